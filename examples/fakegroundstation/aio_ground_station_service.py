@@ -0,0 +1,269 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The fake GroundStationService on grpc.aio.
+
+It answers exactly like ground_station_service.py, but a stream is a coroutine instead of a thread
+of a ten-worker pool, so thousands of ground station streams can be open at once. Instead of
+printing every request, requests are logged as JSON lines: the first `log_first` of each kind, then
+one in `log_every`. The streams and messages per second the server sustains are logged every
+`stats_interval` seconds.
+
+With a plan_catalog.PlanCatalog, ListPlans answers from the catalog instead of with the single
+hard-coded plan, sending the catalog's serialized response as it is. Given TLEs and ground
+station locations, the catalog has the passes predicted for them instead of random plans.
+
+    $ python aio_ground_station_service.py --port 50051 --log-every 1000 --stats-interval 10
+    $ python aio_ground_station_service.py --ground-stations 100 --satellites 500 --plans-per-day 12 --days 7
+    $ python aio_ground_station_service.py --tles active.txt --location 35.6,139.7,40 --location 64.8,-147.5,200
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import time
+
+import grpc
+
+from stellarstation.api.v1.groundstation import groundstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2_grpc
+
+from ground_station_service import CURRENT_PLAN_ID, commands_response, list_plans_error, list_plans_response
+
+SERVICE_NAME = 'stellarstation.api.v1.groundstation.GroundStationService'
+
+logger = logging.getLogger('fakegroundstation')
+
+
+class SampledLog:
+    """Logs events as JSON lines: the first `first` of each event, then one in `every`.
+
+    Every line carries the event name and how many times the event has happened so far, so the
+    totals can be read off the sampled lines.
+    """
+
+    def __init__(self, logger, first=10, every=1000):
+        self.logger = logger
+        self.first = first
+        self.every = every
+        self.counts = collections.Counter()
+
+    def log(self, event, level=logging.INFO, **fields):
+        count = self.counts[event] + 1
+        self.counts[event] = count
+        if count > self.first and count % self.every:
+            return
+        if not self.logger.isEnabledFor(level):
+            return
+        fields['event'] = event
+        fields['count'] = count
+        self.logger.log(level, json.dumps(fields, sort_keys=True, default=str))
+
+
+class ServerStats:
+    """Counters of a servicer, and the rates between two calls of rates()."""
+
+    __slots__ = ('streams_opened', 'streams_active', 'max_streams_active', 'requests', 'responses',
+                 'telemetry_bytes', '_last_time', '_last_streams_opened', '_last_messages')
+
+    def __init__(self):
+        self.streams_opened = 0
+        self.streams_active = 0
+        self.max_streams_active = 0
+        self.requests = 0
+        self.responses = 0
+        self.telemetry_bytes = 0
+        self._last_time = time.monotonic()
+        self._last_streams_opened = 0
+        self._last_messages = 0
+
+    def rates(self):
+        """Returns (streams opened per second, requests and responses per second) since the last call."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        messages = self.requests + self.responses
+        rates = ((self.streams_opened - self._last_streams_opened) / elapsed,
+                 (messages - self._last_messages) / elapsed)
+        self._last_time = now
+        self._last_streams_opened = self.streams_opened
+        self._last_messages = messages
+        return rates
+
+    def __str__(self):
+        return ('streams_opened = {}, streams_active = {}, max_streams_active = {}, requests = {}, '
+                'responses = {}, telemetry_bytes = {}').format(
+            self.streams_opened, self.streams_active, self.max_streams_active, self.requests,
+            self.responses, self.telemetry_bytes)
+
+
+class AioGroundStationServiceServicer(groundstation_pb2_grpc.GroundStationServiceServicer):
+    def __init__(self, log=None, catalog=None):
+        self.log = log or SampledLog(logger)
+        self.stats = ServerStats()
+        self.catalog = catalog
+
+    async def ListPlans(self, request, context):
+        """Lists the plans for a particular ground station. See ground_station_service.py."""
+        self.log.log('list_plans', ground_station_id=request.ground_station_id)
+        error = list_plans_error(request)
+        if error is not None:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, error)
+        if self.catalog is not None:
+            return self.catalog.list_plans_response(
+                request.ground_station_id, request.aos_after.ToNanoseconds(), request.aos_before.ToNanoseconds())
+        return list_plans_response(time.time())
+
+    def _is_current_plan(self, plan_id):
+        if self.catalog is not None:
+            return self.catalog.plan_index(plan_id) is not None
+        return plan_id == CURRENT_PLAN_ID
+
+    async def OpenGroundStationStream(self, request_iterator, context):
+        """Open a stream from a ground station. See ground_station_service.py.
+
+        Every request after the first is answered with the same satellite commands.
+        """
+        stats = self.stats
+        log = self.log
+        request = await request_iterator.__anext__()
+        ground_station_id = request.ground_station_id
+        if not ground_station_id:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Ground station ID not set')
+
+        stats.streams_opened += 1
+        stats.streams_active += 1
+        stats.max_streams_active = max(stats.max_streams_active, stats.streams_active)
+        log.log('stream_opened', ground_station_id=ground_station_id, stream_tag=request.stream_tag,
+                streams_active=stats.streams_active)
+        try:
+            async for request in request_iterator:
+                stats.requests += 1
+                if request.ground_station_id != ground_station_id:
+                    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Unexpected ground station ID')
+                if request.HasField('satellite_telemetry'):
+                    telemetry = request.satellite_telemetry.telemetry
+                    stats.telemetry_bytes += len(telemetry.data)
+                    log.log('satellite_telemetry', ground_station_id=ground_station_id,
+                            stream_tag=request.stream_tag, plan_id=request.satellite_telemetry.plan_id,
+                            framing=telemetry.framing, data=telemetry.data[:10].hex())
+                    if not self._is_current_plan(request.satellite_telemetry.plan_id):
+                        log.log('unexpected_plan_id', logging.WARNING, ground_station_id=ground_station_id,
+                                plan_id=request.satellite_telemetry.plan_id)
+                if request.HasField('stream_event'):
+                    log.log('stream_event', ground_station_id=ground_station_id,
+                            stream_event=str(request.stream_event))
+                stats.responses += 1
+                yield commands_response()
+        finally:
+            stats.streams_active -= 1
+
+
+async def report_stats(servicer, interval):
+    """Logs the streams and messages per second of `servicer` every `interval` seconds, until cancelled."""
+    stats = servicer.stats
+    stats.rates()
+    while True:
+        await asyncio.sleep(interval)
+        streams_per_second, messages_per_second = stats.rates()
+        logger.info(json.dumps({
+            'event': 'stats',
+            'streams_active': stats.streams_active,
+            'max_streams_active': stats.max_streams_active,
+            'streams_per_second': round(streams_per_second, 1),
+            'messages_per_second': round(messages_per_second, 1),
+        }, sort_keys=True))
+
+
+def _serialize_response(response):
+    # Responses from a PlanCatalog are already serialized.
+    if isinstance(response, bytes):
+        return response
+    return response.SerializeToString()
+
+
+async def serve(servicer, address='[::]:50051'):
+    """Starts a grpc.aio server for the ListPlans and OpenGroundStationStream of `servicer`.
+
+    Returns (server, port).
+    """
+    server = grpc.aio.server()
+    handlers = {
+        'ListPlans': grpc.unary_unary_rpc_method_handler(
+            servicer.ListPlans,
+            request_deserializer=groundstation_pb2.ListPlansRequest.FromString,
+            response_serializer=_serialize_response),
+        'OpenGroundStationStream': grpc.stream_stream_rpc_method_handler(
+            servicer.OpenGroundStationStream,
+            request_deserializer=groundstation_pb2.GroundStationStreamRequest.FromString,
+            response_serializer=groundstation_pb2.GroundStationStreamResponse.SerializeToString),
+    }
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(SERVICE_NAME, handlers),))
+    port = server.add_insecure_port(address)
+    await server.start()
+    return server, port
+
+
+async def main(args):
+    catalog = None
+    # The catalog modules need numpy, so they are only imported when a catalog is served.
+    if args.tles:
+        from plan_catalog import PlanCatalog
+        from propagation import GroundStation, read_tles
+        with open(args.tles) as f:
+            tles = read_tles(f)
+        locations = [GroundStation(*(float(value) for value in location.split(','))) for location in args.location]
+        catalog = PlanCatalog.from_tles(tles, locations, days=args.days, min_elevation=args.min_elevation)
+        logger.info(json.dumps({'event': 'catalog', 'plans': len(catalog),
+                                'coordinates': int(catalog.track_offsets[-1])}))
+    elif args.ground_stations:
+        from plan_catalog import PlanCatalog
+        catalog = PlanCatalog(args.ground_stations, args.satellites, args.plans_per_day, args.days)
+        logger.info(json.dumps({'event': 'catalog', 'plans': len(catalog),
+                                'coordinates': int(catalog.track_offsets[-1])}))
+    servicer = AioGroundStationServiceServicer(SampledLog(logger, args.log_first, args.log_every), catalog)
+    server, port = await serve(servicer, '[::]:{}'.format(args.port))
+    logger.info(json.dumps({'event': 'started', 'port': port}))
+    reporter = asyncio.ensure_future(report_stats(servicer, args.stats_interval))
+    try:
+        await server.wait_for_termination()
+    finally:
+        reporter.cancel()
+        await server.stop(0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake GroundStationService on grpc.aio.')
+    parser.add_argument('--port', type=int, default=50051)
+    parser.add_argument('--log-first', type=int, default=10, help='Requests of each kind logged before sampling')
+    parser.add_argument('--log-every', type=int, default=1000, help='Then log one request of each kind in this many')
+    parser.add_argument('--stats-interval', type=float, default=10.0, help='Seconds between stats lines')
+    parser.add_argument('--ground-stations', type=int, default=0,
+                        help='Serve a synthetic catalog of plans for this many ground stations')
+    parser.add_argument('--satellites', type=int, default=100, help='Satellites in the catalog')
+    parser.add_argument('--plans-per-day', type=int, default=6, help='Plans per ground station and day')
+    parser.add_argument('--days', type=int, default=7, help='Days of plans in the catalog')
+    parser.add_argument('--tles', help='Serve the predicted passes of the satellites in this TLE file')
+    parser.add_argument('--location', action='append', default=[],
+                        help='Latitude,longitude,altitude in meters of a ground station of --tles, repeatable')
+    parser.add_argument('--min-elevation', type=float, default=10.0, help='Lowest elevation of a pass of --tles')
+    args = parser.parse_args()
+    if args.tles and not args.location:
+        parser.error('--tles needs at least one --location')
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
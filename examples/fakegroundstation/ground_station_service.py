@@ -28,6 +28,49 @@ PLAN_DURATION_SECONDS = 600
 CURRENT_PLAN_ID = "10"
 
 
+def list_plans_error(request):
+    """Returns the details of the `INVALID_ARGUMENT` error for a ListPlansRequest, or None if it is valid."""
+    if not request.ground_station_id:
+        return 'Ground station ID not set'
+    if request.aos_after is None:
+        return 'AOS after not set'
+    if request.aos_before is None:
+        return 'AOS before not set'
+    delta = request.aos_before.ToDatetime() - request.aos_after.ToDatetime()
+    if delta.days > 31:
+        return 'Duration between aos_after and aos_before > 31 days'
+    return None
+
+
+def list_plans_response(now) -> groundstation_pb2.ListPlansResponse:
+    """Returns the plan starting SECONDS_BEFORE_PLAN_START seconds after `now`."""
+    satellite_coordinates = [
+        groundstation_pb2.SatelliteCoordinates(
+            time=Timestamp(seconds=int(now + SECONDS_BEFORE_PLAN_START + i)),
+            range_rate=(2.1e7 + i * 1e4)
+        )
+        for i in range(PLAN_DURATION_SECONDS)
+    ]
+    # TODO: Fill in the other fields of plan
+    return groundstation_pb2.ListPlansResponse(
+        plan=[groundstation_pb2.Plan(
+            plan_id=CURRENT_PLAN_ID,
+            satellite_coordinates=satellite_coordinates)]
+    )
+
+
+def commands_response() -> groundstation_pb2.GroundStationStreamResponse:
+    """Returns the response sent for every request on a ground station stream."""
+    return groundstation_pb2.GroundStationStreamResponse(
+        plan_id=CURRENT_PLAN_ID,
+        satellite_commands=groundstation_pb2.SatelliteCommands(
+            command=[bytes('command1', encoding='ascii'),
+                     bytes('command2', encoding='ascii'),
+                     bytes('command3', encoding='ascii')],
+        )
+    )
+
+
 class GroundStationServiceServicer(groundstation_pb2_grpc.GroundStationServiceServicer):
     def ListPlans(self, request, context) -> groundstation_pb2.ListPlansResponse:
         """Lists the plans for a particular ground station.
@@ -37,41 +80,13 @@ class GroundStationServiceServicer(groundstation_pb2_grpc.GroundStationServiceSe
         31 days.
         """
         print('Got request for ListPlans')
-        if not request.ground_station_id:
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details('Ground station ID not set')
-            raise RuntimeError('Ground station ID not set')
-        if request.aos_after is None:
+        error = list_plans_error(request)
+        if error is not None:
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details('AOS after not set')
-            raise RuntimeError('AOS after not set')
-        if request.aos_before is None:
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details('AOS before not set')
-            raise RuntimeError('AOS before not set')
+            context.set_details(error)
+            raise RuntimeError(error)
 
-        delta = request.aos_before.ToDatetime() - request.aos_after.ToDatetime()
-        if delta.days > 31:
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details('Duration between aos_after and aos_before > 31 days')
-            raise RuntimeError('Duration between aos_after and aos_before > 31 days')
-
-        now = time.time()
-
-        satellite_coordinates = [
-            groundstation_pb2.SatelliteCoordinates(
-                time=Timestamp(seconds=int(now + SECONDS_BEFORE_PLAN_START + i)),
-                range_rate=(2.1e7 + i * 1e4)
-            )
-            for i in range(PLAN_DURATION_SECONDS)
-        ]
-        # TODO: Fill in the other fields of plan
-        response = groundstation_pb2.ListPlansResponse(
-            plan=[groundstation_pb2.Plan(
-                plan_id=CURRENT_PLAN_ID,
-                satellite_coordinates=satellite_coordinates)]
-        )
-        return response
+        return list_plans_response(time.time())
 
     def OpenGroundStationStream(self, request_iterator, context):
         """Open a stream from a ground station. The returned stream is bi-directional - it is used by
@@ -121,15 +136,7 @@ class GroundStationServiceServicer(groundstation_pb2_grpc.GroundStationServiceSe
                     print("WARNING: plan ID from client telemetry is not equal to current plan ID")
             if request.HasField('stream_event'):
                 print("Stream event", repr(request.stream_event))
-            response = groundstation_pb2.GroundStationStreamResponse(
-                plan_id=CURRENT_PLAN_ID,
-                satellite_commands=groundstation_pb2.SatelliteCommands(
-                    command=[bytes('command1', encoding='ascii'),
-                             bytes('command2', encoding='ascii'),
-                             bytes('command3', encoding='ascii')],
-                )
-            )
-            yield response
+            yield commands_response()
 
 
 if __name__ == '__main__':
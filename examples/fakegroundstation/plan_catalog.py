@@ -0,0 +1,348 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A synthetic catalog of plans for the fake GroundStationService.
+
+The catalog schedules plans of many satellites on many ground stations over a number of days,
+deterministically from a seed. Every plan's coordinate track is computed up front, for all plans
+at once, into flat NumPy arrays: time, azimuth, elevation and range rate at every `step` seconds
+between AOS and LOS. The tracks are simple made-up passes by default; a catalog made with
+PlanCatalog.from_tles() instead schedules the passes predicted by SGP4 (see propagation.py) for
+real orbits over real ground station locations, with their actual azimuth, elevation and range
+rate.
+
+The repeated SatelliteCoordinates of a plan are encoded straight from those arrays into protobuf
+wire format, without creating a message per coordinate: every coordinate is written with the same
+45-byte layout, using varints padded to five bytes, which every protobuf parser accepts. Plans
+are serialized once and kept, so a ListPlans response is only the serialized plans of its window
+joined together. Responses are not kept, since clients ask for windows starting at the current
+time, which are almost never the same twice.
+
+    catalog = PlanCatalog(ground_station_count=100, satellite_count=500, plans_per_day=12, days=7)
+    catalog = PlanCatalog.from_tles(tles, [GroundStation(35.6, 139.7, 40.0)], days=7)
+    wire = catalog.list_plans_response('1', aos_after_seconds, aos_before_seconds)
+"""
+
+import functools
+import time
+
+import numpy as np
+
+from stellarstation.api.v1.groundstation import groundstation_pb2
+
+from propagation import Satellites, find_passes, track_look_angles
+
+# Tags of the fields written by encode_coordinates.
+PLAN_SATELLITE_COORDINATES_TAG = 9 << 3 | 2
+LIST_PLANS_RESPONSE_PLAN_TAG = 1 << 3 | 2
+
+# One SatelliteCoordinates as a field of Plan, with every field present and varints padded to
+# five bytes, so every coordinate has the same size.
+COORDINATES_DTYPE = np.dtype([
+    ('tag', 'u1'), ('length', 'u1'),
+    ('time_tag', 'u1'), ('time_length', 'u1'),
+    ('seconds_tag', 'u1'), ('seconds', 'u1', 5),
+    ('nanos_tag', 'u1'), ('nanos', 'u1', 5),
+    ('angle_tag', 'u1'), ('angle_length', 'u1'),
+    ('azimuth_tag', 'u1'), ('azimuth', '<f8'),
+    ('elevation_tag', 'u1'), ('elevation', '<f8'),
+    ('range_rate_tag', 'u1'), ('range_rate', '<f8'),
+])
+_COORDINATES_CONSTANTS = {
+    'tag': PLAN_SATELLITE_COORDINATES_TAG,
+    'length': COORDINATES_DTYPE.itemsize - 2,
+    'time_tag': 1 << 3 | 2,
+    'time_length': 12,
+    'seconds_tag': 1 << 3 | 0,
+    'nanos_tag': 2 << 3 | 0,
+    'angle_tag': 2 << 3 | 2,
+    'angle_length': 18,
+    'azimuth_tag': 1 << 3 | 1,
+    'elevation_tag': 2 << 3 | 1,
+    'range_rate_tag': 3 << 3 | 1,
+}
+
+# Satellites in low Earth orbit move at about 7.5 km/s.
+ORBITAL_SPEED_METERS_PER_SECOND = 7500.0
+
+NANOS_PER_SECOND = 1000000000
+
+
+def _padded_varints(values):
+    """Returns the non-negative integers `values`, below 2 ** 35, as 5-byte varints."""
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (values.min() < 0 or values.max() >= 1 << 35):
+        raise ValueError('Values must be in [0, 2 ** 35) to be encoded in 5 bytes')
+    shifts = np.arange(0, 35, 7, dtype=np.int64)
+    groups = ((values[:, None] >> shifts) & 0x7f).astype(np.uint8)
+    groups[:, :4] |= 0x80
+    return groups
+
+
+def _varint(value):
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def encode_coordinates(times_ns, azimuth, elevation, range_rate):
+    """Returns the `satellite_coordinates` of a Plan in wire format, one per element of the arrays.
+
+    The result can be appended to any serialized Plan.
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    coordinates = np.zeros(len(times_ns), dtype=COORDINATES_DTYPE)
+    for name, value in _COORDINATES_CONSTANTS.items():
+        coordinates[name] = value
+    coordinates['seconds'] = _padded_varints(times_ns // NANOS_PER_SECOND)
+    coordinates['nanos'] = _padded_varints(times_ns % NANOS_PER_SECOND)
+    coordinates['azimuth'] = azimuth
+    coordinates['elevation'] = elevation
+    coordinates['range_rate'] = range_rate
+    return coordinates.tobytes()
+
+
+def synthetic_tracks(plans, plan_of_sample, times_ns):
+    """Returns (azimuth, elevation, range_rate) of simple overhead passes.
+
+    `plan_of_sample` is the index in `plans` of the plan of each sample, and `times_ns` the time of
+    each sample. Elevation rises to the plan's max_elevation, azimuth sweeps from start_azimuth,
+    and range rate goes from approaching to receding faster for low passes.
+    """
+    plan = plans[plan_of_sample]
+    fractions = (times_ns - plan['aos_ns']) / (plan['los_ns'] - plan['aos_ns'])
+    elevation = plan['max_elevation'] * np.sin(np.pi * fractions)
+    azimuth = (plan['start_azimuth'] + plan['azimuth_sweep'] * fractions) % 360.0
+    speed = ORBITAL_SPEED_METERS_PER_SECOND * np.cos(np.radians(plan['max_elevation']) / 2)
+    range_rate = -speed * np.cos(np.pi * fractions)
+    return azimuth, elevation, range_rate
+
+
+def orbit_tracks(satellites, ground_stations, plans, plan_of_sample, times_ns):
+    """Returns (azimuth, elevation, range_rate) of the plans' satellites from their ground stations.
+
+    `satellites` is a propagation.Satellites and `ground_stations` a sequence of
+    propagation.GroundStation, indexed by the plans' satellite and ground_station.
+    """
+    plan = plans[plan_of_sample]
+    azimuth, elevation, _, range_rate = track_look_angles(
+        satellites, ground_stations, plan['satellite'], plan['ground_station'], times_ns)
+    return azimuth, elevation, range_rate
+
+
+PLAN_DTYPE = np.dtype([
+    ('ground_station', 'i4'),
+    ('satellite', 'i4'),
+    ('aos_ns', 'i8'),
+    ('los_ns', 'i8'),
+    ('max_elevation', 'f8'),
+    ('start_azimuth', 'f8'),
+    ('azimuth_sweep', 'f8'),
+])
+
+
+class CatalogStats:
+    __slots__ = ('plans_serialized', 'responses', 'response_bytes')
+
+    def __init__(self):
+        self.plans_serialized = 0
+        self.responses = 0
+        self.response_bytes = 0
+
+    def __str__(self):
+        return 'plans_serialized = {}, responses = {}, response_bytes = {}'.format(
+            self.plans_serialized, self.responses, self.response_bytes)
+
+
+class PlanCatalog:
+    """Plans of `satellite_count` satellites on `ground_station_count` ground stations.
+
+    Ground stations and satellites are named '1', '2', ..., and plans are numbered in order of
+    ground station and AOS. Every ground station has `plans_per_day` plans a day for `days` days
+    from `start_seconds`, lasting between `min_duration` and `max_duration` seconds, with a
+    coordinate every `step` seconds.
+
+    Instead of random plans, `plans` can be a PLAN_DTYPE array of the plans to serve, in order of
+    ground station and AOS. `tracks` computes the coordinates of the plans, see synthetic_tracks(),
+    and `tles`, if set, are the (line_1, line_2) of each satellite, sent as the tle of its plans.
+    """
+
+    def __init__(self, ground_station_count=10, satellite_count=100, plans_per_day=6, days=1,
+                 start_seconds=None, min_duration=300, max_duration=900, step=1.0, seed=0,
+                 tracks=synthetic_tracks, plans=None, tles=None):
+        self.ground_station_count = ground_station_count
+        self.satellite_count = satellite_count
+        self.step = step
+        self.tles = tles
+        self.stats = CatalogStats()
+        if plans is None:
+            if plans_per_day * max_duration > 24 * 60 * 60:
+                raise ValueError('{} plans of up to {} seconds do not fit in a day'.format(plans_per_day, max_duration))
+            if start_seconds is None:
+                start_seconds = int(time.time()) // 60 * 60
+            plans = self._random_plans(plans_per_day, days, start_seconds, min_duration, max_duration, seed)
+        self.plans = plans
+        self.ground_station_offsets = np.searchsorted(plans['ground_station'], np.arange(ground_station_count + 1))
+
+        # Every track at once, concatenated in plan order.
+        count = len(plans)
+        step_ns = int(step * NANOS_PER_SECOND)
+        sample_counts = (plans['los_ns'] - plans['aos_ns']) // step_ns + 1
+        self.track_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(sample_counts, out=self.track_offsets[1:])
+        plan_of_sample = np.repeat(np.arange(count), sample_counts)
+        sample = np.arange(self.track_offsets[-1]) - self.track_offsets[plan_of_sample]
+        self.track_times_ns = plans['aos_ns'][plan_of_sample] + sample * step_ns
+        self.azimuth, self.elevation, self.range_rate = tracks(plans, plan_of_sample, self.track_times_ns)
+
+        self._serialized_plans = {}
+
+    def _random_plans(self, plans_per_day, days, start_seconds, min_duration, max_duration, seed):
+        rng = np.random.default_rng(seed)
+        per_ground_station = plans_per_day * days
+        count = self.ground_station_count * per_ground_station
+        plans = np.zeros(count, dtype=PLAN_DTYPE)
+        plans['ground_station'] = np.repeat(np.arange(self.ground_station_count), per_ground_station)
+        plans['satellite'] = rng.integers(0, self.satellite_count, count)
+
+        # Each plan is placed at random in its own slot of the day, so plans of a ground station
+        # never overlap and are in order of AOS.
+        slot_ns = 24 * 60 * 60 * NANOS_PER_SECOND // plans_per_day
+        duration_ns = (rng.uniform(min_duration, max_duration, count) * NANOS_PER_SECOND).astype(np.int64)
+        slot = np.tile(np.arange(per_ground_station, dtype=np.int64), self.ground_station_count)
+        offset_ns = (rng.random(count) * (slot_ns - duration_ns)).astype(np.int64)
+        plans['aos_ns'] = start_seconds * NANOS_PER_SECOND + slot * slot_ns + offset_ns
+        plans['los_ns'] = plans['aos_ns'] + duration_ns
+        plans['max_elevation'] = rng.uniform(10, 90, count)
+        plans['start_azimuth'] = rng.uniform(0, 360, count)
+        plans['azimuth_sweep'] = rng.choice([-1, 1], count) * rng.uniform(90, 180, count)
+        return plans
+
+    @classmethod
+    def from_tles(cls, tles, ground_stations, days=1, start_seconds=None, min_elevation=10.0, step=1.0):
+        """Returns a catalog of the predicted passes of satellites over ground stations.
+
+        `tles` is the (line_1, line_2) of each satellite, and `ground_stations` the
+        propagation.GroundStation of each ground station. A ground station tracks one satellite
+        at a time, so a pass that starts before the previous one of its ground station ends is
+        left out.
+        """
+        if start_seconds is None:
+            start_seconds = int(time.time()) // 60 * 60
+        satellites = Satellites(tles)
+        start_ns = start_seconds * NANOS_PER_SECOND
+        end_ns = start_ns + days * 24 * 60 * 60 * NANOS_PER_SECOND
+        scheduled = []
+        for ground_station, location in enumerate(ground_stations):
+            passes = find_passes(satellites, location, start_ns, end_ns, min_elevation=min_elevation)
+            keep = np.zeros(len(passes), dtype=bool)
+            free_ns = start_ns
+            for i, (aos_ns, los_ns) in enumerate(zip(passes['aos_ns'].tolist(), passes['los_ns'].tolist())):
+                if aos_ns >= free_ns:
+                    keep[i] = True
+                    free_ns = los_ns
+            passes = passes[keep]
+            plans = np.zeros(len(passes), dtype=PLAN_DTYPE)
+            plans['ground_station'] = ground_station
+            plans['satellite'] = passes['satellite']
+            plans['aos_ns'] = passes['aos_ns']
+            plans['los_ns'] = passes['los_ns']
+            plans['max_elevation'] = passes['max_elevation']
+            scheduled.append(plans)
+        plans = np.concatenate(scheduled) if scheduled else np.zeros(0, dtype=PLAN_DTYPE)
+        tracks = functools.partial(orbit_tracks, satellites, list(ground_stations))
+        return cls(len(ground_stations), len(satellites), step=step, tracks=tracks, plans=plans,
+                   tles=satellites.tles)
+
+    def __len__(self):
+        return len(self.plans)
+
+    def plan_id(self, index):
+        return str(index + 1)
+
+    def plan_index(self, plan_id):
+        """Returns the index of the plan with `plan_id`, or None if there is none."""
+        try:
+            index = int(plan_id) - 1
+        except ValueError:
+            return None
+        return index if 0 <= index < len(self.plans) else None
+
+    def plan_indices(self, ground_station_id, aos_after_ns, aos_before_ns):
+        """Returns the indices of the plans of a ground station with aos_after_ns <= AOS < aos_before_ns."""
+        try:
+            ground_station = int(ground_station_id) - 1
+        except ValueError:
+            return np.zeros(0, dtype=np.int64)
+        if not 0 <= ground_station < self.ground_station_count:
+            return np.zeros(0, dtype=np.int64)
+        first = self.ground_station_offsets[ground_station]
+        aos = self.plans['aos_ns'][first:self.ground_station_offsets[ground_station + 1]]
+        return first + np.arange(np.searchsorted(aos, aos_after_ns), np.searchsorted(aos, aos_before_ns))
+
+    def track(self, index):
+        """Returns (times in ns, azimuth, elevation, range rate) of a plan's track."""
+        start, end = self.track_offsets[index], self.track_offsets[index + 1]
+        return (self.track_times_ns[start:end], self.azimuth[start:end], self.elevation[start:end],
+                self.range_rate[start:end])
+
+    def _plan_header(self, index):
+        plan = self.plans[index]
+        aos = _timestamp(plan['aos_ns'])
+        los = _timestamp(plan['los_ns'])
+        header = groundstation_pb2.Plan(
+            plan_id=self.plan_id(index),
+            ground_station_id=str(plan['ground_station'] + 1),
+            satellite_id=str(plan['satellite'] + 1),
+            start_time=aos,
+            end_time=los,
+            aos_time=aos,
+            los_time=los,
+            satellite_organization_name='Fake Satellite Organization',
+            ground_station_organization_name='Fake Ground Station Organization')
+        if self.tles is not None:
+            header.tle.line_1, header.tle.line_2 = self.tles[plan['satellite']]
+        return header
+
+    def serialized_plan(self, index):
+        """Returns the Plan at `index` in wire format."""
+        wire = self._serialized_plans.get(index)
+        if wire is None:
+            wire = self._plan_header(index).SerializeToString() + encode_coordinates(*self.track(index))
+            self._serialized_plans[index] = wire
+            self.stats.plans_serialized += 1
+        return wire
+
+    def plan(self, index):
+        """Returns the Plan at `index`."""
+        return groundstation_pb2.Plan.FromString(self.serialized_plan(index))
+
+    def list_plans_response(self, ground_station_id, aos_after_ns, aos_before_ns):
+        """Returns the ListPlansResponse for a window in wire format."""
+        chunks = []
+        for index in self.plan_indices(ground_station_id, aos_after_ns, aos_before_ns):
+            plan = self.serialized_plan(int(index))
+            chunks.append(bytes([LIST_PLANS_RESPONSE_PLAN_TAG]) + _varint(len(plan)))
+            chunks.append(plan)
+        wire = b''.join(chunks)
+        self.stats.responses += 1
+        self.stats.response_bytes += len(wire)
+        return wire
+
+
+def _timestamp(time_ns):
+    return {'seconds': int(time_ns // NANOS_PER_SECOND), 'nanos': int(time_ns % NANOS_PER_SECOND)}
@@ -0,0 +1,658 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SGP4 propagation of many TLEs over many times at once, with NumPy.
+
+This is the near-Earth part of SGP4 as published by Vallado et al. ("Revisiting Spacetrack Report
+#3", 2006), with WGS-72 constants, written so that every step works on whole arrays: the elements
+of every satellite are initialized together, and every satellite is propagated to every time of a
+grid in one pass. Satellites with a period of 225 minutes or more need the deep-space terms
+(SDP4), which are not implemented; their positions are NaN.
+
+On top of it, look_angles() computes the azimuth, elevation, range and range rate of every
+satellite from a ground station, track_look_angles() those of samples of many satellites from many
+ground stations, and find_passes() finds the passes above a minimum elevation.
+
+SGP4 costs a few hundred array operations per sample. For dense grids like a day at 1 Hz,
+interpolate() only propagates every minute or so and interpolates the positions and velocities in
+between, which is within a meter for low Earth orbits, and look angles are computed in blocks
+small enough to stay in the CPU cache. On one CPU core, a day of 1 Hz look angles of 24
+satellites takes about a third of a second that way, and several times longer propagating every
+second.
+
+    satellites = Satellites([(line_1, line_2), ...])
+    station = GroundStation(latitude=35.6, longitude=139.7, altitude=40.0)
+    times_ns = start_ns + np.arange(86400) * 10 ** 9
+    azimuth, elevation, range_m, range_rate = look_angles(satellites, station, times_ns, step=60.0)
+    passes = find_passes(satellites, station, start_ns, end_ns, min_elevation=10.0)
+"""
+
+import calendar
+import collections
+import math
+
+import numpy as np
+
+# WGS-72, as used to generate TLEs.
+MU = 398600.8
+EARTH_RADIUS_KM = 6378.135
+XKE = 60.0 / math.sqrt(EARTH_RADIUS_KM ** 3 / MU)
+J2 = 0.001082616
+J3 = -0.00000253881
+J4 = -0.00000165597
+J3OJ2 = J3 / J2
+
+# WGS-84, for ground station locations.
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+EARTH_ROTATION_RAD_PER_SECOND = 7.29211514670698e-05
+
+MINUTES_PER_DAY = 1440.0
+NANOS_PER_SECOND = 1000000000
+UNIX_EPOCH_JD = 2440587.5
+TWO_PI = 2 * math.pi
+X2O3 = 2.0 / 3.0
+
+# Periods at or above this need the deep-space terms.
+DEEP_SPACE_PERIOD_MINUTES = 225.0
+
+# Codes of the `error` array returned by propagate().
+ERROR_NONE = 0
+ERROR_ECCENTRICITY = 1
+ERROR_MEAN_MOTION = 2
+ERROR_SEMI_LATUS_RECTUM = 4
+ERROR_DECAYED = 6
+ERROR_DEEP_SPACE = 7
+
+GroundStation = collections.namedtuple('GroundStation', ['latitude', 'longitude', 'altitude'])
+GroundStation.__doc__ = 'Geodetic latitude and longitude in degrees, and altitude in meters above the WGS-84 ellipsoid.'
+
+
+def _tle_float(field):
+    """Parses a TLE field with an implied decimal point and exponent, like ' 28098-4'."""
+    field = field.strip()
+    if not field:
+        return 0.0
+    sign = -1.0 if field[0] == '-' else 1.0
+    field = field.lstrip('+-')
+    mantissa, exponent = field[:-2], field[-2:]
+    return sign * float('0.' + mantissa.strip()) * 10.0 ** int(exponent)
+
+
+def parse_tle(line_1, line_2):
+    """Returns the mean elements of a TLE as a dict, angles in degrees and mean motion in revs/day."""
+    year = int(line_1[18:20])
+    year += 1900 if year >= 57 else 2000
+    day_of_year = float(line_1[20:32])
+    epoch_seconds = calendar.timegm((year, 1, 1, 0, 0, 0)) + (day_of_year - 1) * 86400.0
+    return {
+        'catalog_number': line_1[2:7].strip(),
+        'epoch_ns': int(round(epoch_seconds * NANOS_PER_SECOND)),
+        'ndot': float(line_1[33:43]),
+        'nddot': _tle_float(line_1[44:52]),
+        'bstar': _tle_float(line_1[53:61]),
+        'inclination': float(line_2[8:16]),
+        'raan': float(line_2[17:25]),
+        'eccentricity': float('0.' + line_2[26:33].strip()),
+        'argument_of_perigee': float(line_2[34:42]),
+        'mean_anomaly': float(line_2[43:51]),
+        'mean_motion': float(line_2[52:63]),
+    }
+
+
+def read_tles(lines):
+    """Returns the (line_1, line_2) of the TLEs in `lines`, skipping name lines and blank lines."""
+    lines = [line.rstrip() for line in lines if line.strip()]
+    return [(line_1, line_2) for line_1, line_2 in zip(lines, lines[1:])
+            if line_1.startswith('1 ') and line_2.startswith('2 ')]
+
+
+class Satellites:
+    """The SGP4 state of many TLEs, one array element per satellite.
+
+    `tles` is a sequence of (line_1, line_2).
+    """
+
+    def __init__(self, tles):
+        tles = [tuple(tle) for tle in tles]
+        elements = [parse_tle(*tle) for tle in tles]
+        self.tles = tles
+        self.catalog_numbers = [element['catalog_number'] for element in elements]
+
+        def column(name):
+            return np.array([element[name] for element in elements], dtype=np.float64)
+
+        self.epoch_ns = np.array([element['epoch_ns'] for element in elements], dtype=np.int64)
+        self.bstar = column('bstar')
+        self.ecco = column('eccentricity')
+        self.inclo = np.radians(column('inclination'))
+        self.nodeo = np.radians(column('raan'))
+        self.argpo = np.radians(column('argument_of_perigee'))
+        self.mo = np.radians(column('mean_anomaly'))
+        no_kozai = column('mean_motion') * TWO_PI / MINUTES_PER_DAY
+        self._initialize(no_kozai)
+
+    def __len__(self):
+        return len(self.tles)
+
+    def _initialize(self, no_kozai):
+        # sgp4init, for every satellite at once.
+        ecco, inclo, bstar = self.ecco, self.inclo, self.bstar
+        eccsq = ecco * ecco
+        omeosq = 1.0 - eccsq
+        rteosq = np.sqrt(omeosq)
+        cosio = np.cos(inclo)
+        cosio2 = cosio * cosio
+
+        # Un-Kozai the mean motion.
+        ak = (XKE / no_kozai) ** X2O3
+        d1 = 0.75 * J2 * (3.0 * cosio2 - 1.0) / (rteosq * omeosq)
+        del_ = d1 / (ak * ak)
+        adel = ak * (1.0 - del_ * del_ - del_ * (1.0 / 3.0 + 134.0 * del_ * del_ / 81.0))
+        del_ = d1 / (adel * adel)
+        no_unkozai = no_kozai / (1.0 + del_)
+
+        ao = (XKE / no_unkozai) ** X2O3
+        sinio = np.sin(inclo)
+        po = ao * omeosq
+        con42 = 1.0 - 5.0 * cosio2
+        con41 = -con42 - cosio2 - cosio2
+        posq = po * po
+        rp = ao * (1.0 - ecco)
+
+        self.deep_space = TWO_PI / no_unkozai >= DEEP_SPACE_PERIOD_MINUTES
+        # Perigee below 220 km: the simplified equations.
+        isimp = rp < 220.0 / EARTH_RADIUS_KM + 1.0
+
+        # The atmospheric density parameter depends on the perigee height.
+        perige = (rp - 1.0) * EARTH_RADIUS_KM
+        sfour = np.where(perige < 156.0, np.where(perige < 98.0, 20.0, perige - 78.0), 78.0)
+        qzms24 = ((120.0 - sfour) / EARTH_RADIUS_KM) ** 4
+        sfour = sfour / EARTH_RADIUS_KM + 1.0
+
+        pinvsq = 1.0 / posq
+        tsi = 1.0 / (ao - sfour)
+        eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = np.abs(1.0 - etasq)
+        coef = qzms24 * tsi ** 4
+        coef1 = coef / psisq ** 3.5
+        cc2 = coef1 * no_unkozai * (ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq)) +
+                                    0.375 * J2 * tsi / psisq * con41 * (8.0 + 3.0 * etasq * (8.0 + etasq)))
+        cc1 = bstar * cc2
+        eccentric = ecco > 1.0e-4
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cc3 = np.where(eccentric, -2.0 * coef * tsi * J3OJ2 * no_unkozai * sinio / ecco, 0.0)
+            xmcof = np.where(eccentric, -X2O3 * coef * bstar / eeta, 0.0)
+        x1mth2 = 1.0 - cosio2
+        cc4 = 2.0 * no_unkozai * coef1 * ao * omeosq * (
+            eta * (2.0 + 0.5 * etasq) + ecco * (0.5 + 2.0 * etasq) -
+            J2 * tsi / (ao * psisq) * (-3.0 * con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta)) +
+                                       0.75 * x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) * np.cos(2.0 * self.argpo)))
+        cc5 = 2.0 * coef1 * ao * omeosq * (1.0 + 2.75 * (etasq + eeta) + eeta * etasq)
+        cosio4 = cosio2 * cosio2
+        temp1 = 1.5 * J2 * pinvsq * no_unkozai
+        temp2 = 0.5 * temp1 * J2 * pinvsq
+        temp3 = -0.46875 * J4 * pinvsq * pinvsq * no_unkozai
+        self.mdot = (no_unkozai + 0.5 * temp1 * rteosq * con41 +
+                     0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4))
+        self.argpdot = (-0.5 * temp1 * con42 + 0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4) +
+                        temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4))
+        xhdot1 = -temp1 * cosio
+        self.nodedot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * cosio2) + 2.0 * temp3 * (3.0 - 7.0 * cosio2)) * cosio
+        # The simplified equations have no delomg, delm and cc5 terms, so they are zeroed.
+        self.omgcof = np.where(isimp, 0.0, bstar * cc3 * np.cos(self.argpo))
+        self.xmcof = np.where(isimp, 0.0, xmcof)
+        self.nodecf = 3.5 * omeosq * xhdot1 * cc1
+        self.t2cof = 1.5 * cc1
+        # Avoids a division by zero for an inclination of 180 degrees.
+        one_plus_cosio = np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+        self.xlcof = -0.25 * J3OJ2 * sinio * (3.0 + 5.0 * cosio) / one_plus_cosio
+        self.aycof = -0.5 * J3OJ2 * sinio
+        self.delmo = (1.0 + eta * np.cos(self.mo)) ** 3
+        self.sinmao = np.sin(self.mo)
+        self.x7thm1 = 7.0 * cosio2 - 1.0
+
+        cc1sq = cc1 * cc1
+        d2 = 4.0 * ao * tsi * cc1sq
+        temp = d2 * tsi * cc1 / 3.0
+        d3 = (17.0 * ao + sfour) * temp
+        d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+        # The higher order drag terms are left out for the simplified equations.
+        full = ~isimp
+        self.d2 = np.where(full, d2, 0.0)
+        self.d3 = np.where(full, d3, 0.0)
+        self.d4 = np.where(full, d4, 0.0)
+        self.t3cof = np.where(full, d2 + 2.0 * cc1sq, 0.0)
+        self.t4cof = np.where(full, 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq)), 0.0)
+        self.t5cof = np.where(full, 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 +
+                                           15.0 * cc1sq * (2.0 * d2 + cc1sq)), 0.0)
+        self.isimp = isimp
+
+        self.no_unkozai = no_unkozai
+        self.con41 = con41
+        self.x1mth2 = x1mth2
+        self.cc1 = cc1
+        self.cc4 = cc4
+        self.cc5 = np.where(isimp, 0.0, cc5)
+        self.sinio = sinio
+        self.cosio = cosio
+        self.eta = eta
+
+
+def _mod_two_pi(x):
+    # Same as np.fmod(x, TWO_PI), which is several times slower.
+    return x - TWO_PI * np.trunc(x / TWO_PI)
+
+
+def _rotate(sin_a, cos_a, d):
+    """Returns the sine and cosine of a + d from those of a."""
+    sin_d = np.sin(d)
+    cos_d = np.cos(d)
+    return sin_a * cos_d + cos_a * sin_d, cos_a * cos_d - sin_a * sin_d
+
+
+def propagate(satellites, times_ns):
+    """Propagates every satellite to `times_ns`, nanoseconds since the Unix epoch.
+
+    `times_ns` has one row per satellite, or is a 1-D grid used for every satellite. Returns
+    (position, velocity, error): TEME position in km and velocity in km/s with a trailing axis of
+    3, and an error code per position (see ERROR_*). Positions with an error are NaN.
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    if times_ns.ndim < 2:
+        times_ns = np.broadcast_to(times_ns, (len(satellites),) + times_ns.shape[-1:])
+    extra = (1,) * (times_ns.ndim - 1)
+
+    def per_satellite(values):
+        return values.reshape(values.shape + extra)
+
+    s = satellites
+    t = (times_ns - per_satellite(s.epoch_ns)) / (60.0 * NANOS_PER_SECOND)
+    bstar = per_satellite(s.bstar)
+    ecco = per_satellite(s.ecco)
+    inclo = per_satellite(s.inclo)
+    no_unkozai = per_satellite(s.no_unkozai)
+
+    # Secular gravity and atmospheric drag.
+    xmdf = per_satellite(s.mo) + per_satellite(s.mdot) * t
+    argpdf = per_satellite(s.argpo) + per_satellite(s.argpdot) * t
+    nodedf = per_satellite(s.nodeo) + per_satellite(s.nodedot) * t
+    t2 = t * t
+    nodem = nodedf + per_satellite(s.nodecf) * t2
+    t3 = t2 * t
+    t4 = t3 * t
+    delomg = per_satellite(s.omgcof) * t
+    delmtemp = 1.0 + per_satellite(s.eta) * np.cos(xmdf)
+    delm = per_satellite(s.xmcof) * (delmtemp * delmtemp * delmtemp - per_satellite(s.delmo))
+    temp = delomg + delm
+    mm = xmdf + temp
+    argpm = argpdf - temp
+    tempa = 1.0 - per_satellite(s.cc1) * t - per_satellite(s.d2) * t2 - per_satellite(s.d3) * t3 - \
+        per_satellite(s.d4) * t4
+    tempe = bstar * (per_satellite(s.cc4) * t + per_satellite(s.cc5) * (np.sin(mm) - per_satellite(s.sinmao)))
+    templ = per_satellite(s.t2cof) * t2 + per_satellite(s.t3cof) * t3 + \
+        t4 * (per_satellite(s.t4cof) + t * per_satellite(s.t5cof))
+
+    error = np.zeros(t.shape, dtype=np.int8)
+    error[np.broadcast_to(per_satellite(s.deep_space), t.shape)] = ERROR_DEEP_SPACE
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        am = (XKE / no_unkozai) ** X2O3 * tempa * tempa
+        nm = XKE / (am * np.sqrt(am))
+        em = ecco - tempe
+        error[(em >= 1.0) | (em < -0.001)] = ERROR_ECCENTRICITY
+        error[nm <= 0.0] = ERROR_MEAN_MOTION
+        em = np.maximum(em, 1.0e-6)
+        mm = mm + no_unkozai * templ
+        xlm = mm + argpm + nodem
+        nodem = _mod_two_pi(nodem)
+        argpm = _mod_two_pi(argpm)
+        xlm = _mod_two_pi(xlm)
+        mm = _mod_two_pi(xlm - argpm - nodem)
+
+        # Long period periodics.
+        axnl = em * np.cos(argpm)
+        temp = 1.0 / (am * (1.0 - em * em))
+        aynl = em * np.sin(argpm) + temp * per_satellite(s.aycof)
+        xl = mm + argpm + nodem + temp * per_satellite(s.xlcof) * axnl
+
+        # Kepler's equation, by Newton's method with the step limited to 0.95 rad, for at most 10
+        # iterations. Each element stops once its step is below 1e-12, and like the reference
+        # implementation keeps the sine and cosine from before its last step. After the first
+        # iteration they are rotated by the step instead of being computed again.
+        u = _mod_two_pi(xl - nodem)
+        eo1 = u.copy()
+        sineo1 = np.sin(eo1)
+        coseo1 = np.cos(eo1)
+        for _ in range(10):
+            tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1.0 - coseo1 * axnl - sineo1 * aynl)
+            np.minimum(tem5, 0.95, out=tem5)
+            np.maximum(tem5, -0.95, out=tem5)
+            eo1 += tem5
+            tem5[np.abs(tem5) < 1.0e-12] = 0.0
+            if not tem5.any():
+                break
+            sineo1, coseo1 = _rotate(sineo1, coseo1, tem5)
+
+        # Short period periodics.
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1.0 - el2)
+        error[pl < 0.0] = ERROR_SEMI_LATUS_RECTUM
+        rl = am * (1.0 - ecose)
+        rdotl = np.sqrt(am) * esine / rl
+        rvdotl = np.sqrt(pl) / rl
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * J2 * temp
+        temp2 = temp1 * temp
+
+        con41 = per_satellite(s.con41)
+        x1mth2 = per_satellite(s.x1mth2)
+        cosip = per_satellite(s.cosio)
+        sinip = per_satellite(s.sinio)
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * con41) + 0.5 * temp1 * x1mth2 * cos2u
+        mvt = rdotl - nm * temp1 * x1mth2 * sin2u / XKE
+        rvdot = rvdotl + nm * temp1 * (x1mth2 * cos2u + 1.5 * con41) / XKE
+
+        # The short period corrections of su, xnode and xinc are below 1e-3 rad, so their sines
+        # and cosines are those of the uncorrected angles rotated by the correction.
+        norm = 1.0 / np.sqrt(sinu * sinu + cosu * cosu)
+        sinsu, cossu = _rotate(sinu * norm, cosu * norm, -0.25 * temp2 * per_satellite(s.x7thm1) * sin2u)
+        snod, cnod = _rotate(np.sin(nodem), np.cos(nodem), 1.5 * temp2 * cosip * sin2u)
+        sini, cosi = _rotate(sinip, cosip, 1.5 * temp2 * cosip * sinip * cos2u)
+
+        # Orientation vectors.
+        xmx = -snod * cosi
+        xmy = cnod * cosi
+        ux = xmx * sinsu + cnod * cossu
+        uy = xmy * sinsu + snod * cossu
+        uz = sini * sinsu
+        vx = xmx * cossu - cnod * sinsu
+        vy = xmy * cossu - snod * sinsu
+        vz = sini * cossu
+
+        error[(mrt < 1.0) & (error == ERROR_NONE)] = ERROR_DECAYED
+        position = np.stack((ux, uy, uz), axis=-1) * (mrt * EARTH_RADIUS_KM)[..., None]
+        speed = EARTH_RADIUS_KM * XKE / 60.0
+        velocity = (np.stack((ux, uy, uz), axis=-1) * mvt[..., None] +
+                    np.stack((vx, vy, vz), axis=-1) * rvdot[..., None]) * speed
+    failed = error != ERROR_NONE
+    position[failed] = np.nan
+    velocity[failed] = np.nan
+    return position, velocity, error
+
+
+def gmst(times_ns):
+    """Greenwich mean sidereal time in radians (IAU 1982), taking UT1 as UTC."""
+    jd = np.asarray(times_ns, dtype=np.int64) / (86400.0 * NANOS_PER_SECOND) + UNIX_EPOCH_JD
+    tut1 = (jd - 2451545.0) / 36525.0
+    seconds = (-6.2e-6 * tut1 ** 3 + 0.093104 * tut1 ** 2 + (876600.0 * 3600.0 + 8640184.812866) * tut1 +
+               67310.54841)
+    return np.mod(np.radians(seconds / 240.0), TWO_PI)
+
+
+def station_position(station):
+    """Returns the Earth-fixed position in km of a GroundStation."""
+    latitude = math.radians(station.latitude)
+    longitude = math.radians(station.longitude)
+    altitude = station.altitude / 1000.0
+    e2 = WGS84_F * (2.0 - WGS84_F)
+    n = WGS84_A_KM / math.sqrt(1.0 - e2 * math.sin(latitude) ** 2)
+    return np.array([
+        (n + altitude) * math.cos(latitude) * math.cos(longitude),
+        (n + altitude) * math.cos(latitude) * math.sin(longitude),
+        (n * (1.0 - e2) + altitude) * math.sin(latitude),
+    ])
+
+
+def _station_frames(stations):
+    # The Earth-fixed position of each station and the sines and cosines of its latitude and
+    # longitude, as arrays with one element per station.
+    frames = []
+    for station in stations:
+        latitude = math.radians(station.latitude)
+        longitude = math.radians(station.longitude)
+        frames.append(tuple(station_position(station)) + (
+            math.sin(latitude), math.cos(latitude), math.sin(longitude), math.cos(longitude)))
+    return np.array(frames, dtype=np.float64).reshape(-1, 7).T
+
+
+def _propagate_knots(satellites, start_ns, end_ns, step):
+    # Propagates every `step` seconds from start_ns to one knot past end_ns.
+    step_ns = int(step * NANOS_PER_SECOND)
+    count = max(int(end_ns) - int(start_ns), 0) // step_ns + 2
+    position, velocity, error = propagate(satellites, start_ns + np.arange(count, dtype=np.int64) * step_ns)
+    # One contiguous array per axis, which _hermite() reads much faster than the trailing axis.
+    return (int(start_ns), step_ns, np.ascontiguousarray(np.moveaxis(position, -1, 0)),
+            np.ascontiguousarray(np.moveaxis(velocity, -1, 0)), error)
+
+
+def _hermite(knots, rows, times_ns):
+    # The cubic Hermite polynomials through the knots around each time, and their derivatives,
+    # for the satellites `rows`: a slice for every satellite at every time, or an array with the
+    # satellite of each time. Positions and velocities have a leading axis of 3.
+    start_ns, step_ns, knot_position, knot_velocity, _ = knots
+    step = step_ns / NANOS_PER_SECOND
+    index = (times_ns - start_ns) // step_ns
+    # The basis polynomials only depend on the time, so they are shared by every satellite.
+    x = ((times_ns - start_ns) - index * step_ns) / step_ns
+    x2 = x * x
+    x3 = x2 * x
+    h00 = 2.0 * x3 - 3.0 * x2 + 1.0
+    h10 = (x3 - 2.0 * x2 + x) * step
+    h11 = (x3 - x2) * step
+    d00 = (6.0 * x2 - 6.0 * x) / step
+    d10 = 3.0 * x2 - 4.0 * x + 1.0
+    d11 = 3.0 * x2 - 2.0 * x
+
+    position = []
+    velocity = []
+    for axis in range(3):
+        p0 = knot_position[axis][rows, index]
+        delta = p0 - knot_position[axis][rows, index + 1]
+        v0 = knot_velocity[axis][rows, index]
+        v1 = knot_velocity[axis][rows, index + 1]
+        position.append(h00 * delta + h10 * v0 + h11 * v1 + (p0 - delta))
+        velocity.append(d00 * delta + d10 * v0 + d11 * v1)
+    return position, velocity
+
+
+def interpolate(satellites, times_ns, step):
+    """Like propagate() for a 1-D grid of `times_ns`, but only propagates every `step` seconds.
+
+    Positions and velocities in between come from the cubic Hermite polynomial through the
+    propagated positions and velocities around them. For a low Earth orbit and a step of 60
+    seconds, positions are within a meter and velocities within 0.1 m/s of propagate().
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    if times_ns.ndim != 1:
+        raise ValueError('Interpolation needs a 1-D grid of times')
+    if not len(times_ns):
+        return propagate(satellites, times_ns)
+    knots = _propagate_knots(satellites, times_ns.min(), times_ns.max(), step)
+    position, velocity = _hermite(knots, slice(None), times_ns)
+    # A time has the errors of the knots around it.
+    start_ns, step_ns, _, _, knot_error = knots
+    index = (times_ns - start_ns) // step_ns
+    error = np.maximum(knot_error[:, index], knot_error[:, index + 1])
+    return np.stack(position, axis=-1), np.stack(velocity, axis=-1), error
+
+
+def _topocentric(position, velocity, theta, frame):
+    # Azimuth, elevation, range and range rate in km and km/s of TEME positions and velocities,
+    # given as their x, y and z, from stations with _station_frames() `frame`.
+    site_x, site_y, site_z, sin_lat, cos_lat, sin_lon, cos_lon = frame
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    # TEME to Earth-fixed: a rotation by GMST, and the velocity of the rotating frame.
+    x, y, z = position
+    ecef_x = cos_theta * x + sin_theta * y
+    ecef_y = cos_theta * y - sin_theta * x
+    vx, vy, vz = velocity
+    ecef_vx = cos_theta * vx + sin_theta * vy + EARTH_ROTATION_RAD_PER_SECOND * ecef_y
+    ecef_vy = cos_theta * vy - sin_theta * vx - EARTH_ROTATION_RAD_PER_SECOND * ecef_x
+
+    # To the east, north and up of the station.
+    dx = ecef_x - site_x
+    dy = ecef_y - site_y
+    dz = z - site_z
+    horizontal = cos_lon * dx + sin_lon * dy
+    east = cos_lon * dy - sin_lon * dx
+    north = cos_lat * dz - sin_lat * horizontal
+    up = cos_lat * horizontal + sin_lat * dz
+
+    distance = np.sqrt(dx * dx + dy * dy + dz * dz)
+    azimuth = np.degrees(np.arctan2(east, north))
+    azimuth[azimuth < 0.0] += 360.0
+    elevation = np.degrees(np.arcsin(up / distance))
+    range_rate = (dx * ecef_vx + dy * ecef_vy + dz * vz) / distance
+    return azimuth, elevation, distance, range_rate
+
+
+# look_angles() and track_look_angles() work on blocks of about this many samples, so that their
+# temporary arrays stay in the CPU cache. NumPy is several times faster on those than on arrays of
+# a whole day.
+BLOCK_ELEMENTS = 1 << 15
+
+
+def look_angles(satellites, station, times_ns, step=None):
+    """Returns (azimuth, elevation, range, range_rate) of every satellite from `station`.
+
+    `times_ns` is as for propagate(). Angles are in degrees, azimuth clockwise from north, range
+    in meters and range rate in meters per second, positive when the satellite moves away. Polar
+    motion and the difference between UT1 and UTC are ignored.
+
+    With a `step` in seconds, `times_ns` must be a 1-D grid, and the satellites are only
+    propagated every `step` and interpolated in between, see interpolate().
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    knots = None
+    if step is not None:
+        if times_ns.ndim != 1:
+            raise ValueError('Interpolation needs a 1-D grid of times')
+        if len(times_ns):
+            knots = _propagate_knots(satellites, times_ns.min(), times_ns.max(), step)
+    frame = _station_frames([station])[:, 0]
+    shape = (len(satellites), times_ns.shape[-1])
+    results = tuple(np.empty(shape) for _ in range(4))
+    width = max(1, BLOCK_ELEMENTS // max(len(satellites), 1))
+    for begin in range(0, shape[1], width):
+        block_ns = times_ns[..., begin:begin + width]
+        if knots is None:
+            position, velocity, _ = propagate(satellites, block_ns)
+            position = np.moveaxis(position, -1, 0)
+            velocity = np.moveaxis(velocity, -1, 0)
+        else:
+            position, velocity = _hermite(knots, slice(None), block_ns)
+        for result, values in zip(results, _topocentric(position, velocity, gmst(block_ns), frame)):
+            result[:, begin:begin + width] = values
+    azimuth, elevation, distance, range_rate = results
+    distance *= 1000.0
+    range_rate *= 1000.0
+    return azimuth, elevation, distance, range_rate
+
+
+def track_look_angles(satellites, stations, satellite, station, times_ns, step=60.0):
+    """Returns (azimuth, elevation, range, range_rate) of samples of many satellites and stations.
+
+    Sample i is of satellite `satellite[i]` from `stations[station[i]]` at `times_ns[i]`, so the
+    tracks of many passes can be computed at once. Satellites are propagated every `step` seconds
+    over the span of `times_ns` and interpolated in between, see interpolate(). Units are as for
+    look_angles().
+    """
+    satellite = np.asarray(satellite, dtype=np.intp)
+    station = np.asarray(station, dtype=np.intp)
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    results = tuple(np.empty(len(times_ns)) for _ in range(4))
+    if not len(times_ns):
+        return results
+    knots = _propagate_knots(satellites, times_ns.min(), times_ns.max(), step)
+    frames = _station_frames(stations)
+    for begin in range(0, len(times_ns), BLOCK_ELEMENTS):
+        block = slice(begin, begin + BLOCK_ELEMENTS)
+        position, velocity = _hermite(knots, satellite[block], times_ns[block])
+        frame = frames[:, station[block]]
+        for result, values in zip(results, _topocentric(position, velocity, gmst(times_ns[block]), frame)):
+            result[block] = values
+    azimuth, elevation, distance, range_rate = results
+    distance *= 1000.0
+    range_rate *= 1000.0
+    return azimuth, elevation, distance, range_rate
+
+
+PASS_DTYPE = np.dtype([
+    ('satellite', 'i4'),
+    ('aos_ns', 'i8'),
+    ('los_ns', 'i8'),
+    ('max_elevation', 'f8'),
+    ('max_elevation_ns', 'i8'),
+])
+
+
+def find_passes(satellites, station, start_ns, end_ns, step=10.0, min_elevation=0.0):
+    """Returns the passes of every satellite above `min_elevation` degrees between start_ns and end_ns.
+
+    Elevations are computed every `step` seconds and AOS and LOS are interpolated between the
+    samples, so passes shorter than a step may be missed. For steps below a minute, the
+    satellites are propagated every minute and interpolated in between, see interpolate(). Passes
+    already in progress at start_ns or still in progress at end_ns are cut there. The result is a
+    PASS_DTYPE array sorted by AOS.
+    """
+    step_ns = int(step * NANOS_PER_SECOND)
+    times_ns = np.arange(start_ns, end_ns + step_ns, step_ns, dtype=np.int64)
+    times_ns[-1] = min(times_ns[-1], end_ns)
+    _, elevation, _, _ = look_angles(satellites, station, times_ns, step=60.0 if step < 60.0 else None)
+    above = np.nan_to_num(elevation, nan=-90.0) >= min_elevation
+
+    # Edges of the runs of samples above the minimum, with the grid padded so every run has both.
+    padded = np.zeros((len(satellites), len(times_ns) + 2), dtype=np.int8)
+    padded[:, 1:-1] = above
+    edges = np.diff(padded, axis=1)
+    satellite, first = np.nonzero(edges == 1)
+    _, after_last = np.nonzero(edges == -1)
+    last = after_last - 1
+
+    def crossing(before, after):
+        # Time where the elevation crosses min_elevation between two samples.
+        e0 = elevation[satellite, before]
+        e1 = elevation[satellite, after]
+        fraction = np.clip((min_elevation - e0) / (e1 - e0), 0.0, 1.0)
+        return times_ns[before] + (fraction * (times_ns[after] - times_ns[before])).astype(np.int64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        aos_ns = np.where(first > 0, crossing(np.maximum(first - 1, 0), first), times_ns[first])
+        los_ns = np.where(last < len(times_ns) - 1, crossing(last, np.minimum(last + 1, len(times_ns) - 1)),
+                          times_ns[last])
+
+    # The highest sample of each pass.
+    masked = np.where(above, elevation, -np.inf)
+    passes = np.zeros(len(satellite), dtype=PASS_DTYPE)
+    for i in range(len(satellite)):
+        peak = first[i] + int(np.argmax(masked[satellite[i], first[i]:last[i] + 1]))
+        passes[i]['max_elevation'] = elevation[satellite[i], peak]
+        passes[i]['max_elevation_ns'] = times_ns[peak]
+    passes['satellite'] = satellite
+    passes['aos_ns'] = aos_ns
+    passes['los_ns'] = los_ns
+    return passes[np.argsort(passes['aos_ns'], kind='stable')]
@@ -0,0 +1,131 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import time
+
+import grpc
+import pytest
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1.groundstation import groundstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from fakegroundstation.aio_ground_station_service import AioGroundStationServiceServicer, SampledLog, serve
+from fakegroundstation.ground_station_service import commands_response
+
+
+SECONDS_IN_HOUR = 60 * 60
+
+
+def telemetry_request(plan_id="10"):
+    return groundstation_pb2.GroundStationStreamRequest(
+        ground_station_id="2",
+        stream_tag="4",
+        satellite_telemetry=groundstation_pb2.SatelliteTelemetry(
+            plan_id=plan_id,
+            telemetry=transport_pb2.Telemetry(data=bytes('telemetry', encoding='ascii'))))
+
+
+async def with_server(servicer, run):
+    server, port = await serve(servicer, '127.0.0.1:0')
+    try:
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            return await run(groundstation_pb2_grpc.GroundStationServiceStub(channel))
+    finally:
+        await server.stop(None)
+
+
+def test_list_plans() -> None:
+    async def run(stub):
+        now = int(time.time())
+        response = await stub.ListPlans(groundstation_pb2.ListPlansRequest(
+            ground_station_id="2",
+            aos_after=Timestamp(seconds=now),
+            aos_before=Timestamp(seconds=now + SECONDS_IN_HOUR)))
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.ListPlans(groundstation_pb2.ListPlansRequest(
+                ground_station_id="2",
+                aos_after=Timestamp(seconds=now),
+                aos_before=Timestamp(seconds=now + 40 * 24 * SECONDS_IN_HOUR)))
+        return response, error.value
+
+    response, error = asyncio.run(with_server(AioGroundStationServiceServicer(), run))
+
+    assert response.plan[0].plan_id == "10"
+    assert len(response.plan[0].satellite_coordinates) == 600
+    assert error.code() == grpc.StatusCode.INVALID_ARGUMENT
+    assert error.details() == 'Duration between aos_after and aos_before > 31 days'
+
+
+def test_thousand_concurrent_streams() -> None:
+    stream_count = 1000
+    servicer = AioGroundStationServiceServicer()
+    all_open = asyncio.Event()
+    opened = 0
+
+    async def ground_station(stub):
+        nonlocal opened
+        call = stub.OpenGroundStationStream()
+        await call.write(groundstation_pb2.GroundStationStreamRequest(ground_station_id="2", stream_tag="4"))
+        await call.write(telemetry_request())
+        responses = [await call.read()]
+        opened += 1
+        if opened == stream_count:
+            all_open.set()
+        # Every stream stays open until all of them are.
+        await all_open.wait()
+        await call.write(telemetry_request())
+        responses.append(await call.read())
+        await call.done_writing()
+        return responses
+
+    async def run(stub):
+        return await asyncio.gather(*[ground_station(stub) for _ in range(stream_count)])
+
+    results = asyncio.run(with_server(servicer, run))
+
+    assert all(responses == [commands_response()] * 2 for responses in results)
+    assert servicer.stats.max_streams_active == stream_count
+    assert servicer.stats.streams_active == 0
+    assert servicer.stats.requests == servicer.stats.responses == 2 * stream_count
+    assert servicer.stats.telemetry_bytes == 2 * stream_count * len('telemetry')
+
+
+def test_unexpected_ground_station_id_ends_stream() -> None:
+    async def run(stub):
+        call = stub.OpenGroundStationStream()
+        await call.write(groundstation_pb2.GroundStationStreamRequest(ground_station_id="2"))
+        await call.write(groundstation_pb2.GroundStationStreamRequest(ground_station_id="3"))
+        return await call.code(), await call.details()
+
+    assert asyncio.run(with_server(AioGroundStationServiceServicer(), run)) == (
+        grpc.StatusCode.INVALID_ARGUMENT, 'Unexpected ground station ID')
+
+
+def test_sampled_log(caplog) -> None:
+    log = SampledLog(logging.getLogger('test'), first=2, every=5)
+
+    with caplog.at_level(logging.INFO, logger='test'):
+        for i in range(20):
+            log.log('satellite_telemetry', plan_id='10', index=i)
+        log.log('unexpected_plan_id', logging.WARNING, plan_id='3')
+
+    lines = [json.loads(record.getMessage()) for record in caplog.records]
+    assert [line['count'] for line in lines] == [1, 2, 5, 10, 15, 20, 1]
+    assert lines[2] == {'event': 'satellite_telemetry', 'count': 5, 'plan_id': '10', 'index': 4}
+    assert caplog.records[-1].levelno == logging.WARNING
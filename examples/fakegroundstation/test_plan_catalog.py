@@ -0,0 +1,143 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import grpc
+import numpy as np
+import pytest
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1.groundstation import groundstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2_grpc
+
+from fakegroundstation.aio_ground_station_service import AioGroundStationServiceServicer, serve
+from fakegroundstation.plan_catalog import PlanCatalog, encode_coordinates
+from fakegroundstation.propagation import GroundStation, Satellites, look_angles
+
+
+START_SECONDS = 1700000000
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+def test_encoded_coordinates_parse_like_messages() -> None:
+    times_ns = np.array([START_SECONDS * 10 ** 9, START_SECONDS * 10 ** 9 + 500000001])
+    wire = encode_coordinates(times_ns, [10.5, 370.0], [0.0, -1.25], [-7000.0, 6999.5])
+
+    plan = groundstation_pb2.Plan.FromString(groundstation_pb2.Plan(plan_id='1').SerializeToString() + wire)
+
+    assert plan.plan_id == '1'
+    assert list(plan.satellite_coordinates) == [
+        groundstation_pb2.SatelliteCoordinates(
+            time=Timestamp(seconds=START_SECONDS), angle={'azimuth': 10.5}, range_rate=-7000.0),
+        groundstation_pb2.SatelliteCoordinates(
+            time=Timestamp(seconds=START_SECONDS, nanos=500000001),
+            angle={'azimuth': 370.0, 'elevation': -1.25}, range_rate=6999.5),
+    ]
+    with pytest.raises(ValueError):
+        encode_coordinates([-1], [0], [0], [0])
+
+
+def test_catalog_schedules_plans_in_order_without_overlap() -> None:
+    catalog = PlanCatalog(ground_station_count=5, satellite_count=20, plans_per_day=10, days=3,
+                          start_seconds=START_SECONDS)
+
+    assert len(catalog) == 5 * 10 * 3
+    for ground_station in range(5):
+        plans = catalog.plans[catalog.plans['ground_station'] == ground_station]
+        assert (plans['aos_ns'][1:] >= plans['los_ns'][:-1]).all()
+    assert catalog.plans['satellite'].max() < 20
+
+    times_ns, azimuth, elevation, range_rate = catalog.track(7)
+    plan = catalog.plans[7]
+    assert times_ns[0] == plan['aos_ns']
+    assert times_ns[-1] <= plan['los_ns']
+    assert (np.diff(times_ns) == 10 ** 9).all()
+    assert elevation.max() <= plan['max_elevation'] + 1e-9
+    assert ((azimuth >= 0) & (azimuth < 360)).all()
+    assert range_rate[0] < 0 < range_rate[-1]
+
+
+def test_list_plans_response_joins_serialized_plans() -> None:
+    catalog = PlanCatalog(ground_station_count=3, satellite_count=10, plans_per_day=8, days=2,
+                          start_seconds=START_SECONDS)
+    aos_after_ns = START_SECONDS * 10 ** 9
+    aos_before_ns = aos_after_ns + SECONDS_IN_DAY * 10 ** 9
+
+    wire = catalog.list_plans_response('2', aos_after_ns, aos_before_ns)
+    response = groundstation_pb2.ListPlansResponse.FromString(wire)
+
+    assert [plan.plan_id for plan in response.plan] == [str(i) for i in range(17, 25)]
+    plan = response.plan[0]
+    assert plan == catalog.plan(16)
+    assert plan.ground_station_id == '2'
+    assert plan.aos_time.ToNanoseconds() == catalog.plans['aos_ns'][16]
+    assert len(plan.satellite_coordinates) == len(catalog.track(16)[0])
+    # Plans are serialized once, and the response for a later window reuses them.
+    assert catalog.list_plans_response('2', aos_after_ns + 1, aos_before_ns) == wire
+    assert catalog.stats.plans_serialized == 8
+    assert (catalog.stats.responses, catalog.stats.response_bytes) == (2, 2 * len(wire))
+    assert catalog.list_plans_response('4', aos_after_ns, aos_before_ns) == b''
+    assert catalog.plan_index('17') == 16
+    assert catalog.plan_index('1000') is None
+
+
+def test_server_lists_plans_from_catalog() -> None:
+    catalog = PlanCatalog(ground_station_count=2, plans_per_day=4, start_seconds=START_SECONDS)
+
+    async def run():
+        server, port = await serve(AioGroundStationServiceServicer(catalog=catalog), '127.0.0.1:0')
+        try:
+            async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+                stub = groundstation_pb2_grpc.GroundStationServiceStub(channel)
+                return await stub.ListPlans(groundstation_pb2.ListPlansRequest(
+                    ground_station_id='1',
+                    aos_after=Timestamp(seconds=START_SECONDS),
+                    aos_before=Timestamp(seconds=START_SECONDS + SECONDS_IN_DAY)))
+        finally:
+            await server.stop(None)
+
+    response = asyncio.run(run())
+
+    assert list(response.plan) == [catalog.plan(i) for i in range(4)]
+
+
+def test_catalog_from_tles_schedules_predicted_passes() -> None:
+    tles = [('1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927',
+             '2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537'),
+            ('1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753',
+             '2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667')]
+    locations = [GroundStation(35.6, 139.7, 40.0), GroundStation(-33.9, 18.4, 10.0)]
+    start_seconds = int(Satellites(tles).epoch_ns[0] // 10 ** 9)
+
+    catalog = PlanCatalog.from_tles(tles, locations, days=2, start_seconds=start_seconds)
+
+    assert len(catalog) > 0
+    assert set(catalog.plans['ground_station']) == {0, 1}
+    for ground_station in range(2):
+        plans = catalog.plans[catalog.plans['ground_station'] == ground_station]
+        assert (plans['aos_ns'][1:] >= plans['los_ns'][:-1]).all()
+
+    index = int(np.argmax(catalog.plans['max_elevation']))
+    plan = catalog.plans[index]
+    times_ns, azimuth, elevation, range_rate = catalog.track(index)
+    expected = look_angles(Satellites(tles), locations[plan['ground_station']], times_ns)
+    np.testing.assert_allclose(elevation, expected[1][plan['satellite']], atol=1e-2)
+    np.testing.assert_allclose(range_rate, expected[3][plan['satellite']], atol=1.0)
+    assert elevation.min() >= 10.0 - 0.1 and elevation.max() == pytest.approx(plan['max_elevation'], abs=0.5)
+    assert range_rate[0] < 0 < range_rate[-1]
+
+    message = catalog.plan(index)
+    assert (message.tle.line_1, message.tle.line_2) == tles[plan['satellite']]
+    assert message.satellite_coordinates[0].angle.elevation == elevation[0]
@@ -0,0 +1,134 @@
+# Copyright 2026 Infostellar, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from fakegroundstation.propagation import (
+    ERROR_DEEP_SPACE, ERROR_NONE, GroundStation, Satellites, find_passes, interpolate, look_angles, propagate,
+    read_tles, track_look_angles)
+
+
+# The test case of Vallado et al., "Revisiting Spacetrack Report #3", with its expected results.
+VANGUARD_TLE = ('1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753',
+                '2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667')
+VANGUARD_STATES = {
+    0: (7022.46529266, -1400.08296755, 0.03995155, 1.893841015, 6.405893759, 4.534807250),
+    360: (-7154.03120202, -3783.17682504, -3536.19412294, 4.741887409, -4.151817765, -2.093935425),
+    720: (-7134.59340119, 6531.68641334, 3260.27186483, -4.113793027, -2.911922039, -2.557327851),
+    1080: (5568.53901181, 4492.06992591, 3863.87641983, -4.209106476, 5.159719888, 2.744852980),
+    1440: (-938.55923943, -6268.18748831, -4294.02924751, 7.536105209, -0.427127707, 0.989878080),
+}
+ISS_TLE = ('1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927',
+           '2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537')
+GPS_TLE = ('1 24876U 97035A   08264.51782528  .00000000  00000-0  00000-0 0  1234',
+           '2 24876  55.4408 193.2416 0043011 251.2155 108.3278  2.00562037 81234')
+TOKYO = GroundStation(latitude=35.6, longitude=139.7, altitude=40.0)
+SVALBARD = GroundStation(latitude=78.2, longitude=15.4, altitude=500.0)
+
+MINUTE_NS = 60 * 10 ** 9
+DAY_NS = 24 * 60 * MINUTE_NS
+
+
+def test_propagate_matches_reference() -> None:
+    satellites = Satellites([VANGUARD_TLE])
+    minutes = sorted(VANGUARD_STATES)
+
+    position, velocity, error = propagate(satellites, satellites.epoch_ns[0] + np.array(minutes) * MINUTE_NS)
+
+    expected = np.array([VANGUARD_STATES[minute] for minute in minutes])
+    assert (error == ERROR_NONE).all()
+    np.testing.assert_allclose(position[0], expected[:, :3], atol=1e-6)
+    np.testing.assert_allclose(velocity[0], expected[:, 3:], atol=1e-9)
+
+
+def test_deep_space_satellites_are_not_propagated() -> None:
+    satellites = Satellites(read_tles(['ISS (ZARYA)', ISS_TLE[0], ISS_TLE[1], '', 'GPS', GPS_TLE[0], GPS_TLE[1]]))
+
+    position, _, error = propagate(satellites, satellites.epoch_ns[:, None] + np.arange(3) * MINUTE_NS)
+
+    assert satellites.catalog_numbers == ['25544', '24876']
+    assert list(satellites.deep_space) == [False, True]
+    assert (error == [[ERROR_NONE] * 3, [ERROR_DEEP_SPACE] * 3]).all()
+    assert np.isfinite(position[0]).all() and np.isnan(position[1]).all()
+
+
+def test_interpolate_is_close_to_propagate() -> None:
+    satellites = Satellites([ISS_TLE, VANGUARD_TLE])
+    times_ns = satellites.epoch_ns[0] + np.arange(0, 3 * 60 * 60, 7) * 10 ** 9
+
+    position, velocity, _ = propagate(satellites, times_ns)
+    interpolated_position, interpolated_velocity, error = interpolate(satellites, times_ns, 60.0)
+
+    assert (error == ERROR_NONE).all()
+    assert np.abs(interpolated_position[0] - position[0]).max() < 1e-3
+    assert np.abs(interpolated_velocity[0] - velocity[0]).max() < 1e-4
+    # The eccentric orbit is still within 10 m.
+    assert np.abs(interpolated_position[1] - position[1]).max() < 1e-2
+
+
+def test_look_angles() -> None:
+    satellites = Satellites([ISS_TLE])
+    times_ns = satellites.epoch_ns[0] + np.arange(0, DAY_NS, 10 ** 9)
+
+    azimuth, elevation, distance, range_rate = look_angles(satellites, TOKYO, times_ns)
+
+    assert ((azimuth >= 0) & (azimuth < 360)).all()
+    assert ((elevation >= -90) & (elevation <= 90)).all() and elevation.max() > 0
+    # From 350 km up to the other side of the Earth.
+    assert 300e3 < distance.min() and distance.max() < 14000e3
+    # The range rate is the derivative of the range.
+    np.testing.assert_allclose(range_rate[0, 1:-1], np.gradient(distance[0])[1:-1], atol=0.5)
+
+    interpolated = look_angles(satellites, TOKYO, times_ns, step=60.0)
+    for values, interpolated_values, tolerance in zip(
+            (azimuth, elevation, distance, range_rate), interpolated, (1e-2, 1e-3, 1.0, 0.1)):
+        assert np.abs(values - interpolated_values).max() < tolerance
+
+
+def test_track_look_angles_of_mixed_samples() -> None:
+    satellites = Satellites([ISS_TLE, VANGUARD_TLE])
+    stations = [TOKYO, SVALBARD]
+    times_ns = satellites.epoch_ns[0] + np.arange(0, 6 * 60 * 60, 5) * 10 ** 9
+    rng = np.random.default_rng(0)
+    satellite = rng.integers(0, 2, 1000)
+    station = rng.integers(0, 2, 1000)
+    sample = rng.integers(0, len(times_ns), 1000)
+
+    angles = track_look_angles(satellites, stations, satellite, station, times_ns[sample])
+
+    # The tolerances are those of interpolating Vanguard's eccentric orbit.
+    for index, location in enumerate(stations):
+        expected = look_angles(satellites, location, times_ns)
+        at_station = station == index
+        for values, expected_values, tolerance in zip(angles, expected, (1e-2, 1e-2, 10.0, 1.0)):
+            expected_values = expected_values[satellite[at_station], sample[at_station]]
+            assert np.abs(values[at_station] - expected_values).max() < tolerance
+
+
+def test_find_passes() -> None:
+    satellites = Satellites([ISS_TLE, VANGUARD_TLE])
+    start_ns = int(satellites.epoch_ns[0])
+
+    passes = find_passes(satellites, TOKYO, start_ns, start_ns + DAY_NS, min_elevation=10.0)
+    # Neither orbit reaches high enough latitudes to be seen from 78 degrees north.
+    assert len(find_passes(satellites, SVALBARD, start_ns, start_ns + DAY_NS, min_elevation=10.0)) == 0
+
+    assert set(passes['satellite']) == {0, 1}
+    assert (np.diff(passes['aos_ns']) >= 0).all()
+    assert (passes['aos_ns'] < passes['max_elevation_ns']).all()
+    assert (passes['max_elevation_ns'] < passes['los_ns']).all()
+    assert (passes['max_elevation'] >= 10.0).all()
+    _, elevation, _, _ = look_angles(satellites, TOKYO, np.concatenate([passes['aos_ns'], passes['los_ns']]))
+    satellite = np.tile(passes['satellite'], 2)
+    np.testing.assert_allclose(elevation[satellite, np.arange(len(satellite))], 10.0, atol=0.1)
@@ -0,0 +1,99 @@
+# Copyright 2026 Infostellar, Inc.
+# Policies deciding when SatelliteStream sends a ReceiveTelemetryAck.
+#
+# With flow control enabled, an ack for a message_ack_id acknowledges every message received before
+# it, so only the latest message_ack_id of a window needs to be sent. A policy is asked after every
+# processed telemetry response whether the pending ack should be sent now. If it has a
+# flush_interval, the stream also sends a pending ack once it has waited that long, so a quiet
+# stream never holds back an ack indefinitely.
+#
+# All times are time.monotonic() seconds.
+
+
+# Acks every telemetry response. This is what the API documents and what the examples did before
+# ack policies were introduced.
+class EveryMessageAckPolicy:
+    flush_interval = None
+
+    def should_ack(self, pending_count, now):
+        return True
+
+    def on_ack(self, now):
+        pass
+
+
+# Acks every `count` telemetry responses, and at least every `max_delay` seconds.
+class CountAckPolicy:
+    def __init__(self, count, max_delay=1.0):
+        if count < 1:
+            raise ValueError("count must be at least 1 but got {}".format(count))
+        self.count = count
+        self.flush_interval = max_delay
+
+    def should_ack(self, pending_count, now):
+        return pending_count >= self.count
+
+    def on_ack(self, now):
+        pass
+
+
+# Acks at most once every `interval_ms` milliseconds.
+class IntervalAckPolicy:
+    def __init__(self, interval_ms):
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive but got {}".format(interval_ms))
+        self.flush_interval = interval_ms / 1000
+        self._last_ack = None
+
+    def should_ack(self, pending_count, now):
+        return self._last_ack is None or now - self._last_ack >= self.flush_interval
+
+    def on_ack(self, now):
+        self._last_ack = now
+
+
+# Acks every message while the downlink is slow and coalesces acks once it is fast.
+#
+# A message arriving more than `interval_ms` after the previous one is acked immediately. Otherwise
+# acks are sent every `interval_ms` milliseconds, or as soon as `max_count` messages are pending,
+# whichever comes first.
+class AdaptiveAckPolicy:
+    def __init__(self, interval_ms=100, max_count=1000):
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive but got {}".format(interval_ms))
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1 but got {}".format(max_count))
+        self.flush_interval = interval_ms / 1000
+        self.max_count = max_count
+        self._last_ack = None
+        self._last_message = None
+
+    def should_ack(self, pending_count, now):
+        last_message, self._last_message = self._last_message, now
+        if last_message is None or now - last_message >= self.flush_interval:
+            return True
+        if pending_count >= self.max_count:
+            return True
+        return self._last_ack is None or now - self._last_ack >= self.flush_interval
+
+    def on_ack(self, now):
+        self._last_ack = now
+
+
+# Parses an ack policy from a command line / environment variable style string:
+#   "every"         -> EveryMessageAckPolicy()
+#   "count:<n>"     -> CountAckPolicy(n)
+#   "interval:<ms>" -> IntervalAckPolicy(ms)
+#   "adaptive"      -> AdaptiveAckPolicy()
+#   "adaptive:<ms>" -> AdaptiveAckPolicy(ms)
+def parse_ack_policy(spec):
+    name, _, value = spec.partition(':')
+    if name == 'every' and not value:
+        return EveryMessageAckPolicy()
+    if name == 'count' and value:
+        return CountAckPolicy(int(value))
+    if name == 'interval' and value:
+        return IntervalAckPolicy(float(value))
+    if name == 'adaptive':
+        return AdaptiveAckPolicy(float(value)) if value else AdaptiveAckPolicy()
+    raise ValueError("Unknown ack policy '{}'. Expected every, count:<n>, interval:<ms> or adaptive[:<ms>].".format(spec))
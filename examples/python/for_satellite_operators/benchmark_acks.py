@@ -0,0 +1,106 @@
+# Copyright 2026 Infostellar, Inc.
+# Measures the uplink cost of each ack policy.
+#
+# A synthetic stream of telemetry responses is fed through SatelliteStream with each policy. Every
+# request the stream writes is serialized, as gRPC would, so the CPU time includes building and
+# encoding the acks. No network or API key is needed.
+#
+#   $ python3 benchmark_acks.py --messages 200000
+
+import argparse
+import asyncio
+import time
+
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from ack_policy import parse_ack_policy
+from stream_client import SatelliteStream
+
+
+# Stands in for a grpc.aio stream-stream call. Responses are served from memory.
+class InMemoryCall:
+    def __init__(self, responses, messages_per_second):
+        self.responses = responses
+        self.delay = 1 / messages_per_second if messages_per_second else 0
+        self.bytes_written = 0
+
+    async def write(self, request):
+        self.bytes_written += len(request.SerializeToString())
+
+    async def __aiter__(self):
+        for i, response in enumerate(self.responses):
+            # Yield to the event loop like a real read does, so the ack timer can run.
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            elif i % 64 == 0:
+                await asyncio.sleep(0)
+            yield response
+
+    def cancel(self):
+        pass
+
+
+class InMemoryClient:
+    def __init__(self, call):
+        self.call = call
+
+    def OpenSatelliteStream(self):
+        return self.call
+
+
+def make_responses(count, payload_size):
+    data = bytes(payload_size)
+    return [
+        stellarstation_pb2.SatelliteStreamResponse(
+            stream_id='benchmark',
+            receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+                telemetry=[transport_pb2.Telemetry(data=data)],
+                plan_id='1',
+                message_ack_id=str(i)))
+        for i in range(count)
+    ]
+
+
+async def run_policy(spec, responses, messages_per_second):
+    call = InMemoryCall(responses, messages_per_second)
+    satellite_stream = SatelliteStream(InMemoryClient(call), '1', ack_policy=parse_ack_policy(spec))
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    await satellite_stream.open()
+    async for _ in satellite_stream.responses():
+        pass
+    await satellite_stream.close()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    return satellite_stream.stats, call.bytes_written, cpu, wall
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Compare the uplink cost of ack policies.')
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--payload-size', type=int, default=1024)
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Messages per second to simulate (default: as fast as possible)')
+    parser.add_argument('policies', nargs='*',
+                        default=['every', 'count:10', 'count:100', 'interval:50', 'adaptive'])
+    args = parser.parse_args()
+
+    responses = make_responses(args.messages, args.payload_size)
+    print("{:<14} {:>10} {:>14} {:>10} {:>14} {:>12}".format(
+        'policy', 'acks sent', 'uplink bytes', 'cpu (s)', 'cpu/msg (us)', 'msgs/s'))
+    for spec in args.policies:
+        stats, bytes_written, cpu, wall = asyncio.run(run_policy(spec, responses, args.rate))
+        print("{:<14} {:>10} {:>14} {:>10.3f} {:>14.2f} {:>12.0f}".format(
+            spec,
+            stats.total_acks_sent,
+            bytes_written,
+            cpu,
+            cpu / stats.total_telemetry_messages * 1e6,
+            stats.total_telemetry_messages / wall))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,84 @@
+# Copyright 2026 Infostellar, Inc.
+# Compares decoding SatelliteStreamResponse fully with lazy_decode.
+#
+# Serialized telemetry responses are decoded and read the way the receive loop in SatelliteStream
+# reads them: the oneof, stream_id, message_ack_id and the length of every payload. No network or
+# API key is needed.
+#
+#   $ python3 benchmark_decode.py --messages 20000 --payload-sizes 64,1024,65536
+
+import argparse
+import time
+
+from google.protobuf.internal import api_implementation
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from lazy_decode import LazySatelliteStreamResponse
+
+
+def make_wire_responses(count, telemetry_per_response, payload_size):
+    data = bytes(payload_size)
+    frame_header = bytes(16)
+    timestamp = {'seconds': 1700000000, 'nanos': 1000}
+    return [
+        stellarstation_pb2.SatelliteStreamResponse(
+            stream_id='benchmark',
+            receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+                telemetry=[
+                    transport_pb2.Telemetry(
+                        framing=transport_pb2.AX25,
+                        data=data,
+                        downlink_frequency_hz=8000000000,
+                        time_first_byte_received=timestamp,
+                        time_last_byte_received=timestamp,
+                        frame_header=frame_header)
+                    for _ in range(telemetry_per_response)],
+                plan_id='1',
+                satellite_id='5',
+                ground_station_id='2',
+                message_ack_id=str(i))).SerializeToString()
+        for i in range(count)
+    ]
+
+
+def consume(deserialize, wire_responses):
+    total_bytes = 0
+    start = time.process_time()
+    for wire in wire_responses:
+        response = deserialize(wire)
+        if response.WhichOneof('Response') == 'receive_telemetry_response':
+            stream_id = response.stream_id
+            telemetry_response = response.receive_telemetry_response
+            message_ack_id = telemetry_response.message_ack_id
+            for tlm in telemetry_response.telemetry:
+                total_bytes += len(tlm.data)
+    return time.process_time() - start, total_bytes
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Compare full and lazy decoding of SatelliteStreamResponse.')
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--telemetry', type=int, default=1, help='Telemetry messages per response')
+    parser.add_argument('--payload-sizes', default='64,1024,16384,262144')
+    args = parser.parse_args()
+
+    print("protobuf implementation: {}".format(api_implementation.Type()))
+    decoders = [
+        ('full', stellarstation_pb2.SatelliteStreamResponse.FromString),
+        ('lazy', LazySatelliteStreamResponse.FromString),
+    ]
+    for payload_size in (int(size) for size in args.payload_sizes.split(',')):
+        wire_responses = make_wire_responses(args.messages, args.telemetry, payload_size)
+        rates = {}
+        for name, deserialize in decoders:
+            cpu, total_bytes = consume(deserialize, wire_responses)
+            assert total_bytes == args.messages * args.telemetry * payload_size
+            rates[name] = args.messages / cpu
+            print("payload = {:>7} bytes, {}: {:>10.0f} msgs/s, {:>8.1f} MiB/s".format(
+                payload_size, name, rates[name], total_bytes / cpu / 1024 / 1024))
+        print("payload = {:>7} bytes, lazy is {:.2f}x full".format(payload_size, rates['lazy'] / rates['full']))
+
+
+if __name__ == '__main__':
+    run()
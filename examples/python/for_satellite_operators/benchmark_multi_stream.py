@@ -0,0 +1,98 @@
+# Copyright 2026 Infostellar, Inc.
+# Measures the per-stream CPU and memory overhead of MultiSatelliteStreamManager.
+#
+# A fake StellarStationService runs in a separate process, so only client-side work is measured.
+# No API key is needed.
+#
+#   $ python3 benchmark_multi_stream.py --satellites 200 --messages 500 --rate 50
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+
+import toolkit
+from fake_satellite_service import start_in_process
+from multi_stream_manager import MultiSatelliteStreamManager
+
+
+async def run_streams(port, satellites, trace_memory):
+    channels = []
+
+    def client_factory(connection):
+        channel = grpc.aio.insecure_channel(
+            '127.0.0.1:{}'.format(port), options=toolkit.channel_options(connection=connection))
+        channels.append(channel)
+        return stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+
+    try:
+        return await measure(MultiSatelliteStreamManager(client_factory), satellites, trace_memory)
+    finally:
+        for channel in channels:
+            await channel.close()
+
+
+async def measure(manager, satellites, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(satellites):
+        manager.add_satellite(str(i))
+
+    if trace_memory:
+        # Once every stream is receiving, measure what the sessions hold on to, then stop.
+        while sum(m['telemetry_messages'] > 0 for m in manager.metrics()) < satellites:
+            await asyncio.sleep(0.05)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        await manager.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        return size / satellites
+
+    await manager.wait()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    metrics = manager.metrics()
+    messages = sum(m['telemetry_messages'] for m in metrics)
+    failed = [m for m in metrics if not m['completed']]
+    return cpu, wall, messages, failed
+
+
+# grpc.aio is bound to the first event loop that uses it, so both runs share one loop.
+async def run_both(port, satellites):
+    memory = await run_streams(port, satellites, trace_memory=True)
+    return memory, await run_streams(port, satellites, trace_memory=False)
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Measure per-stream overhead of MultiSatelliteStreamManager.')
+    parser.add_argument('--satellites', type=int, default=100)
+    parser.add_argument('--messages', type=int, default=500, help='Telemetry messages per stream')
+    parser.add_argument('--payload-size', type=int, default=1024)
+    parser.add_argument('--rate', type=float, default=100, help='Messages per second per stream')
+    args = parser.parse_args()
+
+    server, port = start_in_process(
+        message_count=args.messages, payload_size=args.payload_size, messages_per_second=args.rate)
+    try:
+        memory, (cpu, wall, messages, failed) = asyncio.run(run_both(port, args.satellites))
+    finally:
+        server.terminate()
+
+    print("satellites = {}, telemetry messages = {}, failed sessions = {}".format(
+        args.satellites, messages, len(failed)))
+    print("wall = {:.2f}s, client cpu = {:.2f}s ({:.1f}% of one core)".format(wall, cpu, 100 * cpu / wall))
+    print("cpu per message = {:.1f}us, cpu per stream = {:.1f}ms".format(
+        cpu / max(messages, 1) * 1e6, cpu / args.satellites * 1e3))
+    print("memory per stream = {:.1f} KiB".format(memory / 1024))
+
+
+if __name__ == '__main__':
+    run()
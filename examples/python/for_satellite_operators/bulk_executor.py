@@ -0,0 +1,388 @@
+# Copyright 2026 Infostellar, Inc.
+# Concurrent ReservePass, CancelPlan and SetPlanMetadata with confirmation.
+#
+# BulkExecutor runs many plan operations at once on a grpc.aio client, at most `concurrency` in
+# flight and at most `rate` calls per second (a token bucket shared by every call, including the
+# confirmation polls). Transient failures are retried with backoff. Retries are idempotent: before
+# reserving a pass again, or when cancelling a plan again fails, the executor checks whether the
+# earlier attempt went through.
+#
+# Reservations and cancellations are confirmed by polling ListPlans until the plan is listed as
+# RESERVED or CANCELED. Pending confirmations of a satellite are batched into one ListPlans call
+# covering all their AOS times, so confirming a week of reservations takes a handful of calls, and
+# polling backs off from poll_interval up to max_poll_interval. There are no fixed sleeps.
+#
+# Plan monitoring stream events are only sent while a plan executes, so they can't confirm
+# reservations or cancellations made ahead of time.
+#
+#   executor = BulkExecutor(toolkit.get_aio_grpc_client(api_key_path, api_url))
+#   results = await executor.reserve_all(
+#       (candidates.satellite_id(i), candidates.get_pass(i), candidates.channel_set_token(i)) for i in selected)
+#   print(executor.stats)
+
+import asyncio
+import time
+
+import grpc
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+from latency_histogram import LatencyHistogram
+from plan_cache import ns_to_timestamp, split_window
+from stream_supervisor import Backoff
+
+RESERVE = 'reserve'
+CANCEL = 'cancel'
+SET_METADATA = 'set_metadata'
+
+RETRYABLE_STATUS_CODES = frozenset([
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+])
+
+
+class ConfirmationTimeoutError(Exception):
+    pass
+
+
+# Allows `rate` acquisitions per second on average, and up to `burst` at once.
+class TokenBucket:
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Callers queue on the lock, so tokens are handed out in order.
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class OperationResult:
+    __slots__ = ('kind', 'key', 'plan', 'error', 'attempts', 'started_at', 'completed_at', 'confirmed_at')
+
+    def __init__(self, kind, key, started_at):
+        self.kind = kind
+        # The reservation token or plan ID.
+        self.key = key
+        # The reserved, canceled or updated plan, as last listed. None for SetPlanMetadata.
+        self.plan = None
+        self.error = None
+        self.attempts = 0
+        self.started_at = started_at
+        self.completed_at = None
+        self.confirmed_at = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return 'OperationResult({}, {}, {})'.format(self.kind, self.key, 'ok' if self.ok else repr(self.error))
+
+
+class BulkExecutorStats:
+    def __init__(self):
+        self.succeeded = {RESERVE: 0, CANCEL: 0, SET_METADATA: 0}
+        self.failed = {RESERVE: 0, CANCEL: 0, SET_METADATA: 0}
+        self.calls = 0
+        self.retries = 0
+        self.polls = 0
+        # From the start of an operation until its call succeeded, and until it was confirmed.
+        self.latency = {kind: LatencyHistogram() for kind in self.succeeded}
+        self.confirmation_latency = {kind: LatencyHistogram() for kind in self.succeeded}
+        self.first_started_at = None
+        self.last_completed_at = None
+
+    # Completed operations per second, from the first start to the last completion.
+    @property
+    def operations_per_second(self):
+        if self.first_started_at is None or self.last_completed_at is None or \
+                self.last_completed_at <= self.first_started_at:
+            return 0.0
+        completed = sum(self.succeeded.values()) + sum(self.failed.values())
+        return completed / (self.last_completed_at - self.first_started_at)
+
+    def __str__(self):
+        def ms(seconds):
+            return '-' if seconds is None else '{:.0f}ms'.format(seconds * 1e3)
+        lines = ["Calls = {}, Retries = {}, Polls = {}, Operations/s = {:.1f}".format(
+            self.calls, self.retries, self.polls, self.operations_per_second)]
+        for kind in self.succeeded:
+            if not self.succeeded[kind] and not self.failed[kind]:
+                continue
+            lines.append("{}: Succeeded = {}, Failed = {}, Latency p50 = {}, p99 = {}, Confirmed p50 = {}, p99 = {}".format(
+                kind,
+                self.succeeded[kind],
+                self.failed[kind],
+                ms(self.latency[kind].value_at_percentile(50)),
+                ms(self.latency[kind].value_at_percentile(99)),
+                ms(self.confirmation_latency[kind].value_at_percentile(50)),
+                ms(self.confirmation_latency[kind].value_at_percentile(99))))
+        return '\n'.join(lines)
+
+
+# A confirmation waiting for a plan to be listed in the expected state.
+class _Expectation:
+    __slots__ = ('aos_ns', 'matches', 'future')
+
+    def __init__(self, aos_ns, matches, future):
+        self.aos_ns = aos_ns
+        self.matches = matches
+        self.future = future
+
+
+# client:               a StellarStationServiceStub on a grpc.aio channel.
+# concurrency:          maximum operations in flight.
+# rate, burst:          calls per second, for the token bucket.
+# max_attempts:         attempts per call for RETRYABLE_STATUS_CODES, including the first.
+# timeout:              deadline of each call, in seconds.
+# confirm:              whether to wait until ListPlans shows reservations and cancellations.
+# confirmation_timeout: seconds to wait for a confirmation.
+class BulkExecutor:
+    def __init__(self, client, concurrency=16, rate=20.0, burst=None, max_attempts=5, timeout=30.0, confirm=True,
+                 confirmation_timeout=60.0, poll_interval=0.25, max_poll_interval=5.0, backoff_factory=Backoff,
+                 clock=time.monotonic):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.confirm = confirm
+        self.confirmation_timeout = confirmation_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factory = backoff_factory
+        self.clock = clock
+        self.rate_limiter = TokenBucket(rate, burst, clock)
+        self.stats = BulkExecutorStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Pending confirmations by satellite, and the poller task of each satellite.
+        self._expectations = {}
+        self._pollers = {}
+        self._poll_reset = set()
+
+    async def _call(self, method, request):
+        await self.rate_limiter.acquire()
+        self.stats.calls += 1
+        return await method(request, timeout=self.timeout)
+
+    # Calls method until it succeeds, fails with a status that isn't retryable, or runs out of
+    # attempts. Before each retry, already_done() is awaited if given; if it returns a plan, the
+    # earlier attempt went through and that plan is returned.
+    async def _call_with_retry(self, result, method, request, already_done=None):
+        backoff = self.backoff_factory()
+        while True:
+            result.attempts += 1
+            try:
+                return await self._call(method, request)
+            except grpc.aio.AioRpcError as e:
+                if e.code() not in RETRYABLE_STATUS_CODES or result.attempts >= self.max_attempts:
+                    # After a retry, the failure may be caused by an earlier attempt that went
+                    # through, e.g. FAILED_PRECONDITION for a plan that is already canceled.
+                    done = await self._check(already_done) if result.attempts > 1 else None
+                    if done is not None:
+                        return done
+                    raise
+            self.stats.retries += 1
+            await asyncio.sleep(backoff.next_delay())
+            done = await self._check(already_done)
+            if done is not None:
+                return done
+
+    async def _check(self, already_done):
+        if already_done is None:
+            return None
+        try:
+            return await already_done()
+        except grpc.aio.AioRpcError:
+            # The call is retried or its error raised instead.
+            return None
+
+    async def _list_plans(self, satellite_id, start_ns, end_ns):
+        response = await self._call(self.client.ListPlans, stellarstation_pb2.ListPlansRequest(
+            satellite_id=satellite_id, aos_after=ns_to_timestamp(start_ns), aos_before=ns_to_timestamp(end_ns)))
+        return response.plan
+
+    # Returns the first plan of satellite_id with AOS aos_ns for which matches(plan) is true.
+    async def _find_plan(self, satellite_id, aos_ns, matches):
+        self.stats.polls += 1
+        for plan in await self._list_plans(satellite_id, aos_ns, aos_ns + 1):
+            if matches(plan):
+                return plan
+        return None
+
+    # Waits until a plan of satellite_id with AOS aos_ns matching matches(plan) is listed.
+    async def _confirm(self, satellite_id, aos_ns, matches):
+        future = asyncio.get_running_loop().create_future()
+        self._expectations.setdefault(satellite_id, []).append(_Expectation(aos_ns, matches, future))
+        # New expectations reset the poll interval, and are confirmed by the satellite's next poll.
+        self._poll_reset.add(satellite_id)
+        if satellite_id not in self._pollers:
+            self._pollers[satellite_id] = asyncio.ensure_future(self._poll(satellite_id))
+        try:
+            return await asyncio.wait_for(future, self.confirmation_timeout)
+        except asyncio.TimeoutError:
+            raise ConfirmationTimeoutError(
+                "Plan with AOS {} of satellite {} was not confirmed within {}s".format(
+                    ns_to_timestamp(aos_ns).ToJsonString(), satellite_id, self.confirmation_timeout))
+
+    # Polls ListPlans for the satellite's pending confirmations until there are none.
+    async def _poll(self, satellite_id):
+        expectations = self._expectations[satellite_id]
+        interval = self.poll_interval
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if satellite_id in self._poll_reset:
+                    self._poll_reset.discard(satellite_id)
+                    interval = self.poll_interval
+                else:
+                    interval = min(self.max_poll_interval, interval * 2)
+                expectations[:] = [e for e in expectations if not e.future.done()]
+                if not expectations:
+                    return
+                aos = sorted(e.aos_ns for e in expectations)
+                plans = []
+                try:
+                    for start, end in split_window(aos[0], aos[-1] + 1):
+                        self.stats.polls += 1
+                        plans.extend(await self._list_plans(satellite_id, start, end))
+                except grpc.aio.AioRpcError as e:
+                    if e.code() not in RETRYABLE_STATUS_CODES:
+                        for expectation in expectations:
+                            if not expectation.future.done():
+                                expectation.future.set_exception(e)
+                    continue
+                for expectation in expectations:
+                    if expectation.future.done():
+                        continue
+                    for plan in plans:
+                        if plan.aos_time.ToNanoseconds() == expectation.aos_ns and expectation.matches(plan):
+                            expectation.future.set_result(plan)
+                            break
+        finally:
+            del self._pollers[satellite_id]
+            del self._expectations[satellite_id]
+            self._poll_reset.discard(satellite_id)
+
+    def _start(self, kind, key):
+        started_at = self.clock()
+        if self.stats.first_started_at is None:
+            self.stats.first_started_at = started_at
+        return OperationResult(kind, key, started_at)
+
+    def _finish(self, result, error=None):
+        now = self.clock()
+        self.stats.last_completed_at = now
+        if error is not None:
+            result.error = error
+            self.stats.failed[result.kind] += 1
+            return result
+        result.confirmed_at = now
+        self.stats.succeeded[result.kind] += 1
+        self.stats.confirmation_latency[result.kind].record(now - result.started_at)
+        return result
+
+    def _called(self, result):
+        result.completed_at = self.clock()
+        self.stats.latency[result.kind].record(result.completed_at - result.started_at)
+
+    # Reserves the pass with channel_set_token (a Pass.ChannelSetToken) for satellite_id.
+    async def reserve(self, satellite_id, pass_, channel_set_token, priority='HIGH'):
+        result = self._start(RESERVE, channel_set_token.reservation_token)
+        aos_ns = pass_.aos_time.ToNanoseconds()
+
+        def is_reservation(plan):
+            return plan.ground_station_id == pass_.ground_station_id and \
+                plan.channel_set.id == channel_set_token.channel_set.id and \
+                plan.status == toolkit.PlanStatus.RESERVED.value
+
+        async def already_reserved():
+            return await self._find_plan(satellite_id, aos_ns, is_reservation)
+
+        async with self._semaphore:
+            try:
+                response = await self._call_with_retry(
+                    result, self.client.ReservePass,
+                    stellarstation_pb2.ReservePassRequest(
+                        reservation_token=channel_set_token.reservation_token, priority=priority),
+                    already_reserved)
+                plan = response.plan if isinstance(response, stellarstation_pb2.ReservePassResponse) else response
+                result.plan = plan
+                self._called(result)
+            except Exception as e:
+                return self._finish(result, e)
+        if self.confirm:
+            try:
+                result.plan = await self._confirm(
+                    satellite_id, plan.aos_time.ToNanoseconds() or aos_ns,
+                    lambda listed: listed.id == plan.id if plan.id else is_reservation(listed))
+            except Exception as e:
+                return self._finish(result, e)
+        return self._finish(result)
+
+    # Cancels plan, a Plan as returned by ListPlans or ReservePass.
+    async def cancel(self, plan):
+        result = self._start(CANCEL, plan.id)
+        aos_ns = plan.aos_time.ToNanoseconds()
+
+        def is_canceled(listed):
+            return listed.id == plan.id and listed.status == toolkit.PlanStatus.CANCELED.value
+
+        async def already_canceled():
+            return await self._find_plan(plan.satellite_id, aos_ns, is_canceled)
+
+        async with self._semaphore:
+            try:
+                response = await self._call_with_retry(
+                    result, self.client.CancelPlan, stellarstation_pb2.CancelPlanRequest(plan_id=plan.id),
+                    already_canceled)
+                if isinstance(response, stellarstation_pb2.Plan):
+                    result.plan = response
+                self._called(result)
+            except Exception as e:
+                return self._finish(result, e)
+        if self.confirm and result.plan is None:
+            try:
+                result.plan = await self._confirm(plan.satellite_id, aos_ns, is_canceled)
+            except Exception as e:
+                return self._finish(result, e)
+        return self._finish(result)
+
+    # Sets the metadata of plan_id to metadata, a PlanMetadata. Setting metadata is idempotent, so it
+    # is confirmed by the call succeeding.
+    async def set_metadata(self, plan_id, metadata):
+        result = self._start(SET_METADATA, plan_id)
+        async with self._semaphore:
+            try:
+                await self._call_with_retry(
+                    result, self.client.SetPlanMetadata,
+                    stellarstation_pb2.SetPlanMetadataRequest(plan_id=plan_id, metadata=metadata))
+                self._called(result)
+            except Exception as e:
+                return self._finish(result, e)
+        return self._finish(result)
+
+    # Reserves every (satellite_id, pass, channel_set_token). Returns the results in the same order.
+    async def reserve_all(self, reservations, priority='HIGH'):
+        return await asyncio.gather(*(self.reserve(satellite_id, pass_, token, priority)
+                                      for satellite_id, pass_, token in reservations))
+
+    # Cancels every plan. Returns the results in the same order.
+    async def cancel_all(self, plans):
+        return await asyncio.gather(*(self.cancel(plan) for plan in plans))
+
+    # Sets the metadata of every (plan_id, metadata). Returns the results in the same order.
+    async def set_metadata_all(self, updates):
+        return await asyncio.gather(*(self.set_metadata(plan_id, metadata) for plan_id, metadata in updates))
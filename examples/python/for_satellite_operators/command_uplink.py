@@ -0,0 +1,274 @@
+# Copyright 2026 Infostellar, Inc.
+# Batched command uplink with send confirmations.
+#
+# CommandUplink queues individual commands and sends them in as few SendSatelliteCommandsRequests
+# as possible. A batch is sent once `linger` seconds have passed since its first command, or as
+# soon as it is full. Batches are split so that no request exceeds the gRPC message size limit
+# (toolkit.MAX_MESSAGE_LENGTH).
+#
+# Every request carries a request_id, and the ground station confirms it with a
+# CommandSentFromGroundStation stream event carrying the same request_id. send() returns a future
+# that resolves with the command-to-confirmation latency once that event arrives, or fails with
+# CommandNotConfirmedError if it doesn't arrive within confirmation_timeout seconds.
+#
+#   uplink = CommandUplink(satellite_stream, channel_set_id=channel_id)
+#   uplink.send(command)
+#   ...
+#   # For every SatelliteStreamResponse:
+#   uplink.on_response(response)
+
+import asyncio
+import time
+import uuid
+
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+from latency_histogram import LatencyHistogram
+
+
+class CommandNotConfirmedError(Exception):
+    pass
+
+
+def _varint_size(value):
+    size = 1
+    while value >= 0x80:
+        value >>= 7
+        size += 1
+    return size
+
+
+# Bytes a command adds to a SendSatelliteCommandsRequest: tag, length and data.
+def command_size(command):
+    return 1 + _varint_size(len(command)) + len(command)
+
+
+class CommandUplinkStats:
+    __slots__ = ('commands_queued', 'commands_sent', 'commands_confirmed', 'commands_failed',
+                 'requests_sent', 'requests_confirmed', 'requests_timed_out', 'bytes_sent',
+                 'latency', 'first_sent_at', 'last_confirmed_at')
+
+    # bytes_sent counts command data, without the protobuf framing.
+    def __init__(self):
+        self.commands_queued = 0
+        self.commands_sent = 0
+        self.commands_confirmed = 0
+        self.commands_failed = 0
+        self.requests_sent = 0
+        self.requests_confirmed = 0
+        self.requests_timed_out = 0
+        self.bytes_sent = 0
+        # Command-to-confirmation latency, from send() until the ground station confirmed it.
+        self.latency = LatencyHistogram()
+        self.first_sent_at = None
+        self.last_confirmed_at = None
+
+    # Confirmed commands per second, from the first request sent to the last confirmation.
+    @property
+    def commands_per_second(self):
+        if self.first_sent_at is None or self.last_confirmed_at is None or \
+                self.last_confirmed_at <= self.first_sent_at:
+            return 0.0
+        return self.commands_confirmed / (self.last_confirmed_at - self.first_sent_at)
+
+    def __str__(self):
+        def ms(seconds):
+            return '-' if seconds is None else '{:.1f}ms'.format(seconds * 1e3)
+        return "Commands Sent = {}, Confirmed = {}, Failed = {}, Requests Sent = {}, Requests Timed Out = {}, Bytes Sent = {}, Confirmation Latency p50 = {}, p99 = {}, max = {}, Commands/s = {:.1f}".format(
+            self.commands_sent,
+            self.commands_confirmed,
+            self.commands_failed,
+            self.requests_sent,
+            self.requests_timed_out,
+            self.bytes_sent,
+            ms(self.latency.value_at_percentile(50)),
+            ms(self.latency.value_at_percentile(99)),
+            ms(self.latency.max),
+            self.commands_per_second)
+
+
+class _PendingRequest:
+    __slots__ = ('sent_at', 'commands', 'timer')
+
+    def __init__(self, sent_at, commands, timer):
+        self.sent_at = sent_at
+        self.commands = commands
+        self.timer = timer
+
+
+# satellite_stream:     an open SatelliteStream. Requests are sent with send_commands.
+# channel_set_id:       passed with every request.
+# linger:               seconds to wait for more commands before sending a batch that isn't full.
+# max_batch_commands:   commands per request. None for no limit other than the size.
+# max_request_bytes:    serialized size limit of a request.
+# confirmation_timeout: seconds to wait for the CommandSentFromGroundStation event.
+class CommandUplink:
+    def __init__(self, satellite_stream, channel_set_id=None, linger=0.005, max_batch_commands=None,
+                 max_request_bytes=toolkit.MAX_MESSAGE_LENGTH, confirmation_timeout=30.0,
+                 clock=time.monotonic):
+        self.satellite_stream = satellite_stream
+        self.channel_set_id = channel_set_id
+        self.linger = linger
+        self.max_batch_commands = max_batch_commands
+        self.max_request_bytes = max_request_bytes
+        self.confirmation_timeout = confirmation_timeout
+        self.clock = clock
+        self.stats = CommandUplinkStats()
+
+        # The size of a request without commands, with room for the length of the nested
+        # SendSatelliteCommandsRequest and a request_id.
+        self._overhead = stellarstation_pb2.SatelliteStreamRequest(
+            satellite_id=satellite_stream.satellite_id,
+            request_id=str(uuid.uuid4()),
+            send_satellite_commands_request=stellarstation_pb2.SendSatelliteCommandsRequest(
+                channel_set_id=channel_set_id)).ByteSize() + 8
+        self._queue = []
+        self._queued_bytes = 0
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    # Queues a command. Returns a future resolving to the command-to-confirmation latency in seconds.
+    # Must be called from the event loop.
+    def send(self, command):
+        size = command_size(command)
+        if self._overhead + size > self.max_request_bytes:
+            raise ValueError("Command of {} bytes doesn't fit in a {} byte request".format(
+                len(command), self.max_request_bytes))
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((command, size, future, self.clock()))
+        self._queued_bytes += size
+        self.stats.commands_queued += 1
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._send_batches())
+        self._wakeup.set()
+        return future
+
+    # Queues several commands. Returns their futures.
+    def send_all(self, commands):
+        return [self.send(command) for command in commands]
+
+    def _batch_full(self):
+        return self._overhead + self._queued_bytes >= self.max_request_bytes or \
+            (self.max_batch_commands is not None and len(self._queue) >= self.max_batch_commands)
+
+    async def _send_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            deadline = loop.time() + self.linger
+            while self.linger and not self._batch_full():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+            await self.flush()
+
+    # Splits queued commands into requests that fit max_request_bytes and max_batch_commands.
+    def _take_batches(self):
+        queue, self._queue = self._queue, []
+        self._queued_bytes = 0
+        batches = []
+        batch = []
+        batch_bytes = self._overhead
+        for entry in queue:
+            size = entry[1]
+            if batch and (batch_bytes + size > self.max_request_bytes or
+                          (self.max_batch_commands is not None and len(batch) >= self.max_batch_commands)):
+                batches.append(batch)
+                batch = []
+                batch_bytes = self._overhead
+            batch.append(entry)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    # Sends every queued command now.
+    async def flush(self):
+        batches = self._take_batches()
+        loop = asyncio.get_running_loop()
+        for i, batch in enumerate(batches):
+            request_id = str(uuid.uuid4())
+            commands = [entry[0] for entry in batch]
+            sent_at = self.clock()
+            timer = loop.call_later(self.confirmation_timeout, self._expire, request_id)
+            self._pending[request_id] = _PendingRequest(sent_at, batch, timer)
+            try:
+                await self.satellite_stream.send_commands(
+                    commands, channel_set_id=self.channel_set_id, request_id=request_id)
+            except Exception as e:
+                # The stream failed. Nothing after this batch is sent either.
+                for unsent in batches[i:]:
+                    self._fail(unsent, e)
+                self._pending.pop(request_id).timer.cancel()
+                return
+
+            stats = self.stats
+            stats.requests_sent += 1
+            stats.commands_sent += len(batch)
+            stats.bytes_sent += sum(len(command) for command in commands)
+            if stats.first_sent_at is None:
+                stats.first_sent_at = sent_at
+
+    # Must be called with every SatelliteStreamResponse, to match the confirmations.
+    def on_response(self, response):
+        if not response.HasField('stream_event'):
+            return
+        stream_event = response.stream_event
+        if not stream_event.request_id or not stream_event.HasField('command_sent'):
+            return
+        pending = self._pending.pop(stream_event.request_id, None)
+        if pending is None:
+            return
+        pending.timer.cancel()
+        confirmed_at = self.clock()
+        stats = self.stats
+        stats.requests_confirmed += 1
+        stats.commands_confirmed += len(pending.commands)
+        stats.last_confirmed_at = confirmed_at
+        for _, _, future, queued_at in pending.commands:
+            latency = confirmed_at - queued_at
+            stats.latency.record(latency)
+            if not future.done():
+                future.set_result(latency)
+
+    def _expire(self, request_id):
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return
+        self.stats.requests_timed_out += 1
+        self._fail(pending.commands, CommandNotConfirmedError(
+            "Request {} was not confirmed within {}s".format(request_id, self.confirmation_timeout)))
+
+    def _fail(self, batch, error):
+        self.stats.commands_failed += len(batch)
+        for _, _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    # Number of requests sent and not yet confirmed.
+    @property
+    def unconfirmed_requests(self):
+        return len(self._pending)
+
+    # Stops sending. Queued and unconfirmed commands fail with CommandNotConfirmedError.
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        error = CommandNotConfirmedError("Command uplink closed")
+        self._fail(self._queue, error)
+        self._queue = []
+        self._queued_bytes = 0
+        for pending in self._pending.values():
+            pending.timer.cancel()
+            self._fail(pending.commands, error)
+        self._pending.clear()
@@ -0,0 +1,155 @@
+# Copyright 2026 Infostellar, Inc.
+# Drops telemetry responses that were already received.
+#
+# When a stream is resumed with resume_stream_message_ack_id the server rewinds, so after a partial
+# failure the same ReceiveTelemetryResponse can be received twice. DuplicateFilter sits between
+# the stream and the sinks and recognizes a response by a 128-bit BLAKE2b fingerprint of its
+# message_ack_id, plan_id and telemetry (timestamps, frequency, header and data).
+#
+# Memory is bounded either way:
+#
+# - LruFingerprints keeps the last `capacity` fingerprints exactly. No false positives.
+# - BloomFingerprints keeps two Bloom filters of `capacity` fingerprints each and checks both.
+#   When the newer one is full the older one is dropped. About 10 bits per fingerprint at a 1%
+#   false-positive rate, against about 100 bytes for the LRU, at the cost of dropping a new response
+#   once in a while; false_positive_rate() estimates how often from the current fill.
+#
+#   duplicates = DuplicateFilter(LruFingerprints(100000))
+#   if not duplicates.is_duplicate(telemetry_response):
+#       sink.write_response(telemetry_response)
+
+import collections
+import hashlib
+import math
+import struct
+import time
+
+from telemetry_sink import timestamp_to_ns
+
+_TELEMETRY_HEADER = struct.Struct('<BqqQI')
+
+
+# Returns the 16-byte fingerprint of a ReceiveTelemetryResponse. With include_ack_id=False, the
+# same telemetry matches even if the server assigned it a new message_ack_id.
+def fingerprint(telemetry_response, include_ack_id=True):
+    digest = hashlib.blake2b(digest_size=16)
+    if include_ack_id:
+        digest.update(telemetry_response.message_ack_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(telemetry_response.plan_id.encode('utf-8'))
+    for telemetry in telemetry_response.telemetry:
+        digest.update(_TELEMETRY_HEADER.pack(
+            telemetry.framing,
+            timestamp_to_ns(telemetry.time_first_byte_received),
+            timestamp_to_ns(telemetry.time_last_byte_received),
+            telemetry.downlink_frequency_hz,
+            len(telemetry.data)))
+        digest.update(telemetry.frame_header)
+        digest.update(telemetry.data)
+    return digest.digest()
+
+
+# The last `capacity` fingerprints, least recently seen dropped first.
+class LruFingerprints:
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self._keys = collections.OrderedDict()
+
+    # Adds key. Returns True if it was already there.
+    def check_and_add(self, key):
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        self._keys[key] = None
+        if len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+        return False
+
+    def false_positive_rate(self):
+        return 0.0
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# At least the last `capacity` fingerprints, in two rotating Bloom filters sized for
+# error_rate false positives each when full.
+class BloomFingerprints:
+    def __init__(self, capacity=1000000, error_rate=0.01):
+        # Only the Bloom filters need NumPy, so the default LRU works without it.
+        import numpy as np
+
+        self.capacity = capacity
+        self.bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._current = np.zeros(self.bits, dtype=bool)
+        self._previous = np.zeros(self.bits, dtype=bool)
+        self._current_count = 0
+        self._previous_count = 0
+
+    def _positions(self, key):
+        # Double hashing: h1 + i * h2 from the two halves of the fingerprint.
+        h1, h2 = struct.unpack_from('<QQ', key)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def check_and_add(self, key):
+        positions = self._positions(key)
+        if self._current[positions].all():
+            return True
+        found = bool(self._previous[positions].all())
+        if self._current_count >= self.capacity:
+            self._current, self._previous = self._previous, self._current
+            self._current[:] = False
+            self._previous_count = self._current_count
+            self._current_count = 0
+        self._current[positions] = True
+        self._current_count += 1
+        return found
+
+    # Estimated probability that a new fingerprint is reported as a duplicate.
+    def false_positive_rate(self):
+        def rate(count):
+            return (1 - math.exp(-self.hashes * count / self.bits)) ** self.hashes
+        return 1 - (1 - rate(self._current_count)) * (1 - rate(self._previous_count))
+
+    def __len__(self):
+        return self._current_count + self._previous_count
+
+
+class DuplicateStats:
+    __slots__ = ('responses', 'duplicates', 'seconds')
+
+    def __init__(self):
+        self.responses = 0
+        self.duplicates = 0
+        # Time spent fingerprinting and looking up.
+        self.seconds = 0.0
+
+    def microseconds_per_response(self):
+        return self.seconds * 1e6 / self.responses if self.responses else 0.0
+
+    def __str__(self):
+        return 'responses = {}, duplicates = {}, overhead = {:.1f}us/response'.format(
+            self.responses, self.duplicates, self.microseconds_per_response())
+
+
+# fingerprints:   LruFingerprints or BloomFingerprints.
+# include_ack_id: whether the message_ack_id is part of the fingerprint.
+class DuplicateFilter:
+    def __init__(self, fingerprints=None, include_ack_id=True, clock=time.perf_counter):
+        self.fingerprints = fingerprints if fingerprints is not None else LruFingerprints()
+        self.include_ack_id = include_ack_id
+        self.clock = clock
+        self.stats = DuplicateStats()
+
+    # Returns True if telemetry_response was already seen, and remembers it otherwise.
+    def is_duplicate(self, telemetry_response):
+        started = self.clock()
+        duplicate = self.fingerprints.check_and_add(fingerprint(telemetry_response, self.include_ack_id))
+        self.stats.seconds += self.clock() - started
+        self.stats.responses += 1
+        self.stats.duplicates += duplicate
+        return duplicate
+
+    def false_positive_rate(self):
+        return self.fingerprints.false_positive_rate()
@@ -0,0 +1,451 @@
+# Copyright 2026 Infostellar, Inc.
+# Streaming frame synchronization of BITSTREAM telemetry, configured from radio.proto framings.
+#
+# Telemetry.data of a BITSTREAM plan is a raw bitstream, MSB first, chunked at arbitrary bit
+# boundaries. A deframer is fed the chunks in order and returns the frames each chunk completes;
+# partial sync words and frames are carried over to the next chunk.
+#
+#   deframer = deframer_for(radio_pb2.CommunicationProtocol(ccsds=radio_pb2.CCSDSTransferFrame(
+#       frame_length_bytes=1115, scrambling_params={})))
+#   for telemetry in telemetry_messages:
+#       for frame in deframer.feed(telemetry.data):
+#           ...
+#
+# The bits are unpacked with NumPy and all per-bit work is vectorized:
+#
+# - AsmDeframer (Bitstream, CCSDSTransferFrame, ASMGolay) searches the attached sync marker at
+#   every bit offset at once, counting bit errors against the marker with one array pass per
+#   marker bit. Offsets with at most max_sync_errors errors match; offsets with at most
+#   max_sync_errors errors against the inverted marker match as inverted (a 180 degree phase
+#   ambiguity) and the frame that follows is inverted back. Frames are then cut out of the bits
+#   one slice per frame.
+# - Ax25Deframer descrambles G3RUH, decodes NRZI and finds HDLC flags with shifted array
+#   operations, then removes stuffed bits and checks the FCS of each frame.
+#
+# Convolutional coding and Reed-Solomon are not decoded here: the bitstream is expected after the
+# ground station's Viterbi decoder, and Reed-Solomon check symbols are left at the end of frames.
+
+import binascii
+import collections
+
+import numpy as np
+from stellarstation.api.v1 import transport_pb2
+from stellarstation.api.v1.radio import radio_pb2
+
+# The CCSDS attached sync marker for transfer frames.
+CCSDS_SYNC_WORD = (0x1ACFFC1D, 32)
+
+# The default sync word of the GOMspace AX100 in ASM+Golay mode.
+AX100_SYNC_WORD = (0x930B51DE, 32)
+
+# Length in bytes of a Reed-Solomon (255, k) code block.
+REED_SOLOMON_BLOCK_LENGTH = 255
+
+# Maximum length of a sync word, so error counts fit in uint8.
+MAX_SYNC_WORD_BITS = 64
+
+HDLC_FLAG = 0x7E
+
+# Shortest AX.25 frame between flags: two addresses, control and FCS.
+AX25_MIN_FRAME_LENGTH = 17
+
+# A frame cut out of the bitstream. bit_offset is the position of its sync word in the bits fed to
+# the deframer, inverted whether the frame was received inverted and bit_errors the number of
+# bit errors in its sync word.
+DeframedFrame = collections.namedtuple('DeframedFrame', ['data', 'bit_offset', 'inverted', 'bit_errors'])
+
+
+class DeframerStats:
+    __slots__ = ('bits', 'frames', 'inverted_frames', 'dropped_frames')
+
+    def __init__(self):
+        self.bits = 0
+        self.frames = 0
+        self.inverted_frames = 0
+        # Sync matches that didn't give a valid frame, e.g. an uncorrectable Golay length or a
+        # bad AX.25 FCS.
+        self.dropped_frames = 0
+
+    def __str__(self):
+        return 'bits = {}, frames = {}, inverted_frames = {}, dropped_frames = {}'.format(
+            self.bits, self.frames, self.inverted_frames, self.dropped_frames)
+
+
+# Returns the bits of the CCSDS pseudo-randomizer sequence, h(x) = x^8 + x^7 + x^5 + x^3 + 1 starting
+# from all ones. It has a period of 255 bits.
+def _ccsds_pn_bits():
+    bits = [1] * 8
+    while len(bits) < 255:
+        n = len(bits) - 8
+        bits.append(bits[n + 7] ^ bits[n + 5] ^ bits[n + 3] ^ bits[n])
+    return np.array(bits, dtype=np.uint8)
+
+
+# One period of the CCSDS pseudo-randomizer sequence as bytes: 255 periods of the bit sequence.
+CCSDS_PN_SEQUENCE = np.packbits(np.tile(_ccsds_pn_bits(), 8))
+
+
+# The parity matrix of the extended (24, 12) Golay code, one 12-bit row per data bit, MSB first.
+GOLAY_PARITY_ROWS = (
+    0xDC5, 0xB8B, 0x717, 0xE2D, 0xC5B, 0x8B7, 0x16F, 0x2DD, 0x5B9, 0xB71, 0x6E3, 0xFFE,
+)
+
+
+# Returns (parity of every 12-bit data word, error pattern of every syndrome). Codewords are
+# data << 12 | parity. Syndromes of the 2325 error patterns of up to 3 bits are all distinct and
+# are corrected; other syndromes map to -1.
+def _golay_tables():
+    data = np.arange(4096)
+    parity = np.zeros(4096, dtype=np.int64)
+    for i, row in enumerate(GOLAY_PARITY_ROWS):
+        parity ^= np.where(data & (1 << (11 - i)), row, 0)
+    errors = [0] + [1 << i for i in range(24)]
+    errors += [(1 << i) | (1 << j) for i in range(24) for j in range(i)]
+    errors += [(1 << i) | (1 << j) | (1 << k) for i in range(24) for j in range(i) for k in range(j)]
+    errors = np.array(errors, dtype=np.int64)
+    syndromes = parity[errors >> 12] ^ (errors & 0xFFF)
+    corrections = np.full(4096, -1, dtype=np.int64)
+    corrections[syndromes] = errors
+    return parity, corrections
+
+
+GOLAY_PARITY, GOLAY_CORRECTIONS = _golay_tables()
+
+
+# Returns the 24-bit Golay codewords of 12-bit data words.
+def golay_encode(data):
+    data = np.asarray(data, dtype=np.int64)
+    return data << 12 | GOLAY_PARITY[data]
+
+
+# Decodes 24-bit Golay codewords. Returns the 12-bit data words, or -1 where there were more than
+# 3 bit errors.
+def golay_decode(codewords):
+    codewords = np.asarray(codewords, dtype=np.int64)
+    corrections = GOLAY_CORRECTIONS[GOLAY_PARITY[codewords >> 12] ^ (codewords & 0xFFF)]
+    return np.where(corrections < 0, -1, (codewords ^ corrections) >> 12)
+
+
+# Returns the bits of a sync word given as (value, length_bits), MSB first.
+def _sync_bits(sync_word):
+    value, length_bits = sync_word
+    if not 0 < length_bits <= MAX_SYNC_WORD_BITS:
+        raise ValueError('Sync words must be 1 to {} bits long, got {}.'.format(MAX_SYNC_WORD_BITS, length_bits))
+    return np.array([(value >> (length_bits - 1 - i)) & 1 for i in range(length_bits)], dtype=np.uint8)
+
+
+# Returns (value, length_bits) of SynchronizationParams, or `default` if they are unset.
+def sync_word_from_params(params, default=None):
+    if not params.length_bits:
+        return default
+    value = int.from_bytes(params.synchronization_word, 'big')
+    return value & ((1 << params.length_bits) - 1), params.length_bits
+
+
+# Decodes a line coding in place of the bits, with `previous` the last raw bit of the previous
+# chunk. Returns the last raw bit of these bits.
+def _line_decode(bits, line_coding, previous):
+    if line_coding == radio_pb2.NRZ_L or not len(bits):
+        return previous
+    last = bits[-1]
+    # NRZ-M: a transition is a 1. NRZ-S: a transition is a 0.
+    shifted = np.empty_like(bits)
+    shifted[0] = previous
+    shifted[1:] = bits[:-1]
+    np.bitwise_xor(bits, shifted, out=bits)
+    if line_coding == radio_pb2.NRZ_S:
+        np.bitwise_xor(bits, 1, out=bits)
+    return last
+
+
+def _check_line_coding(line_coding):
+    if line_coding not in (radio_pb2.NRZ_L, radio_pb2.NRZ_M, radio_pb2.NRZ_S):
+        raise ValueError('Line coding {} is not supported.'.format(radio_pb2.LineCoding.Name(line_coding)))
+
+
+# Deframes frames that start with an attached sync marker.
+#
+# sync_word:          (value, length_bits) of the sync word
+# frame_length_bytes: length of the frames after the sync word, when fixed
+# golay_length:       frames have a Golay coded 24-bit length field after the sync word instead of
+#                     a fixed length, as in the AX100 ASM+Golay mode; its low 8 bits are the
+#                     frame length
+# max_sync_errors:    bit errors tolerated in the sync word, by default 1 in 8
+# allow_inverted:     whether to also match the inverted sync word
+# line_coding:        radio_pb2.LineCoding of the bitstream
+# derandomize:        whether frames are CCSDS scrambled; the length field isn't
+class AsmDeframer:
+    def __init__(self, sync_word, frame_length_bytes=0, golay_length=False, max_sync_errors=None,
+                 allow_inverted=True, line_coding=radio_pb2.NRZ_L, derandomize=False):
+        if not golay_length and frame_length_bytes <= 0:
+            raise ValueError('A frame length is needed without a length field.')
+        _check_line_coding(line_coding)
+        self._sync = _sync_bits(sync_word)
+        self._sync_ones = int(self._sync.sum())
+        self.frame_length_bytes = frame_length_bytes
+        self.golay_length = golay_length
+        self.max_sync_errors = len(self._sync) // 8 if max_sync_errors is None else max_sync_errors
+        self.allow_inverted = allow_inverted
+        self.line_coding = line_coding
+        self.derandomize = derandomize
+        self.stats = DeframerStats()
+        self._header_bits = 24 if golay_length else 0
+        # Bits not consumed yet, and the offset of their first bit in the whole bitstream.
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self._offset = 0
+        self._previous_bit = 0
+
+    # Returns the number of bit errors against the sync word at each of the first n offsets.
+    def _sync_errors(self, bits, n):
+        # errors = sum(bits[i + j] ^ sync[j]) over the sync bits, accumulated modulo 256: bits
+        # under sync ones count as (1 - bit), under sync zeros as bit.
+        errors = np.full(n, self._sync_ones, dtype=np.uint8)
+        for j, bit in enumerate(self._sync):
+            if bit:
+                np.subtract(errors, bits[j:j + n], out=errors)
+            else:
+                np.add(errors, bits[j:j + n], out=errors)
+        return errors
+
+    # Returns the frame lengths in bits after the header of each candidate, -1 when the length
+    # field is uncorrectable and -2 when it isn't complete yet.
+    def _frame_bits(self, bits, starts, inverted):
+        if not self.golay_length:
+            return np.full(len(starts), self.frame_length_bytes * 8, dtype=np.int64)
+        lengths = np.full(len(starts), -2, dtype=np.int64)
+        complete = starts + len(self._sync) + 24 <= len(bits)
+        if complete.any():
+            fields = bits[(starts[complete] + len(self._sync))[:, None] + np.arange(24)]
+            fields ^= inverted[complete, None]
+            codewords = fields.astype(np.int64) @ (1 << np.arange(23, -1, -1, dtype=np.int64))
+            decoded = golay_decode(codewords)
+            lengths[complete] = np.where(decoded < 0, -1, (decoded & 0xFF) * 8)
+        return lengths
+
+    # Returns the frames completed by `data`, a chunk of the bitstream.
+    def feed(self, data):
+        new_bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        self._previous_bit = _line_decode(new_bits, self.line_coding, self._previous_bit)
+        self.stats.bits += len(new_bits)
+        bits = np.concatenate((self._bits, new_bits)) if len(self._bits) else new_bits
+
+        sync_length = len(self._sync)
+        n = len(bits) - sync_length + 1
+        if n <= 0:
+            self._bits = bits
+            return []
+        errors = self._sync_errors(bits, n)
+        matches = errors <= self.max_sync_errors
+        if self.allow_inverted:
+            matches |= errors >= sync_length - self.max_sync_errors
+        starts = np.flatnonzero(matches)
+        inverted = (errors[starts] > self.max_sync_errors).astype(np.uint8)
+        frame_bits = self._frame_bits(bits, starts, inverted)
+
+        # Frames can't overlap, so candidates are taken in order, skipping those inside the
+        # previous frame. This loops over sync matches, not bits.
+        frames = []
+        position = 0
+        pending = None
+        for start, is_inverted, length in zip(starts.tolist(), inverted.tolist(), frame_bits.tolist()):
+            if start < position:
+                continue
+            if length == -1:
+                self.stats.dropped_frames += 1
+                continue
+            header_start = start + sync_length
+            end = header_start + self._header_bits + length
+            if length == -2 or end > len(bits):
+                pending = start
+                break
+            frames.append(self._frame(bits[header_start + self._header_bits:end], start, is_inverted,
+                                      int(errors[start])))
+            position = end
+
+        consumed = pending if pending is not None else max(position, n)
+        self._bits = bits[consumed:].copy()
+        self._offset += consumed
+        return frames
+
+    def _frame(self, bits, start, is_inverted, errors):
+        data = np.packbits(bits)
+        if is_inverted:
+            np.bitwise_not(data, out=data)
+            errors = len(self._sync) - errors
+            self.stats.inverted_frames += 1
+        if self.derandomize:
+            data ^= np.resize(CCSDS_PN_SEQUENCE, len(data))
+        self.stats.frames += 1
+        return DeframedFrame(data.tobytes(), self._offset + start, bool(is_inverted), errors)
+
+
+# Returns the CRC-16/X.25 of AX.25 frames. `reflected` is the frame with the bits of each byte
+# reversed, which lets binascii.crc_hqx compute the reflected CRC.
+def _ax25_fcs(reflected):
+    crc = binascii.crc_hqx(reflected, 0xFFFF)
+    return int('{:016b}'.format(crc)[::-1], 2) ^ 0xFFFF
+
+
+# Returns (callsign, ssid) of the AX.25 address at data[offset:offset + 7].
+def _ax25_address(data, offset):
+    callsign = bytes(b >> 1 for b in data[offset:offset + 6]).decode('ascii', 'replace').rstrip()
+    return callsign, (data[offset + 6] >> 1) & 0x0F
+
+
+# Deframes AX.25 frames in HDLC framing, NRZI coded and optionally G3RUH scrambled. Frames with a
+# bad FCS are dropped, and the FCS is removed from the others.
+#
+# g3ruh:                  whether the bitstream is G3RUH scrambled
+# destination:            if set, only frames to this (callsign, ssid) are returned
+# source:                 if set, only frames from this (callsign, ssid) are returned
+# max_frame_length_bytes: longer frames are dropped, and bits without a flag for that long are
+#                         discarded
+class Ax25Deframer:
+    def __init__(self, g3ruh=False, destination=None, source=None, max_frame_length_bytes=1024):
+        self.g3ruh = g3ruh
+        self.destination = destination
+        self.source = source
+        self.max_frame_length_bytes = max_frame_length_bytes
+        self.stats = DeframerStats()
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self._offset = 0
+        # The last 17 scrambled bits, and the last NRZI coded bit.
+        self._scrambled = np.zeros(17, dtype=np.uint8)
+        self._previous_bit = 0
+
+    # Returns the frames completed by `data`, a chunk of the bitstream.
+    def feed(self, data):
+        new_bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        self.stats.bits += len(new_bits)
+        if not len(new_bits):
+            return []
+        if self.g3ruh:
+            # Multiplicative descrambler, 1 + x^12 + x^17.
+            scrambled = np.concatenate((self._scrambled, new_bits))
+            new_bits = scrambled[17:] ^ scrambled[5:-12] ^ scrambled[:-17]
+            self._scrambled = scrambled[-17:]
+        # NRZI: no transition is a 1.
+        previous_bit = self._previous_bit
+        self._previous_bit = new_bits[-1]
+        nrzi = np.empty_like(new_bits)
+        nrzi[0] = previous_bit
+        nrzi[1:] = new_bits[:-1]
+        np.bitwise_xor(nrzi, new_bits, out=nrzi)
+        np.bitwise_xor(nrzi, 1, out=nrzi)
+        bits = np.concatenate((self._bits, nrzi)) if len(self._bits) else nrzi
+
+        n = len(bits) - 7
+        flags = np.zeros(0, dtype=np.int64)
+        if n > 0:
+            octets = np.zeros(n, dtype=np.uint8)
+            for j in range(8):
+                np.left_shift(octets, 1, out=octets)
+                np.bitwise_or(octets, bits[j:j + n], out=octets)
+            flags = np.flatnonzero(octets == HDLC_FLAG)
+
+        frames = []
+        if len(flags) > 1:
+            starts = flags[:-1] + 8
+            lengths = flags[1:] - starts
+            # Flag fill between frames gives empty frames, skip those at once.
+            max_bits = self.max_frame_length_bytes * 8 * 6 // 5 + 16
+            keep = (lengths >= AX25_MIN_FRAME_LENGTH * 8) & (lengths <= max_bits)
+            for start, end in zip(starts[keep].tolist(), flags[1:][keep].tolist()):
+                frame = self._frame(bits[start:end], start)
+                if frame is not None:
+                    frames.append(frame)
+
+        if len(flags):
+            consumed = int(flags[-1])
+        else:
+            consumed = max(0, len(bits) - 7)
+        if len(bits) - consumed > self.max_frame_length_bytes * 16:
+            consumed = len(bits) - 7
+        self._bits = bits[consumed:].copy()
+        self._offset += consumed
+        return frames
+
+    def _frame(self, bits, start):
+        # Runs of ones ending at each bit. A 0 after five ones is stuffed; six or more ones are an
+        # abort.
+        ones = np.cumsum(bits, dtype=np.int32)
+        run_start = np.where(bits == 0, ones, 0)
+        np.maximum.accumulate(run_start, out=run_start)
+        runs = ones - run_start
+        if runs.max() > 5:
+            self.stats.dropped_frames += 1
+            return None
+        stuffed = np.zeros(len(bits), dtype=bool)
+        stuffed[1:] = (runs[:-1] == 5) & (bits[1:] == 0)
+        bits = bits[~stuffed]
+        if len(bits) % 8 or len(bits) < AX25_MIN_FRAME_LENGTH * 8:
+            self.stats.dropped_frames += 1
+            return None
+        # AX.25 sends bytes LSB first.
+        data = np.packbits(bits, bitorder='little').tobytes()
+        fcs = _ax25_fcs(np.packbits(bits[:-16]).tobytes())
+        if fcs != int.from_bytes(data[-2:], 'little'):
+            self.stats.dropped_frames += 1
+            return None
+        data = data[:-2]
+        if self.destination is not None and _ax25_address(data, 0) != self.destination:
+            return None
+        if self.source is not None and _ax25_address(data, 7) != self.source:
+            return None
+        self.stats.frames += 1
+        return DeframedFrame(data, self._offset + start, False, 0)
+
+
+# Returns a deframer for a radio_pb2.CommunicationProtocol, or one of its framings. Options are
+# passed to the deframer.
+def deframer_for(protocol, **options):
+    if isinstance(protocol, radio_pb2.CommunicationProtocol):
+        framing = protocol.WhichOneof('Framing')
+        if framing is None:
+            raise ValueError('The protocol has no framing.')
+        protocol = getattr(protocol, framing)
+
+    if isinstance(protocol, radio_pb2.AX25):
+        destination = source = None
+        if protocol.destination_callsign:
+            destination = (protocol.destination_callsign, protocol.destination_ssid)
+        if protocol.source_callsign:
+            source = (protocol.source_callsign, protocol.source_ssid)
+        return Ax25Deframer(g3ruh=protocol.g3ruh, destination=destination, source=source, **options)
+
+    if isinstance(protocol, radio_pb2.CCSDSTransferFrame):
+        frame_length_bytes = protocol.frame_length_bytes
+        if not frame_length_bytes and protocol.HasField('reed_solomon_params'):
+            frame_length_bytes = REED_SOLOMON_BLOCK_LENGTH
+        return AsmDeframer(
+            sync_word_from_params(protocol.synchronization_params, CCSDS_SYNC_WORD),
+            frame_length_bytes=frame_length_bytes,
+            line_coding=protocol.line_coding,
+            derandomize=protocol.HasField('scrambling_params'),
+            **options)
+
+    if isinstance(protocol, radio_pb2.ASMGolay):
+        return AsmDeframer(
+            sync_word_from_params(protocol.synchronization_params, AX100_SYNC_WORD),
+            golay_length=True,
+            derandomize=protocol.enable_ccsds_scramble,
+            **options)
+
+    if isinstance(protocol, radio_pb2.Bitstream):
+        sync_word = sync_word_from_params(protocol.synchronization_params)
+        if sync_word is None:
+            raise ValueError('Bitstream framing without a sync word can\'t be deframed.')
+        return AsmDeframer(sync_word, frame_length_bytes=protocol.frame_length_bytes,
+                           line_coding=protocol.line_coding, **options)
+
+    raise ValueError('Unsupported framing {}.'.format(type(protocol).__name__))
+
+
+# Feeds the BITSTREAM Telemetry of `telemetry_messages` to `deframer` and yields
+# (telemetry, frame) for every frame, with the Telemetry message that completed it.
+def deframe_telemetry(deframer, telemetry_messages):
+    for telemetry in telemetry_messages:
+        if telemetry.framing != transport_pb2.BITSTREAM:
+            continue
+        for frame in deframer.feed(telemetry.data):
+            yield telemetry, frame
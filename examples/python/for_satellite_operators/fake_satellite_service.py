@@ -0,0 +1,161 @@
+# Copyright 2026 Infostellar, Inc.
+# A local stand-in for StellarStationService.OpenSatelliteStream.
+#
+# It streams synthetic telemetry for a single plan, honours stream_id and
+# resume_stream_message_ack_id, and confirms commands sent with a request_id with a
+# CommandSentFromGroundStation stream event. The first `failures` streams can be made to fail
+# with UNAVAILABLE after `fail_after` messages, to exercise reconnection. It is meant for tests and for measuring
+# client-side performance offline.
+#
+#   $ python3 fake_satellite_service.py --port 50052
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import socket
+import time
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from stream_client import now_timestamp
+
+
+class FakeStellarStationService(stellarstation_pb2_grpc.StellarStationServiceServicer):
+    def __init__(self, plan_id='1', ground_station_id='1', message_count=100, payload_size=1024,
+                 framing=transport_pb2.BITSTREAM, messages_per_second=None, send_end_message=True,
+                 fail_after=None, failures=0):
+        self.plan_id = plan_id
+        self.ground_station_id = ground_station_id
+        self.message_count = message_count
+        self.payload_size = payload_size
+        self.framing = framing
+        self.messages_per_second = messages_per_second
+        self.send_end_message = send_end_message
+        self.fail_after = fail_after
+        self.failures = failures
+
+        # Every request received on every stream, in order. Useful for assertions in tests.
+        self.requests = []
+        self.streams_opened = 0
+        self._stream_ids = itertools.count(1)
+
+    def _telemetry_response(self, stream_id, satellite_id, index, data):
+        timestamp = now_timestamp()
+        return stellarstation_pb2.SatelliteStreamResponse(
+            stream_id=stream_id,
+            receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+                telemetry=[transport_pb2.Telemetry(
+                    framing=self.framing,
+                    data=data,
+                    downlink_frequency_hz=435000000,
+                    time_first_byte_received=timestamp,
+                    time_last_byte_received=timestamp)],
+                plan_id=self.plan_id,
+                satellite_id=satellite_id,
+                ground_station_id=self.ground_station_id,
+                message_ack_id=str(index)))
+
+    async def _read_requests(self, request_iterator, stream_id, events):
+        async for request in request_iterator:
+            self.requests.append(request)
+            if request.HasField('send_satellite_commands_request') and request.request_id:
+                events.put_nowait(stellarstation_pb2.SatelliteStreamResponse(
+                    stream_id=stream_id,
+                    stream_event=transport_pb2.StreamEvent(
+                        request_id=request.request_id,
+                        timestamp=now_timestamp(),
+                        command_sent=transport_pb2.StreamEvent.CommandSentFromGroundStation())))
+
+    async def OpenSatelliteStream(self, request_iterator, context):
+        setup = await request_iterator.__anext__()
+        self.requests.append(setup)
+        self.streams_opened += 1
+        if not setup.satellite_id:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Satellite ID not set')
+
+        stream_id = setup.stream_id or 'stream-{}'.format(next(self._stream_ids))
+        first_index = 0
+        if setup.resume_stream_message_ack_id:
+            first_index = int(setup.resume_stream_message_ack_id) + 1
+
+        events = asyncio.Queue()
+        reader = asyncio.ensure_future(self._read_requests(request_iterator, stream_id, events))
+        try:
+            data = bytes(self.payload_size)
+            delay = 1 / self.messages_per_second if self.messages_per_second else 0
+            fail_at = None
+            if self.failures > 0 and self.fail_after is not None:
+                self.failures -= 1
+                fail_at = first_index + self.fail_after
+            for index in range(first_index, self.message_count):
+                if index == fail_at:
+                    context.set_code(grpc.StatusCode.UNAVAILABLE)
+                    context.set_details('Injected failure')
+                    return
+                while not events.empty():
+                    yield events.get_nowait()
+                yield self._telemetry_response(stream_id, setup.satellite_id, index, data)
+                await asyncio.sleep(delay)
+
+            if self.send_end_message:
+                yield self._telemetry_response(stream_id, setup.satellite_id, self.message_count, b'')
+
+            # Keep the stream open like the real service does until the client goes away.
+            while True:
+                yield await events.get()
+        finally:
+            reader.cancel()
+
+
+async def serve(servicer, address='[::]:50052'):
+    server = grpc.aio.server()
+    stellarstation_pb2_grpc.add_StellarStationServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port(address)
+    await server.start()
+    return server, port
+
+
+def _serve_forever(port, servicer_options):
+    async def run():
+        server, _ = await serve(FakeStellarStationService(**servicer_options), '127.0.0.1:{}'.format(port))
+        await server.wait_for_termination()
+    asyncio.run(run())
+
+
+# Starts a FakeStellarStationService in a separate process, so that the service does not use the
+# CPU of the client being measured. Returns (process, port). Stop it with process.terminate().
+def start_in_process(startup_time=1.0, **servicer_options):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    process = multiprocessing.Process(target=_serve_forever, args=(port, servicer_options), daemon=True)
+    process.start()
+    time.sleep(startup_time)
+    return process, port
+
+
+async def main(args):
+    servicer = FakeStellarStationService(
+        message_count=args.messages,
+        payload_size=args.payload_size,
+        messages_per_second=args.rate)
+    server, port = await serve(servicer, '[::]:{}'.format(args.port))
+    print('started server on port {}'.format(port))
+    await server.wait_for_termination()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake StellarStationService for local testing.')
+    parser.add_argument('--port', type=int, default=50052)
+    parser.add_argument('--messages', type=int, default=100000, help='Telemetry messages per stream')
+    parser.add_argument('--payload-size', type=int, default=1024, help='Bytes of data per telemetry message')
+    parser.add_argument('--rate', type=float, default=None, help='Messages per second (default: as fast as possible)')
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
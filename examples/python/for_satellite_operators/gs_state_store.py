@@ -0,0 +1,279 @@
+# Copyright 2026 Infostellar, Inc.
+# Columnar time series of GroundStationState monitoring events.
+#
+# PlanMonitoringEvent.ground_station_state reports the antenna, receiver and transmitter state
+# periodically during a plan. GroundStationStateStore flattens each state into one row of the
+# COLUMNS below and keeps them per plan as columnar, append-only NumPy arrays:
+#
+#   <directory>/<plan_id>/<segment>/<column>.npy
+#
+# Rows are buffered and written as a new segment every segment_rows rows or on flush(), so a
+# segment is never modified once written. compact() merges a plan's segments into one, sorted by
+# time and without the repeated events of a resumed stream, optionally downsampled. read() returns
+# the columns as arrays (memory maps for a compacted plan), so queries like tracking_error() run
+# vectorized over the whole plan instead of walking protobuf objects.
+#
+#   store = GroundStationStateStore(directory)
+#   store.append_event(response.stream_event)
+#   ...
+#   store.compact(plan_id)
+#   time_ns, azimuth_error, elevation_error, pointing_error = tracking_error(store.read(plan_id))
+
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# Values of unset fields: NaN for floats, -1 for wrapped integers and booleans (BoolValue is stored as
+# int8 -1, 0 or 1) and 0 for the rest.
+COLUMNS = (
+    ('time_ns', 'i8'),
+    ('antenna_azimuth_command', 'f8'),
+    ('antenna_azimuth_measured', 'f8'),
+    ('antenna_elevation_command', 'f8'),
+    ('antenna_elevation_measured', 'f8'),
+    ('antenna_polarization', 'i1'),
+    ('receiver_center_frequency_hz', 'u8'),
+    ('receiver_carrier_level_dbm', 'f8'),
+    ('receiver_is_phase_locked', '?'),
+    ('receiver_is_bit_synchronizer_locked', '?'),
+    ('receiver_normalized_snr', 'f8'),
+    ('receiver_is_frame_synchronizer_locked', '?'),
+    ('receiver_convolutional_coding_status', 'i1'),
+    ('receiver_convolutional_coding_bit_error_rate', 'f8'),
+    ('receiver_reed_solomon_status', 'i1'),
+    ('receiver_reed_solomon_num_corrected_signals', 'u4'),
+    ('receiver_reed_solomon_num_good_frames', 'i8'),
+    ('receiver_reed_solomon_num_bad_frames', 'i8'),
+    ('receiver_bitrate', 'f4'),
+    ('receiver_carrier_offset', 'f4'),
+    ('transmitter_center_frequency_hz', 'u8'),
+    ('transmitter_carrier_level_dbm', 'f8'),
+    ('transmitter_is_modulation_enabled', 'i1'),
+    ('transmitter_is_carrier_enabled', 'i1'),
+    ('transmitter_is_if_sweep_enabled', 'i1'),
+    ('transmitter_is_idle_pattern_enabled', 'i1'),
+    ('transmitter_bitrate', 'f4'),
+    ('transmitter_carrier_offset', 'f4'),
+)
+
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+NAN = float('nan')
+
+DEFAULT_SEGMENT_ROWS = 65536
+
+
+def _wrapped(message, field, unset):
+    return getattr(message, field).value if message.HasField(field) else unset
+
+
+# Returns the row of a GroundStationState received at time_ns, in COLUMNS order.
+def flatten_state(state, time_ns):
+    row = [time_ns]
+    if state.HasField('antenna'):
+        antenna = state.antenna
+        row += [antenna.azimuth.command if antenna.HasField('azimuth') else NAN,
+                antenna.azimuth.measured if antenna.HasField('azimuth') else NAN,
+                antenna.elevation.command if antenna.HasField('elevation') else NAN,
+                antenna.elevation.measured if antenna.HasField('elevation') else NAN,
+                antenna.polarization]
+    else:
+        row += [NAN, NAN, NAN, NAN, -1]
+
+    if state.HasField('receiver'):
+        receiver = state.receiver
+        reed_solomon = receiver.reed_solomon_status
+        row += [receiver.center_frequency_hz, receiver.carrier_level_dbm, receiver.is_phase_locked,
+                receiver.is_bit_synchronizer_locked, receiver.normalized_snr, receiver.is_frame_synchronizer_locked,
+                receiver.convolutional_coding_status, receiver.convolutional_coding_bit_error_rate,
+                reed_solomon.status, reed_solomon.num_corrected_signals,
+                _wrapped(reed_solomon, 'num_good_frames', -1), _wrapped(reed_solomon, 'num_bad_frames', -1),
+                _wrapped(receiver, 'bitrate', NAN), _wrapped(receiver, 'carrier_offset', NAN)]
+    else:
+        row += [0, NAN, False, False, NAN, False, -1, NAN, -1, 0, -1, -1, NAN, NAN]
+
+    if state.HasField('transmitter'):
+        transmitter = state.transmitter
+        row += [transmitter.center_frequency_hz, transmitter.carrier_level_dbm,
+                _wrapped(transmitter, 'is_modulation_enabled', -1), _wrapped(transmitter, 'is_carrier_enabled', -1),
+                _wrapped(transmitter, 'is_if_sweep_enabled', -1), _wrapped(transmitter, 'is_idle_pattern_enabled', -1),
+                _wrapped(transmitter, 'bitrate', NAN), _wrapped(transmitter, 'carrier_offset', NAN)]
+    else:
+        row += [0, NAN, -1, -1, -1, -1, NAN, NAN]
+    return row
+
+
+def _empty_columns(rows=0):
+    return {name: np.zeros(rows, dtype=dtype) for name, dtype in COLUMNS}
+
+
+# Rows of one plan not written to a segment yet.
+class _PlanBuffer:
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, capacity):
+        self.columns = _empty_columns(capacity)
+        self.rows = 0
+
+
+# Downsamples columns sorted by time into buckets of resolution_ns. Float columns are averaged,
+# ignoring NaN; the others and time_ns keep the first value of each bucket.
+def downsample(columns, resolution_ns):
+    time_ns = columns['time_ns']
+    if not len(time_ns):
+        return columns
+    buckets = (time_ns - time_ns[0]) // resolution_ns
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    result = {}
+    for name, values in columns.items():
+        if values.dtype.kind != 'f':
+            result[name] = values[starts]
+            continue
+        present = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(present, values, 0), starts)
+        counts = np.add.reduceat(present, starts)
+        result[name] = np.divide(sums, counts, out=np.full(len(starts), np.nan), where=counts > 0).astype(values.dtype)
+    return result
+
+
+# Returns (time_ns, azimuth error, elevation error, pointing error) of the antenna, measured minus
+# command, in degrees. The azimuth error is wrapped to [-180, 180) and the pointing error is the
+# angle between the commanded and measured directions.
+def tracking_error(columns):
+    azimuth_command = columns['antenna_azimuth_command']
+    azimuth_measured = columns['antenna_azimuth_measured']
+    elevation_command = columns['antenna_elevation_command']
+    elevation_measured = columns['antenna_elevation_measured']
+    azimuth_error = (azimuth_measured - azimuth_command + 180) % 360 - 180
+    elevation_error = elevation_measured - elevation_command
+    e1 = np.radians(elevation_command)
+    e2 = np.radians(elevation_measured)
+    cosine = np.sin(e1) * np.sin(e2) + np.cos(e1) * np.cos(e2) * np.cos(np.radians(azimuth_error))
+    pointing_error = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+    return columns['time_ns'], azimuth_error, elevation_error, pointing_error
+
+
+# directory:    where the per-plan directories are created.
+# segment_rows: rows buffered per plan before they are written as a segment.
+class GroundStationStateStore:
+    def __init__(self, directory, segment_rows=DEFAULT_SEGMENT_ROWS):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self._buffers = {}
+
+    def _plan_directory(self, plan_id):
+        return os.path.join(self.directory, plan_id or 'unknown-plan')
+
+    def _segments(self, plan_id):
+        plan_directory = self._plan_directory(plan_id)
+        if not os.path.isdir(plan_directory):
+            return []
+        return sorted(os.path.join(plan_directory, name) for name in os.listdir(plan_directory) if name.isdigit())
+
+    # Appends the state of plan_id received at time_ns.
+    def append(self, plan_id, time_ns, state):
+        buffer = self._buffers.get(plan_id)
+        if buffer is None:
+            buffer = self._buffers[plan_id] = _PlanBuffer(self.segment_rows)
+        for (name, _), value in zip(COLUMNS, flatten_state(state, time_ns)):
+            buffer.columns[name][buffer.rows] = value
+        buffer.rows += 1
+        if buffer.rows == self.segment_rows:
+            self._write_segment(plan_id)
+
+    # Appends the ground station state of a StreamEvent, if it has one. Returns whether it did.
+    def append_event(self, stream_event):
+        if not stream_event.HasField('plan_monitoring_event'):
+            return False
+        event = stream_event.plan_monitoring_event
+        if not event.HasField('ground_station_state'):
+            return False
+        time_ns = stream_event.timestamp.seconds * 1000000000 + stream_event.timestamp.nanos
+        self.append(event.plan_id, time_ns, event.ground_station_state)
+        return True
+
+    def _write_segment(self, plan_id, columns=None):
+        if columns is None:
+            buffer = self._buffers.pop(plan_id, None)
+            if buffer is None or not buffer.rows:
+                return
+            columns = {name: values[:buffer.rows] for name, values in buffer.columns.items()}
+        segments = self._segments(plan_id)
+        number = int(os.path.basename(segments[-1])) + 1 if segments else 0
+        path = os.path.join(self._plan_directory(plan_id), '{:06d}'.format(number))
+        # Written under a temporary name first, so readers never see a partial segment.
+        temporary = path + '.tmp'
+        os.makedirs(temporary, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(temporary, name + '.npy'), values)
+        os.rename(temporary, path)
+        return path
+
+    # Writes the buffered rows of every plan.
+    def flush(self):
+        for plan_id in list(self._buffers):
+            self._write_segment(plan_id)
+
+    def close(self):
+        self.flush()
+
+    def plan_ids(self):
+        if not os.path.isdir(self.directory):
+            return sorted(self._buffers)
+        return sorted(set(os.listdir(self.directory)) | set(self._buffers))
+
+    # Returns {column: array} of the plan's rows, in the order they were appended, including rows
+    # not flushed yet. The arrays of a plan with a single segment are read-only memory maps.
+    def read(self, plan_id, names=COLUMN_NAMES):
+        parts = [{name: np.load(os.path.join(segment, name + '.npy'), mmap_mode='r') for name in names}
+                 for segment in self._segments(plan_id)]
+        buffer = self._buffers.get(plan_id)
+        if buffer is not None and buffer.rows:
+            parts.append({name: buffer.columns[name][:buffer.rows] for name in names})
+        if not parts:
+            return {name: _empty_columns()[name] for name in names}
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+    # Merges the plan's segments and buffered rows into one segment, sorted by time, keeping the
+    # first of rows with the same time. With resolution_ns, rows are also downsampled to it.
+    # Returns the number of rows kept.
+    def compact(self, plan_id, resolution_ns=None):
+        old_segments = self._segments(plan_id)
+        columns = self.read(plan_id)
+        self._buffers.pop(plan_id, None)
+        order = np.argsort(columns['time_ns'], kind='stable')
+        time_ns = columns['time_ns'][order]
+        keep = order[np.concatenate(([True], time_ns[1:] != time_ns[:-1]))]
+        columns = {name: np.asarray(values[keep]) for name, values in columns.items()}
+        if resolution_ns:
+            columns = downsample(columns, resolution_ns)
+        if len(columns['time_ns']):
+            self._write_segment(plan_id, columns)
+        for segment in old_segments:
+            shutil.rmtree(segment)
+        return len(columns['time_ns'])
+
+
+# Prints the antenna tracking error of each plan in a store directory.
+#
+#   python gs_state_store.py <directory> [plan_id]
+def run():
+    store = GroundStationStateStore(sys.argv[1])
+    plan_ids = sys.argv[2:] or store.plan_ids()
+    for plan_id in plan_ids:
+        time_ns, _, _, pointing_error = tracking_error(store.read(plan_id))
+        pointing_error = pointing_error[~np.isnan(pointing_error)]
+        if not len(pointing_error):
+            print('Plan {}: no antenna state'.format(plan_id))
+            continue
+        p50, p99 = np.percentile(pointing_error, [50, 99])
+        print('Plan {}: {} states over {:.0f}s, pointing error p50 = {:.3f}, p99 = {:.3f}, max = {:.3f} degrees'.format(
+            plan_id, len(time_ns), (time_ns[-1] - time_ns[0]) / 1e9, p50, p99, pointing_error.max()))
+
+
+if __name__ == '__main__':
+    run()
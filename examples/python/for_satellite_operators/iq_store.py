@@ -0,0 +1,314 @@
+# Copyright 2026 Infostellar, Inc.
+# IQ telemetry as NumPy arrays, stored in memory-mapped .npy files.
+#
+# Telemetry.data of an IQ plan is raw interleaved I/Q samples. iq_samples() views a chunk as a
+# NumPy array without copying it. IqSink writes the samples of each plan into a memory-mapped .npy
+# file that grows as samples arrive:
+#
+#   <directory>/<plan_id>/IQ-<sample_format>.npy        the samples
+#   <directory>/<plan_id>/IQ-<sample_format>.index.npy  one INDEX_DTYPE row per Telemetry chunk
+#
+# The .npy file is preallocated and doubled when full, so appending a chunk is a single copy into
+# the page cache. It is truncated to the samples written when the store is closed. The index maps
+# sample indices to the Telemetry timestamps, so IqRecording can slice a time range of hours of IQ
+# from the memory map without reading the rest.
+#
+#   with IqSink(directory, sample_format='ci16') as iq_sink:
+#       iq_sink.write_response(telemetry_response)
+#
+#   recording = IqRecording(path)
+#   samples = to_complex(recording.between(start_ns, end_ns))
+
+import os
+import struct
+
+import numpy as np
+from stellarstation.api.v1 import transport_pb2
+
+from telemetry_sink import timestamp_to_ns
+
+# Sample formats, as NumPy dtypes of one I/Q sample.
+SAMPLE_FORMATS = {
+    'cf32': np.dtype('<c8'),
+    'ci16': np.dtype([('i', '<i2'), ('q', '<i2')]),
+    'ci8': np.dtype([('i', 'i1'), ('q', 'i1')]),
+}
+
+# One row per appended chunk: its first sample, number of samples, Telemetry timestamps and
+# downlink frequency.
+INDEX_DTYPE = np.dtype([
+    ('sample', '<i8'),
+    ('samples', '<i8'),
+    ('time_first_ns', '<i8'),
+    ('time_last_ns', '<i8'),
+    ('downlink_frequency_hz', '<u8'),
+])
+
+# Size of the .npy header. It is fixed so the shape can be rewritten in place when the file grows.
+NPY_HEADER_SIZE = 128
+
+DEFAULT_INITIAL_CAPACITY = 1 << 20
+DEFAULT_MAX_GROWTH = 1 << 26
+
+
+def _sample_dtype(sample_format):
+    try:
+        return SAMPLE_FORMATS[sample_format]
+    except KeyError:
+        raise ValueError("Unknown sample format '{}'".format(sample_format)) from None
+
+
+# Returns the samples of `data` as a read-only NumPy array sharing its memory. data must hold whole
+# samples.
+def iq_samples(data, sample_format='cf32'):
+    return np.frombuffer(data, dtype=_sample_dtype(sample_format))
+
+
+# Returns samples as complex64, multiplied by scale. Integer samples are converted, cf32 samples
+# are returned as they are when scale is 1.
+def to_complex(samples, scale=1.0):
+    if samples.dtype.names is None:
+        return samples if scale == 1.0 else samples * np.float32(scale)
+    result = np.empty(samples.shape, dtype=np.complex64)
+    result.real = samples['i']
+    result.imag = samples['q']
+    if scale != 1.0:
+        result *= np.float32(scale)
+    return result
+
+
+def _npy_header(dtype, length):
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), length)
+    header = header.ljust(NPY_HEADER_SIZE - 11) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def index_path(path):
+    return path[:-len('.npy')] + '.index.npy'
+
+
+def store_path(directory, plan_id, sample_format):
+    return os.path.join(directory, plan_id or 'unknown-plan', 'IQ-{}.npy'.format(sample_format))
+
+
+# Appends IQ samples to the memory-mapped .npy file at path. An existing file is appended to.
+#
+# initial_capacity: samples preallocated for a new file.
+# max_growth:       the file doubles when full, by at most this many samples.
+class IqStore:
+    def __init__(self, path, sample_format='cf32', initial_capacity=DEFAULT_INITIAL_CAPACITY,
+                 max_growth=DEFAULT_MAX_GROWTH):
+        self.path = path
+        self.sample_format = sample_format
+        self.dtype = _sample_dtype(sample_format)
+        self.max_growth = max_growth
+        self._index = []
+        # Bytes of a sample split across chunks.
+        self._partial = b''
+
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                if np.lib.format.read_magic(f) != (1, 0):
+                    raise ValueError('{} is not an IQ store'.format(path))
+                shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+                header_size = f.tell()
+            if dtype != self.dtype or header_size != NPY_HEADER_SIZE:
+                raise ValueError('{} is not an IQ store of {} samples'.format(path, sample_format))
+            self.count = shape[0]
+            if os.path.exists(index_path(path)):
+                self._index = np.load(index_path(path)).tolist()
+                if self._index:
+                    self.count = self._index[-1][0] + self._index[-1][1]
+            capacity = max(shape[0], self.count, 1)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.count = 0
+            capacity = max(initial_capacity, 1)
+            with open(path, 'wb') as f:
+                f.write(_npy_header(self.dtype, capacity))
+        self._open(capacity)
+
+    def _open(self, capacity):
+        os.truncate(self.path, NPY_HEADER_SIZE + capacity * self.dtype.itemsize)
+        with open(self.path, 'r+b') as f:
+            f.write(_npy_header(self.dtype, capacity))
+        self.capacity = capacity
+        self._map = np.memmap(self.path, dtype=self.dtype, mode='r+', offset=NPY_HEADER_SIZE, shape=(capacity,))
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity += max(1, min(capacity, self.max_growth))
+        self._map.flush()
+        self._map = None
+        self._open(capacity)
+
+    # The samples written so far, as a view of the memory map.
+    @property
+    def samples(self):
+        return self._map[:self.count]
+
+    # Appends the samples of a chunk of IQ data received between time_first_ns and time_last_ns.
+    # Returns the index of its first sample.
+    def append(self, data, time_first_ns=0, time_last_ns=0, downlink_frequency_hz=0):
+        first = self.count
+        data = memoryview(data).cast('B')
+        itemsize = self.dtype.itemsize
+        head = None
+        if self._partial:
+            needed = itemsize - len(self._partial)
+            self._partial += data[:needed].tobytes()
+            data = data[needed:]
+            if len(self._partial) < itemsize:
+                return first
+            head, self._partial = np.frombuffer(self._partial, dtype=self.dtype), b''
+        whole = len(data) // itemsize
+        if whole * itemsize < len(data):
+            self._partial = data[whole * itemsize:].tobytes()
+        samples = np.frombuffer(data, dtype=self.dtype, count=whole)
+
+        end = first + whole + (head is not None)
+        if end > self.capacity:
+            self._grow(end)
+        position = first
+        if head is not None:
+            self._map[position] = head[0]
+            position += 1
+        self._map[position:end] = samples
+        self.count = end
+        self._index.append((first, end - first, time_first_ns, time_last_ns, downlink_frequency_hz))
+        return first
+
+    # Appends the samples of an IQ Telemetry message.
+    def append_telemetry(self, telemetry):
+        return self.append(telemetry.data, timestamp_to_ns(telemetry.time_first_byte_received),
+                           timestamp_to_ns(telemetry.time_last_byte_received), telemetry.downlink_frequency_hz)
+
+    def _write_index(self):
+        temporary = index_path(self.path) + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, np.array(self._index, dtype=INDEX_DTYPE))
+        os.replace(temporary, index_path(self.path))
+
+    # Writes the samples and the index to disk. The file keeps its preallocated size.
+    def flush(self):
+        self._map.flush()
+        self._write_index()
+
+    # Flushes and truncates the file to the samples written, so it loads as a plain .npy file.
+    def close(self):
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map = None
+        os.truncate(self.path, NPY_HEADER_SIZE + self.count * self.dtype.itemsize)
+        with open(self.path, 'r+b') as f:
+            f.write(_npy_header(self.dtype, self.count))
+        self.capacity = self.count
+        self._write_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# Writes the IQ Telemetry of each plan to its own IqStore under directory. Telemetry of other
+# framings is ignored.
+class IqSink:
+    def __init__(self, directory, sample_format='cf32', **store_options):
+        self.directory = directory
+        self.sample_format = sample_format
+        self.store_options = store_options
+        self.stores = {}
+        _sample_dtype(sample_format)
+
+    def write(self, plan_id, telemetry):
+        if telemetry.framing != transport_pb2.IQ:
+            return
+        store = self.stores.get(plan_id)
+        if store is None:
+            store = IqStore(store_path(self.directory, plan_id, self.sample_format), self.sample_format,
+                            **self.store_options)
+            self.stores[plan_id] = store
+        store.append_telemetry(telemetry)
+
+    def write_response(self, telemetry_response):
+        for telemetry in telemetry_response.telemetry:
+            self.write(telemetry_response.plan_id, telemetry)
+
+    def flush(self):
+        for store in self.stores.values():
+            store.flush()
+
+    def close(self):
+        for store in self.stores.values():
+            store.close()
+        self.stores.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# Reads an IQ store without loading it: samples is a read-only memory map, and the index maps
+# sample indices to timestamps. A store still being written can be read up to its last flush.
+class IqRecording:
+    def __init__(self, path):
+        self.path = path
+        self.index = np.load(index_path(path))
+        samples = np.load(path, mmap_mode='r')
+        count = int(self.index['sample'][-1] + self.index['samples'][-1]) if len(self.index) else len(samples)
+        self.samples = samples[:count]
+
+        # Timestamps of the first and last sample of each chunk, relative to the first, so they
+        # interpolate in float64 without losing precision.
+        index = self.index[self.index['samples'] > 0]
+        last_ns = np.where(index['time_last_ns'] > 0, index['time_last_ns'], index['time_first_ns'])
+        self._base_ns = int(index['time_first_ns'][0]) if len(index) else 0
+        self._samples = np.column_stack((index['sample'], index['sample'] + index['samples'] - 1)).ravel()
+        self._times = (np.column_stack((index['time_first_ns'], last_ns)).ravel() - self._base_ns).astype(np.float64)
+        # Receive times can jitter backwards between chunks.
+        np.maximum.accumulate(self._times, out=self._times)
+        span = self._samples[-1] - self._samples[0] if len(index) else 0
+        self._ns_per_sample = (self._times[-1] - self._times[0]) / span if span else 0.0
+
+    def __len__(self):
+        return len(self.samples)
+
+    # Returns the receive time in ns since the epoch of sample indices, interpolated between chunk
+    # timestamps and extrapolated past the first and last chunk.
+    def time_at(self, sample):
+        sample = np.asarray(sample, dtype=np.float64)
+        if not len(self._samples):
+            return np.zeros(sample.shape, dtype=np.int64)
+        times = np.interp(sample, self._samples, self._times)
+        times += np.where(sample < self._samples[0], (sample - self._samples[0]) * self._ns_per_sample, 0)
+        times += np.where(sample > self._samples[-1], (sample - self._samples[-1]) * self._ns_per_sample, 0)
+        return np.rint(times).astype(np.int64) + self._base_ns
+
+    # Returns the index of the first sample received at or after time_ns, clamped to the samples.
+    def sample_at(self, time_ns):
+        if not len(self._samples):
+            return 0
+        time = float(time_ns - self._base_ns)
+        if self._ns_per_sample and time < self._times[0]:
+            sample = self._samples[0] + (time - self._times[0]) / self._ns_per_sample
+        elif self._ns_per_sample and time > self._times[-1]:
+            sample = self._samples[-1] + (time - self._times[-1]) / self._ns_per_sample
+        else:
+            # Timestamps can repeat, take the first sample at the time.
+            position = np.searchsorted(self._times, time)
+            if position < len(self._times) and self._times[position] == time:
+                sample = self._samples[position]
+            else:
+                sample = np.interp(time, self._times, self._samples)
+        return int(min(max(np.ceil(sample), 0), len(self.samples)))
+
+    # Returns the samples received between start_ns and end_ns, as a view of the memory map.
+    def between(self, start_ns, end_ns):
+        return self.samples[self.sample_at(start_ns):self.sample_at(end_ns)]
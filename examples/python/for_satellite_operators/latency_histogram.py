@@ -0,0 +1,278 @@
+# Copyright 2026 Infostellar, Inc.
+# Telemetry latency histograms, per ground station and plan.
+#
+# LatencyRecorder keeps a histogram for each of these intervals:
+#
+#   ground_station_to_client: Telemetry.time_last_byte_received at the ground station until the
+#                             response is received by the client
+#   receive_to_ack:           response received until the ack covering it is sent
+#   receive_to_sink:          response received until its telemetry is written by TelemetrySink
+#
+# The histograms are HDR-style: values are bucketed with a fixed number of significant digits over
+# a wide range, so recording is O(1), memory is fixed and percentiles are accurate to the chosen
+# precision whatever the distribution. They can be pulled as JSON over HTTP (serve_latency_metrics)
+# or dumped periodically (dump_latency_periodically).
+#
+#   latency = LatencyRecorder()
+#   sink = TelemetrySink(directory, on_written=latency.on_written)
+#   satellite_stream = SatelliteStream(client, satellite_id, latency=latency)
+#   ...
+#   sink.write_response(telemetry_response, token=latency.receive_token)
+
+import array
+import asyncio
+import collections
+import http.server
+import json
+import math
+import threading
+import time
+
+from telemetry_sink import timestamp_to_ns
+
+GROUND_STATION_TO_CLIENT = 'ground_station_to_client'
+RECEIVE_TO_ACK = 'receive_to_ack'
+RECEIVE_TO_SINK = 'receive_to_sink'
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# A histogram of latencies from lowest to highest seconds with significant_digits of precision.
+# Values are recorded as integer microseconds. Values outside the range are clamped to it and
+# counted in `clamped`, e.g. negative latencies caused by clock offset between ground station and
+# client.
+class LatencyHistogram:
+    def __init__(self, lowest=1e-6, highest=3600.0, significant_digits=2):
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+
+        lowest_us = max(1, int(lowest * 1e6))
+        self._highest_us = int(highest * 1e6)
+        self._unit_magnitude = int(math.floor(math.log2(lowest_us)))
+        sub_bucket_count_magnitude = int(math.ceil(math.log2(2 * 10 ** significant_digits)))
+        self._sub_bucket_half_count_magnitude = sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= self._highest_us:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._counts = array.array('q', bytes(8 * (bucket_count + 1) * self._sub_bucket_half_count))
+
+        self.count = 0
+        self.clamped = 0
+        self._total = 0
+        self._min = None
+        self._max = None
+
+    def _index(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude \
+            - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket - self._sub_bucket_half_count
+
+    # Returns the range of microsecond values counted at index, as (lowest, highest).
+    def _value_range(self, index):
+        bucket = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        lowest = sub_bucket << (bucket + self._unit_magnitude)
+        return lowest, lowest + (1 << (bucket + self._unit_magnitude)) - 1
+
+    def record(self, seconds, count=1):
+        value = int(seconds * 1e6)
+        if value < 0:
+            value = 0
+            self.clamped += count
+        elif value > self._highest_us:
+            value = self._highest_us
+            self.clamped += count
+        self._counts[self._index(value)] += count
+        self.count += count
+        self._total += value * count
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def merge(self, other):
+        if len(other._counts) != len(self._counts) or other._unit_magnitude != self._unit_magnitude:
+            raise ValueError("Histograms with different ranges or precision can't be merged")
+        for i, count in enumerate(other._counts):
+            if count:
+                self._counts[i] += count
+        self.count += other.count
+        self.clamped += other.clamped
+        self._total += other._total
+        if other._min is not None and (self._min is None or other._min < self._min):
+            self._min = other._min
+        if other._max is not None and (self._max is None or other._max > self._max):
+            self._max = other._max
+
+    def reset(self):
+        self._counts = array.array('q', bytes(8 * len(self._counts)))
+        self.count = 0
+        self.clamped = 0
+        self._total = 0
+        self._min = None
+        self._max = None
+
+    @property
+    def min(self):
+        return None if self._min is None else self._min / 1e6
+
+    @property
+    def max(self):
+        return None if self._max is None else self._max / 1e6
+
+    @property
+    def mean(self):
+        return self._total / self.count / 1e6 if self.count else None
+
+    # Returns the latency in seconds below which `percentile` percent of the values fall. Like
+    # HdrHistogram, the highest value equivalent to the bucket is returned.
+    def value_at_percentile(self, percentile):
+        if not self.count:
+            return None
+        target = max(1, int(math.ceil(percentile / 100 * self.count)))
+        seen = 0
+        for i, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self._value_range(i)[1], self._max) / 1e6
+        return self.max
+
+    def summary(self):
+        summary = {'count': self.count, 'clamped': self.clamped}
+        for name, value in (('min', self.min), ('mean', self.mean), ('max', self.max)):
+            summary[name + '_ms'] = None if value is None else round(value * 1e3, 3)
+        for percentile in PERCENTILES:
+            value = self.value_at_percentile(percentile)
+            summary['p{:g}_ms'.format(percentile)] = None if value is None else round(value * 1e3, 3)
+        return summary
+
+
+# Records telemetry latencies per (interval, ground station, plan). Safe to use from the event loop
+# and the TelemetrySink writer thread at the same time.
+#
+# Responses waiting for an ack are remembered up to max_unacked; older ones are forgotten and get no
+# RECEIVE_TO_ACK sample.
+class LatencyRecorder:
+    def __init__(self, clock=time.time, max_unacked=100000, **histogram_options):
+        self.clock = clock
+        self.histogram_options = histogram_options
+        self.histograms = {}
+        # Token for the response last passed to on_telemetry_response, for TelemetrySink.write_response.
+        self.receive_token = None
+        self._unacked = collections.deque(maxlen=max_unacked)
+        self._lock = threading.Lock()
+
+    def _histogram(self, metric, ground_station_id, plan_id):
+        key = (metric, ground_station_id, plan_id)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(**self.histogram_options)
+        return histogram
+
+    # Called by SatelliteStream when a telemetry response is received. With acked=False, e.g. when
+    # flow control is off, the response isn't kept for on_ack.
+    def on_telemetry_response(self, telemetry_response, received_at=None, acked=True):
+        if received_at is None:
+            received_at = self.clock()
+        ground_station_id = telemetry_response.ground_station_id
+        plan_id = telemetry_response.plan_id
+        with self._lock:
+            histogram = self._histogram(GROUND_STATION_TO_CLIENT, ground_station_id, plan_id)
+            for telemetry in telemetry_response.telemetry:
+                if not telemetry.data:
+                    # The end-of-data message has no meaningful timestamps.
+                    continue
+                last_byte = timestamp_to_ns(telemetry.time_last_byte_received) or \
+                    timestamp_to_ns(telemetry.time_first_byte_received)
+                if last_byte:
+                    histogram.record(received_at - last_byte / 1e9)
+            self.receive_token = (ground_station_id, plan_id, received_at)
+            if acked and telemetry_response.message_ack_id:
+                self._unacked.append((telemetry_response.message_ack_id, self.receive_token))
+
+    # Called by SatelliteStream when an ack is sent. Acks are cumulative, so the ack covers every
+    # response received up to and including message_ack_id.
+    def on_ack(self, message_ack_id, sent_at=None):
+        if sent_at is None:
+            sent_at = self.clock()
+        with self._lock:
+            unacked = self._unacked
+            covered = len(unacked)
+            for i, (ack_id, _) in enumerate(unacked):
+                if ack_id == message_ack_id:
+                    covered = i + 1
+                    break
+            for _ in range(covered):
+                _, (ground_station_id, plan_id, received_at) = unacked.popleft()
+                self._histogram(RECEIVE_TO_ACK, ground_station_id, plan_id).record(sent_at - received_at)
+
+    # Called by SatelliteStream when it (re)opens the stream. Responses of an earlier call that were
+    # never acked are forgotten, since the resumed stream delivers them again.
+    def discard_unacked(self):
+        with self._lock:
+            self._unacked.clear()
+
+    # TelemetrySink on_written callback, for records written with token=receive_token.
+    def on_written(self, tokens, written_at=None):
+        if written_at is None:
+            written_at = self.clock()
+        with self._lock:
+            for ground_station_id, plan_id, received_at in tokens:
+                self._histogram(RECEIVE_TO_SINK, ground_station_id, plan_id).record(written_at - received_at)
+
+    # Returns a summary of every histogram, sorted by ground station, plan and interval.
+    def snapshot(self):
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][2], item[0][0]))
+            return [dict(metric=metric, ground_station_id=ground_station_id, plan_id=plan_id,
+                         **histogram.summary())
+                    for (metric, ground_station_id, plan_id), histogram in items]
+
+    def reset(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+
+
+class _LatencyRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/latency'):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.recorder.snapshot(), indent=1).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Serves recorder.snapshot() as JSON at http://<address>:<port>/latency from a background thread.
+# Returns the server. Call server.shutdown() to stop it.
+def serve_latency_metrics(recorder, port=9464, address='127.0.0.1'):
+    server = http.server.ThreadingHTTPServer((address, port), _LatencyRequestHandler)
+    server.recorder = recorder
+    threading.Thread(target=server.serve_forever, name='latency-metrics', daemon=True).start()
+    return server
+
+
+# Writes recorder.snapshot() to output as a JSON line every interval seconds, until cancelled.
+async def dump_latency_periodically(recorder, output, interval=10.0):
+    while True:
+        await asyncio.sleep(interval)
+        output.write(json.dumps({'time': time.time(), 'latency': recorder.snapshot()}) + '\n')
+        output.flush()
@@ -0,0 +1,312 @@
+# Copyright 2026 Infostellar, Inc.
+# Lazy decoding of SatelliteStreamResponse for the OpenSatelliteStream receive path.
+#
+# The receive loop only needs the oneof discriminator, stream_id, message_ack_id and the telemetry
+# of each response. LazyStellarStationServiceStub deserializes OpenSatelliteStream responses into
+# LazySatelliteStreamResponse, which reads those fields, and every field of each Telemetry, straight
+# from the wire bytes, and returns Telemetry.data as a memoryview of the received message instead
+# of a copy. Stream events and anything else are parsed with the generated classes the first time
+# they are used, so the lazy classes can be
+# used wherever the parsed messages are, e.g. with SatelliteStream, StreamSupervisor and
+# TelemetrySink.
+#
+#   client = LazyStellarStationServiceStub(toolkit.get_aio_channel(api_key_path, api_url))
+#
+# See benchmark_decode.py for the difference in throughput.
+
+import collections
+
+from google.protobuf.message import DecodeError
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+WIRETYPE_VARINT = 0
+WIRETYPE_FIXED64 = 1
+WIRETYPE_LENGTH_DELIMITED = 2
+WIRETYPE_FIXED32 = 5
+
+# Field numbers, from stellarstation.proto and transport.proto.
+STREAM_ID_FIELD = 1
+RESPONSE_ONEOF_FIELDS = {
+    2: 'receive_telemetry_response',
+    3: 'stream_event',
+}
+TELEMETRY_FIELD = 1
+PLAN_ID_FIELD = 2
+MESSAGE_ACK_ID_FIELD = 3
+SATELLITE_ID_FIELD = 4
+GROUND_STATION_ID_FIELD = 5
+TELEMETRY_FRAMING_FIELD = 1
+TELEMETRY_DATA_FIELD = 2
+TELEMETRY_DOWNLINK_FREQUENCY_HZ_FIELD = 3
+TELEMETRY_TIME_FIRST_BYTE_RECEIVED_FIELD = 4
+TELEMETRY_TIME_LAST_BYTE_RECEIVED_FIELD = 5
+TELEMETRY_FRAME_HEADER_FIELD = 6
+TIMESTAMP_SECONDS_FIELD = 1
+TIMESTAMP_NANOS_FIELD = 2
+
+
+# Reading past the end of the buffer raises DecodeError, like any other malformed message.
+def _read_varint(buffer, pos):
+    try:
+        byte = buffer[pos]
+        if byte < 0x80:
+            return byte, pos + 1
+        result = byte & 0x7f
+        shift = 7
+        pos += 1
+        while True:
+            byte = buffer[pos]
+            result |= (byte & 0x7f) << shift
+            pos += 1
+            if byte < 0x80:
+                return result, pos
+            shift += 7
+            if shift >= 64:
+                raise DecodeError('Too many bytes when decoding varint.')
+    except IndexError:
+        raise DecodeError('Truncated message.') from None
+
+
+# Yields (field_number, start, end) for every length-delimited field of the message in
+# buffer[pos:end]. Other fields are skipped.
+def _length_delimited_fields(buffer, pos, end):
+    while pos < end:
+        tag, pos = _read_varint(buffer, pos)
+        wire_type = tag & 7
+        if wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length, pos = _read_varint(buffer, pos)
+            start = pos
+            pos += length
+            if pos > end:
+                raise DecodeError('Truncated message.')
+            yield tag >> 3, start, pos
+        elif wire_type == WIRETYPE_VARINT:
+            _, pos = _read_varint(buffer, pos)
+        elif wire_type == WIRETYPE_FIXED64:
+            pos += 8
+        elif wire_type == WIRETYPE_FIXED32:
+            pos += 4
+        else:
+            raise DecodeError('Unexpected wire type {}.'.format(wire_type))
+    if pos != end:
+        raise DecodeError('Truncated message.')
+
+
+# Returns a varint of an int32, int64 or enum field as a signed integer.
+def _signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+# Yields (field_number, value, start, end) for every varint and length-delimited field of the
+# message in buffer[pos:end]: the value of a varint, or the span of a length-delimited field with a
+# value of None. Fixed-size fields are skipped.
+def _fields(buffer, pos, end):
+    while pos < end:
+        tag, pos = _read_varint(buffer, pos)
+        wire_type = tag & 7
+        if wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length, pos = _read_varint(buffer, pos)
+            start = pos
+            pos += length
+            if pos > end:
+                raise DecodeError('Truncated message.')
+            yield tag >> 3, None, start, pos
+        elif wire_type == WIRETYPE_VARINT:
+            value, pos = _read_varint(buffer, pos)
+            yield tag >> 3, value, pos, pos
+        elif wire_type == WIRETYPE_FIXED64:
+            pos += 8
+        elif wire_type == WIRETYPE_FIXED32:
+            pos += 4
+        else:
+            raise DecodeError('Unexpected wire type {}.'.format(wire_type))
+    if pos != end:
+        raise DecodeError('Truncated message.')
+
+
+# The seconds and nanos of a Timestamp, which is all the receive path reads of one. Creating a
+# generated Timestamp costs more than the rest of a LazyTelemetry, so one is only created for any
+# other attribute, e.g. ToDatetime().
+class LazyTimestamp(collections.namedtuple('LazyTimestamp', ['seconds', 'nanos'])):
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(Timestamp(seconds=self.seconds, nanos=self.nanos), name)
+
+
+EMPTY_TIMESTAMP = LazyTimestamp(0, 0)
+
+
+# Returns the Timestamp in buffer[pos:end].
+def _read_timestamp(buffer, pos, end):
+    seconds = nanos = 0
+    for field, value, _, _ in _fields(buffer, pos, end):
+        if field == TIMESTAMP_SECONDS_FIELD and value is not None:
+            seconds = _signed(value)
+        elif field == TIMESTAMP_NANOS_FIELD and value is not None:
+            nanos = _signed(value)
+    return LazyTimestamp(seconds, nanos)
+
+
+# Base class for the lazy messages. Attributes that are not decoded from the wire are read from the
+# fully parsed message, which is created on first use.
+class _LazyMessage:
+    __slots__ = ('_wire', '_start', '_end', '_message')
+    MESSAGE_CLASS = None
+
+    def __getattr__(self, name):
+        return getattr(self.full(), name)
+
+    # Returns the fully parsed message.
+    def full(self):
+        if self._message is None:
+            self._message = self.MESSAGE_CLASS.FromString(self._wire[self._start:self._end])
+        return self._message
+
+    def SerializeToString(self):
+        return bytes(self._wire[self._start:self._end])
+
+    def ByteSize(self):
+        return self._end - self._start
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyMessage):
+            other = other.full()
+        return self.full() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __str__(self):
+        return str(self.full())
+
+
+class LazyTelemetry(_LazyMessage):
+    __slots__ = ('data', 'framing', 'downlink_frequency_hz', 'time_first_byte_received', 'time_last_byte_received',
+                 'frame_header', '_timestamps_set')
+    MESSAGE_CLASS = transport_pb2.Telemetry
+
+    def __init__(self, wire, view, start, end):
+        self._wire = wire
+        self._start = start
+        self._end = end
+        self._message = None
+        # Every field is read in one pass. The last occurrence of a field wins, as in a full parse.
+        data = view[0:0]
+        framing = downlink_frequency_hz = 0
+        first_byte = last_byte = EMPTY_TIMESTAMP
+        frame_header = b''
+        timestamps_set = set()
+        for field, value, field_start, field_end in _fields(wire, start, end):
+            if field == TELEMETRY_DATA_FIELD:
+                data = view[field_start:field_end]
+            elif value is not None:
+                if field == TELEMETRY_FRAMING_FIELD:
+                    framing = _signed(value)
+                elif field == TELEMETRY_DOWNLINK_FREQUENCY_HZ_FIELD:
+                    downlink_frequency_hz = value
+            elif field == TELEMETRY_TIME_FIRST_BYTE_RECEIVED_FIELD:
+                first_byte = _read_timestamp(wire, field_start, field_end)
+                timestamps_set.add('time_first_byte_received')
+            elif field == TELEMETRY_TIME_LAST_BYTE_RECEIVED_FIELD:
+                last_byte = _read_timestamp(wire, field_start, field_end)
+                timestamps_set.add('time_last_byte_received')
+            elif field == TELEMETRY_FRAME_HEADER_FIELD:
+                frame_header = bytes(wire[field_start:field_end])
+        self.data = data
+        self.framing = framing
+        self.downlink_frequency_hz = downlink_frequency_hz
+        self.time_first_byte_received = first_byte
+        self.time_last_byte_received = last_byte
+        self.frame_header = frame_header
+        self._timestamps_set = timestamps_set
+
+    def HasField(self, field_name):
+        if field_name in ('time_first_byte_received', 'time_last_byte_received'):
+            return field_name in self._timestamps_set
+        return self.full().HasField(field_name)
+
+
+class LazyReceiveTelemetryResponse(_LazyMessage):
+    __slots__ = ('telemetry', 'plan_id', 'message_ack_id', 'satellite_id', 'ground_station_id')
+    MESSAGE_CLASS = stellarstation_pb2.ReceiveTelemetryResponse
+
+    def __init__(self, wire, view, start, end):
+        self._wire = wire
+        self._start = start
+        self._end = end
+        self._message = None
+        telemetry = []
+        self.plan_id = self.message_ack_id = self.satellite_id = self.ground_station_id = ''
+        for field, field_start, field_end in _length_delimited_fields(wire, start, end):
+            if field == TELEMETRY_FIELD:
+                telemetry.append(LazyTelemetry(wire, view, field_start, field_end))
+            elif field == MESSAGE_ACK_ID_FIELD:
+                self.message_ack_id = str(wire[field_start:field_end], 'utf-8')
+            elif field == PLAN_ID_FIELD:
+                self.plan_id = str(wire[field_start:field_end], 'utf-8')
+            elif field == GROUND_STATION_ID_FIELD:
+                self.ground_station_id = str(wire[field_start:field_end], 'utf-8')
+            elif field == SATELLITE_ID_FIELD:
+                self.satellite_id = str(wire[field_start:field_end], 'utf-8')
+        self.telemetry = telemetry
+
+
+class LazySatelliteStreamResponse(_LazyMessage):
+    __slots__ = ('stream_id', '_kind', '_kind_start', '_kind_end', '_telemetry_response')
+    MESSAGE_CLASS = stellarstation_pb2.SatelliteStreamResponse
+
+    def __init__(self, wire):
+        self._wire = wire
+        self._start = 0
+        self._end = len(wire)
+        self._message = None
+        self._kind = None
+        self._telemetry_response = None
+        self.stream_id = ''
+        for field, start, end in _length_delimited_fields(wire, 0, len(wire)):
+            if field == STREAM_ID_FIELD:
+                self.stream_id = str(wire[start:end], 'utf-8')
+            elif field in RESPONSE_ONEOF_FIELDS:
+                self._kind = RESPONSE_ONEOF_FIELDS[field]
+                self._kind_start = start
+                self._kind_end = end
+
+    # The response deserializer for OpenSatelliteStream.
+    @classmethod
+    def FromString(cls, wire):
+        return cls(wire)
+
+    def WhichOneof(self, oneof_group):
+        if oneof_group == 'Response':
+            return self._kind
+        return self.full().WhichOneof(oneof_group)
+
+    def HasField(self, field_name):
+        if field_name in RESPONSE_ONEOF_FIELDS.values():
+            return self._kind == field_name
+        return self.full().HasField(field_name)
+
+    @property
+    def receive_telemetry_response(self):
+        if self._kind != 'receive_telemetry_response':
+            return self.full().receive_telemetry_response
+        if self._telemetry_response is None:
+            self._telemetry_response = LazyReceiveTelemetryResponse(
+                self._wire, memoryview(self._wire), self._kind_start, self._kind_end)
+        return self._telemetry_response
+
+
+# A StellarStationServiceStub whose OpenSatelliteStream yields LazySatelliteStreamResponse.
+class LazyStellarStationServiceStub(stellarstation_pb2_grpc.StellarStationServiceStub):
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.OpenSatelliteStream = channel.stream_stream(
+            '/stellarstation.api.v1.StellarStationService/OpenSatelliteStream',
+            request_serializer=stellarstation_pb2.SatelliteStreamRequest.SerializeToString,
+            response_deserializer=LazySatelliteStreamResponse.FromString)
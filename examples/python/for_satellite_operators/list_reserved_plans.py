@@ -4,28 +4,19 @@
 import os
 
 from google.protobuf.timestamp_pb2 import Timestamp
-from stellarstation.api.v1 import stellarstation_pb2
 
 import toolkit
+from plan_cache import PlanCache
 
-def get_plans(client, sat_id, days=3):
+def get_plans(plan_cache, sat_id, days=3):
     start = Timestamp()
     start.GetCurrentTime()
 
     end = Timestamp()
-    end.GetCurrentTime()
     end.FromSeconds(int(start.ToSeconds()) + (days * 24 * 3600))
 
-    request = stellarstation_pb2.ListPlansRequest(
-            satellite_id = sat_id,
-            aos_after = start,
-            aos_before = end)
-    
-    listPlansResponse = client.ListPlans(request)
-
-    plans = listPlansResponse.plan
-
-    return plans
+    # Served from the cache if the window was fetched less than a minute ago.
+    return plan_cache.get_plans(sat_id, start, end)
 
 def run():
     STELLARSTATION_API_KEY_PATH = os.getenv('STELLARSTATION_API_KEY_PATH')
@@ -45,8 +36,12 @@ def run():
     # A client is necessary to receive services from StellarStation.
     client = toolkit.get_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL)
 
+    # Plans are cached in this file between runs
+    plan_cache = PlanCache(os.getenv('STELLARSTATION_API_PLAN_CACHE', 'stellarstation_plan_cache.db'), client)
+
     # Get the plans
-    plans = get_plans(client, STELLARSTATION_API_SATELLITE_ID)
+    plans = get_plans(plan_cache, STELLARSTATION_API_SATELLITE_ID)
+    plan_cache.close()
 
     # Get plans that are RESERVED
     reserved_plans = [plan for plan in plans if toolkit.PlanStatus(plan.status).name == "RESERVED"]
@@ -1,5 +1,6 @@
 # Copyright 2022 Infostellar, Inc.
 # Requests and prints the past 30 days-worth of completed plans' telemetry file URLs for your satellite.
+# If STELLARSTATION_API_TELEMETRY_DIR is set, the files are downloaded there as well.
 
 import os
 
@@ -7,7 +8,10 @@ from google.protobuf.timestamp_pb2 import Timestamp
 from stellarstation.api.v1 import stellarstation_pb2
 
 import toolkit
+from telemetry_downloader import TelemetryDownloader
 
+# The telemetry URLs are only valid for an hour, so the plans are always listed from the API rather
+# than from a plan_cache.PlanCache.
 def get_plans(client, sat_id, days=-30):
     start = Timestamp()
     start.GetCurrentTime()
@@ -41,6 +45,7 @@ def run():
     client = toolkit.get_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL)
 
     # Get the plans
+    STELLARSTATION_API_TELEMETRY_DIR = os.getenv('STELLARSTATION_API_TELEMETRY_DIR')
     plans = get_plans(client, STELLARSTATION_API_SATELLITE_ID)
 
     # Get plans that are COMLETED
@@ -54,5 +59,15 @@ def run():
         else:
             print("({} of {}):{}\n".format(i + 1, len(completed_plans), " Telemetry Metadata Does Not Exist"))
 
+    # Download the files, several parts at once. Interrupted downloads resume where they stopped.
+    if STELLARSTATION_API_TELEMETRY_DIR:
+        with TelemetryDownloader(STELLARSTATION_API_TELEMETRY_DIR) as downloader:
+            for plan, metadata, path, error in downloader.download_plans(completed_plans):
+                if error is None:
+                    print("Downloaded {}".format(path))
+                else:
+                    print("Failed to download {} of plan {}: {}".format(metadata.url, plan.id, error))
+            print(downloader.stats)
+
 if __name__ == '__main__':
     run()
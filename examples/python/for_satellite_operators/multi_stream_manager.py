@@ -0,0 +1,146 @@
+# Copyright 2026 Infostellar, Inc.
+# Runs OpenSatelliteStream sessions for many satellites in one event loop.
+#
+# Each satellite gets its own SatelliteStream, ack policy, supervisor and sink, so acks, resume
+# points, metrics and output are kept per satellite, while the streams share a small number of
+# pooled connections. A session is a handful of Python objects and one task, so hundreds of
+# satellites fit in one process (see benchmark_multi_stream.py for the measured overhead).
+
+import asyncio
+
+from ack_policy import AdaptiveAckPolicy
+from stream_client import SatelliteStream, is_end_message
+from stream_supervisor import StreamSupervisor
+
+
+class SatelliteSession:
+    __slots__ = ('satellite_id', 'stream', 'supervisor', 'sink', 'task', 'completed', 'error')
+
+    def __init__(self, satellite_id, stream, supervisor, sink):
+        self.satellite_id = satellite_id
+        self.stream = stream
+        self.supervisor = supervisor
+        self.sink = sink
+        self.task = None
+        self.completed = False
+        self.error = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def metrics(self):
+        stats = self.stream.stats
+        return {
+            'satellite_id': self.satellite_id,
+            'running': self.running,
+            'completed': self.completed,
+            'error': None if self.error is None else str(self.error),
+            'stream_id': self.stream.stream_id,
+            'last_ack_id': self.stream.last_ack_id,
+            'responses': stats.total_responses,
+            'telemetry_messages': stats.total_telemetry_messages,
+            'stream_events': stats.total_stream_events,
+            'acks_sent': stats.total_acks_sent,
+            'messages_sent': stats.total_messages_sent,
+            'bytes_received': stats.total_bytes_received,
+            'reconnections': len(self.supervisor.metrics.recoveries),
+        }
+
+
+# client_factory(connection) returns a StellarStationServiceStub on a grpc.aio channel for the
+# given connection index, e.g.
+#
+#   lambda connection: toolkit.get_aio_grpc_client(key_path, api_url, connection=connection)
+#
+# Satellites are assigned to connections in order, streams_per_connection at a time. HTTP/2 servers
+# limit the concurrent streams per connection (commonly to 100), so the default stays below that.
+#
+# sink_factory(satellite_id), if given, returns an object with write_response(telemetry_response)
+# and close(), e.g. a TelemetrySink per satellite. handle_response(satellite_id, response), if
+# given, is called for every response and ends the satellite's session by returning True. Without
+# it a session ends at the end-of-data message.
+class MultiSatelliteStreamManager:
+    def __init__(self, client_factory, sink_factory=None, handle_response=None,
+                 ack_policy_factory=AdaptiveAckPolicy, checkpoint_store=None,
+                 streams_per_connection=80, **supervisor_options):
+        self.client_factory = client_factory
+        self.sink_factory = sink_factory
+        self.handle_response = handle_response
+        self.ack_policy_factory = ack_policy_factory
+        self.checkpoint_store = checkpoint_store
+        self.streams_per_connection = streams_per_connection
+        self.supervisor_options = supervisor_options
+        self.sessions = {}
+        self._clients = {}
+        self._added = 0
+
+    def _client(self):
+        connection = self._added // self.streams_per_connection
+        self._added += 1
+        client = self._clients.get(connection)
+        if client is None:
+            client = self._clients[connection] = self.client_factory(connection)
+        return client
+
+    def _response_handler(self, satellite_id, sink):
+        handle_response = self.handle_response
+
+        def handle(response):
+            if response.HasField('receive_telemetry_response'):
+                telemetry_response = response.receive_telemetry_response
+                if sink is not None:
+                    sink.write_response(telemetry_response)
+                if handle_response is None:
+                    return is_end_message(telemetry_response)
+            if handle_response is not None:
+                return handle_response(satellite_id, response)
+            return False
+
+        return handle
+
+    # Adds a satellite and starts streaming it. Keyword arguments are passed to SatelliteStream,
+    # e.g. plan_id, ground_station_id or accepted_framing. Must be called from the event loop.
+    def add_satellite(self, satellite_id, **stream_options):
+        if satellite_id in self.sessions:
+            raise ValueError("Satellite {} is already being streamed".format(satellite_id))
+        stream = SatelliteStream(self._client(), satellite_id,
+                                 ack_policy=self.ack_policy_factory(), **stream_options)
+        sink = self.sink_factory(satellite_id) if self.sink_factory is not None else None
+        supervisor = StreamSupervisor(stream, self._response_handler(satellite_id, sink),
+                                      checkpoint_store=self.checkpoint_store, **self.supervisor_options)
+        session = self.sessions[satellite_id] = SatelliteSession(satellite_id, stream, supervisor, sink)
+        session.task = asyncio.ensure_future(self._run_session(session))
+        return session
+
+    async def _run_session(self, session):
+        try:
+            session.completed = await session.supervisor.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A failing satellite must not take the others down with it.
+            session.error = e
+        finally:
+            if session.sink is not None:
+                session.sink.close()
+
+    # Stops streaming a satellite. Its checkpoint is kept, so it can be resumed later.
+    async def remove_satellite(self, satellite_id):
+        session = self.sessions.pop(satellite_id)
+        session.task.cancel()
+        await asyncio.gather(session.task, return_exceptions=True)
+        return session
+
+    # Waits until every session has ended.
+    async def wait(self):
+        await asyncio.gather(*(session.task for session in self.sessions.values()), return_exceptions=True)
+
+    # Stops every session. Sessions and their metrics are kept.
+    async def stop(self):
+        for session in self.sessions.values():
+            session.task.cancel()
+        await self.wait()
+
+    def metrics(self):
+        return [session.metrics() for session in self.sessions.values()]
@@ -0,0 +1,253 @@
+# Copyright 2026 Infostellar, Inc.
+# Scores and selects passes to reserve from ListUpcomingAvailablePasses.
+#
+# Every Pass x ChannelSetToken combination of every satellite is a candidate. PassCandidates holds
+# them in columnar NumPy arrays, and select_passes scores them and picks the best set that doesn't
+# conflict, all in vectorized form:
+#
+# - Score: a weighted sum of max elevation, pass duration, unit price and ground station diversity,
+#   each normalized to [0, 1] (see ScoreWeights).
+# - Conflicts: two candidates conflict if they overlap in time and share a satellite or a ground
+#   station. Candidates overlapping a RESERVED or EXECUTING plan of the same satellite or ground
+#   station are dropped.
+# - Selection: the highest scoring candidate is kept and its conflicts are dropped, until none are
+#   left. This is done in rounds: every candidate scoring higher than all its remaining conflicts
+#   is kept at once, which gives the same result as going through them one by one.
+#
+#   candidates = PassCandidates.from_passes(fetch_passes(client, satellite_ids))
+#   for i in select_passes(candidates, reserved_plans=plans):
+#       token = candidates.reservation_token(i)
+
+import numpy as np
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+
+# Plans in these statuses occupy their satellite and ground station.
+BLOCKING_STATUSES = (
+    toolkit.PlanStatus.RESERVED.value,
+    toolkit.PlanStatus.EXECUTING.value,
+)
+
+
+# Weights of the normalized score terms. Higher scores are better, so price counts against a
+# candidate. Candidates below min_elevation_degrees or above max_unit_price are never selected.
+class ScoreWeights:
+    __slots__ = ('elevation', 'duration', 'price', 'diversity', 'min_elevation_degrees', 'max_unit_price')
+
+    def __init__(self, elevation=1.0, duration=0.5, price=1.0, diversity=0.25, min_elevation_degrees=0.0,
+                 max_unit_price=None):
+        self.elevation = elevation
+        self.duration = duration
+        self.price = price
+        self.diversity = diversity
+        self.min_elevation_degrees = min_elevation_degrees
+        self.max_unit_price = max_unit_price
+
+
+# Calls ListUpcomingAvailablePasses for each satellite. Returns {satellite_id: [Pass]}.
+def fetch_passes(client, satellite_ids):
+    passes = {}
+    for satellite_id in satellite_ids:
+        response = client.ListUpcomingAvailablePasses(
+            stellarstation_pb2.ListUpcomingAvailablePassesRequest(satellite_id=satellite_id))
+        passes[satellite_id] = list(getattr(response, 'pass'))
+    return passes
+
+
+# Encodes strings as int32 codes into the shared `codes` dictionary.
+def _encode(values, codes):
+    return np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int32,
+                       count=len(values))
+
+
+class PassCandidates:
+    def __init__(self, satellite_ids, passes, pass_index, token_index, aos_ns, los_ns, max_elevation_degrees,
+                 unit_price, satellite, ground_station, ground_station_ids):
+        # Python objects, for the selected candidates.
+        self.satellite_ids = satellite_ids
+        self.passes = passes
+        self.ground_station_ids = ground_station_ids
+        # One entry per candidate.
+        self.pass_index = pass_index
+        self.token_index = token_index
+        self.aos_ns = aos_ns
+        self.los_ns = los_ns
+        self.max_elevation_degrees = max_elevation_degrees
+        self.unit_price = unit_price
+        self.satellite = satellite
+        self.ground_station = ground_station
+
+    # passes_by_satellite: {satellite_id: [Pass]}, e.g. from fetch_passes.
+    @classmethod
+    def from_passes(cls, passes_by_satellite):
+        satellite_ids = list(passes_by_satellite)
+        passes = []
+        pass_satellites = []
+        for satellite, satellite_id in enumerate(satellite_ids):
+            satellite_passes = list(passes_by_satellite[satellite_id])
+            passes.extend(satellite_passes)
+            pass_satellites.extend([satellite] * len(satellite_passes))
+
+        token_counts = np.fromiter((len(p.channel_set_token) for p in passes), dtype=np.int64, count=len(passes))
+        pass_index = np.repeat(np.arange(len(passes)), token_counts)
+        starts = np.cumsum(token_counts) - token_counts
+        token_index = np.arange(len(pass_index)) - np.repeat(starts, token_counts)
+
+        # Per pass, then expanded to its tokens.
+        aos_ns = np.fromiter((p.aos_time.ToNanoseconds() for p in passes), dtype=np.int64, count=len(passes))
+        los_ns = np.fromiter((p.los_time.ToNanoseconds() for p in passes), dtype=np.int64, count=len(passes))
+        elevation = np.fromiter((p.max_elevation_degrees for p in passes), dtype=np.float64, count=len(passes))
+        ground_station_codes = {}
+        ground_station = _encode([p.ground_station_id for p in passes], ground_station_codes)
+        unit_price = np.fromiter((token.unit_price for p in passes for token in p.channel_set_token),
+                                 dtype=np.float64, count=len(pass_index))
+
+        return cls(
+            satellite_ids=satellite_ids,
+            passes=passes,
+            pass_index=pass_index,
+            token_index=token_index,
+            aos_ns=aos_ns[pass_index],
+            los_ns=los_ns[pass_index],
+            max_elevation_degrees=elevation[pass_index],
+            unit_price=unit_price,
+            satellite=np.asarray(pass_satellites, dtype=np.int32)[pass_index],
+            ground_station=ground_station[pass_index],
+            ground_station_ids=list(ground_station_codes))
+
+    def __len__(self):
+        return len(self.pass_index)
+
+    def get_pass(self, i):
+        return self.passes[self.pass_index[i]]
+
+    def channel_set_token(self, i):
+        return self.get_pass(i).channel_set_token[self.token_index[i]]
+
+    def reservation_token(self, i):
+        return self.channel_set_token(i).reservation_token
+
+    def satellite_id(self, i):
+        return self.satellite_ids[self.satellite[i]]
+
+    def ground_station_id(self, i):
+        return self.ground_station_ids[self.ground_station[i]]
+
+    # Returns the satellite and ground station codes of the plans, with -1 for unknown ones.
+    def _plan_codes(self, plans):
+        satellite_codes = {satellite_id: i for i, satellite_id in enumerate(self.satellite_ids)}
+        ground_station_codes = {ground_station_id: i for i, ground_station_id in enumerate(self.ground_station_ids)}
+        satellite = np.fromiter((satellite_codes.get(plan.satellite_id, -1) for plan in plans), dtype=np.int32,
+                                count=len(plans))
+        ground_station = np.fromiter((ground_station_codes.get(plan.ground_station_id, -1) for plan in plans),
+                                     dtype=np.int32, count=len(plans))
+        return satellite, ground_station
+
+    # Returns the score of every candidate. Candidates that can't be selected score -inf.
+    # reserved_plans are used for the diversity term: ground stations that already have many of a
+    # satellite's plans score lower for that satellite.
+    def score(self, weights=None, reserved_plans=()):
+        weights = weights or ScoreWeights()
+        n = len(self)
+        if not n:
+            return np.zeros(0)
+        duration = (self.los_ns - self.aos_ns) / 1e9
+        price = self.unit_price
+        score = weights.elevation * np.clip(self.max_elevation_degrees / 90.0, 0.0, 1.0)
+        score += weights.duration * duration / max(duration.max(), 1.0)
+        if price.max() > 0:
+            score -= weights.price * price / price.max()
+
+        plans = [plan for plan in reserved_plans if plan.status in BLOCKING_STATUSES]
+        if weights.diversity and plans:
+            satellite, ground_station = self._plan_codes(plans)
+            known = (satellite >= 0) & (ground_station >= 0)
+            counts = np.zeros((len(self.satellite_ids), len(self.ground_station_ids)))
+            np.add.at(counts, (satellite[known], ground_station[known]), 1)
+            totals = counts.sum(axis=1)
+            share = counts[self.satellite, self.ground_station] / np.maximum(totals[self.satellite], 1)
+            score += weights.diversity * (1.0 - share)
+        else:
+            score += weights.diversity
+
+        excluded = self.max_elevation_degrees < weights.min_elevation_degrees
+        if weights.max_unit_price is not None:
+            excluded |= price > weights.max_unit_price
+        score[excluded] = -np.inf
+        return score
+
+
+# Returns the pairs (i, j), i < j, of intervals in [aos, los + gap) that overlap and share a
+# satellite or ground station.
+def _conflicts(aos_ns, los_ns, satellite, ground_station, gap_ns):
+    order = np.argsort(aos_ns, kind='stable')
+    aos_sorted = aos_ns[order]
+    # Candidates after i in AOS order that start before i ends overlap it.
+    ends = np.searchsorted(aos_sorted, los_ns[order] + gap_ns, side='left')
+    counts = np.maximum(ends - np.arange(len(order)) - 1, 0)
+    first = np.repeat(np.arange(len(order)), counts)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + offsets
+    first = order[first]
+    second = order[second]
+    shared = (satellite[first] == satellite[second]) | (ground_station[first] == ground_station[second])
+    return first[shared], second[shared]
+
+
+# Returns the indices of the selected candidates, highest score first.
+# min_gap_seconds: time a satellite or ground station needs between two passes.
+# limit:           maximum number of candidates to select.
+def select_passes(candidates, weights=None, reserved_plans=(), min_gap_seconds=0.0, limit=None):
+    reserved_plans = list(reserved_plans)
+    score = candidates.score(weights, reserved_plans)
+    n = len(candidates)
+    alive = np.isfinite(score)
+
+    # Reserved plans are added as extra intervals, so that conflicts with them come out of the same
+    # sweep as conflicts between candidates.
+    plans = [plan for plan in reserved_plans if plan.status in BLOCKING_STATUSES]
+    plan_satellite, plan_ground_station = candidates._plan_codes(plans)
+    # Unknown ids get codes that match nothing, not each other.
+    unknown = np.arange(-2, -2 - len(plans), -1, dtype=np.int32)
+    plan_satellite = np.where(plan_satellite >= 0, plan_satellite, unknown)
+    plan_ground_station = np.where(plan_ground_station >= 0, plan_ground_station, unknown)
+    first, second = _conflicts(
+        np.concatenate([candidates.aos_ns,
+                        np.fromiter((p.aos_time.ToNanoseconds() for p in plans), dtype=np.int64, count=len(plans))]),
+        np.concatenate([candidates.los_ns,
+                        np.fromiter((p.los_time.ToNanoseconds() for p in plans), dtype=np.int64, count=len(plans))]),
+        np.concatenate([candidates.satellite, plan_satellite]),
+        np.concatenate([candidates.ground_station, plan_ground_station]),
+        int(min_gap_seconds * 1e9))
+
+    first_is_plan = first >= n
+    second_is_plan = second >= n
+    alive[first[second_is_plan & ~first_is_plan]] = False
+    alive[second[first_is_plan & ~second_is_plan]] = False
+    between_candidates = ~first_is_plan & ~second_is_plan
+    # Both directions, so each candidate sees all its conflicts as neighbors.
+    u = np.concatenate([first[between_candidates], second[between_candidates]])
+    v = np.concatenate([second[between_candidates], first[between_candidates]])
+
+    # Unique priorities, so ties are broken by candidate order.
+    priority = np.empty(n, dtype=np.int64)
+    priority[np.lexsort((np.arange(n), -score))] = np.arange(n, 0, -1)
+
+    selected = np.zeros(n, dtype=bool)
+    while alive.any():
+        edges = alive[u] & alive[v]
+        u = u[edges]
+        v = v[edges]
+        best_neighbor = np.zeros(n, dtype=np.int64)
+        np.maximum.at(best_neighbor, u, priority[v])
+        winners = alive & (priority > best_neighbor)
+        selected |= winners
+        alive &= ~winners
+        alive[v[winners[u]]] = False
+
+    indices = np.flatnonzero(selected)
+    indices = indices[np.argsort(-priority[indices], kind='stable')]
+    if limit is not None:
+        indices = indices[:limit]
+    return indices
@@ -0,0 +1,273 @@
+# Copyright 2026 Infostellar, Inc.
+# A persistent, incremental cache of ListPlans results.
+#
+# Plans are stored in SQLite, indexed by satellite and AOS/LOS time, together with the AOS windows
+# that have been fetched for each satellite. A query only calls ListPlans for the parts of its
+# window that haven't been fetched yet or have gone stale:
+#
+# - A window that was entirely in the past when it was fetched can't gain new plans, so it stays
+#   valid. Its plans that were still RESERVED, EXECUTING or PROCESSING are refreshed once they are
+#   older than refresh_interval.
+# - A window that reached into the future can gain new reservations, so it is fetched again once it
+#   is older than max_age.
+#
+# Plans are cached without their telemetry_metadata, since its URLs are only valid for an hour after
+# ListPlans returns them. Call ListPlans directly for telemetry URLs.
+#
+#   cache = PlanCache('plans.db', client)
+#   plans = cache.get_plans(satellite_id, aos_after, aos_before)
+
+import datetime
+import sqlite3
+import time
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+
+# ListPlans rejects windows longer than 31 days.
+MAX_LIST_PLANS_WINDOW_NS = 31 * 24 * 3600 * 10 ** 9
+
+# Plans in these statuses can still change.
+NON_TERMINAL_STATUSES = (
+    toolkit.PlanStatus.RESERVED.value,
+    toolkit.PlanStatus.EXECUTING.value,
+    toolkit.PlanStatus.PROCESSING.value,
+)
+
+
+# Converts a Timestamp, a datetime (naive datetimes are UTC, like Timestamp.ToDatetime()) or
+# seconds since the epoch to nanoseconds since the epoch.
+def to_ns(value):
+    if isinstance(value, Timestamp):
+        return value.ToNanoseconds()
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        delta = value - datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        return (delta.days * 86400 + delta.seconds) * 10 ** 9 + delta.microseconds * 1000
+    return int(value * 10 ** 9)
+
+
+def ns_to_timestamp(ns):
+    timestamp = Timestamp()
+    timestamp.FromNanoseconds(ns)
+    return timestamp
+
+
+# Returns the parts of [start, end) not covered by the sorted, possibly overlapping intervals.
+def subtract_intervals(start, end, intervals):
+    gaps = []
+    position = start
+    for interval_start, interval_end in intervals:
+        if interval_end <= position:
+            continue
+        if interval_start >= end:
+            break
+        if interval_start > position:
+            gaps.append((position, interval_start))
+        position = max(position, interval_end)
+        if position >= end:
+            break
+    if position < end:
+        gaps.append((position, end))
+    return gaps
+
+
+# Splits [start, end) into windows ListPlans accepts.
+def split_window(start, end, max_window=MAX_LIST_PLANS_WINDOW_NS):
+    return [(s, min(s + max_window, end)) for s in range(start, end, max_window)]
+
+
+class PlanCacheStats:
+    __slots__ = ('queries', 'queries_served_from_cache', 'list_plans_calls', 'plans_fetched')
+
+    def __init__(self):
+        self.queries = 0
+        self.queries_served_from_cache = 0
+        self.list_plans_calls = 0
+        self.plans_fetched = 0
+
+    def __str__(self):
+        return "Queries = {}, Served From Cache = {}, ListPlans Calls = {}, Plans Fetched = {}".format(
+            self.queries, self.queries_served_from_cache, self.list_plans_calls, self.plans_fetched)
+
+
+# path:             SQLite database file, or ':memory:'.
+# client:           a StellarStationServiceStub on a synchronous channel.
+# max_age:          seconds after which a window that reached into the future is fetched again.
+# refresh_interval: seconds after which plans in NON_TERMINAL_STATUSES are fetched again.
+class PlanCache:
+    def __init__(self, path, client, max_age=60.0, refresh_interval=60.0, clock=time.time):
+        self.path = path
+        self.client = client
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.stats = PlanCacheStats()
+        # Parsed plans by id, so plans that haven't changed aren't parsed again.
+        self._parsed = {}
+
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS plan ('
+            ' id TEXT PRIMARY KEY,'
+            ' satellite_id TEXT NOT NULL,'
+            ' aos_ns INTEGER NOT NULL,'
+            ' los_ns INTEGER NOT NULL,'
+            ' status INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' data BLOB NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS plan_aos ON plan (satellite_id, aos_ns)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS plan_los ON plan (satellite_id, los_ns)')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS plan_window ('
+            ' satellite_id TEXT NOT NULL,'
+            ' start_ns INTEGER NOT NULL,'
+            ' end_ns INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS plan_window_start ON plan_window (satellite_id, start_ns)')
+        self._db.commit()
+
+    # Returns the plans of satellite_id with AOS in [aos_after, aos_before), sorted by AOS, like
+    # ListPlans. With statuses, only plans in those PlanStatus values are returned. max_age overrides
+    # the cache's max_age for this query; 0 fetches the whole window again.
+    def get_plans(self, satellite_id, aos_after, aos_before, statuses=None, max_age=None):
+        start = to_ns(aos_after)
+        end = to_ns(aos_before)
+        self.stats.queries += 1
+        calls = self.stats.list_plans_calls
+        self.refresh(satellite_id, start, end, max_age)
+        if self.stats.list_plans_calls == calls:
+            self.stats.queries_served_from_cache += 1
+
+        query = 'SELECT id, fetched_at, data FROM plan WHERE satellite_id = ? AND aos_ns >= ? AND aos_ns < ?'
+        parameters = [satellite_id, start, end]
+        if statuses is not None:
+            statuses = [getattr(status, 'value', status) for status in statuses]
+            query += ' AND status IN ({})'.format(', '.join('?' * len(statuses)))
+            parameters += statuses
+        query += ' ORDER BY aos_ns, id'
+        return [self._parse(*row) for row in self._db.execute(query, parameters)]
+
+    # Returns the plans of satellite_id whose [AOS, LOS) overlaps [start, end), from the cache only.
+    def get_cached_plans_overlapping(self, satellite_id, start, end):
+        rows = self._db.execute(
+            'SELECT id, fetched_at, data FROM plan WHERE satellite_id = ? AND los_ns > ? AND aos_ns < ?'
+            ' ORDER BY aos_ns, id',
+            (satellite_id, to_ns(start), to_ns(end)))
+        return [self._parse(*row) for row in rows]
+
+    def _parse(self, plan_id, fetched_at, data):
+        cached = self._parsed.get(plan_id)
+        if cached is not None and cached[0] == fetched_at:
+            return cached[1]
+        plan = stellarstation_pb2.Plan.FromString(data)
+        self._parsed[plan_id] = (fetched_at, plan)
+        return plan
+
+    # Fetches the parts of [start_ns, end_ns) that are missing or stale, and the non-terminal plans
+    # in it that are due for a refresh.
+    def refresh(self, satellite_id, start_ns, end_ns, max_age=None):
+        now = self.clock()
+        if max_age is None:
+            max_age = self.max_age
+        with self._db:
+            # Windows that reached into the future and have expired are never used again.
+            self._db.execute(
+                'DELETE FROM plan_window WHERE satellite_id = ? AND end_ns > fetched_at * 1000000000'
+                ' AND fetched_at <= ?',
+                (satellite_id, now - max_age))
+        fresh = [
+            (window_start, window_end)
+            for window_start, window_end, fetched_at in self._db.execute(
+                'SELECT start_ns, end_ns, fetched_at FROM plan_window'
+                ' WHERE satellite_id = ? AND start_ns < ? AND end_ns > ? ORDER BY start_ns',
+                (satellite_id, end_ns, start_ns))
+            if now - fetched_at < max_age or (max_age > 0 and window_end <= fetched_at * 10 ** 9)
+        ]
+        for gap_start, gap_end in subtract_intervals(start_ns, end_ns, fresh):
+            for window in split_window(gap_start, gap_end):
+                self._fetch(satellite_id, *window)
+
+        # Refresh plans that may have changed since they were fetched, in as few calls as possible.
+        stale = [aos for (aos,) in self._db.execute(
+            'SELECT aos_ns FROM plan WHERE satellite_id = ? AND aos_ns >= ? AND aos_ns < ?'
+            ' AND status IN ({}) AND fetched_at <= ? ORDER BY aos_ns'.format(
+                ', '.join('?' * len(NON_TERMINAL_STATUSES))),
+            (satellite_id, start_ns, end_ns) + NON_TERMINAL_STATUSES + (now - self.refresh_interval,))]
+        while stale:
+            window_start = stale[0]
+            window_end = min(window_start + MAX_LIST_PLANS_WINDOW_NS, stale[-1] + 1)
+            self._fetch(satellite_id, window_start, window_end)
+            stale = [aos for aos in stale if aos >= window_end]
+
+    # Calls ListPlans for [start_ns, end_ns) and replaces the cached plans in that window.
+    def _fetch(self, satellite_id, start_ns, end_ns):
+        response = self.client.ListPlans(stellarstation_pb2.ListPlansRequest(
+            satellite_id=satellite_id,
+            aos_after=ns_to_timestamp(start_ns),
+            aos_before=ns_to_timestamp(end_ns)))
+        fetched_at = self.clock()
+        self.stats.list_plans_calls += 1
+        self.stats.plans_fetched += len(response.plan)
+        for plan in response.plan:
+            plan.ClearField('telemetry_metadata')
+
+        with self._db:
+            # Plans that are no longer listed, e.g. deleted ones, are removed.
+            self._db.execute(
+                'DELETE FROM plan WHERE satellite_id = ? AND aos_ns >= ? AND aos_ns < ?',
+                (satellite_id, start_ns, end_ns))
+            self._db.executemany(
+                'INSERT OR REPLACE INTO plan (id, satellite_id, aos_ns, los_ns, status, fetched_at, data)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(plan.id, satellite_id, plan.aos_time.ToNanoseconds(), plan.los_time.ToNanoseconds(),
+                  plan.status, fetched_at, plan.SerializeToString())
+                 for plan in response.plan])
+            # Older windows inside this one are superseded.
+            self._db.execute(
+                'DELETE FROM plan_window WHERE satellite_id = ? AND start_ns >= ? AND end_ns <= ?',
+                (satellite_id, start_ns, end_ns))
+            self._db.execute(
+                'INSERT INTO plan_window (satellite_id, start_ns, end_ns, fetched_at) VALUES (?, ?, ?, ?)',
+                (satellite_id, start_ns, end_ns, fetched_at))
+        for plan in response.plan:
+            self._parsed[plan.id] = (fetched_at, plan)
+
+    # Stores a plan returned by another call, e.g. ReservePassResponse.plan. It is refreshed by the
+    # next query like any other non-terminal plan.
+    def put(self, satellite_id, plan):
+        if plan.telemetry_metadata:
+            plan = stellarstation_pb2.Plan.FromString(plan.SerializeToString())
+            plan.ClearField('telemetry_metadata')
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO plan (id, satellite_id, aos_ns, los_ns, status, fetched_at, data)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (plan.id, satellite_id, plan.aos_time.ToNanoseconds(), plan.los_time.ToNanoseconds(),
+                 plan.status, 0, plan.SerializeToString()))
+        self._parsed.pop(plan.id, None)
+
+    # Forgets everything cached for satellite_id, or for every satellite.
+    def clear(self, satellite_id=None):
+        with self._db:
+            if satellite_id is None:
+                self._db.execute('DELETE FROM plan')
+                self._db.execute('DELETE FROM plan_window')
+            else:
+                self._db.execute('DELETE FROM plan WHERE satellite_id = ?', (satellite_id,))
+                self._db.execute('DELETE FROM plan_window WHERE satellite_id = ?', (satellite_id,))
+        self._parsed.clear()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,197 @@
+# Copyright 2026 Infostellar, Inc.
+# Concurrent ListPlans over long time ranges and many satellites or ground stations.
+#
+# ListPlans takes one satellite (or ground station) per request and rejects AOS windows longer than
+# 31 days, so a fleet-wide history pull is one request per satellite per 31 days. PlanFetcher splits
+# the range into allowed chunks and runs the requests concurrently on one channel, at most
+# `concurrency` at a time. Plans are yielded as their chunk arrives, deduplicated by id (a plan with
+# its AOS on a chunk boundary can be listed by both chunks). Requests failing with a transient
+# status are retried with backoff.
+#
+#   fetcher = PlanFetcher(toolkit.get_aio_grpc_client(api_key_path, api_url))
+#   async for plan in fetcher.fetch(satellite_ids, aos_after, aos_before):
+#       ...
+#
+# For ground stations, pass a GroundStationServiceStub and make_request=ground_station_plans_request.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import grpc
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2_grpc
+
+import toolkit
+from plan_cache import MAX_LIST_PLANS_WINDOW_NS, ns_to_timestamp, split_window, to_ns
+from stream_supervisor import Backoff
+
+RETRYABLE_STATUS_CODES = frozenset([
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+])
+
+
+def satellite_plans_request(satellite_id, aos_after, aos_before):
+    return stellarstation_pb2.ListPlansRequest(
+        satellite_id=satellite_id, aos_after=aos_after, aos_before=aos_before)
+
+
+def ground_station_plans_request(ground_station_id, aos_after, aos_before):
+    return groundstation_pb2.ListPlansRequest(
+        ground_station_id=ground_station_id, aos_after=aos_after, aos_before=aos_before)
+
+
+# Ground station plans carry their id in plan_id.
+def plan_id(plan):
+    if isinstance(plan, groundstation_pb2.Plan):
+        return plan.plan_id
+    return plan.id
+
+
+class PlanFetcherStats:
+    __slots__ = ('requests', 'retries', 'plans_fetched', 'duplicates')
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.plans_fetched = 0
+        self.duplicates = 0
+
+    def __str__(self):
+        return "ListPlans Calls = {}, Retries = {}, Plans Fetched = {}, Duplicates = {}".format(
+            self.requests, self.retries, self.plans_fetched, self.duplicates)
+
+
+# client:        a StellarStationServiceStub or GroundStationServiceStub on a grpc.aio channel.
+# make_request:  builds the ListPlansRequest for (id, aos_after, aos_before) Timestamps.
+# concurrency:   maximum ListPlans calls in flight.
+# timeout:       deadline of each call, in seconds.
+# max_attempts:  attempts per chunk for RETRYABLE_STATUS_CODES, including the first.
+class PlanFetcher:
+    def __init__(self, client, make_request=satellite_plans_request, concurrency=16, timeout=30.0,
+                 max_attempts=5, max_window_ns=MAX_LIST_PLANS_WINDOW_NS, backoff_factory=Backoff):
+        self.client = client
+        self.make_request = make_request
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.max_window_ns = max_window_ns
+        self.backoff_factory = backoff_factory
+        self.stats = PlanFetcherStats()
+
+    async def _list_plans(self, plans_of, start_ns, end_ns):
+        request = self.make_request(plans_of, ns_to_timestamp(start_ns), ns_to_timestamp(end_ns))
+        backoff = self.backoff_factory()
+        attempt = 1
+        while True:
+            try:
+                response = await self.client.ListPlans(request, timeout=self.timeout)
+            except grpc.aio.AioRpcError as e:
+                if e.code() not in RETRYABLE_STATUS_CODES or attempt >= self.max_attempts:
+                    raise
+                attempt += 1
+                self.stats.retries += 1
+                await asyncio.sleep(backoff.next_delay())
+                continue
+            self.stats.requests += 1
+            self.stats.plans_fetched += len(response.plan)
+            return response.plan
+
+    # Yields the plans of every id in ids with AOS between aos_after and aos_before, in the order
+    # their chunks arrive. aos_after and aos_before are Timestamps, datetimes or seconds since the
+    # epoch. If a chunk fails, the other calls are cancelled and the error is raised.
+    async def fetch(self, ids, aos_after, aos_before):
+        windows = split_window(to_ns(aos_after), to_ns(aos_before), self.max_window_ns)
+        # Earliest chunks first, across every id.
+        chunks = [(plans_of, start, end) for start, end in windows for plans_of in ids]
+        if not chunks:
+            return
+        pending = iter(chunks)
+        results = asyncio.Queue()
+
+        async def worker():
+            try:
+                # Workers share the iterator, so each chunk is fetched once.
+                for plans_of, start, end in pending:
+                    results.put_nowait(await self._list_plans(plans_of, start, end))
+            except Exception as e:
+                results.put_nowait(e)
+            else:
+                results.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(chunks)))]
+        running = len(workers)
+        seen = set()
+        try:
+            while running:
+                plans = await results.get()
+                if plans is None:
+                    running -= 1
+                    continue
+                if isinstance(plans, Exception):
+                    raise plans
+                for plan in plans:
+                    key = plan_id(plan)
+                    if key in seen:
+                        self.stats.duplicates += 1
+                        continue
+                    seen.add(key)
+                    yield plan
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    # Returns every plan fetch yields, sorted by AOS.
+    async def fetch_all(self, ids, aos_after, aos_before):
+        plans = [plan async for plan in self.fetch(ids, aos_after, aos_before)]
+        plans.sort(key=lambda plan: (plan.aos_time.ToNanoseconds(), plan_id(plan)))
+        return plans
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Lists the plans of several satellites or ground stations.')
+    parser.add_argument('ids', nargs='+', help='Satellite IDs, or ground station IDs with -g')
+    parser.add_argument('-k', default=os.getenv('STELLARSTATION_API_KEY_PATH'), help='API key path')
+    parser.add_argument('-E', default=os.getenv('STELLARSTATION_API_URL', 'stream.qa.stellarstation.com'),
+                        help='API endpoint')
+    parser.add_argument('-g', action='store_true', help='List the plans of ground stations')
+    parser.add_argument('-d', type=float, default=-90, help='Days from now. Negative for past plans (default: -90)')
+    parser.add_argument('-c', type=int, default=16, help='Maximum concurrent ListPlans calls')
+    args = parser.parse_args()
+    assert args.k, "Did you properly define STELLARSTATION_API_KEY_PATH on your system?"
+
+    now = time.time()
+    aos_after, aos_before = sorted((now, now + args.d * 24 * 3600))
+
+    async def main():
+        channel = toolkit.get_aio_channel(args.k, args.E)
+        if args.g:
+            fetcher = PlanFetcher(groundstation_pb2_grpc.GroundStationServiceStub(channel),
+                                  make_request=ground_station_plans_request, concurrency=args.c)
+        else:
+            fetcher = PlanFetcher(toolkit.get_aio_grpc_client(args.k, args.E), concurrency=args.c)
+        started = time.monotonic()
+        try:
+            async for plan in fetcher.fetch(args.ids, aos_after, aos_before):
+                if args.g:
+                    print("{} {} {} {}".format(
+                        plan.plan_id, plan.aos_time.ToDatetime(), plan.los_time.ToDatetime(), plan.satellite_id))
+                else:
+                    print("{} {} {} {}".format(
+                        plan.id, plan.aos_time.ToDatetime(), plan.los_time.ToDatetime(),
+                        toolkit.PlanStatus(plan.status).name))
+        finally:
+            await channel.close()
+        print("{} in {:.1f}s".format(fetcher.stats, time.monotonic() - started), file=sys.stderr)
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    run()
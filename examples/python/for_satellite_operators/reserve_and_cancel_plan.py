@@ -1,37 +1,27 @@
 # Copyright 2022 Infostellar, Inc.
-# Reserves the first available plan, confirms to the user that it has been reserved by getting upcoming plans and printing it,
+# Reserves the best available pass, confirms to the user that it has been reserved by getting upcoming plans and printing it,
 #   then cancels the plan (to clean up after this example runs).
 
+import asyncio
 import os
-from time import sleep
 
 from google.protobuf.timestamp_pb2 import Timestamp
-from stellarstation.api.v1 import stellarstation_pb2
 
 import toolkit
+from bulk_executor import BulkExecutor
+from pass_selection import PassCandidates, fetch_passes, select_passes
+from plan_cache import PlanCache
 
-def get_plans(client, sat_id, days=1):
+def get_plans(plan_cache, sat_id, days=1):
     start = Timestamp()
     start.GetCurrentTime()
 
     end = Timestamp()
-    end.GetCurrentTime()
     end.FromSeconds(int(start.ToSeconds()) + (days * 24 * 3600))
 
-    request = stellarstation_pb2.ListPlansRequest(
-            satellite_id = sat_id,
-            aos_after = start,
-            aos_before = end)
-    
-    listPlansResponse = client.ListPlans(request)
-
-    plans = listPlansResponse.plan
-
-    return plans
+    return plan_cache.get_plans(sat_id, start, end)
 
 def run():
-    WAIT_TIME_SEC = 5
-
     STELLARSTATION_API_KEY_PATH = os.getenv('STELLARSTATION_API_KEY_PATH')
     STELLARSTATION_API_SATELLITE_ID = os.getenv('STELLARSTATION_API_SATELLITE_ID')
 
@@ -44,53 +34,55 @@ def run():
     # A client is necessary to receive services from StellarStation.
     client = toolkit.get_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL)
 
+    # Plans are cached in this file between runs
+    plan_cache = PlanCache(os.getenv('STELLARSTATION_API_PLAN_CACHE', 'stellarstation_plan_cache.db'), client)
+
     # Get passes that a plan can be scheduled for
     # Each pass in this list of plans is simply a protobuf 'Pass' message (defined in stellarstation.proto)
-    request = stellarstation_pb2.ListUpcomingAvailablePassesRequest(satellite_id = STELLARSTATION_API_SATELLITE_ID)
-    response = client.ListUpcomingAvailablePasses(request)
-    available_passes = getattr(response, "pass")
-
-    # Reserve a plan for the first pass using the first available channel set's reservation token
-    plan_ids_before_resevation = [plan.id for plan in get_plans(client, STELLARSTATION_API_SATELLITE_ID)]
-    assert available_passes[0], "There are no available passes. Contact Infostellar to check configuration settings."
-    assert available_passes[0].channel_set_token[0], "There are no channel sets configured for this satellite. Contact Infostellar to check configuration settings."
-    first_pass = available_passes[0]
-    print("The first pass is over Ground Station of ID {}, with AoS={} and LoS={} UTC".format(
-            first_pass.ground_station_id,
-            first_pass.aos_time.ToDatetime(),
-            first_pass.los_time.ToDatetime()))
-    print("Attempting to reserve a plan on that first pass...")
-    reservation_token = first_pass.channel_set_token[0].reservation_token
-    request = stellarstation_pb2.ReservePassRequest(reservation_token = reservation_token, priority = "HIGH")
-    response = client.ReservePass(request)
-    scheduled_plan = response.plan
-
-    # Give the servers a bit of time to update
-    print("Reservation request sent. Waiting {} seconds for servers to update...".format(WAIT_TIME_SEC))
-    sleep(WAIT_TIME_SEC)
-
-    # Assert that the plan was scheduled and print the ID
-    plan_ids_after_resevation = [plan.id for plan in get_plans(client, STELLARSTATION_API_SATELLITE_ID)]
-    assert scheduled_plan.id not in plan_ids_before_resevation
-    assert scheduled_plan.id in plan_ids_after_resevation
-    print("Successfully scheduled plan ID ({})".format(scheduled_plan.id))
-    # print("--Scheduled Plan Details-------------------------------------")
-    # print(scheduled_plan)
-
-    # Cancel the plan to clean up
-    print("Canceling the plan to clean up...".format(scheduled_plan.id))
-    request = stellarstation_pb2.CancelPlanRequest(plan_id = scheduled_plan.id)
-    client.CancelPlan(request)
-
-    # Give the servers a bit of time to update
-    print("Cancelation request sent. Waiting {} seconds for servers to update...".format(WAIT_TIME_SEC))
-    sleep(WAIT_TIME_SEC)
-
-    # Checking cancelation successful
-    my_canceled_plan = next((plan for plan in get_plans(client, STELLARSTATION_API_SATELLITE_ID)), None)
-    assert my_canceled_plan
-    assert toolkit.PlanStatus(my_canceled_plan.status).name == "CANCELED"
-    print("Successfully canceled plan of ID ({})".format(scheduled_plan.id))
+    candidates = PassCandidates.from_passes(fetch_passes(client, [STELLARSTATION_API_SATELLITE_ID]))
+    assert len(candidates), "There are no available passes or channel sets. Contact Infostellar to check configuration settings."
+
+    # Reserve a plan for the best scoring pass and channel set that doesn't overlap a reserved plan
+    plans_before_reservation = get_plans(plan_cache, STELLARSTATION_API_SATELLITE_ID)
+    plan_ids_before_resevation = [plan.id for plan in plans_before_reservation]
+    selected = select_passes(candidates, reserved_plans=plans_before_reservation, limit=1)
+    assert len(selected), "All available passes overlap reserved plans."
+    best_pass = candidates.get_pass(selected[0])
+    print("The best pass is over Ground Station of ID {}, with AoS={} and LoS={} UTC, max elevation {:.1f} degrees".format(
+            best_pass.ground_station_id,
+            best_pass.aos_time.ToDatetime(),
+            best_pass.los_time.ToDatetime(),
+            best_pass.max_elevation_degrees))
+    print("Attempting to reserve a plan on that pass...")
+
+    # The executor confirms each step by polling ListPlans for the plan, instead of waiting a fixed time.
+    async def reserve_and_cancel():
+        executor = BulkExecutor(toolkit.get_aio_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL))
+        reserved = await executor.reserve(
+            STELLARSTATION_API_SATELLITE_ID, best_pass, candidates.channel_set_token(selected[0]), priority="HIGH")
+        assert reserved.ok, "Reservation failed: {}".format(reserved.error)
+        scheduled_plan = reserved.plan
+        assert scheduled_plan.id not in plan_ids_before_resevation
+        print("Successfully scheduled plan ID ({}), confirmed in {:.1f}s".format(
+            scheduled_plan.id, reserved.confirmed_at - reserved.started_at))
+        # print("--Scheduled Plan Details-------------------------------------")
+        # print(scheduled_plan)
+
+        # Cancel the plan to clean up
+        print("Canceling the plan to clean up...")
+        canceled = await executor.cancel(scheduled_plan)
+        assert canceled.ok, "Cancelation failed: {}".format(canceled.error)
+        assert toolkit.PlanStatus(canceled.plan.status).name == "CANCELED"
+        print("Successfully canceled plan of ID ({}), confirmed in {:.1f}s".format(
+            scheduled_plan.id, canceled.confirmed_at - canceled.started_at))
+        print(executor.stats)
+        return canceled.plan
+
+    # The cache is told about the canceled plan, so the next run doesn't need to list it again.
+    plan_cache.put(STELLARSTATION_API_SATELLITE_ID, asyncio.run(reserve_and_cancel()))
+
+    print("Plan cache: {}".format(plan_cache.stats))
+    plan_cache.close()
 
     print("Example finished. Exiting...")
 
@@ -0,0 +1,367 @@
+# Copyright 2026 Infostellar, Inc.
+# Fans telemetry out to local consumer processes through a shared-memory ring buffer.
+#
+# The stream receiver publishes every Telemetry message into a TelemetryRing, a ring buffer in
+# multiprocessing.shared_memory. Consumers in other processes attach to it by name, each in its own
+# slot with its own cursor, and read frames as memoryviews of the shared memory, so one stream
+# feeds archiving, deframing, spectrum and forwarding processes without pickling or copying, and
+# their decoding work runs on other cores than the gRPC receive loop.
+#
+#   ring = TelemetryRing('stellarstation-tlm', size=64 * 1024 * 1024)   # in the receiver
+#   ring.publish_response(telemetry_response)
+#
+#   consumer = RingConsumer('stellarstation-tlm', slot=0)                # in each consumer
+#   while True:
+#       consumer.wait(timeout=1)
+#       for frame in consumer.frames():
+#           process(frame.data)
+#
+# The publisher never waits for consumers: when a frame doesn't fit without overwriting data an
+# attached consumer hasn't read, it is dropped and counted, and consumers see a gap in the sequence
+# numbers. A frame's memoryview is valid until the consumer moves past it. lag() shows how far
+# behind each consumer is.
+#
+# Layout of the shared memory, all integers little-endian u64 unless noted:
+#
+#   header:      magic | capacity | max_consumers | write_position | next_sequence | dropped
+#   slots:       max_consumers x (active | read_position | next_sequence | pid | frames_read)
+#   data:        capacity bytes of records, each 8-byte aligned
+#   record:      data length (u32) | plan_id length (u16) | framing (u8) | flags (u8) | sequence
+#                | time_first_byte_received (i64, ns) | downlink_frequency_hz | plan_id | data
+#
+# Positions count bytes written since the ring was created; position % capacity is the offset in
+# the data area. A record never wraps: if it doesn't fit before the end, a WRAP record (or, with less
+# than a record header left, nothing) fills the rest. There is a single publisher, which is the only
+# writer of the header, and each consumer is the only writer of its slot.
+
+import collections
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from telemetry_sink import timestamp_to_ns
+
+MAGIC = b'SSTLRING'
+HEADER = struct.Struct('<8sQQQQQ')
+SLOT = struct.Struct('<QQQQQ')
+RECORD_HEADER = struct.Struct('<IHBBQqQ')
+
+SLOT_SIZE = 64
+SLOTS_OFFSET = 64
+
+# Offsets in the header.
+WRITE_POSITION_OFFSET = 24
+NEXT_SEQUENCE_OFFSET = 32
+DROPPED_OFFSET = 40
+
+# Offsets in a slot.
+SLOT_ACTIVE_OFFSET = 0
+SLOT_READ_POSITION_OFFSET = 8
+SLOT_NEXT_SEQUENCE_OFFSET = 16
+SLOT_PID_OFFSET = 24
+SLOT_FRAMES_READ_OFFSET = 32
+
+# Record flags.
+FLAG_WRAP = 1
+
+DEFAULT_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_CONSUMERS = 8
+
+_U64 = struct.Struct('<Q')
+
+# Names of the rings created by this process.
+_created = set()
+
+# A frame read from the ring. data is a memoryview of the shared memory.
+RingFrame = collections.namedtuple(
+    'RingFrame', ['sequence', 'plan_id', 'framing', 'time_first_byte_received', 'downlink_frequency_hz', 'data'])
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+def _data_offset(max_consumers):
+    return (SLOTS_OFFSET + max_consumers * SLOT_SIZE + 63) // 64 * 64
+
+
+def _get(buf, offset):
+    return _U64.unpack_from(buf, offset)[0]
+
+
+def _put(buf, offset, value):
+    _U64.pack_into(buf, offset, value)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+# Creates the ring and publishes to it. Only one process publishes to a ring.
+#
+# name:          name of the shared memory, None for a random one (see .name).
+# size:          bytes of frame data the ring holds.
+# max_consumers: consumer slots.
+class TelemetryRing:
+    def __init__(self, name=None, size=DEFAULT_SIZE, max_consumers=DEFAULT_MAX_CONSUMERS):
+        self.capacity = _align(size)
+        self.max_consumers = max_consumers
+        self._data = _data_offset(max_consumers)
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=self._data + self.capacity)
+        self.name = self._shm.name
+        _created.add(self.name)
+        self._buf = self._shm.buf
+        self._buf[:self._data] = bytes(self._data)
+        HEADER.pack_into(self._buf, 0, MAGIC, self.capacity, max_consumers, 0, 0, 0)
+        self._write_position = 0
+        self._sequence = 0
+        self.frames_published = 0
+        self.bytes_published = 0
+        self.dropped = 0
+
+    # Returns the lowest read position of the attached consumers, detaching those whose process
+    # is gone when check_alive is set.
+    def _min_read_position(self, check_alive=False):
+        lowest = self._write_position
+        for slot in range(self.max_consumers):
+            offset = SLOTS_OFFSET + slot * SLOT_SIZE
+            if not _get(self._buf, offset + SLOT_ACTIVE_OFFSET):
+                continue
+            if check_alive and not _process_alive(_get(self._buf, offset + SLOT_PID_OFFSET)):
+                _put(self._buf, offset + SLOT_ACTIVE_OFFSET, 0)
+                continue
+            lowest = min(lowest, _get(self._buf, offset + SLOT_READ_POSITION_OFFSET))
+        return lowest
+
+    # Publishes a frame. Returns False if it was dropped because the consumers are too far behind.
+    def publish(self, plan_id, framing, data, time_first_byte_received=0, downlink_frequency_hz=0):
+        plan_id_bytes = plan_id.encode('utf-8')
+        size = _align(RECORD_HEADER.size + len(plan_id_bytes) + len(data))
+        if size > self.capacity:
+            raise ValueError('A {} byte frame does not fit in the {} byte ring'.format(len(data), self.capacity))
+
+        position = self._write_position
+        offset = position % self.capacity
+        padding = self.capacity - offset if offset + size > self.capacity else 0
+        needed = position + padding + size
+        if needed - self._min_read_position() > self.capacity and \
+                needed - self._min_read_position(check_alive=True) > self.capacity:
+            self.dropped += 1
+            self._sequence += 1
+            _put(self._buf, DROPPED_OFFSET, self.dropped)
+            _put(self._buf, NEXT_SEQUENCE_OFFSET, self._sequence)
+            return False
+
+        if padding:
+            if padding >= RECORD_HEADER.size:
+                RECORD_HEADER.pack_into(self._buf, self._data + offset, 0, 0, 0, FLAG_WRAP, 0, 0, 0)
+            offset = 0
+        start = self._data + offset
+        RECORD_HEADER.pack_into(self._buf, start, len(data), len(plan_id_bytes), framing, 0, self._sequence,
+                                time_first_byte_received, downlink_frequency_hz)
+        start += RECORD_HEADER.size
+        self._buf[start:start + len(plan_id_bytes)] = plan_id_bytes
+        start += len(plan_id_bytes)
+        self._buf[start:start + len(data)] = data
+
+        # The record is complete before the position that makes it visible is written.
+        self._sequence += 1
+        self._write_position = needed
+        _put(self._buf, NEXT_SEQUENCE_OFFSET, self._sequence)
+        _put(self._buf, WRITE_POSITION_OFFSET, needed)
+        self.frames_published += 1
+        self.bytes_published += len(data)
+        return True
+
+    def publish_telemetry(self, plan_id, telemetry):
+        return self.publish(plan_id, telemetry.framing, telemetry.data,
+                            timestamp_to_ns(telemetry.time_first_byte_received), telemetry.downlink_frequency_hz)
+
+    # Publishes every Telemetry message of a ReceiveTelemetryResponse.
+    def publish_response(self, telemetry_response):
+        for telemetry in telemetry_response.telemetry:
+            self.publish_telemetry(telemetry_response.plan_id, telemetry)
+
+    # Returns the attached consumers and how far behind the publisher each one is.
+    def lag(self):
+        return ring_lag(self._buf)
+
+    # Closes and removes the shared memory. Consumers that are still attached keep their mapping.
+    def close(self):
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm.close()
+        self._shm.unlink()
+        _created.discard(self.name)
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def ring_lag(buf):
+    _, _, max_consumers, write_position, next_sequence, _ = HEADER.unpack_from(buf, 0)
+    lags = []
+    for slot in range(max_consumers):
+        active, read_position, slot_sequence, pid, frames_read = SLOT.unpack_from(buf, SLOTS_OFFSET + slot * SLOT_SIZE)
+        if active:
+            lags.append({
+                'slot': slot,
+                'pid': pid,
+                'frames_read': frames_read,
+                'lag_bytes': write_position - read_position,
+                'lag_frames': next_sequence - slot_sequence,
+            })
+    return lags
+
+
+# Attaches to a TelemetryRing in `slot` and reads it from the frame published next. Raises ValueError
+# if another consumer that is still running has the slot.
+class RingConsumer:
+    def __init__(self, name, slot):
+        if sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the memory with the resource tracker, which removes it when the
+            # process exits. Processes started by multiprocessing share the publisher's tracker
+            # and must leave its registration alone; others have their own and must not keep it.
+            if multiprocessing.parent_process() is None and self._shm.name not in _created:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self._buf = self._shm.buf
+        magic, self.capacity, self.max_consumers, write_position, next_sequence, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            self._shm.close()
+            raise ValueError('{} is not a telemetry ring'.format(name))
+        if not 0 <= slot < self.max_consumers:
+            self._shm.close()
+            raise ValueError('Slot {} is out of range, the ring has {}'.format(slot, self.max_consumers))
+        self.slot = slot
+        self._data = _data_offset(self.max_consumers)
+        self._slot = SLOTS_OFFSET + slot * SLOT_SIZE
+        # A slot left active by a process that is gone can be taken over.
+        pid = _get(self._buf, self._slot + SLOT_PID_OFFSET)
+        if _get(self._buf, self._slot + SLOT_ACTIVE_OFFSET) and _process_alive(pid):
+            self._buf = None
+            self._shm.close()
+            raise ValueError('Slot {} is in use by process {}'.format(slot, pid))
+        self._position = write_position
+        self.frames_read = 0
+        SLOT.pack_into(self._buf, self._slot, 0, write_position, next_sequence, os.getpid(), 0)
+        _put(self._buf, self._slot + SLOT_ACTIVE_OFFSET, 1)
+
+    # Returns (frame, position after it) of the next frame, or (None, position) if there is none.
+    def _next(self):
+        position = self._position
+        while position < _get(self._buf, WRITE_POSITION_OFFSET):
+            offset = position % self.capacity
+            remaining = self.capacity - offset
+            if remaining < RECORD_HEADER.size:
+                position += remaining
+                continue
+            start = self._data + offset
+            data_length, plan_id_length, framing, flags, sequence, time_ns, frequency = \
+                RECORD_HEADER.unpack_from(self._buf, start)
+            if flags & FLAG_WRAP:
+                position += remaining
+                continue
+            start += RECORD_HEADER.size
+            plan_id = bytes(self._buf[start:start + plan_id_length]).decode('utf-8')
+            start += plan_id_length
+            frame = RingFrame(sequence, plan_id, framing, time_ns, frequency, self._buf[start:start + data_length])
+            return frame, position + _align(RECORD_HEADER.size + plan_id_length + data_length)
+        return None, position
+
+    def _release(self, frame, position):
+        # Using the data after this raises instead of reading whatever is written there next.
+        # Views taken of it still export the buffer, and keep working.
+        try:
+            frame.data.release()
+        except BufferError:
+            pass
+        self._position = position
+        self.frames_read += 1
+        _put(self._buf, self._slot + SLOT_NEXT_SEQUENCE_OFFSET, frame.sequence + 1)
+        _put(self._buf, self._slot + SLOT_FRAMES_READ_OFFSET, self.frames_read)
+        _put(self._buf, self._slot + SLOT_READ_POSITION_OFFSET, position)
+
+    # Yields the frames published so far, at most max_frames. A frame is released to the
+    # publisher, and its data released, when the next one is requested or the iteration ends;
+    # copy what has to be kept.
+    def frames(self, max_frames=None):
+        count = 0
+        while max_frames is None or count < max_frames:
+            frame, position = self._next()
+            if frame is None:
+                return
+            try:
+                yield frame
+            finally:
+                self._release(frame, position)
+            count += 1
+
+    # Waits until a frame is available or timeout seconds pass. Returns whether one is.
+    def wait(self, timeout=None, poll_interval=0.0005, max_poll_interval=0.01):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = poll_interval
+        while self._position >= _get(self._buf, WRITE_POSITION_OFFSET):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+        return True
+
+    # Bytes and frames published that this consumer hasn't read yet.
+    def lag(self):
+        return (_get(self._buf, WRITE_POSITION_OFFSET) - self._position,
+                _get(self._buf, NEXT_SEQUENCE_OFFSET) - _get(self._buf, self._slot + SLOT_NEXT_SEQUENCE_OFFSET))
+
+    # Frees the slot. Frames read from this consumer must not be used after this.
+    def close(self):
+        if self._shm is None:
+            return
+        _put(self._buf, self._slot + SLOT_ACTIVE_OFFSET, 0)
+        self._buf = None
+        self._shm.close()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# Prints the frames and bytes read per second from a ring, and the lag of every consumer.
+#
+#   python shm_ring.py <ring name> [slot]
+def run():
+    name = sys.argv[1]
+    slot = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    with RingConsumer(name, slot) as consumer:
+        while True:
+            started = time.monotonic()
+            frames = size = 0
+            while time.monotonic() - started < 1:
+                consumer.wait(timeout=0.1)
+                for frame in consumer.frames():
+                    frames += 1
+                    size += len(frame.data)
+            print('frames/s = {}, bytes/s = {}, lag (bytes, frames) = {}'.format(frames, size, consumer.lag()))
+
+
+if __name__ == '__main__':
+    run()
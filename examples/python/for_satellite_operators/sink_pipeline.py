@@ -0,0 +1,424 @@
+# Copyright 2026 Infostellar, Inc.
+# Fans received telemetry out to output stages that run behind bounded queues.
+#
+# Each stage of a SinkPipeline has its own queue and its own worker thread, so a slow output (a
+# disk, a UDP peer, a terminal) only falls behind on its own queue instead of slowing the gRPC
+# read. What happens when a queue is full is chosen per stage:
+#
+# - BLOCK:       submit() waits for room, so nothing is lost. On an asyncio loop, await
+#                submit_async() instead: it waits in an executor thread, so the loop keeps running
+#                (acks, commands, timers) while the stream read waits and flow control holds back
+#                the server.
+# - DROP_OLDEST: the oldest queued response is dropped for the new one.
+# - SPILL:       responses that don't fit are serialized to a spill file and read back in order
+#                once the stage catches up. Nothing is lost and the stream isn't slowed, at the
+#                cost of disk space.
+#
+# Built-in stages write to TelemetrySink files, forward the data of every Telemetry as UDP
+# datagrams, or print a line per response. Any other stage is an object with process() and
+# close(), or just a function of the ReceiveTelemetryResponse.
+#
+#   pipeline = SinkPipeline()
+#   pipeline.add(FileStage('tlm'), policy=BLOCK)
+#   pipeline.add(UdpForwardStage(('127.0.0.1', 5000)), policy=DROP_OLDEST, max_queue=1000)
+#   pipeline.add(my_decoder, name='decoder', policy=SPILL)
+#   pipeline.submit(telemetry_response)        # or, on an asyncio loop:
+#   await pipeline.submit_async(telemetry_response)
+#   ...
+#   pipeline.flush()                           # e.g. before checkpointing what was submitted
+#   ...
+#   pipeline.close()
+#   for stats in pipeline.stats():
+#       print(stats)
+
+import asyncio
+import collections
+import pickle
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from stellarstation.api.v1 import stellarstation_pb2
+
+from telemetry_sink import TelemetrySink
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop-oldest'
+SPILL = 'spill'
+
+# response length (u32) | token length (u32) | ReceiveTelemetryResponse | pickled token
+SPILL_RECORD_HEADER = struct.Struct('<II')
+
+# Largest payload of a UDP datagram over IPv4.
+MAX_DATAGRAM_SIZE = 65507
+
+
+# Base class of the stages. process() is only ever called from the stage's worker thread.
+class Stage:
+    name = 'stage'
+
+    # Handles a ReceiveTelemetryResponse. token is the one passed to SinkPipeline.submit().
+    def process(self, telemetry_response, token):
+        raise NotImplementedError
+
+    # Writes out anything the stage buffers. Called from the worker thread by SinkPipeline.flush().
+    def flush(self):
+        pass
+
+    # Called from the worker thread once the queue is drained.
+    def close(self):
+        pass
+
+
+# A function of the ReceiveTelemetryResponse as a stage.
+class FunctionStage(Stage):
+    def __init__(self, function, name=None):
+        self.function = function
+        self.name = name or getattr(function, '__name__', 'function')
+
+    def process(self, telemetry_response, token):
+        self.function(telemetry_response)
+
+
+# Writes telemetry to a TelemetrySink. Tokens are passed on, so LatencyRecorder.on_written
+# measures the time to disk including the time spent in the queue.
+class FileStage(Stage):
+    name = 'file'
+
+    def __init__(self, directory, **sink_options):
+        # The stage already has its own thread.
+        sink_options.setdefault('background', False)
+        self.sink = TelemetrySink(directory, **sink_options)
+
+    def process(self, telemetry_response, token):
+        self.sink.write_response(telemetry_response, token)
+
+    def flush(self):
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
+
+
+# Sends the data of every Telemetry to address as UDP datagrams, split at max_datagram_size.
+class UdpForwardStage(Stage):
+    name = 'udp'
+
+    def __init__(self, address, max_datagram_size=MAX_DATAGRAM_SIZE):
+        self.address = address
+        self.max_datagram_size = max_datagram_size
+        family = socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+
+    def process(self, telemetry_response, token):
+        for telemetry in telemetry_response.telemetry:
+            data = memoryview(telemetry.data)
+            for start in range(0, len(data), self.max_datagram_size):
+                self._socket.sendto(data[start:start + self.max_datagram_size], self.address)
+
+    def close(self):
+        self._socket.close()
+
+
+# Prints one line per response.
+class StdoutStage(Stage):
+    name = 'stdout'
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def process(self, telemetry_response, token):
+        print('Plan {}, message {}: {} telemetry, {} bytes'.format(
+            telemetry_response.plan_id, telemetry_response.message_ack_id, len(telemetry_response.telemetry),
+            sum(len(telemetry.data) for telemetry in telemetry_response.telemetry)), file=self.stream)
+
+
+class StageStats:
+    __slots__ = ('name', 'policy', 'submitted', 'processed', 'dropped', 'spilled', 'bytes_processed',
+                 'queue_depth', 'max_queue_depth', 'blocked_seconds', 'busy_seconds', 'started_at', 'stopped_at')
+
+    def __init__(self, name, policy):
+        self.name = name
+        self.policy = policy
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        # Responses written to the spill file, including ones read back since.
+        self.spilled = 0
+        self.bytes_processed = 0
+        # Responses waiting, in memory and spilled.
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        # Time submit() waited for room, with BLOCK.
+        self.blocked_seconds = 0.0
+        # Time the stage spent in process().
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+
+    # Responses processed per second since the stage started.
+    def throughput(self):
+        elapsed = (self.stopped_at or time.monotonic()) - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return ('stage = {}, policy = {}, submitted = {}, processed = {}, dropped = {}, spilled = {}, '
+                'queue_depth = {}, max_queue_depth = {}, throughput = {:.1f}/s, bytes = {}, '
+                'blocked_seconds = {:.3f}, busy_seconds = {:.3f}').format(
+            self.name, self.policy, self.submitted, self.processed, self.dropped, self.spilled,
+            self.queue_depth, self.max_queue_depth, self.throughput(), self.bytes_processed,
+            self.blocked_seconds, self.busy_seconds)
+
+
+# Responses that didn't fit in a SPILL queue, in an unnamed temporary file.
+class _SpillFile:
+    def __init__(self, directory=None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._read_offset = 0
+        self._write_offset = 0
+        self.count = 0
+
+    def append(self, telemetry_response, token):
+        wire = telemetry_response.SerializeToString()
+        token_bytes = pickle.dumps(token) if token is not None else b''
+        self._file.seek(self._write_offset)
+        self._file.write(SPILL_RECORD_HEADER.pack(len(wire), len(token_bytes)))
+        self._file.write(wire)
+        self._file.write(token_bytes)
+        self._write_offset = self._file.tell()
+        self.count += 1
+
+    def pop(self):
+        self._file.seek(self._read_offset)
+        wire_length, token_length = SPILL_RECORD_HEADER.unpack(self._file.read(SPILL_RECORD_HEADER.size))
+        wire = self._file.read(wire_length)
+        token_bytes = self._file.read(token_length)
+        self._read_offset = self._file.tell()
+        self.count -= 1
+        if not self.count:
+            # Start over instead of growing the file for as long as the stage is behind.
+            self._file.truncate(0)
+            self._read_offset = self._write_offset = 0
+        token = pickle.loads(token_bytes) if token_bytes else None
+        return stellarstation_pb2.ReceiveTelemetryResponse.FromString(wire), token
+
+    def close(self):
+        self._file.close()
+
+
+# stage:           the Stage.
+# policy:          BLOCK, DROP_OLDEST or SPILL.
+# max_queue:       responses kept in memory.
+# spill_directory: where the spill file is created. Defaults to the system temporary directory.
+class _StageRunner:
+    def __init__(self, stage, policy, max_queue, spill_directory):
+        self.stage = stage
+        self.policy = policy
+        self.max_queue = max_queue
+        self.stats = StageStats(stage.name, policy)
+        self.error = None
+
+        self._queue = collections.deque()
+        self._spill = _SpillFile(spill_directory) if policy == SPILL else None
+        self._closing = False
+        # Events of the flush() calls waiting for the queue to drain.
+        self._flush_waiters = []
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, name='sink-stage-{}'.format(stage.name), daemon=True)
+        self._thread.start()
+
+    def put(self, telemetry_response, token):
+        stats = self.stats
+        with self._lock:
+            stats.submitted += 1
+            if self._spill is not None and (self._spill.count or len(self._queue) >= self.max_queue):
+                # Everything after the first spilled response is spilled too, so the order is kept.
+                self._spill.append(telemetry_response, token)
+                stats.spilled += 1
+            else:
+                if len(self._queue) >= self.max_queue:
+                    if self.policy == DROP_OLDEST:
+                        self._queue.popleft()
+                        stats.dropped += 1
+                    else:
+                        started = time.monotonic()
+                        while len(self._queue) >= self.max_queue and self.error is None:
+                            self._not_full.wait()
+                        stats.blocked_seconds += time.monotonic() - started
+                self._queue.append((telemetry_response, token))
+            stats.queue_depth = self._depth()
+            stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+            self._not_empty.notify()
+
+    # Whether put() would wait for room. Only the one producer adds to the queue, so a queue that isn't
+    # full stays that way until the next put().
+    def is_full(self):
+        with self._lock:
+            return self.policy == BLOCK and len(self._queue) >= self.max_queue and self.error is None
+
+    def _depth(self):
+        return len(self._queue) + (self._spill.count if self._spill is not None else 0)
+
+    def _get(self):
+        with self._lock:
+            while not self._depth() and not self._closing and not self._flush_waiters:
+                self._not_empty.wait()
+            if self._queue:
+                item = self._queue.popleft()
+            elif self._depth():
+                item = self._spill.pop()
+            elif self._flush_waiters:
+                waiters, self._flush_waiters = self._flush_waiters, []
+                return waiters
+            else:
+                return None
+            self.stats.queue_depth = self._depth()
+            self._not_full.notify()
+            return item
+
+    def _run(self):
+        stats = self.stats
+        clock = time.monotonic
+        for item in iter(self._get, None):
+            if isinstance(item, list):
+                self._flush(item)
+                continue
+            telemetry_response, token = item
+            if self.error is not None:
+                # Keep draining so that a BLOCK producer doesn't wait forever.
+                continue
+            started = clock()
+            try:
+                self.stage.process(telemetry_response, token)
+            except Exception as e:
+                with self._lock:
+                    self.error = e
+                    self._not_full.notify_all()
+                continue
+            stats.busy_seconds += clock() - started
+            stats.processed += 1
+            stats.bytes_processed += sum(len(telemetry.data) for telemetry in telemetry_response.telemetry)
+        try:
+            self.stage.close()
+        except Exception as e:
+            self.error = self.error or e
+        stats.stopped_at = clock()
+
+    def _flush(self, waiters):
+        try:
+            if self.error is None:
+                self.stage.flush()
+        except Exception as e:
+            with self._lock:
+                self.error = e
+                self._not_full.notify_all()
+        for waiter in waiters:
+            waiter.set()
+
+    # Waits until everything queued so far has been processed and the stage has been flushed.
+    def flush(self):
+        waiter = threading.Event()
+        with self._lock:
+            self._flush_waiters.append(waiter)
+            self._not_empty.notify()
+        waiter.wait()
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+            self._not_empty.notify()
+        self._thread.join()
+        if self._spill is not None:
+            self._spill.close()
+
+
+class SinkPipeline:
+    def __init__(self, spill_directory=None):
+        self.spill_directory = spill_directory
+        self._runners = []
+        self._closed = False
+
+    # Adds a stage: a Stage, or a function of the ReceiveTelemetryResponse. Returns the stage.
+    def add(self, stage, policy=BLOCK, max_queue=1024, name=None):
+        if policy not in (BLOCK, DROP_OLDEST, SPILL):
+            raise ValueError("Unknown backpressure policy '{}'".format(policy))
+        if not isinstance(stage, Stage):
+            stage = FunctionStage(stage, name)
+        elif name is not None:
+            stage.name = name
+        self._runners.append(_StageRunner(stage, policy, max_queue, self.spill_directory))
+        return stage
+
+    # Queues a ReceiveTelemetryResponse for every stage. token is passed to each stage with it.
+    def submit(self, telemetry_response, token=None):
+        self._raise_stage_error()
+        for runner in self._runners:
+            runner.put(telemetry_response, token)
+
+    # Like submit(), for a caller on an asyncio loop: waiting for room in a full BLOCK queue is done
+    # in an executor thread, so the loop isn't blocked.
+    async def submit_async(self, telemetry_response, token=None):
+        self._raise_stage_error()
+        for runner in self._runners:
+            if runner.is_full():
+                await asyncio.get_running_loop().run_in_executor(None, runner.put, telemetry_response, token)
+            else:
+                runner.put(telemetry_response, token)
+
+    # Waits until every stage has processed everything submitted so far, and has written out what it
+    # buffers, e.g. a FileStage's pending records. The data is then in the operating system's hands,
+    # so it survives this process crashing.
+    def flush(self):
+        for runner in self._runners:
+            runner.flush()
+        self._raise_stage_error()
+
+    # Like flush(), for a caller on an asyncio loop.
+    async def flush_async(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    # Per-stage queue depths, throughput and losses.
+    def stats(self):
+        return [runner.stats for runner in self._runners]
+
+    # Processes everything queued, closes every stage and waits for the workers to finish.
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for runner in self._runners:
+            runner.close()
+        self._raise_stage_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _raise_stage_error(self):
+        for runner in self._runners:
+            if runner.error is not None:
+                raise IOError("Sink stage '{}' failed".format(runner.stage.name)) from runner.error
+
+
+# Builds the stages of a spec like 'file:<directory>,stdout,udp:<host>:<port>'.
+def parse_stages(spec):
+    stages = []
+    for part in spec.split(','):
+        name, _, value = part.strip().partition(':')
+        if name == 'file' and value:
+            stages.append(FileStage(value))
+        elif name == 'stdout' and not value:
+            stages.append(StdoutStage())
+        elif name == 'udp' and value:
+            host, _, port = value.rpartition(':')
+            stages.append(UdpForwardStage((host.strip('[]'), int(port))))
+        else:
+            raise ValueError("Unknown sink stage '{}'. Expected file:<directory>, stdout or udp:<host>:<port>.".format(part))
+    return stages
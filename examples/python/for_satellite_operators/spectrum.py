@@ -0,0 +1,197 @@
+# Copyright 2026 Infostellar, Inc.
+# Live spectrum and waterfall of IQ telemetry.
+#
+# SpectrumAnalyzer is fed IQ Telemetry as it arrives. Samples are cut into fft_size frames and all
+# the frames of a chunk are windowed and transformed in one batched np.fft call. Power spectra are
+# averaged `average` frames at a time into waterfall rows, which are kept in a fixed-size ring
+# buffer in dB, at `bins` columns per row.
+#
+# feed() tracks the time it spends against the wall-clock time between calls. When that goes over
+# cpu_budget, only one frame in `stride` is transformed, doubling stride until it fits, so the
+# analyzer never slows the receive loop down; the stride halves again once there's room.
+#
+# WATERFALL telemetry is a diagram of the whole plan rendered by the ground station. Its payload
+# isn't decoded here; the last one received is kept in last_waterfall.
+#
+#   analyzer = SpectrumAnalyzer(fft_size=2048, bins=512, sample_format='ci16')
+#   for telemetry in telemetry_response.telemetry:
+#       analyzer.feed_telemetry(telemetry)
+#   rows, times = analyzer.waterfall()
+
+import time
+
+import numpy as np
+from stellarstation.api.v1 import transport_pb2
+
+from iq_store import SAMPLE_FORMATS, to_complex
+from telemetry_sink import timestamp_to_ns
+
+WINDOWS = {
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+    None: np.ones,
+}
+
+# Power of empty bins, so they don't go to -inf dB.
+MIN_POWER = 1e-20
+
+
+class SpectrumStats:
+    __slots__ = ('samples', 'frames', 'frames_skipped', 'rows', 'busy_seconds')
+
+    def __init__(self):
+        self.samples = 0
+        self.frames = 0
+        self.frames_skipped = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+
+    def __str__(self):
+        return 'samples = {}, frames = {}, frames_skipped = {}, rows = {}, busy_seconds = {:.3f}'.format(
+            self.samples, self.frames, self.frames_skipped, self.rows, self.busy_seconds)
+
+
+# fft_size:        samples per FFT.
+# bins:            columns of the spectrum; fft_size bins are averaged down to this many. Must
+#                  divide fft_size. Defaults to fft_size.
+# average:         FFT frames averaged into each waterfall row.
+# rows:            waterfall rows kept.
+# window:          'hann', 'hamming', 'blackman' or None.
+# sample_format:   of IQ Telemetry data, see iq_store.SAMPLE_FORMATS.
+# scale:           multiplies integer samples, e.g. 1 / 32768 for full scale ci16.
+# cpu_budget:      fraction of wall-clock time feed() may use before frames are skipped.
+# budget_interval: seconds over which the CPU time is measured.
+class SpectrumAnalyzer:
+    def __init__(self, fft_size=1024, bins=None, average=16, rows=256, window='hann', sample_format='cf32',
+                 scale=1.0, cpu_budget=0.1, budget_interval=1.0, clock=time.perf_counter):
+        bins = bins or fft_size
+        if fft_size % bins:
+            raise ValueError('bins must divide fft_size, got {} and {}'.format(bins, fft_size))
+        if window not in WINDOWS:
+            raise ValueError("Unknown window '{}'".format(window))
+        self.fft_size = fft_size
+        self.bins = bins
+        self.average = average
+        self.sample_dtype = SAMPLE_FORMATS[sample_format]
+        self.scale = scale
+        self.cpu_budget = cpu_budget
+        self.budget_interval = budget_interval
+        self.clock = clock
+        self.stats = SpectrumStats()
+        self.stride = 1
+        self.last_waterfall = None
+
+        # Normalized so a full-scale tone in the middle of a bin reads 0 dB.
+        window_values = WINDOWS[window](fft_size).astype(np.float32)
+        self._window = window_values / np.float32(window_values.sum())
+        self._pending = np.zeros(0, dtype=np.complex64)
+        self._partial = b''
+        self._frame_count = 0
+        self._sum = np.zeros(bins, dtype=np.float64)
+        self._summed = 0
+        self._rows = np.full((rows, bins), np.nan, dtype=np.float32)
+        self._row_times = np.zeros(rows, dtype=np.int64)
+        self._next_row = 0
+        self._busy = 0.0
+        self._interval_start = None
+
+    # Feeds complex samples received at time_ns. Returns the number of waterfall rows added.
+    def feed(self, samples, time_ns=0):
+        started = self.clock()
+        if self._interval_start is None:
+            self._interval_start = started
+        self.stats.samples += len(samples)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.fft_size
+        self._pending = samples[count * self.fft_size:].astype(np.complex64)
+        frames = samples[:count * self.fft_size].reshape(count, self.fft_size)
+
+        # Frames are picked by their position in the whole stream, so the stride doesn't restart
+        # with every chunk.
+        first = (-self._frame_count) % self.stride
+        self._frame_count += count
+        frames = frames[first::self.stride]
+        self.stats.frames += len(frames)
+        self.stats.frames_skipped += count - len(frames)
+
+        added = 0
+        if len(frames):
+            spectra = np.fft.fft(frames * self._window, axis=1)
+            power = spectra.real ** 2 + spectra.imag ** 2
+            power = np.fft.fftshift(power, axes=1)
+            if self.bins != self.fft_size:
+                power = power.reshape(len(power), self.bins, -1).mean(axis=2)
+            added = self._accumulate(power, time_ns)
+
+        finished = self.clock()
+        self._busy += finished - started
+        self.stats.busy_seconds += finished - started
+        self._adjust_stride(finished)
+        return added
+
+    # Feeds a Telemetry message. IQ is analyzed; WATERFALL is kept in last_waterfall.
+    def feed_telemetry(self, telemetry):
+        if telemetry.framing == transport_pb2.WATERFALL:
+            self.last_waterfall = telemetry.data
+            return 0
+        if telemetry.framing != transport_pb2.IQ:
+            return 0
+        data = memoryview(telemetry.data).cast('B')
+        if self._partial:
+            data = memoryview(self._partial + data.tobytes())
+        itemsize = self.sample_dtype.itemsize
+        whole = len(data) // itemsize
+        self._partial = data[whole * itemsize:].tobytes()
+        samples = to_complex(np.frombuffer(data, dtype=self.sample_dtype, count=whole), self.scale)
+        return self.feed(samples, timestamp_to_ns(telemetry.time_first_byte_received))
+
+    def _accumulate(self, power, time_ns):
+        # Completes the row being summed, then averages whole groups of `average` frames at once.
+        needed = self.average - self._summed
+        if len(power) < needed:
+            self._sum += power.sum(axis=0)
+            self._summed += len(power)
+            return 0
+        first_row = (self._sum + power[:needed].sum(axis=0)) / self.average
+        full = (len(power) - needed) // self.average
+        end = needed + full * self.average
+        rows = np.concatenate((first_row[None, :],
+                               power[needed:end].reshape(full, self.average, self.bins).mean(axis=1)))
+        rest = power[end:]
+        self._sum = rest.sum(axis=0)
+        self._summed = len(rest)
+
+        rows = rows[-len(self._rows):]
+        positions = (self._next_row + np.arange(len(rows))) % len(self._rows)
+        self._rows[positions] = 10 * np.log10(np.maximum(rows, MIN_POWER))
+        self._row_times[positions] = time_ns
+        self._next_row = (self._next_row + len(rows)) % len(self._rows)
+        self.stats.rows += len(rows)
+        return len(rows)
+
+    def _adjust_stride(self, now):
+        elapsed = now - self._interval_start
+        if elapsed < self.budget_interval:
+            return
+        usage = self._busy / elapsed
+        if usage > self.cpu_budget:
+            self.stride *= 2
+        elif usage < self.cpu_budget / 4 and self.stride > 1:
+            self.stride //= 2
+        self._busy = 0.0
+        self._interval_start = now
+
+    # Returns the waterfall oldest row first, as (rows in dB, receive time in ns of each row). Rows
+    # not filled yet are left out.
+    def waterfall(self):
+        filled = min(self.stats.rows, len(self._rows))
+        order = (self._next_row - filled + np.arange(filled)) % len(self._rows)
+        return self._rows[order], self._row_times[order]
+
+    # Returns the latest waterfall row in dB, or None.
+    def spectrum(self):
+        if not self.stats.rows:
+            return None
+        return self._rows[(self._next_row - 1) % len(self._rows)]
@@ -0,0 +1,432 @@
+# Copyright 2026 Infostellar, Inc.
+# Measures OpenSatelliteStream throughput and latency, like examples/go/stream-benchmarker.
+#
+# During a pass a line is printed every reporting interval with the bytes and frames per second,
+# the receive latency, and the gaps and out-of-order frames seen. A pass is assumed to have ended
+# once no data has been received for the -e duration. Then a pass summary is printed, and on exit
+# a summary over all passes.
+#
+#   $ python3 stream_benchmarker.py -k stellarstation-private-key.json -s 5 -i 10s -e 10s
+#
+# With --fake, a fake service is started in a separate process and the stream is read from it, so
+# client-side throughput can be measured offline:
+#
+#   $ python3 stream_benchmarker.py --fake --fake-messages 100000 --fake-payload-size 1024 -i 1s -e 2s -x
+#
+# CTRL-C stops the session at any time.
+
+import argparse
+import asyncio
+import datetime
+import signal
+import sys
+import time
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+import toolkit
+from ack_policy import parse_ack_policy
+from fake_satellite_service import start_in_process
+from lazy_decode import LazyStellarStationServiceStub
+from stream_client import SatelliteStream
+from stream_supervisor import StreamSupervisor
+from telemetry_sink import timestamp_to_ns
+
+DATE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DURATION_UNITS = (('ms', 0.001), ('s', 1), ('m', 60), ('h', 3600))
+
+
+# Parses durations like the Go tool's flags: 500ms, 10s, 1m, 1h. A plain number is in seconds.
+def parse_duration(value):
+    for unit, seconds in DURATION_UNITS:
+        if value.endswith(unit):
+            number = value[:-len(unit)]
+            break
+    else:
+        number, seconds = value, 1
+    try:
+        return float(number) * seconds
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid duration '{}'".format(value))
+
+
+def format_time(seconds):
+    if seconds is None:
+        return '-'
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime(DATE_TIME_FORMAT)
+
+
+# Counters for the frames received in one reporting interval or one pass.
+class ThroughputCounters:
+    __slots__ = ('plan_id', 'start', 'end', 'first_byte_time', 'last_byte_time', 'total_bytes',
+                 'frames', 'gaps', 'longest_gap', 'out_of_order', 'first_byte_latency_sum',
+                 'last_byte_latency_sum')
+
+    def __init__(self, plan_id, start):
+        self.plan_id = plan_id
+        self.start = start
+        self.end = start
+        self.first_byte_time = None
+        self.last_byte_time = None
+        self.total_bytes = 0
+        self.frames = 0
+        self.gaps = 0
+        self.longest_gap = 0.0
+        self.out_of_order = 0
+        self.first_byte_latency_sum = 0.0
+        self.last_byte_latency_sum = 0.0
+
+    def add(self, size, first_byte, last_byte, received_at, gap, out_of_order):
+        if self.first_byte_time is None:
+            self.first_byte_time = first_byte
+        if self.last_byte_time is None or last_byte > self.last_byte_time:
+            self.last_byte_time = last_byte
+        self.total_bytes += size
+        self.frames += 1
+        self.first_byte_latency_sum += received_at - first_byte
+        self.last_byte_latency_sum += received_at - last_byte
+        if gap is not None:
+            self.gaps += 1
+            self.longest_gap = max(self.longest_gap, gap)
+        if out_of_order:
+            self.out_of_order += 1
+
+    def merge(self, other):
+        if self.first_byte_time is None:
+            self.first_byte_time = other.first_byte_time
+        if other.last_byte_time is not None and \
+                (self.last_byte_time is None or other.last_byte_time > self.last_byte_time):
+            self.last_byte_time = other.last_byte_time
+        self.end = other.end
+        self.total_bytes += other.total_bytes
+        self.frames += other.frames
+        self.gaps += other.gaps
+        self.longest_gap = max(self.longest_gap, other.longest_gap)
+        self.out_of_order += other.out_of_order
+        self.first_byte_latency_sum += other.first_byte_latency_sum
+        self.last_byte_latency_sum += other.last_byte_latency_sum
+
+    @property
+    def elapsed(self):
+        return self.end - self.start
+
+    @property
+    def bytes_per_second(self):
+        return self.total_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mbps(self):
+        return self.bytes_per_second * 8 / 1024 / 1024
+
+    @property
+    def average_bytes(self):
+        return self.total_bytes / self.frames if self.frames else 0.0
+
+    @property
+    def first_byte_latency(self):
+        return self.first_byte_latency_sum / self.frames if self.frames else 0.0
+
+    @property
+    def last_byte_latency(self):
+        return self.last_byte_latency_sum / self.frames if self.frames else 0.0
+
+
+# Collects per-interval and per-pass statistics from ReceiveTelemetryResponses.
+#
+# A gap is a break of more than gap_threshold seconds between the last byte of a frame and the
+# first byte of the next one, as timestamped by the ground station. Latency is the time from those
+# timestamps until the frame was received here, so it includes any clock offset between the two.
+class StreamBenchmark:
+    def __init__(self, gap_threshold=1.0, clock=time.time):
+        self.gap_threshold = gap_threshold
+        self.clock = clock
+        self.passes = []
+        self.current_pass = None
+        self.last_received_at = None
+        self._interval = None
+        self._previous_first_byte = None
+        self._previous_last_byte = None
+
+    @property
+    def pass_started(self):
+        return self.current_pass is not None
+
+    def on_telemetry_response(self, telemetry_response, received_at=None):
+        if received_at is None:
+            received_at = self.clock()
+        for telemetry in telemetry_response.telemetry:
+            size = len(telemetry.data)
+            if size == 0:
+                # The end-of-data message.
+                continue
+            if self.current_pass is None:
+                self.current_pass = ThroughputCounters(telemetry_response.plan_id, received_at)
+                self._interval = ThroughputCounters(telemetry_response.plan_id, received_at)
+                self._previous_first_byte = self._previous_last_byte = None
+
+            first_byte = timestamp_to_ns(telemetry.time_first_byte_received) / 1e9
+            last_byte = timestamp_to_ns(telemetry.time_last_byte_received) / 1e9 or first_byte
+            gap = None
+            out_of_order = False
+            if self._previous_first_byte is not None:
+                out_of_order = first_byte < self._previous_first_byte
+                if first_byte - self._previous_last_byte > self.gap_threshold:
+                    gap = first_byte - self._previous_last_byte
+            self._previous_first_byte = first_byte
+            self._previous_last_byte = max(last_byte, self._previous_last_byte or last_byte)
+
+            self._interval.add(size, first_byte, last_byte, received_at, gap, out_of_order)
+            self.last_received_at = received_at
+
+    # Returns the counters for the interval since the last report and starts a new interval, or
+    # None if no pass is in progress.
+    def report(self, now=None):
+        if self.current_pass is None:
+            return None
+        if now is None:
+            now = self.clock()
+        interval = self._interval
+        interval.end = now
+        self.current_pass.merge(interval)
+        self._interval = ThroughputCounters(interval.plan_id, now)
+        return interval
+
+    def idle_time(self, now=None):
+        if self.last_received_at is None:
+            return 0.0
+        return (self.clock() if now is None else now) - self.last_received_at
+
+    # Ends the current pass and returns its counters, or None if no pass is in progress. The pass
+    # ends at the last data received.
+    def end_pass(self):
+        if self.current_pass is None:
+            return None
+        self.report(self.last_received_at)
+        ended, self.current_pass = self.current_pass, None
+        self._interval = None
+        self.passes.append(ended)
+        return ended
+
+
+class ReportWriter:
+    def __init__(self, output, print_pass_summary=True, print_overall_summary=True):
+        self.output = output
+        self.print_pass_summary = print_pass_summary
+        self.print_overall_summary = print_overall_summary
+        self._printed_header = False
+
+    def write(self, line):
+        self.output.write(line + '\n')
+        self.output.flush()
+
+    def interval(self, counters):
+        if not self._printed_header:
+            self.write("Pass {}:".format(counters.plan_id))
+            self.write("{:>10}{:>22}{:>22}{:>12}{:>12}{:>14}{:>10}{:>11}{:>14}{:>10}{:>10}{:>7}{:>10}{:>7}".format(
+                'PlanID', 'DATE', 'Most recent', 'First lat.', 'Last lat.', 'Total bytes', 'Frames',
+                'Avg bytes', 'Bytes/s', 'Mbps', 'Frames/s', 'Gaps', 'Max gap', 'OOO'))
+            self._printed_header = True
+        self.write("{:>10}{:>22}{:>22}{:>12.3f}{:>12.3f}{:>14}{:>10}{:>11.1f}{:>14.0f}{:>10.2f}{:>10.1f}{:>7}{:>10.3f}{:>7}".format(
+            counters.plan_id,
+            format_time(counters.end),
+            format_time(counters.last_byte_time),
+            counters.first_byte_latency,
+            counters.last_byte_latency,
+            counters.total_bytes,
+            counters.frames,
+            counters.average_bytes,
+            counters.bytes_per_second,
+            counters.mbps,
+            counters.frames_per_second,
+            counters.gaps,
+            counters.longest_gap,
+            counters.out_of_order))
+
+    def pass_summary(self, counters):
+        self._printed_header = False
+        if not self.print_pass_summary:
+            return
+        self.write("")
+        self.write("Pass Summary:")
+        self.write("{:>10}{:>22}{:>22}{:>12}{:>12}{:>14}{:>10}{:>14}{:>10}{:>10}{:>7}{:>10}{:>7}".format(
+            'PlanID', 'First byte time', 'Last byte time', 'First lat.', 'Last lat.', 'Total bytes',
+            'Frames', 'Bytes/s', 'Mbps', 'Frames/s', 'Gaps', 'Max gap', 'OOO'))
+        self.write("{:>10}{:>22}{:>22}{:>12.3f}{:>12.3f}{:>14}{:>10}{:>14.0f}{:>10.2f}{:>10.1f}{:>7}{:>10.3f}{:>7}".format(
+            counters.plan_id,
+            format_time(counters.first_byte_time),
+            format_time(counters.last_byte_time),
+            counters.first_byte_latency,
+            counters.last_byte_latency,
+            counters.total_bytes,
+            counters.frames,
+            counters.bytes_per_second,
+            counters.mbps,
+            counters.frames_per_second,
+            counters.gaps,
+            counters.longest_gap,
+            counters.out_of_order))
+        self.write("")
+
+    def overall_summary(self, passes):
+        if not self.print_overall_summary or not passes:
+            return
+        total_bytes = sum(p.total_bytes for p in passes)
+        frames = sum(p.frames for p in passes)
+        elapsed = sum(p.elapsed for p in passes)
+        self.write("Overall Summary:")
+        self.write("{:>22}{:>22}{:>12}{:>14}{:>12}{:>14}{:>10}{:>7}{:>7}".format(
+            'Start session', 'End session', 'Num passes', 'Total bytes', 'Frames', 'Bytes/s', 'Mbps',
+            'Gaps', 'OOO'))
+        bytes_per_second = total_bytes / elapsed if elapsed > 0 else 0.0
+        self.write("{:>22}{:>22}{:>12}{:>14}{:>12}{:>14.0f}{:>10.2f}{:>7}{:>7}".format(
+            format_time(passes[0].first_byte_time),
+            format_time(passes[-1].last_byte_time),
+            len(passes),
+            total_bytes,
+            frames,
+            bytes_per_second,
+            bytes_per_second * 8 / 1024 / 1024,
+            sum(p.gaps for p in passes),
+            sum(p.out_of_order for p in passes)))
+
+
+# Streams satellite_id until stop is set, or until the first pass ends with exit_after_pass.
+# Returns the StreamBenchmark.
+async def benchmark_stream(client, satellite_id, writer, interval=10.0, end_after=10.0,
+                           exit_after_pass=False, ack_policy=None, gap_threshold=1.0, stop=None):
+    benchmark = StreamBenchmark(gap_threshold=gap_threshold)
+    stop = stop or asyncio.Event()
+    satellite_stream = SatelliteStream(
+        client,
+        satellite_id,
+        accepted_framing=[transport_pb2.AX25, transport_pb2.BITSTREAM],
+        ack_policy=ack_policy)
+
+    def handle_response(response):
+        if response.HasField('receive_telemetry_response'):
+            telemetry_response = response.receive_telemetry_response
+            started = benchmark.pass_started
+            benchmark.on_telemetry_response(telemetry_response)
+            if not started and benchmark.pass_started:
+                print("Receiving messages for Plan ID {}".format(telemetry_response.plan_id), file=sys.stderr)
+        return False
+
+    async def report_periodically():
+        while True:
+            await asyncio.sleep(interval)
+            if not benchmark.pass_started:
+                continue
+            counters = benchmark.report()
+            if counters.frames:
+                writer.interval(counters)
+            if end_after > 0 and benchmark.idle_time() >= end_after:
+                print("Plan with ID {} ended after not receiving messages for {}s".format(
+                    benchmark.current_pass.plan_id, end_after), file=sys.stderr)
+                writer.pass_summary(benchmark.end_pass())
+                if exit_after_pass:
+                    stop.set()
+
+    supervisor = StreamSupervisor(satellite_stream, handle_response)
+    tasks = [asyncio.ensure_future(supervisor.run()),
+             asyncio.ensure_future(report_periodically()),
+             asyncio.ensure_future(stop.wait())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # Raises errors from the stream, e.g. an invalid API key.
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if benchmark.pass_started:
+        writer.pass_summary(benchmark.end_pass())
+    writer.overall_summary(benchmark.passes)
+    return benchmark
+
+
+def run():
+    parser = argparse.ArgumentParser(description='StellarStation streaming API benchmarking tool.')
+    parser.add_argument('-k', default='stellarstation-private-key.json', help='StellarStation API Key file')
+    parser.add_argument('-E', default='api.stellarstation.com:443', help='API endpoint')
+    parser.add_argument('-s', default='5', help='Satellite ID as provided by StellarStation')
+    parser.add_argument('-i', type=parse_duration, default=10.0,
+                        help='Reporting interval (10s, 1m, etc.). During a pass, an output line is generated for each reporting interval.')
+    parser.add_argument('-e', type=parse_duration, default=10.0,
+                        help='Assume a pass has ended after this much time has passed without receiving any additional data')
+    parser.add_argument('-x', action='store_true', help='Exit the program after a pass ends')
+    parser.add_argument('-P', action='store_true', help='Do not print a pass summary after each pass')
+    parser.add_argument('-S', action='store_true', help='Do not print an overall summary when the program exits')
+    parser.add_argument('-o', default='', help='Write report output to a file instead of standard out')
+    parser.add_argument('-g', type=parse_duration, default=1.0,
+                        help='Count a gap when consecutive frames are further apart than this')
+    parser.add_argument('-a', default='every', help='Ack policy: every, count:<n>, interval:<ms> or adaptive[:<ms>]')
+    parser.add_argument('--lazy', action='store_true', help='Decode responses lazily (see lazy_decode.py)')
+    parser.add_argument('--insecure', action='store_true',
+                        help='Connect to -E without TLS or an API key, e.g. to fake_satellite_service.py')
+    parser.add_argument('--fake', action='store_true', help='Stream from a fake service started in a separate process')
+    parser.add_argument('--fake-messages', type=int, default=100000)
+    parser.add_argument('--fake-payload-size', type=int, default=1024)
+    parser.add_argument('--fake-rate', type=float, default=None, help='Messages per second (default: as fast as possible)')
+    args = parser.parse_args()
+
+    output = open(args.o, 'w') if args.o else sys.stdout
+    writer = ReportWriter(output, print_pass_summary=not args.P, print_overall_summary=not args.S)
+    stub_class = LazyStellarStationServiceStub if args.lazy else stellarstation_pb2_grpc.StellarStationServiceStub
+
+    server = None
+    endpoint = args.E
+    insecure = args.insecure
+    if args.fake:
+        server, port = start_in_process(
+            message_count=args.fake_messages,
+            payload_size=args.fake_payload_size,
+            messages_per_second=args.fake_rate)
+        endpoint = '127.0.0.1:{}'.format(port)
+        insecure = True
+
+    async def main():
+        stop = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGINT, stop.set)
+        except NotImplementedError:
+            # Windows. CTRL-C exits without the summaries.
+            pass
+        if insecure:
+            channel = grpc.aio.insecure_channel(endpoint, options=toolkit.channel_options())
+        else:
+            channel = toolkit.get_aio_channel(args.k, endpoint)
+        print("Listening for messages", file=sys.stderr)
+        cpu_start = time.process_time()
+        try:
+            await benchmark_stream(
+                stub_class(channel), args.s, writer,
+                interval=args.i,
+                end_after=args.e,
+                exit_after_pass=args.x,
+                ack_policy=parse_ack_policy(args.a),
+                gap_threshold=args.g,
+                stop=stop)
+        finally:
+            await channel.close()
+        print("Session ended, client cpu = {:.2f}s".format(time.process_time() - cpu_start), file=sys.stderr)
+
+    try:
+        asyncio.run(main())
+    finally:
+        if server is not None:
+            server.terminate()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,242 @@
+# Copyright 2026 Infostellar, Inc.
+# An asyncio client for OpenSatelliteStream.
+#
+# Responses are read, acks are sent and commands are written from a single event loop, so there is
+# no request queue and no generator thread, and reading never waits for a write. Writes go through
+# an asyncio.Lock, because grpc.aio allows only one write in flight on a call and the ack timer,
+# the receive path and the command uplink can all write.
+
+import asyncio
+import time
+
+import grpc
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1 import stellarstation_pb2
+
+from ack_policy import EveryMessageAckPolicy
+
+
+# The counters printed by the stream examples.
+class StreamStats:
+    __slots__ = ('total_responses', 'total_telemetry_messages', 'total_stream_events',
+                 'total_acks_sent', 'total_messages_sent', 'total_bytes_received')
+
+    def __init__(self):
+        self.total_responses = 0
+        self.total_telemetry_messages = 0
+        self.total_stream_events = 0
+        self.total_acks_sent = 0
+        self.total_messages_sent = 0
+        self.total_bytes_received = 0
+
+    def __str__(self):
+        return "Total Responses = {}, Telemetry Messages = {}, MessagesSent = {}, Acks Sent = {}, StreamEvents = {}, Total Bytes = {}".format(
+            self.total_responses,
+            self.total_telemetry_messages,
+            self.total_messages_sent,
+            self.total_acks_sent,
+            self.total_stream_events,
+            self.total_bytes_received)
+
+
+# A message with 1 telemetry and 0 data is how the end of the plan's data is marked.
+# It is sent while the ground station is cleaning up, so it may arrive after the
+# PlanLifecycleEventStatus has been marked as completed.
+def is_end_message(telemetry_response):
+    return len(telemetry_response.telemetry) == 1 and len(telemetry_response.telemetry[0].data) == 0
+
+
+def now_timestamp():
+    timestamp = Timestamp()
+    timestamp.FromNanoseconds(time.time_ns())
+    return timestamp
+
+
+# A single OpenSatelliteStream session.
+#
+# client must be a StellarStationServiceStub created on a grpc.aio channel,
+# e.g. with toolkit.get_aio_grpc_client. With a lazy_decode.LazyStellarStationServiceStub, responses
+# are decoded lazily and telemetry payloads are not copied.
+#
+# ack_policy decides when acks are sent (see ack_policy.py). By default every telemetry response
+# is acked.
+#
+# latency, if given, is a latency_histogram.LatencyRecorder that is told when each telemetry
+# response is received and when each ack is sent.
+#
+# last_ack_id is the message_ack_id of the last telemetry response the consumer has processed. Under
+# a coalescing ack policy its ack may still be pending; finish() sends it. stream_id and last_ack_id are kept across
+# calls to open(), so calling open() again after an error resumes the stream from the message after
+# the last one that was processed.
+class SatelliteStream:
+    def __init__(self, client, satellite_id, plan_id=None, ground_station_id=None,
+                 enable_events=True, enable_flow_control=True, accepted_framing=None,
+                 stream_id=None, resume_stream_message_ack_id=None, ack_policy=None, latency=None):
+        self.client = client
+        self.satellite_id = satellite_id
+        self.plan_id = plan_id
+        self.ground_station_id = ground_station_id
+        self.enable_events = enable_events
+        self.enable_flow_control = enable_flow_control
+        self.accepted_framing = accepted_framing
+        self.stream_id = stream_id
+        self.last_ack_id = resume_stream_message_ack_id
+        self.ack_policy = ack_policy or EveryMessageAckPolicy()
+        self.latency = latency
+        self.stats = StreamStats()
+        self._call = None
+        self._write_lock = asyncio.Lock()
+        self._pending_acks = 0
+        self._ack_timer = None
+        # The message_ack_id of the telemetry response the consumer is processing.
+        self._processing_ack_id = None
+
+    def _setup_request(self):
+        # enable_events, enable_flow_control and accepted_framing do not need to be sent
+        # after the setup message.
+        return stellarstation_pb2.SatelliteStreamRequest(
+            satellite_id=self.satellite_id,
+            plan_id=self.plan_id,
+            ground_station_id=self.ground_station_id,
+            enable_events=self.enable_events,
+            accepted_framing=self.accepted_framing,
+            # stream_id and last_ack_id are None on the first attempt. On recovery, the streamer
+            # rewinds the stream to the message after last_ack_id, so acks that were still pending
+            # are not needed.
+            stream_id=self.stream_id,
+            resume_stream_message_ack_id=self.last_ack_id,
+            enable_flow_control=self.enable_flow_control)
+
+    async def open(self):
+        self._call = self.client.OpenSatelliteStream()
+        self._pending_acks = 0
+        self._processing_ack_id = None
+        if self.latency is not None:
+            self.latency.discard_unacked()
+        await self.write(self._setup_request())
+        if self.enable_flow_control and self.ack_policy.flush_interval:
+            self._ack_timer = asyncio.ensure_future(self._flush_acks_periodically(self.ack_policy.flush_interval))
+
+    # Writes are serialized since the ack timer and the consumer can both write to the call.
+    async def write(self, request):
+        call = self._call
+        async with self._write_lock:
+            try:
+                await call.write(request)
+            except asyncio.InvalidStateError:
+                # The server has already finished the call. If it failed, raise its status like a
+                # read would. If it finished normally, the read loop ends on its own.
+                code = await call.code()
+                if code == grpc.StatusCode.OK:
+                    return
+                raise grpc.aio.AioRpcError(code, await call.initial_metadata(),
+                                           await call.trailing_metadata(), await call.details())
+        self.stats.total_messages_sent += 1
+
+    # Sends a burst of commands. Many commands can be sent in a single request.
+    #
+    # If request_id is set, the ground station will respond with a stream event carrying the
+    # same request_id to confirm the commands were sent.
+    async def send_commands(self, commands, channel_set_id=None, request_id=None):
+        await self.write(stellarstation_pb2.SatelliteStreamRequest(
+            satellite_id=self.satellite_id,
+            request_id=request_id,
+            send_satellite_commands_request=stellarstation_pb2.SendSatelliteCommandsRequest(
+                command=commands,
+                channel_set_id=channel_set_id)))
+
+    # Sends the ack for last_ack_id, which acknowledges every message before it as well.
+    async def flush_acks(self):
+        if not self._pending_acks:
+            return
+        self._pending_acks = 0
+        self.ack_policy.on_ack(time.monotonic())
+        message_ack_id = self.last_ack_id
+        await self.write(stellarstation_pb2.SatelliteStreamRequest(
+            satellite_id=self.satellite_id,
+            telemetry_received_ack=stellarstation_pb2.ReceiveTelemetryAck(
+                message_ack_id=message_ack_id,
+                # received_timestamp is not required,
+                # but provides stellarstation with debugging information
+                received_timestamp=now_timestamp())))
+        self.stats.total_acks_sent += 1
+        if self.latency is not None:
+            self.latency.on_ack(message_ack_id)
+
+    async def _flush_acks_periodically(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_acks()
+            except Exception:
+                # The call has failed. The error is raised to the consumer reading responses().
+                return
+
+    # Yields each SatelliteStreamResponse and updates the counters.
+    #
+    # With flow control enabled, a telemetry response counts as processed once the consumer asks
+    # for the next response. It is then acked according to the ack policy.
+    async def responses(self):
+        stats = self.stats
+        ack_policy = self.ack_policy
+        latency = self.latency
+        async for response in self._call:
+            stats.total_responses += 1
+
+            # stream_id allows you to attempt a stream recovery, but
+            # also provides a useful identifier for the Stellarstation
+            # team to help debug any issues
+            if self.stream_id is None and response.stream_id:
+                self.stream_id = response.stream_id
+
+            kind = response.WhichOneof("Response")
+            if kind == "receive_telemetry_response":
+                telemetry_response = response.receive_telemetry_response
+                if latency is not None:
+                    latency.on_telemetry_response(telemetry_response, acked=self.enable_flow_control)
+                stats.total_telemetry_messages += 1
+                for tlm in telemetry_response.telemetry:
+                    stats.total_bytes_received += len(tlm.data)
+
+                if self.enable_flow_control and telemetry_response.message_ack_id:
+                    self._processing_ack_id = telemetry_response.message_ack_id
+
+                yield response
+
+                if self._processing_ack_id is not None:
+                    self._processed()
+                    if ack_policy.should_ack(self._pending_acks, time.monotonic()):
+                        await self.flush_acks()
+            else:
+                if kind == "stream_event":
+                    stats.total_stream_events += 1
+                yield response
+
+    def _processed(self):
+        self.last_ack_id = self._processing_ack_id
+        self._processing_ack_id = None
+        self._pending_acks += 1
+
+    # Acks every response the consumer has received, including the last one, and closes the stream.
+    # Called once the consumer is done with the stream, e.g. after the end message. Errors sending
+    # the acks are ignored, since every response has already been processed.
+    async def finish(self):
+        if self._processing_ack_id is not None:
+            self._processed()
+        try:
+            if self._call is not None:
+                await self.flush_acks()
+        except grpc.RpcError:
+            pass
+        finally:
+            await self.close()
+
+    # Cancels the RPC. The stream can be resumed later with open().
+    async def close(self):
+        if self._ack_timer is not None:
+            self._ack_timer.cancel()
+            self._ack_timer = None
+        if self._call is None:
+            return
+        call, self._call = self._call, None
+        call.cancel()
@@ -0,0 +1,242 @@
+# Copyright 2026 Infostellar, Inc.
+# Records live satellite streams and replays them from a local StellarStationService.
+#
+# RecordingStellarStationServiceStub saves every OpenSatelliteStream response as it came off the
+# wire, before it is deserialized, together with the time it arrived:
+#
+#   file header: b'SSREC' | version (u8)
+#   record:      arrival time (i64, ns since epoch) | length (u32) | serialized SatelliteStreamResponse
+#
+# ReplayStellarStationService serves a recording to any client of OpenSatelliteStream, sending the
+# recorded bytes unchanged at the recorded pace, `speed` times faster, or as fast as possible. It
+# resumes after resume_stream_message_ack_id like the real service, and keeps the acks it receives.
+# With enable_flow_control, it stops sending once ack_window telemetry responses are waiting for an
+# ack, so a client whose acks fall behind is held back as by flow control on the real service.
+# Client throughput, latency and ack policies can so be regression-tested against the traffic of a
+# real pass.
+# Stream events are replayed as recorded, so command confirmations refer to the recorded requests.
+#
+#   client = RecordingStellarStationServiceStub(toolkit.get_aio_channel(api_key_path, api_url),
+#                                               StreamRecorder('pass.ssrec'))
+#
+#   $ python3 stream_recording.py pass.ssrec --port 50052 --speed 10
+
+import argparse
+import asyncio
+import os
+import struct
+import time
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+
+FILE_MAGIC = b'SSREC'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<5sB')
+RECORD_HEADER = struct.Struct('<qI')
+
+SERVICE_NAME = 'stellarstation.api.v1.StellarStationService'
+
+
+# Appends responses to a recording. A recording that already exists is appended to.
+class StreamRecorder:
+    def __init__(self, path, buffer_size=1024 * 1024):
+        self.path = path
+        self.responses_recorded = 0
+        self.bytes_recorded = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab', buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+
+    def record(self, wire, arrival_ns=None):
+        if arrival_ns is None:
+            arrival_ns = time.time_ns()
+        self._file.write(RECORD_HEADER.pack(arrival_ns, len(wire)))
+        self._file.write(wire)
+        self.responses_recorded += 1
+        self.bytes_recorded += len(wire)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# A StellarStationServiceStub whose OpenSatelliteStream records each response before it is
+# deserialized with `deserializer`, e.g. lazy_decode.LazySatelliteStreamResponse.FromString.
+class RecordingStellarStationServiceStub(stellarstation_pb2_grpc.StellarStationServiceStub):
+    def __init__(self, channel, recorder, deserializer=stellarstation_pb2.SatelliteStreamResponse.FromString):
+        super().__init__(channel)
+
+        def record_and_deserialize(wire):
+            recorder.record(wire)
+            return deserializer(wire)
+
+        self.recorder = recorder
+        self.OpenSatelliteStream = channel.stream_stream(
+            '/{}/OpenSatelliteStream'.format(SERVICE_NAME),
+            request_serializer=stellarstation_pb2.SatelliteStreamRequest.SerializeToString,
+            response_deserializer=record_and_deserialize)
+
+
+# Reads a recording. Returns a list of (arrival time in ns, serialized SatelliteStreamResponse).
+# A record cut short by a crash while recording is left out.
+def read_recording(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data) != (FILE_MAGIC, FILE_VERSION):
+        raise ValueError("{} is not a stream recording".format(path))
+    records = []
+    offset = FILE_HEADER.size
+    while offset + RECORD_HEADER.size <= len(data):
+        arrival_ns, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > len(data):
+            break
+        records.append((arrival_ns, data[offset:offset + length]))
+        offset += length
+    return records
+
+
+# records: a list of (arrival time in ns, serialized SatelliteStreamResponse), see read_recording.
+# speed:      1 replays at the recorded pace, 10 ten times faster, None as fast as possible.
+# ack_window: with flow control, telemetry responses sent ahead of the last ack.
+class ReplayStellarStationService:
+    def __init__(self, records, speed=1.0, ack_window=1000):
+        self.records = records
+        self.speed = speed
+        self.ack_window = ack_window
+        self.times = [arrival_ns for arrival_ns, _ in records]
+        self.wires = [wire for _, wire in records]
+        # Index of the record following each message_ack_id, for resuming and acks.
+        self._resume_index = {}
+        # Telemetry responses with a message_ack_id before each record, for the ack window.
+        self._acked_before = [0]
+        for index, wire in enumerate(self.wires):
+            response = stellarstation_pb2.SatelliteStreamResponse.FromString(wire)
+            message_ack_id = None
+            if response.WhichOneof('Response') == 'receive_telemetry_response':
+                message_ack_id = response.receive_telemetry_response.message_ack_id
+                if message_ack_id:
+                    self._resume_index[message_ack_id] = index + 1
+            self._acked_before.append(self._acked_before[-1] + (1 if message_ack_id else 0))
+
+        # Every request received on every stream, and the message_ack_id of every ack, in order.
+        self.requests = []
+        self.acked = []
+        self.streams_opened = 0
+        self.responses_sent = 0
+        # Time sending waited for acks, with flow control.
+        self.seconds_waiting_for_acks = 0.0
+
+    async def _read_requests(self, request_iterator, window):
+        async for request in request_iterator:
+            self.requests.append(request)
+            if request.HasField('telemetry_received_ack'):
+                message_ack_id = request.telemetry_received_ack.message_ack_id
+                self.acked.append(message_ack_id)
+                window.on_ack(self._resume_index.get(message_ack_id))
+
+    async def OpenSatelliteStream(self, request_iterator, context):
+        setup = await request_iterator.__anext__()
+        self.requests.append(setup)
+        self.streams_opened += 1
+        if not setup.satellite_id:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Satellite ID not set')
+
+        first_index = 0
+        if setup.resume_stream_message_ack_id:
+            first_index = self._resume_index.get(setup.resume_stream_message_ack_id)
+            if first_index is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, 'Unknown message_ack_id {}'.format(
+                    setup.resume_stream_message_ack_id))
+
+        window = _AckWindow(first_index)
+        reader = asyncio.ensure_future(self._read_requests(request_iterator, window))
+        try:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            first_ns = self.times[first_index] if first_index < len(self.times) else 0
+            for index in range(first_index, len(self.wires)):
+                if self.speed:
+                    delay = started + (self.times[index] - first_ns) / 1e9 / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if setup.enable_flow_control:
+                    waiting_since = loop.time()
+                    while self._acked_before[index] - self._acked_before[window.acked_index] >= self.ack_window:
+                        await window.wait()
+                    self.seconds_waiting_for_acks += loop.time() - waiting_since
+                yield self.wires[index]
+                self.responses_sent += 1
+
+            # Keep the stream open like the real service does until the client goes away.
+            await reader
+        finally:
+            reader.cancel()
+
+
+# The index of the record after the last one acked on a replayed stream.
+class _AckWindow:
+    def __init__(self, acked_index):
+        self.acked_index = acked_index
+        self._acked = asyncio.Event()
+
+    def on_ack(self, index):
+        if index is not None and index > self.acked_index:
+            self.acked_index = index
+            self._acked.set()
+
+    async def wait(self):
+        self._acked.clear()
+        await self._acked.wait()
+
+
+# Serves OpenSatelliteStream of a ReplayStellarStationService. The recorded bytes are sent as they
+# are, without being parsed and serialized again. Returns (server, port).
+async def serve_replay(servicer, address='[::]:50052'):
+    server = grpc.aio.server()
+    handler = grpc.stream_stream_rpc_method_handler(
+        servicer.OpenSatelliteStream,
+        request_deserializer=stellarstation_pb2.SatelliteStreamRequest.FromString,
+        response_serializer=bytes)
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(
+        SERVICE_NAME, {'OpenSatelliteStream': handler}),))
+    port = server.add_insecure_port(address)
+    await server.start()
+    return server, port
+
+
+async def main(args):
+    records = read_recording(args.recording)
+    servicer = ReplayStellarStationService(records, speed=args.speed or None, ack_window=args.ack_window)
+    server, port = await serve_replay(servicer, '[::]:{}'.format(args.port))
+    duration = (records[-1][0] - records[0][0]) / 1e9 if records else 0
+    print('replaying {} responses recorded over {:.1f}s on port {}'.format(len(records), duration, port))
+    await server.wait_for_termination()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a recorded satellite stream.')
+    parser.add_argument('recording', help='File written by StreamRecorder')
+    parser.add_argument('--port', type=int, default=50052)
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed relative to the recording, 0 for as fast as possible')
+    parser.add_argument('--ack-window', type=int, default=1000,
+                        help='With flow control, telemetry responses sent ahead of the last ack')
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
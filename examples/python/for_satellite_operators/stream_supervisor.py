@@ -0,0 +1,285 @@
+# Copyright 2026 Infostellar, Inc.
+# Keeps a SatelliteStream running across errors and process restarts.
+#
+# The supervisor reconnects with exponential backoff and jitter, resumes the stream with
+# stream_id and resume_stream_message_ack_id, and checkpoints both to SQLite so a restarted
+# process resumes where the previous one stopped instead of rewinding or losing data. It also
+# measures how long each recovery takes.
+
+import asyncio
+import random
+import sqlite3
+import time
+
+import grpc
+
+# Errors worth reconnecting for. Anything else (e.g. an invalid API key) is raised.
+RETRYABLE_STATUS_CODES = frozenset([
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+    grpc.StatusCode.ABORTED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.CANCELLED,
+])
+
+# The server stops buffering for a stream that has had no listener for 10 minutes,
+# so older checkpoints can't be resumed.
+MAX_CHECKPOINT_AGE_SECONDS = 10 * 60
+
+
+# Exponential backoff. `jitter` is the fraction of each delay that is randomized: 0 gives fixed
+# delays, 1 gives "full jitter" (uniform between 0 and the exponential delay).
+class Backoff:
+    def __init__(self, initial=0.5, maximum=30.0, multiplier=2.0, jitter=1.0, rng=random.random):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.rng = rng
+        self.attempt = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.initial * self.multiplier ** self.attempt)
+        self.attempt += 1
+        return delay * (1 - self.jitter) + delay * self.jitter * self.rng()
+
+    def reset(self):
+        self.attempt = 0
+
+
+# Durable (stream_id, message_ack_id) checkpoints in a SQLite database in WAL mode.
+class CheckpointStore:
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode, NORMAL only risks the last transactions on power loss, not on a process crash.
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS stream_checkpoint ('
+            ' key TEXT PRIMARY KEY,'
+            ' stream_id TEXT,'
+            ' message_ack_id TEXT,'
+            ' updated_at REAL NOT NULL)')
+        self._db.commit()
+
+    # Returns (stream_id, message_ack_id), or (None, None) if there is no usable checkpoint.
+    def load(self, key, max_age=MAX_CHECKPOINT_AGE_SECONDS):
+        row = self._db.execute(
+            'SELECT stream_id, message_ack_id, updated_at FROM stream_checkpoint WHERE key = ?',
+            (key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[2] > max_age):
+            return None, None
+        return row[0], row[1]
+
+    def save(self, key, stream_id, message_ack_id):
+        self._db.execute(
+            'INSERT OR REPLACE INTO stream_checkpoint (key, stream_id, message_ack_id, updated_at)'
+            ' VALUES (?, ?, ?, ?)',
+            (key, stream_id, message_ack_id, time.time()))
+        self._db.commit()
+
+    def clear(self, key):
+        self._db.execute('DELETE FROM stream_checkpoint WHERE key = ?', (key,))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+class Recovery:
+    __slots__ = ('dropped_at', 'reason', 'attempts', 'reconnected_at', 'first_telemetry_at',
+                 'full_throughput_at', 'baseline_bytes_per_second')
+
+    def __init__(self, dropped_at, reason, baseline_bytes_per_second):
+        self.dropped_at = dropped_at
+        self.reason = reason
+        self.attempts = 0
+        self.reconnected_at = None
+        self.first_telemetry_at = None
+        self.full_throughput_at = None
+        self.baseline_bytes_per_second = baseline_bytes_per_second
+
+    # Seconds from the drop until telemetry was flowing again at full throughput, or None.
+    @property
+    def recovery_time(self):
+        if self.full_throughput_at is None:
+            return None
+        return self.full_throughput_at - self.dropped_at
+
+    def __str__(self):
+        def since_drop(t):
+            return '-' if t is None else '{:.3f}s'.format(t - self.dropped_at)
+        return "Recovery ({}): attempts = {}, reconnected after {}, first telemetry after {}, full throughput after {}".format(
+            self.reason,
+            self.attempts,
+            since_drop(self.reconnected_at),
+            since_drop(self.first_telemetry_at),
+            since_drop(self.full_throughput_at))
+
+
+# Tracks downlink throughput in fixed windows and how long each dropped stream takes to get back
+# to `full_throughput_fraction` of the throughput it had before the drop.
+class RecoveryMetrics:
+    def __init__(self, window=1.0, full_throughput_fraction=0.9, smoothing=0.3, clock=time.monotonic):
+        self.window = window
+        self.full_throughput_fraction = full_throughput_fraction
+        self.smoothing = smoothing
+        self.clock = clock
+        self.bytes_per_second = None
+        self.recoveries = []
+        self._current = None
+        self._window_start = None
+        self._window_bytes = 0
+
+    def on_telemetry(self, size):
+        now = self.clock()
+        if self._window_start is None:
+            self._window_start = now
+        elif now - self._window_start >= self.window:
+            self._close_window(now)
+        self._window_bytes += size
+
+        current = self._current
+        if current is not None and current.first_telemetry_at is None:
+            current.first_telemetry_at = now
+            if not current.baseline_bytes_per_second:
+                # Nothing to compare against, e.g. the stream dropped before a full window.
+                current.full_throughput_at = now
+                self._current = None
+
+    def _close_window(self, now):
+        rate = self._window_bytes / (now - self._window_start)
+        self._window_start = now
+        self._window_bytes = 0
+        if self.bytes_per_second is None:
+            self.bytes_per_second = rate
+        else:
+            self.bytes_per_second += self.smoothing * (rate - self.bytes_per_second)
+
+        current = self._current
+        if current is not None and rate >= self.full_throughput_fraction * current.baseline_bytes_per_second:
+            current.full_throughput_at = now
+            self._current = None
+
+    def on_disconnect(self, reason):
+        if self._current is None:
+            self._current = Recovery(self.clock(), reason, self.bytes_per_second)
+            self.recoveries.append(self._current)
+        self._current.attempts += 1
+        self._window_start = None
+        self._window_bytes = 0
+
+    def on_reconnect(self):
+        if self._current is not None and self._current.reconnected_at is None:
+            self._current.reconnected_at = self.clock()
+
+
+# Runs a SatelliteStream until handle_response returns True.
+#
+# handle_response(response) is called for every SatelliteStreamResponse, and may be a coroutine
+# function. on_open(satellite_stream), if given, is awaited after every (re)connection, e.g. to send
+# commands. With a checkpoint_store, the stream is resumed from the stored checkpoint on start, and
+# checkpoints are saved every checkpoint_interval seconds and whenever the stream stops.
+# before_checkpoint, if given, is awaited before a checkpoint is saved, e.g. to flush the outputs the
+# responses were handed to so that a checkpoint never covers data that isn't written yet. Once
+# handle_response returns True the stream is finished: the pending acks, including the one for the
+# last response, are sent and its checkpoint is cleared instead.
+class StreamSupervisor:
+    def __init__(self, satellite_stream, handle_response, on_open=None, checkpoint_store=None,
+                 checkpoint_key=None, checkpoint_interval=1.0, backoff=None, max_attempts=None,
+                 retryable_status_codes=RETRYABLE_STATUS_CODES, metrics=None, before_checkpoint=None):
+        self.satellite_stream = satellite_stream
+        self.handle_response = handle_response
+        self.on_open = on_open
+        self.checkpoint_store = checkpoint_store
+        self.checkpoint_key = checkpoint_key or satellite_stream.satellite_id
+        self.checkpoint_interval = checkpoint_interval
+        self.backoff = backoff or Backoff()
+        self.max_attempts = max_attempts
+        self.retryable_status_codes = retryable_status_codes
+        self.metrics = metrics or RecoveryMetrics()
+        self.before_checkpoint = before_checkpoint
+        # Connections since telemetry was last received.
+        self.attempts = 0
+        self._last_checkpoint = None
+
+    async def _checkpoint(self):
+        if self.checkpoint_store is None:
+            return
+        satellite_stream = self.satellite_stream
+        checkpoint = (satellite_stream.stream_id, satellite_stream.last_ack_id)
+        if checkpoint == self._last_checkpoint:
+            return
+        if self.before_checkpoint is not None:
+            await self.before_checkpoint()
+        self.checkpoint_store.save(self.checkpoint_key, *checkpoint)
+        self._last_checkpoint = checkpoint
+
+    def _resume_from_checkpoint(self):
+        if self.checkpoint_store is None:
+            return
+        stream_id, message_ack_id = self.checkpoint_store.load(self.checkpoint_key)
+        if stream_id is not None:
+            self.satellite_stream.stream_id = stream_id
+            self.satellite_stream.last_ack_id = message_ack_id
+            self._last_checkpoint = (stream_id, message_ack_id)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_store is None:
+            return
+        self.checkpoint_store.clear(self.checkpoint_key)
+        self._last_checkpoint = None
+
+    # Streams until handle_response returns True. Returns False if max_attempts connections in a row
+    # ended without any telemetry being received.
+    async def run(self):
+        satellite_stream = self.satellite_stream
+        metrics = self.metrics
+        self._resume_from_checkpoint()
+
+        while True:
+            self.attempts += 1
+            reason = 'stream closed by server'
+            done = False
+            try:
+                await satellite_stream.open()
+                metrics.on_reconnect()
+                if self.on_open is not None:
+                    await self.on_open(satellite_stream)
+
+                next_checkpoint = time.monotonic() + self.checkpoint_interval
+                async for response in satellite_stream.responses():
+                    if response.HasField('receive_telemetry_response'):
+                        self.backoff.reset()
+                        self.attempts = 0
+                        for telemetry in response.receive_telemetry_response.telemetry:
+                            metrics.on_telemetry(len(telemetry.data))
+
+                    done = self.handle_response(response)
+                    if asyncio.iscoroutine(done):
+                        done = await done
+                    if done:
+                        return True
+
+                    if time.monotonic() >= next_checkpoint:
+                        await self._checkpoint()
+                        next_checkpoint = time.monotonic() + self.checkpoint_interval
+            except grpc.RpcError as e:
+                if e.code() not in self.retryable_status_codes:
+                    raise
+                reason = e.code().name
+            finally:
+                if done:
+                    await satellite_stream.finish()
+                    self._clear_checkpoint()
+                else:
+                    await satellite_stream.close()
+                    await self._checkpoint()
+
+            metrics.on_disconnect(reason)
+            if self.max_attempts is not None and self.attempts >= self.max_attempts:
+                return False
+            await asyncio.sleep(self.backoff.next_delay())
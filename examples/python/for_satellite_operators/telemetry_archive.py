@@ -0,0 +1,258 @@
+# Copyright 2026 Infostellar, Inc.
+# An indexed, memory-mapped archive of ReceiveTelemetryResponse data for replaying passes.
+#
+# Layout of an archive file:
+#
+#   header:   b'SSTLMA' | version (u16)
+#   records:  frame_header | data, for every Telemetry message, in the order they were appended
+#   strings:  count (u32), then length (u16) | utf-8 bytes, for every plan and ground station ID
+#   index:    one INDEX_ENTRY per record, sorted by (plan, ground station, time_first_byte_received)
+#   trailer:  strings offset (u64) | index offset (u64) | record count (u64) | b'SSTLMA\0\0'
+#
+# All integers are little-endian. The index is written when the archive is closed. Readers mmap the
+# whole file, binary search the index in place and return frames as memoryview slices of the
+# mapping, so nothing is copied or parsed until it is used.
+
+import bisect
+import collections
+import mmap
+import struct
+
+from telemetry_sink import timestamp_to_ns, write_chunks
+
+MAGIC = b'SSTLMA'
+VERSION = 1
+HEADER = struct.Struct('<6sH')
+# plan, ground station, time_first_byte_received, time_last_byte_received, offset,
+# downlink_frequency_hz, data length, frame_header length, framing
+INDEX_ENTRY = struct.Struct('<IIqqQQIHBx')
+TRAILER = struct.Struct('<QQQ8s')
+STRING_LENGTH = struct.Struct('<H')
+COUNT = struct.Struct('<I')
+
+Frame = collections.namedtuple('Frame', [
+    'plan_id', 'ground_station_id', 'time_first_byte_received', 'time_last_byte_received',
+    'downlink_frequency_hz', 'framing', 'frame_header', 'data'])
+
+
+class TelemetryArchiveWriter:
+    def __init__(self, path, buffer_size=4 * 1024 * 1024):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._file = open(path, 'wb', buffering=0)
+        self._offset = HEADER.size
+        self._strings = {}
+        self._entries = []
+        self._pending = [HEADER.pack(MAGIC, VERSION)]
+        self._pending_bytes = HEADER.size
+
+    def _string_index(self, value):
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    # Appends a Telemetry message received for plan_id from ground_station_id.
+    def append(self, plan_id, ground_station_id, telemetry):
+        frame_header = telemetry.frame_header
+        data = telemetry.data
+        self._entries.append((
+            self._string_index(plan_id),
+            self._string_index(ground_station_id),
+            timestamp_to_ns(telemetry.time_first_byte_received),
+            timestamp_to_ns(telemetry.time_last_byte_received),
+            self._offset,
+            telemetry.downlink_frequency_hz,
+            len(data),
+            len(frame_header),
+            telemetry.framing))
+
+        size = len(frame_header) + len(data)
+        if frame_header:
+            self._pending.append(frame_header)
+        self._pending.append(data)
+        self._pending_bytes += size
+        self._offset += size
+        if self._pending_bytes >= self.buffer_size:
+            self._write_pending()
+
+    def append_response(self, telemetry_response):
+        for telemetry in telemetry_response.telemetry:
+            self.append(telemetry_response.plan_id, telemetry_response.ground_station_id, telemetry)
+
+    def _write_pending(self):
+        write_chunks(self._file.fileno(), self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+
+    # Writes the string table, the sorted index and the trailer.
+    def close(self):
+        if self._file is None:
+            return
+        strings = sorted(self._strings, key=self._strings.get)
+        strings_offset = self._offset
+        chunks = [COUNT.pack(len(strings))]
+        for value in strings:
+            encoded = value.encode('utf-8')
+            chunks.append(STRING_LENGTH.pack(len(encoded)))
+            chunks.append(encoded)
+        index_offset = strings_offset + sum(len(chunk) for chunk in chunks)
+
+        self._entries.sort(key=lambda entry: (entry[0], entry[1], entry[2]))
+        index = bytearray(INDEX_ENTRY.size * len(self._entries))
+        for i, entry in enumerate(self._entries):
+            INDEX_ENTRY.pack_into(index, i * INDEX_ENTRY.size, *entry)
+        chunks.append(index)
+        chunks.append(TRAILER.pack(strings_offset, index_offset, len(self._entries), MAGIC + b'\0\0'))
+
+        self._pending.extend(chunks)
+        self._write_pending()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# A sequence of the (plan, ground station, time_first_byte_received) keys of the index, read
+# straight from the mapping, so that bisect can search it without loading it.
+class _IndexKeys:
+    KEY = struct.Struct('<IIq')
+
+    def __init__(self, buffer, offset, count):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.KEY.unpack_from(self.buffer, self.offset + i * INDEX_ENTRY.size)
+
+
+class TelemetryArchive:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version = HEADER.unpack_from(self._buffer)
+        strings_offset, index_offset, count, trailer_magic = TRAILER.unpack_from(
+            self._buffer, len(self._buffer) - TRAILER.size)
+        if magic != MAGIC or trailer_magic != MAGIC + b'\0\0':
+            raise ValueError("{} is not a complete telemetry archive".format(path))
+        if version != VERSION:
+            raise ValueError("Unsupported telemetry archive version {}".format(version))
+
+        (string_count,) = COUNT.unpack_from(self._buffer, strings_offset)
+        offset = strings_offset + COUNT.size
+        self._strings = []
+        for _ in range(string_count):
+            (length,) = STRING_LENGTH.unpack_from(self._buffer, offset)
+            offset += STRING_LENGTH.size
+            self._strings.append(bytes(self._buffer[offset:offset + length]).decode('utf-8'))
+            offset += length
+        self._string_indexes = {value: i for i, value in enumerate(self._strings)}
+
+        self._index_offset = index_offset
+        self._keys = _IndexKeys(self._buffer, index_offset, count)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self._keys):
+            raise IndexError(i)
+        plan, ground_station, first, last, offset, frequency, data_length, header_length, framing = \
+            INDEX_ENTRY.unpack_from(self._buffer, self._index_offset + i * INDEX_ENTRY.size)
+        data_offset = offset + header_length
+        return Frame(
+            self._strings[plan],
+            self._strings[ground_station],
+            first,
+            last,
+            frequency,
+            framing,
+            self._buffer[offset:data_offset],
+            self._buffer[data_offset:data_offset + data_length])
+
+    # Returns the distinct values of the first key field in keys[low:high], one bisect per value.
+    def _distinct(self, low, high, prefix):
+        values = []
+        i = low
+        while i < high:
+            value = self._keys[i][len(prefix)]
+            values.append(value)
+            i = bisect.bisect_left(self._keys, prefix + (value + 1,), i, high)
+        return values
+
+    # Returns the (start, end) index ranges of frames for plan_id, one per ground station, optionally
+    # restricted to a ground station and to time_first_byte_received in [start_ns, end_ns).
+    def _ranges(self, plan_id, ground_station_id, start_ns, end_ns):
+        plan = self._string_indexes.get(plan_id)
+        if plan is None:
+            return []
+        low = bisect.bisect_left(self._keys, (plan,))
+        high = bisect.bisect_left(self._keys, (plan + 1,), low)
+        if ground_station_id is None:
+            ground_stations = self._distinct(low, high, (plan,))
+        elif ground_station_id in self._string_indexes:
+            ground_stations = [self._string_indexes[ground_station_id]]
+        else:
+            ground_stations = []
+
+        ranges = []
+        for ground_station in ground_stations:
+            if start_ns is None:
+                start = bisect.bisect_left(self._keys, (plan, ground_station), low, high)
+            else:
+                start = bisect.bisect_left(self._keys, (plan, ground_station, start_ns), low, high)
+            if end_ns is None:
+                end = bisect.bisect_left(self._keys, (plan, ground_station + 1), start, high)
+            else:
+                end = bisect.bisect_left(self._keys, (plan, ground_station, end_ns), start, high)
+            if start < end:
+                ranges.append((start, end))
+        return ranges
+
+    def plan_ids(self):
+        return sorted(self._strings[plan] for plan in self._distinct(0, len(self._keys), ()))
+
+    # Yields the frames of a plan in time order, optionally restricted to a ground station and to
+    # time_first_byte_received in [start_ns, end_ns).
+    def frames(self, plan_id, ground_station_id=None, start_ns=None, end_ns=None):
+        ranges = self._ranges(plan_id, ground_station_id, start_ns, end_ns)
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            for i in range(start, end):
+                yield self[i]
+            return
+        # A plan normally executes on one ground station. If there are several, merge them by time.
+        indexes = sorted((self._keys[i][2], i) for start, end in ranges for i in range(start, end))
+        for _, i in indexes:
+            yield self[i]
+
+    # Returns the first frame of plan_id received at or after time_ns, or None.
+    def seek(self, plan_id, time_ns, ground_station_id=None):
+        candidates = [start for start, _ in self._ranges(plan_id, ground_station_id, time_ns, None)]
+        if not candidates:
+            return None
+        return self[min(candidates, key=lambda i: self._keys[i][2])]
+
+    # Frames returned by the archive are views of the mapping and must be released before closing.
+    def close(self):
+        self._keys = None
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
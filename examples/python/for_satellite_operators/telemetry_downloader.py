@@ -0,0 +1,451 @@
+# Copyright 2026 Infostellar, Inc.
+# Parallel, resumable downloads of the telemetry files in Plan.telemetry_metadata.
+#
+# Files are downloaded next to the stream telemetry written by TelemetrySink:
+#
+#   <directory>/<plan_id>/<DATA_TYPE>-<file name from the URL>
+#
+# Each file is fetched with HTTP range requests of part_size bytes, several at once, over
+# keep-alive connections that are reused across parts and files. max_connections bounds the number
+# of requests in flight across every file being downloaded. Data is written into <path>.part at
+# its offset as it arrives, and the ranges completed so far are recorded in <path>.part.json, so an
+# interrupted download resumes with the missing ranges only. The file is renamed to <path> when
+# complete. Servers that don't support ranges are downloaded in one request.
+#
+#   downloader = TelemetryDownloader(directory)
+#   for plan, metadata, path, error in downloader.download_plans(plans):
+#       ...
+#
+# The URLs are valid for one hour after ListPlans returned them. A download that fails with 403
+# can be resumed with the URLs of a fresh ListPlans call.
+
+import concurrent.futures
+import http.client
+import json
+import os
+import posixpath
+import re
+import ssl
+import threading
+import time
+import urllib.parse
+
+from stellarstation.api.v1 import stellarstation_pb2
+
+from plan_cache import subtract_intervals
+from stream_supervisor import Backoff
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+
+CONTENT_RANGE = re.compile(r'bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)')
+
+
+class DownloadError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+# The file changed on the server since the download started, e.g. a DECODED file was regenerated.
+class FileChangedError(DownloadError):
+    pass
+
+
+# Status codes worth retrying, for errors the server may recover from.
+def is_retryable_status(status):
+    return status == 429 or status >= 500
+
+
+def telemetry_path(directory, plan_id, metadata):
+    data_type = stellarstation_pb2.TelemetryMetadata.DataType.Name(metadata.data_type)
+    name = posixpath.basename(urllib.parse.unquote(urllib.parse.urlsplit(metadata.url).path))
+    return os.path.join(directory, plan_id, '{}-{}'.format(data_type, name) if name else data_type)
+
+
+class DownloadStats:
+    __slots__ = ('files_completed', 'files_failed', 'files_skipped', 'bytes_downloaded', 'bytes_resumed',
+                 'requests', 'retries', 'connections', 'started_at', 'finished_at')
+
+    def __init__(self):
+        self.files_completed = 0
+        self.files_failed = 0
+        self.files_skipped = 0
+        self.bytes_downloaded = 0
+        # Bytes of partial downloads that didn't have to be fetched again.
+        self.bytes_resumed = 0
+        self.requests = 0
+        self.retries = 0
+        self.connections = 0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def bytes_per_second(self):
+        if self.started_at is None or self.finished_at is None or self.finished_at <= self.started_at:
+            return 0.0
+        return self.bytes_downloaded / (self.finished_at - self.started_at)
+
+    def __str__(self):
+        return "Files = {}, Failed = {}, Skipped = {}, Downloaded = {} bytes, Resumed = {} bytes, Requests = {}, Retries = {}, Connections = {}, MB/s = {:.1f}".format(
+            self.files_completed,
+            self.files_failed,
+            self.files_skipped,
+            self.bytes_downloaded,
+            self.bytes_resumed,
+            self.requests,
+            self.retries,
+            self.connections,
+            self.bytes_per_second / 1e6)
+
+
+# Keep-alive connections, one per thread and host, so each worker thread reuses its own.
+class _ConnectionPool:
+    def __init__(self, timeout, ssl_context, stats):
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.stats = stats
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = set()
+
+    def get(self, scheme, netloc):
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (scheme, netloc)
+        connection = connections.get(key)
+        if connection is None:
+            if scheme == 'https':
+                connection = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self.ssl_context)
+            else:
+                connection = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            connections[key] = connection
+            with self._lock:
+                self._all.add(connection)
+                self.stats.connections += 1
+        return connection
+
+    # Closes a connection that can't be reused, e.g. after an error or an unread response.
+    def discard(self, scheme, netloc):
+        connection = self._local.connections.pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+            with self._lock:
+                self._all.discard(connection)
+
+    def close(self):
+        with self._lock:
+            connections = list(self._all)
+            self._all.clear()
+        for connection in connections:
+            connection.close()
+
+
+class _File:
+    def __init__(self, key, url, path):
+        self.key = key
+        self.url = url
+        self.path = path
+        self.part_path = path + '.part'
+        self.state_path = path + '.part.json'
+        self.fd = None
+        self.size = None
+        self.etag = None
+        # Completed [start, end) ranges, sorted.
+        self.done = []
+        self.in_flight = 0
+        self.error = None
+        self.lock = threading.Lock()
+
+    def add_done(self, start, end):
+        done = sorted(self.done + [(start, end)])
+        merged = [done[0]]
+        for range_start, range_end in done[1:]:
+            if range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        self.done = merged
+
+    def missing(self):
+        return subtract_intervals(0, self.size, self.done)
+
+
+# directory:       where files are written, see telemetry_path.
+# max_connections: requests in flight across every download.
+# part_size:       bytes per range request.
+# max_attempts:    attempts per request for connection errors and retryable statuses.
+class TelemetryDownloader:
+    def __init__(self, directory, max_connections=8, part_size=DEFAULT_PART_SIZE, max_attempts=5, timeout=60.0,
+                 ssl_context=None, backoff_factory=Backoff):
+        self.directory = directory
+        self.part_size = part_size
+        self.max_attempts = max_attempts
+        self.backoff_factory = backoff_factory
+        self.stats = DownloadStats()
+        self._stats_lock = threading.Lock()
+        self._pool = _ConnectionPool(timeout, ssl_context or ssl.create_default_context(), self.stats)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_connections, thread_name_prefix='download')
+
+    # Sends a GET for url and returns the response, retrying stale keep-alive connections once.
+    def _request(self, url, headers):
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        for attempt in range(2):
+            connection = self._pool.get(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', target, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._pool.discard(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._pool.discard(parts.scheme, parts.netloc)
+                raise
+            with self._stats_lock:
+                self.stats.requests += 1
+            return response
+
+    # Reads the response body into the file from offset. Returns the number of bytes written.
+    def _read_into(self, file, response, offset, length=None):
+        buffer = bytearray(READ_SIZE)
+        view = memoryview(buffer)
+        written = 0
+        while length is None or written < length:
+            size = response.readinto(view if length is None else view[:min(READ_SIZE, length - written)])
+            if not size:
+                break
+            data = view[:size]
+            position = offset + written
+            while data:
+                count = _write_at(file, data, position)
+                data = data[count:]
+                position += count
+            written += size
+            with self._stats_lock:
+                self.stats.bytes_downloaded += size
+        if length is not None and written < length:
+            raise DownloadError("Connection closed after {} of {} bytes".format(written, length))
+        return written
+
+    # Runs fetch(url, ...) with retries for connection errors and retryable statuses.
+    def _with_retry(self, fetch, *args):
+        backoff = self.backoff_factory()
+        attempt = 1
+        while True:
+            try:
+                return fetch(*args)
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                if isinstance(e, FileChangedError) or attempt >= self.max_attempts or \
+                        (isinstance(e, DownloadError) and e.status is not None and not is_retryable_status(e.status)):
+                    raise
+                attempt += 1
+                with self._stats_lock:
+                    self.stats.retries += 1
+                time.sleep(backoff.next_delay())
+
+    # Fetches the first missing range of the file, which also tells its size and whether the
+    # server supports ranges.
+    def _probe(self, file):
+        parts = urllib.parse.urlsplit(file.url)
+        start = file.missing()[0][0] if file.size is not None else 0
+        response = self._request(file.url, {'Range': 'bytes={}-{}'.format(start, start + self.part_size - 1)})
+        try:
+            if response.status == 416:
+                match = CONTENT_RANGE.match(response.getheader('Content-Range', ''))
+                response.read()
+                if match and match.group(3) == '0':
+                    self._reset(file, 0, response.getheader('ETag'))
+                    return
+                raise DownloadError("Range not satisfiable", response.status)
+            if response.status == 200:
+                # No range support: the whole file, from the start.
+                length = response.getheader('Content-Length')
+                self._reset(file, None, response.getheader('ETag'))
+                size = self._read_into(file, response, 0, int(length) if length is not None else None)
+                file.size = size
+                file.add_done(0, size)
+                return
+            if response.status != 206:
+                response.read()
+                raise DownloadError("HTTP {} {}".format(response.status, response.reason), response.status)
+
+            match = CONTENT_RANGE.match(response.getheader('Content-Range', ''))
+            if not match or match.group(1) is None or match.group(3) == '*':
+                raise DownloadError("Invalid Content-Range {!r}".format(response.getheader('Content-Range')))
+            range_start, range_end, size = int(match.group(1)), int(match.group(2)), int(match.group(3))
+            etag = response.getheader('ETag')
+            if file.size != size or (file.etag and etag and file.etag != etag):
+                # A new download, or the file changed since the partial download. The probed range
+                # is still valid for the new file.
+                self._reset(file, size, etag)
+            self._read_into(file, response, range_start, range_end + 1 - range_start)
+            file.add_done(range_start, range_end + 1)
+        except Exception:
+            self._pool.discard(parts.scheme, parts.netloc)
+            raise
+
+    def _reset(self, file, size, etag):
+        file.size = size
+        file.etag = etag
+        with self._stats_lock:
+            self.stats.bytes_resumed -= sum(end - start for start, end in file.done)
+        file.done = []
+        os.ftruncate(file.fd, 0)
+
+    def _fetch_range(self, file, start, end):
+        parts = urllib.parse.urlsplit(file.url)
+        response = self._request(file.url, {'Range': 'bytes={}-{}'.format(start, end - 1)})
+        try:
+            if response.status != 206:
+                response.read()
+                raise DownloadError("HTTP {} {} for range {}-{}".format(response.status, response.reason, start, end - 1),
+                                    response.status)
+            etag = response.getheader('ETag')
+            if file.etag and etag and etag != file.etag:
+                raise FileChangedError("{} changed during the download".format(file.url))
+            self._read_into(file, response, start, end - start)
+        except Exception:
+            self._pool.discard(parts.scheme, parts.netloc)
+            raise
+        return start, end
+
+    def _open(self, file):
+        os.makedirs(os.path.dirname(file.path) or '.', exist_ok=True)
+        state = None
+        if os.path.exists(file.part_path):
+            try:
+                with open(file.state_path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+        file.fd = os.open(file.part_path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        if state is None:
+            os.ftruncate(file.fd, 0)
+            return
+        file.size = state['size']
+        file.etag = state.get('etag')
+        file.done = [tuple(done) for done in state['done']]
+        with self._stats_lock:
+            self.stats.bytes_resumed += sum(end - start for start, end in file.done)
+
+    def _save_state(self, file):
+        temporary = file.state_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'size': file.size, 'etag': file.etag, 'done': file.done}, f)
+        os.replace(temporary, file.state_path)
+
+    def _complete(self, file):
+        os.close(file.fd)
+        file.fd = None
+        os.replace(file.part_path, file.path)
+        try:
+            os.remove(file.state_path)
+        except FileNotFoundError:
+            pass
+
+    # Downloads every (key, url, path) and yields (key, path, error) as each file completes, with
+    # error None on success. Existing files at path are not downloaded again.
+    def download_all(self, downloads):
+        if self.stats.started_at is None:
+            self.stats.started_at = time.monotonic()
+        in_flight = {}
+        try:
+            for key, url, path in downloads:
+                if os.path.exists(path):
+                    self.stats.files_skipped += 1
+                    yield key, path, None
+                    continue
+                file = _File(key, url, path)
+                try:
+                    self._open(file)
+                except OSError as e:
+                    self.stats.files_failed += 1
+                    yield key, path, e
+                    continue
+                if file.size is not None and not file.missing():
+                    # Interrupted after the last part was written.
+                    self._complete(file)
+                    self.stats.files_completed += 1
+                    yield key, path, None
+                    continue
+                in_flight[self._executor.submit(self._with_retry, self._probe, file)] = (file, None)
+                file.in_flight = 1
+
+            while in_flight:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    file, completed_range = in_flight.pop(future)
+                    file.in_flight -= 1
+                    try:
+                        result = future.result()
+                        if completed_range is not None:
+                            file.add_done(*result)
+                        # Saved even if another part failed, so the next attempt resumes from here.
+                        self._save_state(file)
+                    except Exception as e:
+                        file.error = file.error or e
+                    if file.error is None and completed_range is None:
+                        # The probe is done: fetch the rest of the file in parts.
+                        for start, end in file.missing():
+                            for part_start in range(start, end, self.part_size):
+                                part = (part_start, min(part_start + self.part_size, end))
+                                in_flight[self._executor.submit(self._with_retry, self._fetch_range, file, *part)] = \
+                                    (file, part)
+                                file.in_flight += 1
+                    if file.in_flight:
+                        continue
+                    self.stats.finished_at = time.monotonic()
+                    if file.error is None:
+                        self._complete(file)
+                        self.stats.files_completed += 1
+                        yield file.key, file.path, None
+                    else:
+                        # The partial download is kept, to be resumed by the next attempt.
+                        os.close(file.fd)
+                        file.fd = None
+                        self.stats.files_failed += 1
+                        yield file.key, file.path, file.error
+        finally:
+            for future in in_flight:
+                future.cancel()
+            concurrent.futures.wait(in_flight)
+            for file, _ in in_flight.values():
+                if file.fd is not None:
+                    os.close(file.fd)
+                    file.fd = None
+
+    # Downloads the telemetry files of plans, optionally only those with data_type in data_types
+    # (TelemetryMetadata.DataType values). Yields (plan, metadata, path, error) as each completes.
+    def download_plans(self, plans, data_types=None):
+        downloads = [((plan, metadata), metadata.url, telemetry_path(self.directory, plan.id, metadata))
+                     for plan in plans
+                     for metadata in plan.telemetry_metadata
+                     if metadata.url and (data_types is None or metadata.data_type in data_types)]
+        for (plan, metadata), path, error in self.download_all(downloads):
+            yield plan, metadata, path, error
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# Writes data to file at offset. Returns the number of bytes written.
+def _write_at(file, data, offset):
+    if hasattr(os, 'pwrite'):
+        return os.pwrite(file.fd, data, offset)
+    # Windows has no positional writes.
+    with file.lock:
+        os.lseek(file.fd, offset, os.SEEK_SET)
+        return os.write(file.fd, data)
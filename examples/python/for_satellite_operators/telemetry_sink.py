@@ -0,0 +1,307 @@
+# Copyright 2026 Infostellar, Inc.
+# Buffered, framing-aware telemetry files.
+#
+# Telemetry is written to one file per plan and Framing:
+#
+#   <directory>/<plan_id>/<FRAMING>-<segment>.tlm
+#
+# Each file starts with a small header and is followed by one record per Telemetry message:
+#
+#   file header:  b'SSTLM' | version (u8) | framing (u8) | plan_id length (u8) | plan_id (utf-8)
+#   record:       data length (u32) | time_first_byte_received (i64, ns since epoch)
+#                 | downlink_frequency_hz (u64) | frame_header length (u16)
+#                 | frame_header | data
+#
+# All integers are little-endian. Records are not copied into the sink: the header and the
+# Telemetry.data buffer are queued as separate chunks and written with os.writev once buffer_size
+# bytes are pending, normally from a background writer thread so the receive loop never waits on
+# the disk.
+
+import collections
+import os
+import queue
+import struct
+import threading
+import time
+
+from stellarstation.api.v1 import transport_pb2
+
+FILE_MAGIC = b'SSTLM'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<5sBBB')
+RECORD_HEADER = struct.Struct('<IqQH')
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# When files are fsync'ed.
+FSYNC_NEVER = 'never'
+# When a file is rotated or the sink is closed.
+FSYNC_ON_CLOSE = 'close'
+# After every buffer written to a file.
+FSYNC_ON_FLUSH = 'flush'
+
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+TelemetryRecord = collections.namedtuple(
+    'TelemetryRecord',
+    ['time_first_byte_received', 'downlink_frequency_hz', 'frame_header', 'data'])
+
+
+def timestamp_to_ns(timestamp):
+    return timestamp.seconds * 1000000000 + timestamp.nanos
+
+
+# Writes every chunk to fd, with as few system calls as possible.
+def write_chunks(fd, chunks):
+    if not hasattr(os, 'writev'):
+        # Windows has no vectored writes.
+        data = memoryview(b''.join(chunks))
+        while data:
+            data = data[os.write(fd, data):]
+        return
+
+    for start in range(0, len(chunks), IOV_MAX):
+        batch = chunks[start:start + IOV_MAX]
+        written = os.writev(fd, batch)
+        expected = sum(len(chunk) for chunk in batch)
+        if written == expected:
+            continue
+        # Partial write, e.g. when interrupted by a signal. Finish the batch chunk by chunk.
+        for chunk in batch:
+            if written >= len(chunk):
+                written -= len(chunk)
+                continue
+            data = memoryview(chunk)[written:]
+            written = 0
+            while data:
+                data = data[os.write(fd, data):]
+
+
+def segment_path(plan_directory, framing_name, segment):
+    return os.path.join(plan_directory, '{}-{:04d}.tlm'.format(framing_name, segment))
+
+
+class _SinkFile:
+    __slots__ = ('path', 'fd', 'size', 'pending', 'pending_bytes', 'pending_tokens')
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.size = 0
+        self.pending = []
+        self.pending_bytes = 0
+        self.pending_tokens = []
+
+
+class TelemetrySink:
+    # directory:      where the per-plan directories are created.
+    # buffer_size:    bytes to aggregate before they are handed to the writer.
+    # max_file_size:  rotate to a new segment once a file exceeds this many bytes. None to disable.
+    # fsync:          FSYNC_NEVER, FSYNC_ON_CLOSE or FSYNC_ON_FLUSH.
+    # flush_interval: seconds after which pending data is written even if buffer_size isn't reached.
+    # max_open_files: files beyond this are closed, least recently written first.
+    # background:     write from a background thread. Otherwise writes happen in the calling thread.
+    # max_pending_buffers: buffers queued for the background thread before write() blocks.
+    # on_written:     called with the tokens passed to write() once their records are written,
+    #                 from the writer thread, e.g. LatencyRecorder.on_written.
+    def __init__(self, directory, buffer_size=DEFAULT_BUFFER_SIZE, max_file_size=None,
+                 fsync=FSYNC_ON_CLOSE, flush_interval=1.0, max_open_files=16, background=True,
+                 max_pending_buffers=8, on_written=None):
+        if fsync not in (FSYNC_NEVER, FSYNC_ON_CLOSE, FSYNC_ON_FLUSH):
+            raise ValueError("Unknown fsync mode '{}'".format(fsync))
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.max_file_size = max_file_size
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.max_open_files = max_open_files
+        self.on_written = on_written
+
+        self.records_written = 0
+        self.bytes_written = 0
+
+        self._files = collections.OrderedDict()
+        self._segments = {}
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._error = None
+        self._closed = False
+
+        self._jobs = None
+        self._writer = None
+        if background:
+            self._jobs = queue.Queue(maxsize=max_pending_buffers)
+            self._writer = threading.Thread(target=self._write_jobs, name='telemetry-sink', daemon=True)
+            self._writer.start()
+
+    # Queues a Telemetry message received for plan_id. If token is set, it is passed to on_written
+    # once the record has been written.
+    def write(self, plan_id, telemetry, token=None):
+        sink_file = self._file_for(plan_id, telemetry.framing)
+
+        data = telemetry.data
+        frame_header = telemetry.frame_header
+        header = RECORD_HEADER.pack(
+            len(data),
+            timestamp_to_ns(telemetry.time_first_byte_received),
+            telemetry.downlink_frequency_hz,
+            len(frame_header)) + frame_header
+        size = len(header) + len(data)
+
+        sink_file.pending.append(header)
+        sink_file.pending.append(data)
+        sink_file.pending_bytes += size
+        sink_file.size += size
+        if token is not None:
+            sink_file.pending_tokens.append(token)
+        self._pending_bytes += size
+        self.records_written += 1
+
+        if self.max_file_size is not None and sink_file.size >= self.max_file_size:
+            self._rotate(plan_id, telemetry.framing)
+        if self._pending_bytes >= self.buffer_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    # Queues every Telemetry message of a ReceiveTelemetryResponse.
+    def write_response(self, telemetry_response, token=None):
+        for telemetry in telemetry_response.telemetry:
+            self.write(telemetry_response.plan_id, telemetry, token)
+
+    # Hands all pending data to the writer. With background=False, the data is on disk on return.
+    def flush(self):
+        self._raise_writer_error()
+        for sink_file in self._files.values():
+            self._submit_pending(sink_file)
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+
+    # Flushes and closes every file. With a background writer, waits for it to finish.
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for sink_file in list(self._files.values()):
+            self._close_file(sink_file)
+        self._files.clear()
+        if self._writer is not None:
+            self._jobs.put(None)
+            self._writer.join()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _file_for(self, plan_id, framing):
+        key = (plan_id, framing)
+        sink_file = self._files.get(key)
+        if sink_file is not None:
+            self._files.move_to_end(key)
+            return sink_file
+
+        framing_name = transport_pb2.Framing.Name(framing)
+        plan_directory = os.path.join(self.directory, plan_id or 'unknown-plan')
+        # Segments continue after files left by earlier runs, which are never overwritten.
+        segment = self._segments.get(key)
+        if segment is None:
+            segment = 0
+            while os.path.exists(segment_path(plan_directory, framing_name, segment)):
+                segment += 1
+        self._segments[key] = segment + 1
+        sink_file = _SinkFile(segment_path(plan_directory, framing_name, segment))
+        plan_id_bytes = plan_id.encode('utf-8')
+        header = FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, framing, len(plan_id_bytes)) + plan_id_bytes
+        sink_file.pending.append(header)
+        sink_file.pending_bytes += len(header)
+        sink_file.size += len(header)
+        self._pending_bytes += len(header)
+
+        self._files[key] = sink_file
+        if len(self._files) > self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            self._close_file(oldest)
+        return sink_file
+
+    def _rotate(self, plan_id, framing):
+        self._close_file(self._files.pop((plan_id, framing)))
+
+    def _close_file(self, sink_file):
+        self._submit_pending(sink_file)
+        self._submit(('close', sink_file, None))
+
+    def _submit_pending(self, sink_file):
+        if not sink_file.pending:
+            return
+        chunks, sink_file.pending = sink_file.pending, []
+        tokens, sink_file.pending_tokens = sink_file.pending_tokens, []
+        self._pending_bytes -= sink_file.pending_bytes
+        sink_file.pending_bytes = 0
+        self._submit(('write', sink_file, (chunks, tokens)))
+
+    def _submit(self, job):
+        if self._jobs is None:
+            self._run_job(job)
+        else:
+            self._jobs.put(job)
+
+    def _write_jobs(self):
+        for job in iter(self._jobs.get, None):
+            if self._error is not None:
+                continue
+            try:
+                self._run_job(job)
+            except Exception as e:
+                self._error = e
+
+    def _run_job(self, job):
+        action, sink_file, data = job
+        if action == 'write':
+            chunks, tokens = data
+            if sink_file.fd is None:
+                os.makedirs(os.path.dirname(sink_file.path), exist_ok=True)
+                sink_file.fd = os.open(sink_file.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o644)
+            write_chunks(sink_file.fd, chunks)
+            self.bytes_written += sum(len(chunk) for chunk in chunks)
+            if self.fsync == FSYNC_ON_FLUSH:
+                os.fsync(sink_file.fd)
+            if tokens and self.on_written is not None:
+                self.on_written(tokens)
+        elif sink_file.fd is not None:
+            if self.fsync != FSYNC_NEVER:
+                os.fsync(sink_file.fd)
+            os.close(sink_file.fd)
+            sink_file.fd = None
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise IOError("Telemetry sink writer failed") from self._error
+
+
+# Reads a file written by TelemetrySink.
+# Returns (plan_id, framing, records) where records is a list of TelemetryRecord.
+def read_telemetry_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, framing, plan_id_length = FILE_HEADER.unpack_from(data)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        raise ValueError("{} is not a telemetry sink file".format(path))
+    offset = FILE_HEADER.size
+    plan_id = data[offset:offset + plan_id_length].decode('utf-8')
+    offset += plan_id_length
+
+    records = []
+    while offset < len(data):
+        data_length, time_first_byte_received, frequency, frame_header_length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        frame_header = data[offset:offset + frame_header_length]
+        offset += frame_header_length
+        records.append(TelemetryRecord(time_first_byte_received, frequency, frame_header,
+                                       data[offset:offset + data_length]))
+        offset += data_length
+    return plan_id, framing, records
@@ -0,0 +1,44 @@
+# Copyright 2026 Infostellar, Inc.
+
+import pytest
+
+from ack_policy import AdaptiveAckPolicy, CountAckPolicy, EveryMessageAckPolicy, IntervalAckPolicy, parse_ack_policy
+
+
+def test_count_policy() -> None:
+    policy = CountAckPolicy(3)
+    assert [policy.should_ack(n, 0) for n in (1, 2, 3)] == [False, False, True]
+    assert policy.flush_interval == 1.0
+
+
+def test_interval_policy() -> None:
+    policy = IntervalAckPolicy(100)
+    assert policy.should_ack(1, 10.0)
+    policy.on_ack(10.0)
+    assert not policy.should_ack(1, 10.05)
+    assert policy.should_ack(2, 10.2)
+
+
+def test_adaptive_policy_acks_slow_streams_immediately() -> None:
+    policy = AdaptiveAckPolicy(interval_ms=100, max_count=5)
+    assert policy.should_ack(1, 0.0)
+    policy.on_ack(0.0)
+    # Slow: every message is more than an interval after the previous one.
+    assert policy.should_ack(1, 0.5)
+    policy.on_ack(0.5)
+    # Fast: coalesced until the interval passes or max_count is reached.
+    assert not policy.should_ack(1, 0.51)
+    assert not policy.should_ack(2, 0.52)
+    assert policy.should_ack(5, 0.53)
+    policy.on_ack(0.53)
+    assert not policy.should_ack(1, 0.54)
+    assert policy.should_ack(2, 0.64)
+
+
+def test_parse_ack_policy() -> None:
+    assert isinstance(parse_ack_policy('every'), EveryMessageAckPolicy)
+    assert parse_ack_policy('count:10').count == 10
+    assert parse_ack_policy('interval:50').flush_interval == 0.05
+    assert parse_ack_policy('adaptive:20').flush_interval == 0.02
+    with pytest.raises(ValueError):
+        parse_ack_policy('count')
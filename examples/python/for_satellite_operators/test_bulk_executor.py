@@ -0,0 +1,228 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import time
+
+import grpc
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+from bulk_executor import RESERVE, BulkExecutor, ConfirmationTimeoutError, TokenBucket
+from stream_supervisor import Backoff
+
+Pass = getattr(stellarstation_pb2, 'Pass')
+
+HOUR = 3600
+
+
+def copy(plan):
+    copied = stellarstation_pb2.Plan()
+    copied.CopyFrom(plan)
+    return copied
+
+
+def rpc_error(code):
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata())
+
+
+# Plan changes become visible to ListPlans `visibility_delay` seconds after the call that made them.
+class FakePlanService:
+    def __init__(self, visibility_delay=0.05, call_delay=0.01):
+        self.visibility_delay = visibility_delay
+        self.call_delay = call_delay
+        self.plans = {}
+        self.visible = {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Errors to raise by method name. 'after' errors are raised once the call went through.
+        self.errors = {}
+        self.errors_after = {}
+        self._next_id = 1
+
+    async def _enter(self, method):
+        self.calls.append(method)
+        # Confirmation polls aren't counted against the executor's concurrency.
+        counted = method != 'ListPlans'
+        self.in_flight += counted
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.call_delay)
+        finally:
+            self.in_flight -= counted
+        errors = self.errors.get(method)
+        if errors:
+            raise rpc_error(errors.pop(0))
+
+    def _exit(self, method):
+        errors = self.errors_after.get(method)
+        if errors:
+            raise rpc_error(errors.pop(0))
+
+    def _publish(self, plan):
+        plan = copy(plan)
+        self.plans[plan.id] = plan
+        asyncio.get_running_loop().call_later(self.visibility_delay, self.visible.__setitem__, plan.id, plan)
+
+    async def ReservePass(self, request, timeout=None):
+        await self._enter('ReservePass')
+        satellite_id, ground_station_id, aos, channel_set_id = request.reservation_token.split('/')
+        for plan in self.plans.values():
+            if plan.ground_station_id == ground_station_id and plan.aos_time.seconds == int(aos) and \
+                    plan.status == toolkit.PlanStatus.RESERVED.value:
+                raise rpc_error(grpc.StatusCode.FAILED_PRECONDITION)
+        plan = stellarstation_pb2.Plan(
+            id=str(self._next_id), satellite_id=satellite_id, ground_station_id=ground_station_id,
+            aos_time={'seconds': int(aos)}, los_time={'seconds': int(aos) + 600},
+            channel_set={'id': channel_set_id}, status=toolkit.PlanStatus.RESERVED.value)
+        self._next_id += 1
+        self._publish(plan)
+        self._exit('ReservePass')
+        return stellarstation_pb2.ReservePassResponse(plan=plan)
+
+    async def CancelPlan(self, request, timeout=None):
+        await self._enter('CancelPlan')
+        plan = self.plans.get(request.plan_id)
+        if plan is None:
+            raise rpc_error(grpc.StatusCode.NOT_FOUND)
+        if plan.status == toolkit.PlanStatus.CANCELED.value:
+            raise rpc_error(grpc.StatusCode.FAILED_PRECONDITION)
+        plan = copy(plan)
+        plan.status = toolkit.PlanStatus.CANCELED.value
+        self._publish(plan)
+        self._exit('CancelPlan')
+        return stellarstation_pb2.CancelPlanResponse()
+
+    async def SetPlanMetadata(self, request, timeout=None):
+        await self._enter('SetPlanMetadata')
+        self._exit('SetPlanMetadata')
+        return stellarstation_pb2.SetPlanMetadataResponse()
+
+    async def ListPlans(self, request, timeout=None):
+        await self._enter('ListPlans')
+        start = request.aos_after.ToNanoseconds()
+        end = request.aos_before.ToNanoseconds()
+        return stellarstation_pb2.ListPlansResponse(plan=[
+            plan for plan in self.visible.values()
+            if plan.satellite_id == request.satellite_id and start <= plan.aos_time.ToNanoseconds() < end])
+
+
+def reservation(satellite_id, ground_station_id, aos):
+    token = Pass.ChannelSetToken(
+        channel_set={'id': 'cs'},
+        reservation_token='{}/{}/{}/cs'.format(satellite_id, ground_station_id, aos))
+    return satellite_id, Pass(ground_station_id=ground_station_id, aos_time={'seconds': aos},
+                              los_time={'seconds': aos + 600}, channel_set_token=[token]), token
+
+
+def no_backoff():
+    return Backoff(initial=0, jitter=0)
+
+
+def test_reserves_and_cancels_concurrently_with_batched_confirmation() -> None:
+    service = FakePlanService()
+    reservations = [reservation(str(satellite), 'gs{}'.format(satellite), 10 * HOUR + i * HOUR)
+                    for satellite in range(4) for i in range(10)]
+
+    async def run():
+        executor = BulkExecutor(service, concurrency=8, rate=10000, poll_interval=0.02)
+        reserved = await executor.reserve_all(reservations)
+        canceled = await executor.cancel_all([result.plan for result in reserved])
+        return executor, reserved, canceled
+
+    executor, reserved, canceled = asyncio.run(run())
+
+    assert all(result.ok for result in reserved + canceled)
+    assert [result.plan.aos_time.seconds for result in reserved] == [r[1].aos_time.seconds for r in reservations]
+    assert all(result.plan.status == toolkit.PlanStatus.CANCELED.value for result in canceled)
+    assert service.max_in_flight <= 8
+    assert executor.stats.succeeded[RESERVE] == 40
+    # Confirmations are batched per satellite instead of one ListPlans per plan.
+    assert service.calls.count('ListPlans') < 40
+    assert executor.stats.latency[RESERVE].count == 40
+
+
+def test_rate_limit() -> None:
+    service = FakePlanService(call_delay=0)
+
+    async def run():
+        executor = BulkExecutor(service, rate=100, burst=1, confirm=False)
+        started = time.monotonic()
+        await executor.set_metadata_all(
+            [(str(i), stellarstation_pb2.PlanMetadata(metadata={'k': stellarstation_pb2.PlanMetadata.Metadata(data=['v'])})) for i in range(11)])
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_reserve_retry_is_idempotent() -> None:
+    service = FakePlanService(visibility_delay=0)
+    # The reservation goes through, but the client sees a deadline.
+    service.errors_after['ReservePass'] = [grpc.StatusCode.DEADLINE_EXCEEDED]
+
+    async def run():
+        executor = BulkExecutor(service, backoff_factory=no_backoff, poll_interval=0.01)
+        return await executor.reserve(*reservation('1', 'gs', 10 * HOUR))
+
+    result = asyncio.run(run())
+
+    assert result.ok
+    assert result.attempts == 1
+    assert service.calls.count('ReservePass') == 1
+    assert len(service.plans) == 1
+
+
+def test_cancel_retry_after_ambiguous_failure() -> None:
+    service = FakePlanService(visibility_delay=0)
+    service.errors_after['CancelPlan'] = [grpc.StatusCode.UNAVAILABLE]
+
+    async def run():
+        executor = BulkExecutor(service, backoff_factory=no_backoff, poll_interval=0.01)
+        reserved = await executor.reserve(*reservation('1', 'gs', 10 * HOUR))
+        return await executor.cancel(reserved.plan)
+
+    result = asyncio.run(run())
+
+    assert result.ok
+    assert result.plan.status == toolkit.PlanStatus.CANCELED.value
+    assert service.calls.count('CancelPlan') == 1
+
+
+def test_transient_errors_are_retried_and_permanent_ones_reported() -> None:
+    service = FakePlanService()
+    service.errors['SetPlanMetadata'] = [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.INVALID_ARGUMENT]
+
+    async def run():
+        executor = BulkExecutor(service, backoff_factory=no_backoff)
+        result = await executor.set_metadata('1', stellarstation_pb2.PlanMetadata())
+        return executor, result
+
+    executor, result = asyncio.run(run())
+
+    assert not result.ok
+    assert result.error.code() == grpc.StatusCode.INVALID_ARGUMENT
+    assert result.attempts == 2
+    assert executor.stats.retries == 1
+
+
+def test_confirmation_timeout() -> None:
+    service = FakePlanService(visibility_delay=10)
+
+    async def run():
+        executor = BulkExecutor(service, confirmation_timeout=0.1, poll_interval=0.01)
+        return await executor.reserve(*reservation('1', 'gs', 10 * HOUR))
+
+    result = asyncio.run(run())
+
+    assert isinstance(result.error, ConfirmationTimeoutError)
+
+
+def test_token_bucket_burst() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=1, burst=3, clock=lambda: now[0])
+
+    async def run():
+        for _ in range(3):
+            await asyncio.wait_for(bucket.acquire(), 0.1)
+    asyncio.run(run())
+    assert bucket._tokens == 0
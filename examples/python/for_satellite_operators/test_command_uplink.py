@@ -0,0 +1,125 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from command_uplink import CommandNotConfirmedError, CommandUplink
+from fake_satellite_service import FakeStellarStationService, serve
+from stream_client import SatelliteStream
+
+
+class RecordingStream:
+    satellite_id = '5'
+
+    def __init__(self):
+        self.requests = []
+
+    async def send_commands(self, commands, channel_set_id=None, request_id=None):
+        self.requests.append(stellarstation_pb2.SatelliteStreamRequest(
+            satellite_id=self.satellite_id,
+            request_id=request_id,
+            send_satellite_commands_request=stellarstation_pb2.SendSatelliteCommandsRequest(
+                command=commands, channel_set_id=channel_set_id)))
+
+
+def command_sent(request_id):
+    return stellarstation_pb2.SatelliteStreamResponse(
+        stream_event=transport_pb2.StreamEvent(
+            request_id=request_id,
+            command_sent=transport_pb2.StreamEvent.CommandSentFromGroundStation()))
+
+
+def test_uplink_batches_and_splits_under_the_size_limit() -> None:
+    stream = RecordingStream()
+
+    async def run():
+        uplink = CommandUplink(stream, channel_set_id='7', linger=0.01, max_request_bytes=1000)
+        futures = uplink.send_all([bytes([i]) * 100 for i in range(25)])
+        await asyncio.sleep(0.05)
+        for request in stream.requests:
+            uplink.on_response(command_sent(request.request_id))
+        latencies = await asyncio.gather(*futures)
+        return uplink, latencies
+
+    uplink, latencies = asyncio.run(run())
+
+    assert all(request.ByteSize() <= 1000 for request in stream.requests)
+    assert len(stream.requests) == 3
+    commands = [c for r in stream.requests for c in r.send_satellite_commands_request.command]
+    assert commands == [bytes([i]) * 100 for i in range(25)]
+    assert all(r.send_satellite_commands_request.channel_set_id == '7' for r in stream.requests)
+    assert len({r.request_id for r in stream.requests}) == 3
+
+    assert all(latency >= 0 for latency in latencies)
+    stats = uplink.stats
+    assert (stats.commands_sent, stats.commands_confirmed, stats.requests_sent, stats.requests_confirmed) == (25, 25, 3, 3)
+    assert stats.bytes_sent == 2500
+    assert stats.latency.count == 25
+    assert uplink.unconfirmed_requests == 0
+
+
+def test_uplink_limits_commands_per_request_and_rejects_oversized_commands() -> None:
+    stream = RecordingStream()
+
+    async def run():
+        uplink = CommandUplink(stream, linger=0, max_batch_commands=4, max_request_bytes=1000)
+        with pytest.raises(ValueError):
+            uplink.send(bytes(1000))
+        uplink.send_all([b'\x01'] * 10)
+        await uplink.flush()
+        await uplink.close()
+
+    asyncio.run(run())
+    assert [len(r.send_satellite_commands_request.command) for r in stream.requests] == [4, 4, 2]
+
+
+def test_uplink_fails_unconfirmed_commands() -> None:
+    stream = RecordingStream()
+
+    async def run():
+        uplink = CommandUplink(stream, linger=0, confirmation_timeout=0.05)
+        future = uplink.send(b'\x01')
+        with pytest.raises(CommandNotConfirmedError):
+            await future
+        # A late or unknown confirmation is ignored.
+        uplink.on_response(command_sent(stream.requests[0].request_id))
+        return uplink
+
+    uplink = asyncio.run(run())
+    assert uplink.stats.requests_timed_out == 1
+    assert uplink.stats.commands_failed == 1
+    assert uplink.stats.commands_confirmed == 0
+
+
+def test_uplink_confirmed_by_fake_service() -> None:
+    servicer = FakeStellarStationService(message_count=1000, messages_per_second=500)
+
+    async def run():
+        server, port = await serve(servicer, '127.0.0.1:0')
+        try:
+            async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+                client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+                satellite_stream = SatelliteStream(client, '5')
+                uplink = CommandUplink(satellite_stream, channel_set_id='1')
+                await satellite_stream.open()
+                futures = uplink.send_all([b'\xaa\xbb'] * 50)
+                async for response in satellite_stream.responses():
+                    uplink.on_response(response)
+                    if all(future.done() for future in futures):
+                        break
+                await satellite_stream.close()
+                await uplink.close()
+                return uplink
+        finally:
+            await server.stop(None)
+
+    uplink = asyncio.run(run())
+    assert uplink.stats.commands_confirmed == 50
+    assert uplink.stats.requests_sent == uplink.stats.requests_confirmed
+    sent = [r for r in servicer.requests if r.HasField('send_satellite_commands_request')]
+    assert sum(len(r.send_satellite_commands_request.command) for r in sent) == 50
@@ -0,0 +1,62 @@
+# Copyright 2026 Infostellar, Inc.
+
+import os
+import random
+
+from stellarstation.api.v1 import stellarstation_pb2, transport_pb2
+
+from dedup import BloomFingerprints, DuplicateFilter, LruFingerprints, fingerprint
+
+
+def response(ack_id, data, plan_id='plan'):
+    return stellarstation_pb2.ReceiveTelemetryResponse(
+        plan_id=plan_id, message_ack_id=ack_id,
+        telemetry=[transport_pb2.Telemetry(data=data, time_first_byte_received={'seconds': 1})])
+
+
+def test_resumed_stream_duplicates_are_dropped() -> None:
+    responses = [response(str(i), os.urandom(100)) for i in range(100)]
+    duplicates = DuplicateFilter(LruFingerprints(1000))
+
+    # The stream is resumed after response 59, and the server rewinds to response 40.
+    kept = [r for r in responses[:60] + responses[40:] if not duplicates.is_duplicate(r)]
+
+    assert kept == responses
+    assert duplicates.stats.duplicates == 20
+    assert duplicates.stats.microseconds_per_response() > 0
+
+
+def test_fingerprint_covers_ack_id_and_content() -> None:
+    assert fingerprint(response('1', b'a')) != fingerprint(response('2', b'a'))
+    assert fingerprint(response('1', b'a'), include_ack_id=False) == fingerprint(response('2', b'a'),
+                                                                                 include_ack_id=False)
+    assert fingerprint(response('1', b'a')) != fingerprint(response('1', b'b'))
+    assert fingerprint(response('1', b'a')) != fingerprint(response('1', b'a', plan_id='other'))
+
+
+def test_lru_is_bounded() -> None:
+    fingerprints = LruFingerprints(capacity=3)
+    for key in (b'a', b'b', b'c', b'a', b'd'):
+        fingerprints.check_and_add(key)
+
+    assert len(fingerprints) == 3
+    # b was the least recently seen.
+    assert not fingerprints.check_and_add(b'b')
+    assert fingerprints.check_and_add(b'a')
+
+
+def test_bloom_rotation_and_false_positive_rate() -> None:
+    fingerprints = BloomFingerprints(capacity=1000, error_rate=0.01)
+    rng = random.Random(1)
+    keys = [rng.randbytes(16) for _ in range(3000)]
+
+    # A few false positives while filling up.
+    assert sum(fingerprints.check_and_add(key) for key in keys[:1000]) < 10
+    assert all(fingerprints.check_and_add(key) for key in keys[:1000])
+    assert 0.005 < fingerprints.false_positive_rate() < 0.03
+
+    # After two more rotations the first keys are forgotten, and memory stays at two filters.
+    false_positives = sum(fingerprints.check_and_add(key) for key in keys[1000:])
+    assert false_positives < 60
+    assert len(fingerprints) <= 2000
+    assert sum(fingerprints.check_and_add(key) for key in keys[:100]) < 10
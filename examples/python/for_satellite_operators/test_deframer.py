@@ -0,0 +1,221 @@
+# Copyright 2026 Infostellar, Inc.
+
+import binascii
+
+import numpy as np
+import pytest
+from stellarstation.api.v1 import transport_pb2
+from stellarstation.api.v1.radio import radio_pb2
+
+from deframer import (AX100_SYNC_WORD, CCSDS_PN_SEQUENCE, CCSDS_SYNC_WORD, AsmDeframer, Ax25Deframer,
+                      deframe_telemetry, deframer_for, golay_decode, golay_encode)
+
+
+def to_bits(data):
+    return np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
+
+
+def word_bits(value, length_bits):
+    return np.array([(value >> (length_bits - 1 - i)) & 1 for i in range(length_bits)], dtype=np.uint8)
+
+
+# Packs bits into bytes, padding the end with random bits, and splits them into chunks at random.
+def chunks(bits, rng, max_chunk=300):
+    bits = np.concatenate((bits, rng.integers(0, 2, (-len(bits)) % 8, dtype=np.uint8)))
+    data = np.packbits(bits).tobytes()
+    result = []
+    while data:
+        size = int(rng.integers(1, max_chunk))
+        result.append(data[:size])
+        data = data[size:]
+    return result
+
+
+def feed_all(deframer, data_chunks):
+    return [frame for chunk in data_chunks for frame in deframer.feed(chunk)]
+
+
+def test_golay_corrects_three_bit_errors() -> None:
+    rng = np.random.default_rng(1)
+    data = rng.integers(0, 4096, 1000)
+    codewords = golay_encode(data)
+    errors = np.zeros(1000, dtype=np.int64)
+    for _ in range(3):
+        errors |= 1 << rng.integers(0, 24, 1000)
+
+    assert (golay_decode(codewords ^ errors) == data).all()
+    # Four bit errors are detected, never miscorrected.
+    assert (golay_decode(codewords ^ 0xF) == -1).all()
+
+
+def test_ccsds_pn_sequence() -> None:
+    assert bytes(CCSDS_PN_SEQUENCE[:8]) == bytes.fromhex('ff480ec09a0d70bc')
+
+
+def test_ccsds_frames_at_bit_offsets_inverted_and_across_chunks() -> None:
+    rng = np.random.default_rng(2)
+    frames = [rng.integers(0, 256, 64, dtype=np.uint8).tobytes() for _ in range(20)]
+    sync = word_bits(*CCSDS_SYNC_WORD)
+    parts = []
+    for i, frame in enumerate(frames):
+        # Noise of any bit length between frames.
+        parts.append(rng.integers(0, 2, int(rng.integers(0, 40)), dtype=np.uint8))
+        scrambled = np.frombuffer(frame, dtype=np.uint8) ^ CCSDS_PN_SEQUENCE[:64]
+        frame_bits = np.concatenate((sync, to_bits(scrambled)))
+        if i % 3 == 0:
+            frame_bits ^= 1
+        if i % 4 == 1:
+            # Two bit errors in the sync word.
+            frame_bits[[3, 17]] ^= 1
+        parts.append(frame_bits)
+    bits = np.concatenate(parts)
+
+    deframer = deframer_for(radio_pb2.CommunicationProtocol(ccsds=radio_pb2.CCSDSTransferFrame(
+        frame_length_bytes=64, scrambling_params=radio_pb2.CCSDSScramblingParams())))
+    deframed = feed_all(deframer, chunks(bits, rng))
+
+    assert [frame.data for frame in deframed] == frames
+    assert [frame.inverted for frame in deframed] == [i % 3 == 0 for i in range(20)]
+    assert [frame.bit_errors for frame in deframed] == [2 if i % 4 == 1 else 0 for i in range(20)]
+    offsets = np.cumsum([0] + [len(part) for part in parts])
+    assert [frame.bit_offset for frame in deframed] == [int(offsets[2 * i + 1]) for i in range(20)]
+    assert deframer.stats.frames == 20
+    assert deframer.stats.inverted_frames == 7
+
+
+def test_reed_solomon_block_length_and_custom_sync_word() -> None:
+    protocol = radio_pb2.CCSDSTransferFrame(
+        synchronization_params=radio_pb2.SynchronizationParams(synchronization_word=b'\x7f\xf1', length_bits=15),
+        reed_solomon_params=radio_pb2.CCSDSReedSolomonParams())
+    deframer = deframer_for(protocol, allow_inverted=False)
+    frame = bytes(range(255))
+    bits = np.concatenate((np.zeros(5, dtype=np.uint8), word_bits(0x7ff1, 15), to_bits(frame)))
+
+    deframed = feed_all(deframer, chunks(bits, np.random.default_rng(3)))
+
+    assert [f.data for f in deframed] == [frame]
+    assert deframed[0].bit_offset == 5
+
+
+@pytest.mark.parametrize('line_coding', [radio_pb2.NRZ_M, radio_pb2.NRZ_S])
+def test_bitstream_with_differential_line_coding(line_coding) -> None:
+    rng = np.random.default_rng(4)
+    frames = [rng.integers(0, 256, 32, dtype=np.uint8).tobytes() for _ in range(5)]
+    sync = (0xEB90, 16)
+    bits = np.concatenate([np.concatenate((word_bits(*sync), to_bits(frame))) for frame in frames])
+    # NRZ-M: a 1 is a transition. NRZ-S: a 0 is a transition.
+    transitions = bits if line_coding == radio_pb2.NRZ_M else bits ^ 1
+    coded = (np.cumsum(transitions) % 2).astype(np.uint8)
+
+    deframer = deframer_for(radio_pb2.Bitstream(
+        synchronization_params=radio_pb2.SynchronizationParams(synchronization_word=b'\xeb\x90', length_bits=16),
+        frame_length_bytes=32, line_coding=line_coding))
+
+    assert [f.data for f in feed_all(deframer, chunks(coded, rng))] == frames
+
+
+def test_asm_golay_variable_length_frames() -> None:
+    rng = np.random.default_rng(5)
+    frames = [rng.integers(0, 256, int(rng.integers(1, 256)), dtype=np.uint8).tobytes() for _ in range(10)]
+    parts = []
+    for i, frame in enumerate(frames):
+        length = golay_encode(len(frame) | 0x600)
+        if i == 4:
+            # Three bit errors in the length field are corrected.
+            length ^= 0x800101
+        scrambled = np.frombuffer(frame, dtype=np.uint8) ^ np.resize(CCSDS_PN_SEQUENCE, len(frame))
+        parts += [rng.integers(0, 2, 13, dtype=np.uint8), word_bits(*AX100_SYNC_WORD), word_bits(int(length), 24),
+                  to_bits(scrambled)]
+    # An uncorrectable length field is dropped.
+    parts += [word_bits(*AX100_SYNC_WORD), word_bits(int(golay_encode(10)) ^ 0xF, 24), np.zeros(80, dtype=np.uint8)]
+
+    deframer = deframer_for(radio_pb2.CommunicationProtocol(
+        asm_golay=radio_pb2.ASMGolay(enable_ccsds_scramble=True)))
+    deframed = feed_all(deframer, chunks(np.concatenate(parts), rng, max_chunk=20))
+
+    assert [f.data for f in deframed] == frames
+    assert deframer.stats.dropped_frames == 1
+
+
+def test_incomplete_frame_waits_for_more_bits() -> None:
+    deframer = AsmDeframer(CCSDS_SYNC_WORD, frame_length_bytes=4)
+    data = bytes.fromhex('1acffc1d') + b'abcd'
+
+    assert deframer.feed(data[:6]) == []
+    assert deframer.feed(data[6:7]) == []
+    (frame,) = deframer.feed(data[7:] + b'\x00')
+    assert frame.data == b'abcd'
+
+
+def ax25_frame(destination, source, info):
+    def address(callsign, ssid, last):
+        return bytes(ord(c) << 1 for c in callsign.ljust(6)) + bytes([0x60 | ssid << 1 | last])
+    frame = address(*destination, 0) + address(*source, 1) + b'\x03\xf0' + info
+    crc = binascii.crc_hqx(bytes(int('{:08b}'.format(b)[::-1], 2) for b in frame), 0xFFFF)
+    return frame, frame + (int('{:016b}'.format(crc)[::-1], 2) ^ 0xFFFF).to_bytes(2, 'little')
+
+
+# HDLC framing with bit stuffing, NRZI and optional G3RUH scrambling.
+def ax25_bits(frames, g3ruh, flags=4):
+    flag = [0, 1, 1, 1, 1, 1, 1, 0]
+    bits = flag * flags
+    for frame in frames:
+        ones = 0
+        for bit in np.unpackbits(np.frombuffer(frame, dtype=np.uint8), bitorder='little').tolist():
+            bits.append(bit)
+            ones = ones + 1 if bit else 0
+            if ones == 5:
+                bits.append(0)
+                ones = 0
+        bits += flag * flags
+    level = 0
+    nrzi = []
+    for bit in bits:
+        if not bit:
+            level ^= 1
+        nrzi.append(level)
+    if not g3ruh:
+        return np.array(nrzi, dtype=np.uint8)
+    scrambled = [0] * 17
+    for bit in nrzi:
+        scrambled.append(bit ^ scrambled[-12] ^ scrambled[-17])
+    return np.array(scrambled[17:], dtype=np.uint8)
+
+
+@pytest.mark.parametrize('g3ruh', [False, True])
+def test_ax25(g3ruh) -> None:
+    rng = np.random.default_rng(6)
+    frames = [ax25_frame(('JQ1ZZZ', 0), ('SAT', 1), bytes([0x7e, 0xff, 0xff]) + bytes(range(i * 7)))
+              for i in range(8)]
+    other = ax25_frame(('OTHER', 0), ('SAT', 1), b'x')
+    encoded = [frame for _, frame in frames[:4]] + [other[1]] + [frame for _, frame in frames[4:]]
+    bits = ax25_bits(encoded, g3ruh)
+    # A corrupted frame is dropped.
+    bad = ax25_bits([frames[0][1]], g3ruh)
+    bad[80] ^= 1
+
+    deframer = deframer_for(radio_pb2.AX25(g3ruh=g3ruh, destination_callsign='JQ1ZZZ'))
+    deframed = feed_all(deframer, chunks(np.concatenate((bits, bad)), rng, max_chunk=30))
+
+    assert [f.data for f in deframed] == [frame for frame, _ in frames]
+    assert deframer.stats.frames == 8
+    assert deframer.stats.dropped_frames >= 1
+
+
+def test_deframe_telemetry_skips_other_framings() -> None:
+    deframer = AsmDeframer(CCSDS_SYNC_WORD, frame_length_bytes=2)
+    telemetry = [
+        transport_pb2.Telemetry(framing=transport_pb2.AX25, data=bytes.fromhex('1acffc1d') + b'no'),
+        transport_pb2.Telemetry(framing=transport_pb2.BITSTREAM, data=bytes.fromhex('001acffc1d') + b'ok'),
+    ]
+
+    assert [(t.framing, f.data) for t, f in deframe_telemetry(deframer, telemetry)] == [(transport_pb2.BITSTREAM, b'ok')]
+
+
+def test_unsupported_configs() -> None:
+    with pytest.raises(ValueError):
+        deframer_for(radio_pb2.Bitstream(frame_length_bytes=10))
+    with pytest.raises(ValueError):
+        deframer_for(radio_pb2.CCSDSTransferFrame(frame_length_bytes=10, line_coding=radio_pb2.BP_L))
+    with pytest.raises(ValueError):
+        deframer_for(radio_pb2.CommunicationProtocol())
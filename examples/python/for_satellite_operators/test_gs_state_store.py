@@ -0,0 +1,125 @@
+# Copyright 2026 Infostellar, Inc.
+
+import math
+
+import numpy as np
+from stellarstation.api.v1 import transport_pb2
+from stellarstation.api.v1.monitoring import monitoring_pb2
+
+from gs_state_store import COLUMN_NAMES, GroundStationStateStore, downsample, flatten_state, tracking_error
+
+SECOND = 10 ** 9
+
+
+def antenna_state(azimuth_command, azimuth_measured, elevation_command, elevation_measured):
+    return monitoring_pb2.GroundStationState(antenna=monitoring_pb2.AntennaState(
+        azimuth={'command': azimuth_command, 'measured': azimuth_measured},
+        elevation={'command': elevation_command, 'measured': elevation_measured}))
+
+
+def state_event(plan_id, time_ns, state):
+    return transport_pb2.StreamEvent(
+        timestamp={'seconds': time_ns // SECOND, 'nanos': time_ns % SECOND},
+        plan_monitoring_event=transport_pb2.PlanMonitoringEvent(plan_id=plan_id, ground_station_state=state))
+
+
+def test_flatten_state_and_unset_fields() -> None:
+    state = monitoring_pb2.GroundStationState(
+        receiver=monitoring_pb2.ReceiverState(
+            center_frequency_hz=2200000000, is_phase_locked=True, normalized_snr=12.5,
+            convolutional_coding_status=monitoring_pb2.LOCKED,
+            reed_solomon_status={'num_corrected_signals': 3, 'num_good_frames': {'value': 10}},
+            bitrate={'value': 9600}),
+        transmitter=monitoring_pb2.TransmitterState(is_carrier_enabled={'value': False}))
+
+    row = dict(zip(COLUMN_NAMES, flatten_state(state, 5)))
+
+    assert len(row) == len(COLUMN_NAMES)
+    assert row['time_ns'] == 5
+    assert math.isnan(row['antenna_azimuth_command'])
+    assert row['receiver_center_frequency_hz'] == 2200000000
+    assert row['receiver_is_phase_locked'] and not row['receiver_is_bit_synchronizer_locked']
+    assert row['receiver_convolutional_coding_status'] == monitoring_pb2.LOCKED
+    assert row['receiver_reed_solomon_num_corrected_signals'] == 3
+    assert row['receiver_reed_solomon_num_good_frames'] == 10
+    assert row['receiver_reed_solomon_num_bad_frames'] == -1
+    assert row['receiver_bitrate'] == 9600
+    assert math.isnan(row['receiver_carrier_offset'])
+    assert row['transmitter_is_carrier_enabled'] == 0
+    assert row['transmitter_is_modulation_enabled'] == -1
+
+
+def test_segments_read_and_tracking_error(tmp_path) -> None:
+    store = GroundStationStateStore(str(tmp_path), segment_rows=100)
+    for i in range(250):
+        assert store.append_event(state_event('p', 1000 * SECOND + i * SECOND,
+                                              antenna_state(359.5, 0.5, 10 + i * 0.1, 10 + i * 0.1 + 0.2)))
+    # Other events and other plans are kept apart.
+    assert not store.append_event(transport_pb2.StreamEvent(command_sent={}))
+    store.append('q', 0, antenna_state(0, 0, 0, 0))
+
+    # Two segments are written, the rest is still buffered.
+    assert len(store._segments('p')) == 2
+    columns = store.read('p')
+    assert len(columns['time_ns']) == 250
+    time_ns, azimuth_error, elevation_error, pointing_error = tracking_error(columns)
+    assert (np.diff(time_ns) == SECOND).all()
+    np.testing.assert_allclose(azimuth_error, 1.0)
+    np.testing.assert_allclose(elevation_error, 0.2, atol=1e-9)
+    assert (pointing_error > 0.2).all() and (pointing_error < 1.03).all()
+
+    store.close()
+    reopened = GroundStationStateStore(str(tmp_path))
+    assert reopened.plan_ids() == ['p', 'q']
+    assert (reopened.read('p', names=('time_ns',))['time_ns'] == time_ns).all()
+
+
+def test_compaction_sorts_drops_repeats_and_downsamples(tmp_path) -> None:
+    store = GroundStationStateStore(str(tmp_path), segment_rows=50)
+    # A resumed stream repeats states 80 to 99.
+    for i in list(range(100)) + list(range(80, 120)):
+        store.append('p', i * SECOND // 2, antenna_state(10, 10, 20, 20 + i))
+    store.flush()
+
+    assert store.compact('p') == 120
+    columns = store.read('p')
+    assert len(store._segments('p')) == 1
+    assert isinstance(columns['time_ns'], np.memmap)
+    assert (np.diff(columns['time_ns']) > 0).all()
+
+    assert store.compact('p', resolution_ns=10 * SECOND) == 6
+    columns = store.read('p')
+    assert list(columns['time_ns']) == [i * 10 * SECOND for i in range(6)]
+    # Floats are averaged over each 20 states.
+    np.testing.assert_allclose(columns['antenna_elevation_measured'], [20 + 9.5 + 20 * i for i in range(6)])
+
+
+def test_downsample_ignores_nan() -> None:
+    columns = {
+        'time_ns': np.array([0, 1, 2, 10, 11]),
+        'value': np.array([1.0, np.nan, 3.0, np.nan, np.nan]),
+        'flag': np.array([True, False, False, False, True]),
+    }
+
+    result = downsample(columns, 10)
+
+    assert list(result['time_ns']) == [0, 10]
+    assert result['value'][0] == 2.0 and np.isnan(result['value'][1])
+    assert list(result['flag']) == [True, False]
+
+
+def test_tracking_error_over_a_million_states() -> None:
+    rows = 1000000
+    rng = np.random.default_rng(0)
+    columns = {
+        'time_ns': np.arange(rows, dtype=np.int64),
+        'antenna_azimuth_command': rng.uniform(0, 360, rows),
+        'antenna_elevation_command': rng.uniform(0, 90, rows),
+    }
+    columns['antenna_azimuth_measured'] = columns['antenna_azimuth_command'] + 0.1
+    columns['antenna_elevation_measured'] = columns['antenna_elevation_command'] - 0.1
+
+    _, azimuth_error, elevation_error, pointing_error = tracking_error(columns)
+
+    np.testing.assert_allclose(azimuth_error, 0.1, atol=1e-9)
+    assert (pointing_error <= math.hypot(0.1, 0.1) + 1e-9).all()
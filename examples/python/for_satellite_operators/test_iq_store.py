@@ -0,0 +1,113 @@
+# Copyright 2026 Infostellar, Inc.
+
+import numpy as np
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2, transport_pb2
+
+from iq_store import IqRecording, IqSink, IqStore, iq_samples, store_path, to_complex
+
+SECOND = 10 ** 9
+
+
+def telemetry(data, first_ns, last_ns, framing=transport_pb2.IQ):
+    return transport_pb2.Telemetry(
+        framing=framing, data=data, downlink_frequency_hz=2200000000,
+        time_first_byte_received={'seconds': first_ns // SECOND, 'nanos': first_ns % SECOND},
+        time_last_byte_received={'seconds': last_ns // SECOND, 'nanos': last_ns % SECOND})
+
+
+def test_iq_samples_share_memory() -> None:
+    data = np.arange(8, dtype='<i2').tobytes()
+
+    samples = iq_samples(data, 'ci16')
+
+    assert samples.base is data
+    assert list(samples['i']) == [0, 2, 4, 6]
+    assert list(to_complex(samples)) == [0 + 1j, 2 + 3j, 4 + 5j, 6 + 7j]
+    complex_samples = iq_samples(np.array([1 + 2j, 3 - 4j], dtype=np.complex64).tobytes())
+    assert to_complex(complex_samples) is complex_samples
+    with pytest.raises(ValueError):
+        iq_samples(data, 'cu4')
+
+
+def test_store_grows_and_joins_samples_split_across_chunks(tmp_path) -> None:
+    path = str(tmp_path / 'plan' / 'IQ-ci16.npy')
+    expected = np.arange(2 * 1000, dtype='<i2')
+    data = expected.tobytes()
+
+    with IqStore(path, 'ci16', initial_capacity=16) as store:
+        # Chunks that end in the middle of a sample.
+        for start in range(0, len(data), 333):
+            store.append(data[start:start + 333])
+        assert store.count == 1000
+        assert store.capacity >= 1000
+        assert (store.samples['q'] == expected[1::2]).all()
+
+    loaded = np.load(path)
+    assert loaded.shape == (1000,)
+    assert (loaded['i'] == expected[::2]).all()
+
+
+def test_reopened_store_is_appended_to(tmp_path) -> None:
+    path = str(tmp_path / 'IQ-cf32.npy')
+    first = np.arange(10, dtype=np.complex64)
+    with IqStore(path, initial_capacity=4) as store:
+        store.append(first.tobytes(), 1 * SECOND, 2 * SECOND)
+    with IqStore(path) as store:
+        assert store.count == 10
+        assert store.append((first + 1j).tobytes(), 3 * SECOND, 4 * SECOND) == 10
+
+    recording = IqRecording(path)
+    assert len(recording) == 20
+    assert (recording.samples[10:] == first + 1j).all()
+    with pytest.raises(ValueError):
+        IqStore(path, 'ci8')
+
+
+def test_timestamps_of_samples(tmp_path) -> None:
+    path = str(tmp_path / 'IQ-ci8.npy')
+    # 1000 samples per chunk, one chunk per second: 1 ms per sample.
+    with IqStore(path, 'ci8') as store:
+        for chunk in range(10):
+            first_ns = 100 * SECOND + chunk * SECOND
+            store.append_telemetry(telemetry(bytes(2000), first_ns, first_ns + SECOND - 10 ** 6))
+
+    recording = IqRecording(path)
+
+    assert list(recording.time_at([0, 1, 1000, 9999])) == [100 * SECOND, 100 * SECOND + 10 ** 6, 101 * SECOND,
+                                                           109 * SECOND + 999 * 10 ** 6]
+    assert recording.time_at(10000) == 110 * SECOND
+    assert recording.sample_at(100 * SECOND) == 0
+    assert recording.sample_at(105 * SECOND + 500 * 10 ** 6) == 5500
+    assert recording.sample_at(50 * SECOND) == 0
+    assert recording.sample_at(200 * SECOND) == 10000
+    window = recording.between(102 * SECOND, 103 * SECOND)
+    assert len(window) == 1000
+    assert isinstance(window, np.memmap)
+    assert list(recording.index['downlink_frequency_hz'][:1]) == [2200000000]
+
+
+def test_flushed_store_is_readable_while_written(tmp_path) -> None:
+    path = str(tmp_path / 'IQ-cf32.npy')
+    store = IqStore(path, initial_capacity=1000)
+    store.append(np.ones(10, dtype=np.complex64).tobytes(), SECOND, 2 * SECOND)
+    store.flush()
+
+    recording = IqRecording(path)
+
+    assert len(recording) == 10
+    store.close()
+
+
+def test_sink_writes_iq_of_each_plan(tmp_path) -> None:
+    response = stellarstation_pb2.ReceiveTelemetryResponse(plan_id='p1', telemetry=[
+        telemetry(np.arange(4, dtype=np.complex64).tobytes(), SECOND, 2 * SECOND),
+        telemetry(b'frame', SECOND, 2 * SECOND, framing=transport_pb2.AX25),
+    ])
+
+    with IqSink(str(tmp_path)) as sink:
+        sink.write_response(response)
+        sink.write('p2', telemetry(np.arange(2, dtype=np.complex64).tobytes(), SECOND, 2 * SECOND))
+
+    assert list(np.load(store_path(str(tmp_path), 'p1', 'cf32'))) == [0, 1, 2, 3]
+    assert len(np.load(store_path(str(tmp_path), 'p2', 'cf32'))) == 2
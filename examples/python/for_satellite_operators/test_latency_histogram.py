@@ -0,0 +1,130 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import json
+import urllib.request
+
+import grpc
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from ack_policy import CountAckPolicy
+from fake_satellite_service import FakeStellarStationService, serve
+from latency_histogram import (GROUND_STATION_TO_CLIENT, RECEIVE_TO_ACK, RECEIVE_TO_SINK,
+                               LatencyHistogram, LatencyRecorder, serve_latency_metrics)
+from stream_client import SatelliteStream, is_end_message
+from telemetry_sink import TelemetrySink
+
+
+def test_histogram_percentiles_within_precision() -> None:
+    histogram = LatencyHistogram(significant_digits=2)
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.min == 0.001
+    assert histogram.max == 1.0
+    assert abs(histogram.mean - 0.5005) < 1e-9
+    for percentile, expected in ((50, 0.5), (90, 0.9), (99, 0.99), (100, 1.0)):
+        assert abs(histogram.value_at_percentile(percentile) - expected) <= expected * 0.01
+
+
+def test_histogram_clamps_and_merges() -> None:
+    first = LatencyHistogram(highest=10.0)
+    second = LatencyHistogram(highest=10.0)
+    first.record(-0.5)
+    second.record(20.0)
+    second.record(0.002, count=3)
+    first.merge(second)
+
+    assert first.count == 5
+    assert first.clamped == 2
+    assert first.min == 0.0
+    assert first.max == 10.0
+    assert abs(first.value_at_percentile(50) - 0.002) < 0.002 * 0.01
+    first.reset()
+    assert first.count == 0
+    assert first.value_at_percentile(50) is None
+
+
+def telemetry_response(message_ack_id, last_byte_seconds, ground_station_id='gs', plan_id='p'):
+    return stellarstation_pb2.ReceiveTelemetryResponse(
+        ground_station_id=ground_station_id,
+        plan_id=plan_id,
+        message_ack_id=message_ack_id,
+        telemetry=[transport_pb2.Telemetry(data=b'x', time_last_byte_received={'seconds': last_byte_seconds})])
+
+
+def test_recorder_tracks_each_interval_per_ground_station_and_plan() -> None:
+    recorder = LatencyRecorder()
+    recorder.on_telemetry_response(telemetry_response('1', 100), received_at=100.5)
+    first_token = recorder.receive_token
+    recorder.on_telemetry_response(telemetry_response('2', 100), received_at=101.0)
+    recorder.on_telemetry_response(telemetry_response('3', 200, ground_station_id='other'), received_at=200.25)
+    # The ack for 2 covers 1 and 2, but not 3.
+    recorder.on_ack('2', sent_at=102.0)
+    recorder.on_written([first_token], written_at=103.5)
+
+    histograms = {(h['metric'], h['ground_station_id']): h for h in recorder.snapshot()}
+    assert histograms[(GROUND_STATION_TO_CLIENT, 'gs')]['count'] == 2
+    assert histograms[(GROUND_STATION_TO_CLIENT, 'gs')]['max_ms'] == 1000
+    assert histograms[(GROUND_STATION_TO_CLIENT, 'other')]['max_ms'] == 250
+    assert histograms[(RECEIVE_TO_ACK, 'gs')]['count'] == 2
+    assert histograms[(RECEIVE_TO_ACK, 'gs')]['min_ms'] == 1000
+    assert histograms[(RECEIVE_TO_ACK, 'gs')]['max_ms'] == 1500
+    assert (RECEIVE_TO_ACK, 'other') not in histograms
+    assert histograms[(RECEIVE_TO_SINK, 'gs')]['max_ms'] == 3000
+
+    server = serve_latency_metrics(recorder, port=0)
+    try:
+        url = 'http://127.0.0.1:{}/latency'.format(server.server_address[1])
+        with urllib.request.urlopen(url) as response:
+            assert json.loads(response.read()) == recorder.snapshot()
+    finally:
+        server.shutdown()
+
+
+def test_unacked_responses_are_bounded() -> None:
+    recorder = LatencyRecorder(max_unacked=3)
+    for i in range(10):
+        recorder.on_telemetry_response(telemetry_response(str(i), 100), received_at=100.0 + i)
+    recorder.on_telemetry_response(telemetry_response('10', 100), received_at=110.0, acked=False)
+    recorder.on_ack('9', sent_at=120.0)
+
+    # Only the last 3 acked responses were kept.
+    histograms = {h['metric']: h for h in recorder.snapshot()}
+    assert histograms[RECEIVE_TO_ACK]['count'] == 3
+    assert histograms[RECEIVE_TO_ACK]['max_ms'] == 13000
+
+    recorder.on_telemetry_response(telemetry_response('11', 100), received_at=111.0)
+    recorder.discard_unacked()
+    recorder.on_ack('11', sent_at=120.0)
+    assert {h['metric']: h for h in recorder.snapshot()}[RECEIVE_TO_ACK]['count'] == 3
+
+
+def test_stream_and_sink_report_latency(tmp_path) -> None:
+    servicer = FakeStellarStationService(message_count=30, payload_size=10)
+    recorder = LatencyRecorder()
+
+    async def consume():
+        server, port = await serve(servicer, '127.0.0.1:0')
+        try:
+            async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+                client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+                satellite_stream = SatelliteStream(client, '5', ack_policy=CountAckPolicy(10), latency=recorder)
+                with TelemetrySink(str(tmp_path), on_written=recorder.on_written) as sink:
+                    await satellite_stream.open()
+                    async for response in satellite_stream.responses():
+                        telemetry_response = response.receive_telemetry_response
+                        sink.write_response(telemetry_response, token=recorder.receive_token)
+                        if is_end_message(telemetry_response):
+                            break
+                    await satellite_stream.close()
+        finally:
+            await server.stop(None)
+
+    asyncio.run(consume())
+
+    counts = {h['metric']: h['count'] for h in recorder.snapshot()}
+    assert counts == {GROUND_STATION_TO_CLIENT: 30, RECEIVE_TO_ACK: 30, RECEIVE_TO_SINK: 31}
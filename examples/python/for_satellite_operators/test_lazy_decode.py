@@ -0,0 +1,129 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+import pytest
+from google.protobuf.message import DecodeError
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from fake_satellite_service import FakeStellarStationService, serve
+from lazy_decode import LazySatelliteStreamResponse, LazyStellarStationServiceStub
+from stream_client import SatelliteStream, is_end_message
+
+
+def make_telemetry_response():
+    return stellarstation_pb2.SatelliteStreamResponse(
+        stream_id='stream-1',
+        receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+            telemetry=[
+                transport_pb2.Telemetry(
+                    framing=transport_pb2.AX25,
+                    data=b'\x01' * 300,
+                    downlink_frequency_hz=2200000000,
+                    time_first_byte_received={'seconds': 100, 'nanos': 5},
+                    frame_header=b'header'),
+                transport_pb2.Telemetry(framing=transport_pb2.BITSTREAM, data=b'\x02\x03'),
+            ],
+            plan_id='plan-1',
+            satellite_id='5',
+            ground_station_id='gs-1',
+            message_ack_id='42'))
+
+
+def test_lazy_response_matches_full_parse() -> None:
+    expected = make_telemetry_response()
+    wire = expected.SerializeToString()
+    response = LazySatelliteStreamResponse.FromString(wire)
+
+    assert response.WhichOneof('Response') == 'receive_telemetry_response'
+    assert response.HasField('receive_telemetry_response')
+    assert not response.HasField('stream_event')
+    assert response.stream_id == 'stream-1'
+
+    telemetry_response = response.receive_telemetry_response
+    assert telemetry_response.message_ack_id == '42'
+    assert telemetry_response.plan_id == 'plan-1'
+    assert telemetry_response.satellite_id == '5'
+    assert telemetry_response.ground_station_id == 'gs-1'
+    assert [bytes(tlm.data) for tlm in telemetry_response.telemetry] == [b'\x01' * 300, b'\x02\x03']
+    # Payloads are views of the received bytes, not copies.
+    assert isinstance(telemetry_response.telemetry[0].data, memoryview)
+    assert not is_end_message(telemetry_response)
+
+    # Every field of a Telemetry is read from the wire, without parsing it.
+    first = telemetry_response.telemetry[0]
+    expected_first = expected.receive_telemetry_response.telemetry[0]
+    assert first.framing == transport_pb2.AX25
+    assert first.downlink_frequency_hz == 2200000000
+    assert tuple(first.time_first_byte_received) == (100, 5)
+    assert first.HasField('time_first_byte_received')
+    assert not first.HasField('time_last_byte_received')
+    assert tuple(first.time_last_byte_received) == (0, 0)
+    assert first.frame_header == b'header'
+    assert first._message is None
+    # Other attributes of a timestamp come from a generated Timestamp.
+    assert first.time_first_byte_received.ToNanoseconds() == expected_first.time_first_byte_received.ToNanoseconds()
+
+    assert response == expected
+    assert response.full() == expected
+    assert response.SerializeToString() == wire
+
+
+def test_lazy_stream_event_falls_back_to_full_parse() -> None:
+    expected = stellarstation_pb2.SatelliteStreamResponse(
+        stream_id='stream-1',
+        stream_event=transport_pb2.StreamEvent(request_id='r1'))
+    response = LazySatelliteStreamResponse.FromString(expected.SerializeToString())
+
+    assert response.WhichOneof('Response') == 'stream_event'
+    assert response.HasField('stream_event')
+    assert response.stream_event.request_id == 'r1'
+    assert not response.receive_telemetry_response.telemetry
+
+
+def test_lazy_decode_skips_unknown_fields_and_rejects_truncated_messages() -> None:
+    wire = make_telemetry_response().SerializeToString()
+    # Unknown varint (field 20), fixed64 (21) and fixed32 (22) fields before the known ones.
+    unknown = b'\xa0\x01\x96\x01' + b'\xa9\x01' + bytes(8) + b'\xb5\x01' + bytes(4)
+    response = LazySatelliteStreamResponse.FromString(unknown + wire)
+    assert response.receive_telemetry_response.message_ack_id == '42'
+
+    with pytest.raises(DecodeError):
+        LazySatelliteStreamResponse.FromString(wire[:-3])
+    # A tag whose length is cut off.
+    with pytest.raises(DecodeError):
+        LazySatelliteStreamResponse.FromString(b'\x0a')
+    # Any truncation is either a shorter valid message or a DecodeError.
+    for length in range(len(wire)):
+        try:
+            telemetry_response = LazySatelliteStreamResponse.FromString(wire[:length]).receive_telemetry_response
+            [telemetry.data for telemetry in telemetry_response.telemetry]
+        except DecodeError:
+            pass
+
+
+def test_satellite_stream_with_lazy_stub() -> None:
+    servicer = FakeStellarStationService(message_count=20, payload_size=100)
+
+    async def consume():
+        server, port = await serve(servicer, '127.0.0.1:0')
+        try:
+            async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+                satellite_stream = SatelliteStream(LazyStellarStationServiceStub(channel), '5')
+                await satellite_stream.open()
+                async for response in satellite_stream.responses():
+                    assert isinstance(response, LazySatelliteStreamResponse)
+                    if is_end_message(response.receive_telemetry_response):
+                        break
+                await satellite_stream.close()
+                return satellite_stream
+        finally:
+            await server.stop(None)
+
+    satellite_stream = asyncio.run(consume())
+    assert satellite_stream.stats.total_telemetry_messages == 21
+    assert satellite_stream.stats.total_bytes_received == 2000
+    assert satellite_stream.last_ack_id == '19'
+    assert satellite_stream.stream_id == 'stream-1'
@@ -0,0 +1,90 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+
+import toolkit
+from fake_satellite_service import FakeStellarStationService, serve
+from multi_stream_manager import MultiSatelliteStreamManager
+
+
+async def run_manager(servicer, satellite_ids, **kwargs):
+    server, port = await serve(servicer, '127.0.0.1:0')
+    channels = []
+
+    def client_factory(connection):
+        channel = grpc.aio.insecure_channel(
+            '127.0.0.1:{}'.format(port), options=toolkit.channel_options(connection=connection))
+        channels.append(channel)
+        return stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+
+    manager = MultiSatelliteStreamManager(client_factory, **kwargs)
+    try:
+        for satellite_id in satellite_ids:
+            manager.add_satellite(satellite_id)
+        await manager.wait()
+        return manager, len(channels)
+    finally:
+        for channel in channels:
+            await channel.close()
+        await server.stop(None)
+
+
+class ListSink:
+    def __init__(self):
+        self.responses = []
+        self.closed = False
+
+    def write_response(self, telemetry_response):
+        self.responses.append(telemetry_response)
+
+    def close(self):
+        self.closed = True
+
+
+def test_manager_streams_every_satellite() -> None:
+    servicer = FakeStellarStationService(message_count=10, payload_size=50)
+    sinks = {}
+
+    def sink_factory(satellite_id):
+        sink = sinks[satellite_id] = ListSink()
+        return sink
+
+    satellite_ids = [str(i) for i in range(7)]
+    manager, connections = asyncio.run(run_manager(
+        servicer, satellite_ids, sink_factory=sink_factory, streams_per_connection=3))
+
+    assert connections == 3
+    metrics = {m['satellite_id']: m for m in manager.metrics()}
+    assert sorted(metrics) == satellite_ids
+    for satellite_id in satellite_ids:
+        assert metrics[satellite_id]['completed']
+        assert metrics[satellite_id]['error'] is None
+        assert metrics[satellite_id]['telemetry_messages'] == 11
+        assert metrics[satellite_id]['bytes_received'] == 500
+        assert len(sinks[satellite_id].responses) == 11
+        assert sinks[satellite_id].closed
+    assert servicer.streams_opened == 7
+    # Each satellite has its own stream and its own acks.
+    assert len({m['stream_id'] for m in metrics.values()}) == 7
+
+
+def test_manager_isolates_failing_satellite() -> None:
+    servicer = FakeStellarStationService(message_count=10, payload_size=10)
+
+    def handle_response(satellite_id, response):
+        if satellite_id == 'bad':
+            raise ValueError('cannot handle telemetry')
+        return response.HasField('receive_telemetry_response') and \
+            response.receive_telemetry_response.message_ack_id == '9'
+
+    manager, _ = asyncio.run(run_manager(servicer, ['good', 'bad'], handle_response=handle_response))
+
+    metrics = {m['satellite_id']: m for m in manager.metrics()}
+    assert metrics['good']['completed']
+    assert metrics['good']['telemetry_messages'] == 10
+    assert not metrics['bad']['completed']
+    assert metrics['bad']['error'] == 'cannot handle telemetry'
@@ -0,0 +1,125 @@
+# Copyright 2026 Infostellar, Inc.
+
+import random
+
+import numpy as np
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+from pass_selection import PassCandidates, ScoreWeights, select_passes
+
+Pass = getattr(stellarstation_pb2, 'Pass')
+
+
+def make_pass(ground_station_id, aos, duration=600, elevation=45.0, prices=(1.0,)):
+    return Pass(
+        aos_time={'seconds': aos},
+        los_time={'seconds': aos + duration},
+        ground_station_id=ground_station_id,
+        max_elevation_degrees=elevation,
+        channel_set_token=[Pass.ChannelSetToken(reservation_token='{}-{}-{}'.format(ground_station_id, aos, i),
+                                                unit_price=price)
+                           for i, price in enumerate(prices)])
+
+
+def plan(satellite_id, ground_station_id, aos, duration=600, status=toolkit.PlanStatus.RESERVED):
+    return stellarstation_pb2.Plan(
+        satellite_id=satellite_id,
+        ground_station_id=ground_station_id,
+        aos_time={'seconds': aos},
+        los_time={'seconds': aos + duration},
+        status=status.value)
+
+
+def test_candidates_are_pass_and_token_combinations() -> None:
+    candidates = PassCandidates.from_passes({
+        'a': [make_pass('gs1', 0, prices=(1.0, 2.0)), make_pass('gs2', 1000)],
+        'b': [],
+        'c': [make_pass('gs1', 5000, prices=(3.0,))],
+    })
+
+    assert len(candidates) == 4
+    assert [candidates.reservation_token(i) for i in range(4)] == ['gs1-0-0', 'gs1-0-1', 'gs2-1000-0', 'gs1-5000-0']
+    assert [candidates.satellite_id(i) for i in range(4)] == ['a', 'a', 'a', 'c']
+    assert [candidates.ground_station_id(i) for i in range(4)] == ['gs1', 'gs1', 'gs2', 'gs1']
+    assert list(candidates.unit_price) == [1.0, 2.0, 1.0, 3.0]
+
+
+def test_selects_best_token_and_drops_conflicts() -> None:
+    candidates = PassCandidates.from_passes({
+        'a': [make_pass('gs1', 0, elevation=80, prices=(2.0, 1.0)),
+              # Overlaps the first pass of 'a'.
+              make_pass('gs2', 300, elevation=30)],
+        # Overlaps the first pass of 'a' on the same ground station, at a lower elevation.
+        'b': [make_pass('gs1', 100, elevation=60), make_pass('gs3', 100, elevation=10)],
+    })
+
+    selected = select_passes(candidates)
+
+    assert [candidates.reservation_token(i) for i in selected] == ['gs1-0-1', 'gs3-100-0']
+
+
+def test_reserved_plans_and_filters() -> None:
+    candidates = PassCandidates.from_passes({
+        'a': [make_pass('gs1', 0, elevation=80), make_pass('gs2', 2000, elevation=5),
+              make_pass('gs2', 4000, prices=(10.0,))],
+        'b': [make_pass('gs3', 0)],
+    })
+    plans = [
+        # Another satellite on gs1 at the same time.
+        plan('z', 'gs1', 300),
+        # Canceled plans don't block.
+        plan('b', 'gs3', 0, status=toolkit.PlanStatus.CANCELED),
+    ]
+
+    selected = select_passes(candidates, ScoreWeights(min_elevation_degrees=10, max_unit_price=5.0),
+                             reserved_plans=plans)
+
+    assert [candidates.reservation_token(i) for i in selected] == ['gs3-0-0']
+
+
+def test_min_gap() -> None:
+    candidates = PassCandidates.from_passes({'a': [make_pass('gs1', 0), make_pass('gs2', 660)]})
+
+    assert len(select_passes(candidates)) == 2
+    assert len(select_passes(candidates, min_gap_seconds=120)) == 1
+
+
+def test_diversity_prefers_less_used_ground_stations() -> None:
+    candidates = PassCandidates.from_passes({'a': [make_pass('gs1', 10000), make_pass('gs2', 10100)]})
+    plans = [plan('a', 'gs1', 0), plan('a', 'gs1', 5000)]
+
+    selected = select_passes(candidates, reserved_plans=plans)
+
+    assert [candidates.ground_station_id(i) for i in selected] == ['gs2']
+
+
+def sequential_greedy(candidates, score, min_gap_ns=0):
+    selected = []
+    for i in sorted(range(len(candidates)), key=lambda i: (-score[i], i)):
+        if not np.isfinite(score[i]):
+            continue
+        if all(not ((candidates.satellite[i] == candidates.satellite[j] or
+                     candidates.ground_station[i] == candidates.ground_station[j]) and
+                    candidates.aos_ns[i] < candidates.los_ns[j] + min_gap_ns and
+                    candidates.aos_ns[j] < candidates.los_ns[i] + min_gap_ns)
+               for j in selected):
+            selected.append(i)
+    return selected
+
+
+def test_matches_sequential_greedy() -> None:
+    rng = random.Random(4)
+    passes = {
+        str(satellite): [make_pass('gs{}'.format(rng.randrange(6)), rng.randrange(86400),
+                                   duration=rng.randrange(200, 900), elevation=rng.uniform(0, 90),
+                                   prices=[rng.uniform(1, 5) for _ in range(rng.randrange(1, 3))])
+                         for _ in range(40)]
+        for satellite in range(20)
+    }
+    candidates = PassCandidates.from_passes(passes)
+    weights = ScoreWeights(min_elevation_degrees=5)
+
+    selected = select_passes(candidates, weights, min_gap_seconds=60)
+
+    assert list(selected) == sequential_greedy(candidates, candidates.score(weights), 60 * 10 ** 9)
@@ -0,0 +1,142 @@
+# Copyright 2026 Infostellar, Inc.
+
+from stellarstation.api.v1 import stellarstation_pb2
+
+import toolkit
+from plan_cache import MAX_LIST_PLANS_WINDOW_NS, PlanCache, subtract_intervals
+
+DAY = 24 * 3600
+NOW = 1000 * DAY
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakePlansClient:
+    def __init__(self, plans):
+        self.plans = plans
+        self.calls = []
+
+    def ListPlans(self, request):
+        start = request.aos_after.ToNanoseconds()
+        end = request.aos_before.ToNanoseconds()
+        assert end - start <= MAX_LIST_PLANS_WINDOW_NS
+        self.calls.append((start, end))
+        return stellarstation_pb2.ListPlansResponse(plan=[
+            plan for plan in self.plans
+            if request.satellite_id == '5' and start <= plan.aos_time.ToNanoseconds() < end])
+
+
+def plan(plan_id, aos_seconds, status=toolkit.PlanStatus.SUCCEEDED):
+    return stellarstation_pb2.Plan(
+        id=plan_id,
+        aos_time={'seconds': aos_seconds},
+        los_time={'seconds': aos_seconds + 600},
+        status=status.value)
+
+
+def test_subtract_intervals() -> None:
+    assert subtract_intervals(0, 100, []) == [(0, 100)]
+    assert subtract_intervals(0, 100, [(10, 20), (15, 30), (50, 200)]) == [(0, 10), (30, 50)]
+    assert subtract_intervals(0, 100, [(-10, 100)]) == []
+
+
+def test_past_windows_are_fetched_once_in_31_day_chunks(tmp_path) -> None:
+    clock = FakeClock(NOW)
+    client = FakePlansClient([plan(str(i), NOW - i * DAY) for i in range(1, 60)])
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, clock=clock)
+
+    plans = cache.get_plans('5', NOW - 60 * DAY, NOW)
+    assert [p.id for p in plans] == [str(i) for i in range(59, 0, -1)]
+    assert len(client.calls) == 2
+
+    # The window was entirely in the past, so it stays valid. A wider window only fetches the rest.
+    clock.now += 3600
+    assert len(cache.get_plans('5', NOW - 30 * DAY, NOW)) == 30
+    assert len(client.calls) == 2
+    cache.get_plans('5', NOW - 60 * DAY, NOW + 3600)
+    assert client.calls[2:] == [(NOW * 10 ** 9, (NOW + 3600) * 10 ** 9)]
+    assert cache.stats.queries == 3
+    assert cache.stats.queries_served_from_cache == 1
+    cache.close()
+
+    # The cache persists across processes.
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, clock=clock)
+    assert len(cache.get_plans('5', NOW - 60 * DAY, NOW, statuses=[toolkit.PlanStatus.SUCCEEDED])) == 59
+    assert len(client.calls) == 3
+
+
+def test_future_windows_and_non_terminal_plans_are_refreshed(tmp_path) -> None:
+    clock = FakeClock(NOW)
+    reserved = plan('r', NOW - DAY, toolkit.PlanStatus.RESERVED)
+    client = FakePlansClient([plan('old', NOW - 20 * DAY), reserved, plan('next', NOW + DAY)])
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, max_age=60, refresh_interval=300, clock=clock)
+
+    assert [p.id for p in cache.get_plans('5', NOW - 27 * DAY, NOW + 3 * DAY)] == ['old', 'r', 'next']
+    assert len(client.calls) == 1
+
+    # Within max_age nothing is fetched.
+    clock.now += 30
+    cache.get_plans('5', NOW - 27 * DAY, NOW + 3 * DAY)
+    assert len(client.calls) == 1
+
+    # After max_age the window reaching into the future is fetched again, and sees new plans.
+    client.plans.append(plan('new', NOW + 2 * DAY, toolkit.PlanStatus.RESERVED))
+    clock.now += 60
+    assert [p.id for p in cache.get_plans('5', NOW, NOW + 3 * DAY)] == ['next', 'new']
+    assert len(client.calls) == 2
+
+    # A window entirely in the past is fetched once. Then only the reserved plan in it is refreshed,
+    # once it is older than refresh_interval.
+    assert cache.get_plans('5', NOW - 27 * DAY, NOW)[1].status == toolkit.PlanStatus.RESERVED.value
+    assert len(client.calls) == 3
+    reserved.status = toolkit.PlanStatus.SUCCEEDED.value
+    clock.now += 100
+    assert cache.get_plans('5', NOW - 27 * DAY, NOW)[1].status == toolkit.PlanStatus.RESERVED.value
+    assert len(client.calls) == 3
+    clock.now += 300
+    assert cache.get_plans('5', NOW - 27 * DAY, NOW)[1].status == toolkit.PlanStatus.SUCCEEDED.value
+    assert client.calls[-1] == ((NOW - DAY) * 10 ** 9, (NOW - DAY) * 10 ** 9 + 1)
+
+    # max_age=0 always fetches, e.g. to confirm a change made through the API.
+    calls = len(client.calls)
+    client.plans.remove(reserved)
+    assert 'r' not in [p.id for p in cache.get_plans('5', NOW - 27 * DAY, NOW, max_age=0)]
+    assert len(client.calls) == calls + 1
+
+
+def test_query_max_age_keeps_windows_longer(tmp_path) -> None:
+    clock = FakeClock(NOW)
+    client = FakePlansClient([plan('next', NOW + DAY, toolkit.PlanStatus.RESERVED)])
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, max_age=60, refresh_interval=3600, clock=clock)
+    cache.get_plans('5', NOW, NOW + 3 * DAY)
+
+    clock.now += 120
+    cache.get_plans('5', NOW, NOW + 3 * DAY, max_age=3600)
+    assert len(client.calls) == 1
+    cache.get_plans('5', NOW, NOW + 3 * DAY)
+    assert len(client.calls) == 2
+
+
+def test_telemetry_urls_are_not_cached(tmp_path) -> None:
+    listed = plan('1', NOW - DAY)
+    listed.telemetry_metadata.add(url='https://example.com/1')
+    client = FakePlansClient([listed])
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, clock=FakeClock(NOW))
+
+    assert not cache.get_plans('5', NOW - 2 * DAY, NOW)[0].telemetry_metadata
+    reserved = plan('2', NOW - DAY // 2)
+    reserved.telemetry_metadata.add(url='https://example.com/2')
+    cache.put('5', reserved)
+    assert reserved.telemetry_metadata
+    cache.close()
+
+    cache = PlanCache(str(tmp_path / 'plans.db'), client, clock=FakeClock(NOW))
+    plans = cache.get_plans('5', NOW - 2 * DAY, NOW)
+    assert [p.id for p in plans] == ['1', '2']
+    assert not any(p.telemetry_metadata for p in plans)
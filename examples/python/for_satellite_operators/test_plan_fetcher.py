@@ -0,0 +1,121 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1.groundstation import groundstation_pb2
+
+from plan_cache import MAX_LIST_PLANS_WINDOW_NS
+from plan_fetcher import PlanFetcher, ground_station_plans_request
+from stream_supervisor import Backoff
+
+DAY = 24 * 3600
+NOW = 1000 * DAY
+
+
+class FakeAsyncPlansClient:
+    def __init__(self, plans_by_id, failures=None, delay=0.01):
+        self.plans_by_id = plans_by_id
+        # Status codes to fail the next calls with.
+        self.failures = list(failures or [])
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ListPlans(self, request, timeout=None):
+        plans_of = request.ground_station_id if isinstance(request, groundstation_pb2.ListPlansRequest) \
+            else request.satellite_id
+        start = request.aos_after.ToNanoseconds()
+        end = request.aos_before.ToNanoseconds()
+        assert end - start <= MAX_LIST_PLANS_WINDOW_NS
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.failures:
+            raise grpc.aio.AioRpcError(self.failures.pop(0), grpc.aio.Metadata(), grpc.aio.Metadata())
+        self.calls.append((plans_of, start, end))
+        # Both ends are inclusive, so plans on chunk boundaries are listed twice.
+        response_class = groundstation_pb2.ListPlansResponse if isinstance(request, groundstation_pb2.ListPlansRequest) \
+            else stellarstation_pb2.ListPlansResponse
+        return response_class(plan=[
+            plan for plan in self.plans_by_id.get(plans_of, [])
+            if start <= plan.aos_time.ToNanoseconds() <= end])
+
+
+def plan(plan_id, aos_seconds):
+    return stellarstation_pb2.Plan(id=plan_id, aos_time={'seconds': aos_seconds}, los_time={'seconds': aos_seconds + 600})
+
+
+def no_backoff():
+    return Backoff(initial=0, jitter=0)
+
+
+def test_fetches_every_satellite_and_chunk_concurrently() -> None:
+    satellites = [str(i) for i in range(10)]
+    plans_by_id = {
+        satellite: [plan('{}-{}'.format(satellite, day), NOW - day * DAY) for day in range(0, 91, 5)]
+        for satellite in satellites
+    }
+    client = FakeAsyncPlansClient(plans_by_id)
+    fetcher = PlanFetcher(client, concurrency=8)
+
+    plans = asyncio.run(fetcher.fetch_all(satellites, NOW - 90 * DAY, NOW))
+
+    # 90 days are 3 chunks.
+    assert len(client.calls) == 30
+    assert client.max_in_flight == 8
+    expected = sorted((p for ps in plans_by_id.values() for p in ps),
+                      key=lambda p: (p.aos_time.ToNanoseconds(), p.id))
+    assert [p.id for p in plans] == [p.id for p in expected]
+    # The plans on the two inner chunk boundaries of each satellite were listed twice.
+    assert fetcher.stats.plans_fetched == len(expected) + fetcher.stats.duplicates
+    assert fetcher.stats.requests == 30
+
+
+def test_streams_plans_as_chunks_arrive() -> None:
+    client = FakeAsyncPlansClient({'1': [plan('a', NOW - DAY)], '2': [plan('b', NOW - DAY)]}, delay=0.2)
+    fetcher = PlanFetcher(client, concurrency=1)
+
+    async def first():
+        async for p in fetcher.fetch(['1', '2'], NOW - 2 * DAY, NOW):
+            # Returned before the second call is made; leaving the loop cancels it.
+            return p.id, len(client.calls)
+
+    assert asyncio.run(first()) == ('a', 1)
+    assert len(client.calls) == 1
+
+
+def test_ground_station_plans() -> None:
+    client = FakeAsyncPlansClient({'gs': [groundstation_pb2.Plan(plan_id='p', aos_time={'seconds': NOW - DAY})]})
+    fetcher = PlanFetcher(client, make_request=ground_station_plans_request)
+
+    plans = asyncio.run(fetcher.fetch_all(['gs'], NOW - 40 * DAY, NOW))
+
+    assert [p.plan_id for p in plans] == ['p']
+    assert len(client.calls) == 2
+
+
+def test_retries_transient_errors() -> None:
+    client = FakeAsyncPlansClient({'1': [plan('a', NOW - DAY)]},
+                                  failures=[grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED])
+    fetcher = PlanFetcher(client, backoff_factory=no_backoff)
+
+    plans = asyncio.run(fetcher.fetch_all(['1'], NOW - 2 * DAY, NOW))
+
+    assert [p.id for p in plans] == ['a']
+    assert fetcher.stats.retries == 2
+
+
+def test_permanent_error_is_raised() -> None:
+    client = FakeAsyncPlansClient({}, failures=[grpc.StatusCode.INVALID_ARGUMENT])
+    fetcher = PlanFetcher(client, backoff_factory=no_backoff)
+
+    with pytest.raises(grpc.aio.AioRpcError) as error:
+        asyncio.run(fetcher.fetch_all(['1', '2'], NOW - 2 * DAY, NOW))
+    assert error.value.code() == grpc.StatusCode.INVALID_ARGUMENT
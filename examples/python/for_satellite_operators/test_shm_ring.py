@@ -0,0 +1,128 @@
+# Copyright 2026 Infostellar, Inc.
+
+import multiprocessing
+import subprocess
+import sys
+
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2, transport_pb2
+
+from shm_ring import SLOT_PID_OFFSET, SLOTS_OFFSET, RingConsumer, TelemetryRing
+
+
+def frames_of(consumer, max_frames=None):
+    return [(frame.sequence, frame.plan_id, frame.framing, bytes(frame.data))
+            for frame in consumer.frames(max_frames)]
+
+
+def test_consumers_read_with_their_own_cursors() -> None:
+    with TelemetryRing(size=4096, max_consumers=2) as ring:
+        first = RingConsumer(ring.name, 0)
+        ring.publish_response(stellarstation_pb2.ReceiveTelemetryResponse(plan_id='p', telemetry=[
+            transport_pb2.Telemetry(framing=transport_pb2.AX25, data=b'one', time_first_byte_received={'seconds': 2}),
+            transport_pb2.Telemetry(framing=transport_pb2.IQ, data=b'two'),
+        ]))
+        second = RingConsumer(ring.name, 1)
+        ring.publish('p', transport_pb2.BITSTREAM, b'three')
+
+        assert frames_of(first, max_frames=1) == [(0, 'p', transport_pb2.AX25, b'one')]
+        assert [lag['lag_frames'] for lag in ring.lag()] == [2, 1]
+        # The second consumer only sees frames published after it attached.
+        assert frames_of(second) == [(2, 'p', transport_pb2.BITSTREAM, b'three')]
+        assert frames_of(first) == [(1, 'p', transport_pb2.IQ, b'two'), (2, 'p', transport_pb2.BITSTREAM, b'three')]
+        assert first.lag() == (0, 0)
+        assert [lag['frames_read'] for lag in ring.lag()] == [3, 1]
+        first.close()
+        second.close()
+        assert ring.lag() == []
+
+
+def test_slot_of_a_running_consumer_is_not_taken() -> None:
+    with TelemetryRing(size=4096, max_consumers=2) as ring:
+        first = RingConsumer(ring.name, 0)
+        with pytest.raises(ValueError):
+            RingConsumer(ring.name, 0)
+
+        # The slot of a consumer whose process is gone can be taken.
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        ring._shm.buf[SLOTS_OFFSET + SLOT_PID_OFFSET:SLOTS_OFFSET + SLOT_PID_OFFSET + 8] = exited.pid.to_bytes(8, 'little')
+        second = RingConsumer(ring.name, 0)
+        ring.publish('p', transport_pb2.BITSTREAM, b'one')
+        assert frames_of(second) == [(0, 'p', transport_pb2.BITSTREAM, b'one')]
+        second.close()
+        first.close()
+
+
+def test_records_wrap_and_slow_consumers_cause_drops() -> None:
+    with TelemetryRing(size=1024, max_consumers=1) as ring:
+        consumer = RingConsumer(ring.name, 0)
+        received = []
+        for i in range(100):
+            # 300 bytes a frame, so the records wrap at different offsets.
+            assert ring.publish('plan', transport_pb2.IQ, bytes([i]) * 300)
+            received += [data[0] for _, _, _, data in frames_of(consumer)]
+        assert received == list(range(100))
+
+        # Nobody reads: once the ring is full, frames are dropped.
+        results = [ring.publish('plan', transport_pb2.IQ, bytes(300)) for _ in range(5)]
+        assert results == [True, True, True, False, False]
+        assert ring.dropped == 2
+        sequences = [sequence for sequence, _, _, _ in frames_of(consumer)]
+        assert sequences == [100, 101, 102]
+        assert ring.publish('plan', transport_pb2.IQ, bytes(300))
+        # The dropped frames show as a gap in the sequence numbers.
+        assert [sequence for sequence, _, _, _ in frames_of(consumer)] == [105]
+        consumer.close()
+
+        with pytest.raises(ValueError):
+            ring.publish('plan', transport_pb2.IQ, bytes(2000))
+
+
+def test_frame_is_released_when_the_next_is_requested() -> None:
+    with TelemetryRing(size=1024, max_consumers=1) as ring:
+        consumer = RingConsumer(ring.name, 0)
+        ring.publish('p', transport_pb2.IQ, b'a' * 600)
+        frames = consumer.frames()
+        frame = next(frames)
+        # The frame being processed isn't overwritten.
+        assert not ring.publish('p', transport_pb2.IQ, b'b' * 600)
+        assert bytes(frame.data) == b'a' * 600
+        assert list(frames) == []
+        with pytest.raises(ValueError):
+            bytes(frame.data)
+        assert ring.publish('p', transport_pb2.IQ, b'b' * 600)
+        consumer.close()
+
+
+def consume(name, slot, count, results):
+    with RingConsumer(name, slot) as consumer:
+        total = 0
+        read = 0
+        while read < count:
+            consumer.wait(timeout=10)
+            for frame in consumer.frames():
+                total += sum(frame.data)
+                read += 1
+        results.put((slot, read, total))
+
+
+def test_consumer_processes() -> None:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    with TelemetryRing(size=64 * 1024, max_consumers=2) as ring:
+        processes = [context.Process(target=consume, args=(ring.name, slot, 200, results)) for slot in range(2)]
+        for process in processes:
+            process.start()
+        # Waits for both consumers to attach before publishing.
+        while len(ring.lag()) < 2:
+            pass
+        published = 0
+        while published < 200:
+            published += ring.publish('p', transport_pb2.IQ, bytes([published % 256]) * 1000)
+        outcome = sorted(results.get(timeout=30) for _ in processes)
+        for process in processes:
+            process.join(timeout=10)
+
+    expected = sum((i % 256) * 1000 for i in range(200))
+    assert outcome == [(0, 200, expected), (1, 200, expected)]
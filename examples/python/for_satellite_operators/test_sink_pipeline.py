@@ -0,0 +1,211 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import socket
+import threading
+
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from sink_pipeline import (BLOCK, DROP_OLDEST, SPILL, FileStage, SinkPipeline, Stage, StdoutStage,
+                           UdpForwardStage, parse_stages)
+from telemetry_sink import read_telemetry_file
+
+
+def telemetry_response(index, data=b'data'):
+    return stellarstation_pb2.ReceiveTelemetryResponse(
+        plan_id='p1', message_ack_id=str(index),
+        telemetry=[transport_pb2.Telemetry(framing=transport_pb2.BITSTREAM, data=data)])
+
+
+# Records what it processes, and waits for `release` before each response.
+class HeldStage(Stage):
+    name = 'held'
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.processed = []
+        self.closed = False
+
+    def process(self, telemetry_response, token):
+        self.release.wait()
+        self.processed.append((telemetry_response.message_ack_id, token))
+
+    def close(self):
+        self.closed = True
+
+
+def test_every_stage_gets_every_response_in_order() -> None:
+    received = []
+    stage = HeldStage()
+    stage.release.set()
+
+    with SinkPipeline() as pipeline:
+        pipeline.add(stage, max_queue=2)
+        pipeline.add(lambda response: received.append(response.message_ack_id), name='collect')
+        for i in range(100):
+            pipeline.submit(telemetry_response(i), token=i)
+
+    assert stage.processed == [(str(i), i) for i in range(100)]
+    assert stage.closed
+    assert received == [str(i) for i in range(100)]
+    held_stats, collect_stats = pipeline.stats()
+    assert collect_stats.name == 'collect'
+    assert (held_stats.submitted, held_stats.processed, held_stats.dropped) == (100, 100, 0)
+    assert held_stats.bytes_processed == 400
+    assert held_stats.max_queue_depth <= 2
+    assert held_stats.queue_depth == 0
+    assert 'policy = block' in str(held_stats)
+
+
+def test_submit_async_waits_for_room_without_blocking_the_loop() -> None:
+    stage = HeldStage()
+    pipeline = SinkPipeline()
+    pipeline.add(stage, max_queue=1)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        # The stage holds the first response and the second fills the queue, so the third waits.
+        for i in range(2):
+            await pipeline.submit_async(telemetry_response(i))
+        submit = asyncio.ensure_future(pipeline.submit_async(telemetry_response(2)))
+        await asyncio.sleep(0.1)
+        waiting, ticks_while_waiting = not submit.done(), ticks
+        stage.release.set()
+        await submit
+        ticker.cancel()
+        return waiting, ticks_while_waiting
+
+    waiting, ticks_while_waiting = asyncio.run(run())
+    pipeline.close()
+
+    assert waiting
+    assert ticks_while_waiting >= 5
+    assert [ack_id for ack_id, _ in stage.processed] == ['0', '1', '2']
+
+
+def test_flush_waits_for_queued_responses(tmp_path) -> None:
+    stage = HeldStage()
+    pipeline = SinkPipeline()
+    pipeline.add(stage, max_queue=10)
+    pipeline.add(FileStage(str(tmp_path)))
+    for i in range(5):
+        pipeline.submit(telemetry_response(i))
+
+    flusher = threading.Thread(target=pipeline.flush)
+    flusher.start()
+    flusher.join(0.2)
+    assert flusher.is_alive()
+    stage.release.set()
+    flusher.join()
+
+    assert len(stage.processed) == 5
+    # The FileStage's buffered records are written, before the pipeline is closed.
+    _, _, records = read_telemetry_file(str(tmp_path / 'p1' / 'BITSTREAM-0000.tlm'))
+    assert len(list(records)) == 5
+    pipeline.close()
+
+
+def test_drop_oldest_keeps_the_newest_responses() -> None:
+    stage = HeldStage()
+    pipeline = SinkPipeline()
+    pipeline.add(stage, policy=DROP_OLDEST, max_queue=3)
+
+    for i in range(10):
+        pipeline.submit(telemetry_response(i))
+    stage.release.set()
+    pipeline.close()
+
+    stats = pipeline.stats()[0]
+    assert stats.processed + stats.dropped == 10
+    assert stats.dropped >= 6
+    assert [ack_id for ack_id, _ in stage.processed[-3:]] == ['7', '8', '9']
+
+
+def test_spilled_responses_are_processed_in_order(tmp_path) -> None:
+    stage = HeldStage()
+    pipeline = SinkPipeline(spill_directory=str(tmp_path))
+    pipeline.add(stage, policy=SPILL, max_queue=2)
+
+    for i in range(50):
+        pipeline.submit(telemetry_response(i, bytes([i]) * 100), token=('gs', 'p1', float(i)))
+    stats = pipeline.stats()[0]
+    assert stats.spilled >= 47
+    assert stats.queue_depth >= 49
+    stage.release.set()
+    pipeline.close()
+
+    assert stage.processed == [(str(i), ('gs', 'p1', float(i))) for i in range(50)]
+    assert stats.dropped == 0
+    assert stats.queue_depth == 0
+
+
+def test_blocked_submit_waits_for_room() -> None:
+    stage = HeldStage()
+    pipeline = SinkPipeline()
+    pipeline.add(stage, policy=BLOCK, max_queue=1)
+    for i in range(2):
+        pipeline.submit(telemetry_response(i))
+
+    submitter = threading.Thread(target=pipeline.submit, args=(telemetry_response(2),))
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive()
+    stage.release.set()
+    submitter.join()
+    pipeline.close()
+
+    assert [ack_id for ack_id, _ in stage.processed] == ['0', '1', '2']
+    assert pipeline.stats()[0].blocked_seconds >= 0.1
+
+
+def test_stage_error_is_raised() -> None:
+    def fail(response):
+        raise RuntimeError('broken')
+
+    pipeline = SinkPipeline()
+    pipeline.add(fail, max_queue=1)
+    pipeline.submit(telemetry_response(0))
+
+    with pytest.raises(IOError):
+        for i in range(1, 10):
+            pipeline.submit(telemetry_response(i))
+        pipeline.close()
+
+
+def test_built_in_stages(tmp_path, capsys) -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(5)
+
+        with SinkPipeline() as pipeline:
+            pipeline.add(FileStage(str(tmp_path)))
+            pipeline.add(UdpForwardStage(receiver.getsockname(), max_datagram_size=3))
+            pipeline.add(StdoutStage())
+            pipeline.submit(telemetry_response(0, b'abcde'))
+
+        assert [receiver.recv(100) for _ in range(2)] == [b'abc', b'de']
+
+    _, _, records = read_telemetry_file(str(tmp_path / 'p1' / 'BITSTREAM-0000.tlm'))
+    assert [record.data for record in records] == [b'abcde']
+    assert 'Plan p1, message 0: 1 telemetry, 5 bytes' in capsys.readouterr().out
+
+
+def test_parse_stages(tmp_path) -> None:
+    stages = parse_stages('file:{},stdout,udp:127.0.0.1:5000'.format(tmp_path))
+
+    assert [stage.name for stage in stages] == ['file', 'stdout', 'udp']
+    assert stages[2].address == ('127.0.0.1', 5000)
+    for stage in stages:
+        stage.close()
+    with pytest.raises(ValueError):
+        parse_stages('kafka')
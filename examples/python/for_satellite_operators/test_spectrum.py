@@ -0,0 +1,77 @@
+# Copyright 2026 Infostellar, Inc.
+
+import numpy as np
+import pytest
+from stellarstation.api.v1 import transport_pb2
+
+from spectrum import SpectrumAnalyzer
+
+
+def tone(count, frequency, amplitude=1.0, start=0):
+    n = np.arange(start, start + count)
+    return (amplitude * np.exp(2j * np.pi * frequency * n)).astype(np.complex64)
+
+
+def test_tone_peak_and_level() -> None:
+    analyzer = SpectrumAnalyzer(fft_size=256, average=4, rows=8)
+    # A tone in the middle of bin 32 above the center.
+    assert analyzer.feed(tone(256 * 8, 32 / 256)) == 2
+
+    spectrum = analyzer.spectrum()
+    assert np.argmax(spectrum) == 128 + 32
+    assert spectrum.max() == pytest.approx(0, abs=0.01)
+    assert np.median(spectrum) < -60
+
+
+def test_chunks_of_any_size_give_the_same_waterfall() -> None:
+    samples = tone(256 * 40, 0.1) + tone(256 * 40, -0.3, 0.01)
+    whole = SpectrumAnalyzer(fft_size=256, bins=64, average=3, rows=10, window='blackman')
+    whole.feed(samples)
+    chunked = SpectrumAnalyzer(fft_size=256, bins=64, average=3, rows=10, window='blackman')
+    for start in range(0, len(samples), 1000):
+        chunked.feed(samples[start:start + 1000], time_ns=start)
+
+    rows, times = chunked.waterfall()
+    assert rows.shape == (10, 64)
+    np.testing.assert_allclose(rows, whole.waterfall()[0], atol=1e-3)
+    # 40 frames make 13 rows, of which the last 10 are kept, oldest first.
+    assert chunked.stats.rows == 13
+    assert list(times) == sorted(times)
+    np.testing.assert_allclose(chunked.spectrum(), rows[-1])
+
+
+def test_iq_telemetry_split_samples_and_waterfall_payloads() -> None:
+    samples = (tone(512, 0.25) * 1000).view(np.float32).astype('<i2').tobytes()
+    analyzer = SpectrumAnalyzer(fft_size=128, average=1, sample_format='ci16', scale=1 / 1000)
+
+    for start in range(0, len(samples), 301):
+        analyzer.feed_telemetry(transport_pb2.Telemetry(framing=transport_pb2.IQ, data=samples[start:start + 301]))
+    analyzer.feed_telemetry(transport_pb2.Telemetry(framing=transport_pb2.WATERFALL, data=b'png'))
+    analyzer.feed_telemetry(transport_pb2.Telemetry(framing=transport_pb2.AX25, data=b'frame'))
+
+    assert analyzer.stats.samples == 512
+    assert analyzer.stats.rows == 4
+    assert np.argmax(analyzer.spectrum()) == 64 + 32
+    assert analyzer.last_waterfall == b'png'
+
+
+def test_frames_are_skipped_over_cpu_budget() -> None:
+    now = [0.0]
+
+    # Every feed takes 0.1s of a 0.2s interval between feeds, 50% CPU.
+    def clock():
+        now[0] += 0.1
+        return now[0]
+
+    analyzer = SpectrumAnalyzer(fft_size=64, average=1, cpu_budget=0.1, budget_interval=0.5, clock=clock)
+    for _ in range(20):
+        analyzer.feed(tone(64 * 16, 0.1))
+
+    assert analyzer.stride > 1
+    assert analyzer.stats.frames_skipped > 0
+    assert analyzer.stats.frames + analyzer.stats.frames_skipped == 20 * 16
+
+
+def test_invalid_bins() -> None:
+    with pytest.raises(ValueError):
+        SpectrumAnalyzer(fft_size=256, bins=100)
@@ -0,0 +1,91 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import io
+
+import grpc
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from fake_satellite_service import FakeStellarStationService, serve
+from stream_benchmarker import ReportWriter, StreamBenchmark, benchmark_stream, parse_duration
+
+
+def telemetry_response(frames, plan_id='1'):
+    return stellarstation_pb2.ReceiveTelemetryResponse(
+        plan_id=plan_id,
+        telemetry=[
+            transport_pb2.Telemetry(
+                data=bytes(size),
+                time_first_byte_received={'seconds': int(first), 'nanos': int(first % 1 * 1e9)},
+                time_last_byte_received={'seconds': int(last), 'nanos': int(last % 1 * 1e9)})
+            for size, first, last in frames])
+
+
+def test_parse_duration() -> None:
+    assert parse_duration('500ms') == 0.5
+    assert parse_duration('10s') == 10
+    assert parse_duration('2m') == 120
+    assert parse_duration('1h') == 3600
+    assert parse_duration('1.5') == 1.5
+
+
+def test_benchmark_reports_intervals_gaps_and_latency() -> None:
+    benchmark = StreamBenchmark(gap_threshold=1.0)
+    benchmark.on_telemetry_response(telemetry_response([(100, 100.0, 100.5), (100, 100.5, 101.0)]), received_at=101.5)
+    # 3 seconds after the previous frame ended: a gap.
+    benchmark.on_telemetry_response(telemetry_response([(200, 104.0, 104.5)]), received_at=105.0)
+    # Earlier than the previous frame: out of order.
+    benchmark.on_telemetry_response(telemetry_response([(50, 103.0, 103.5)]), received_at=105.5)
+
+    interval = benchmark.report(now=103.5)
+    assert interval.total_bytes == 450
+    assert interval.frames == 4
+    assert interval.bytes_per_second == 225
+    assert interval.frames_per_second == 2
+    assert interval.gaps == 1
+    assert interval.longest_gap == 3.0
+    assert interval.out_of_order == 1
+    assert abs(interval.first_byte_latency - (1.5 + 1.0 + 1.0 + 2.5) / 4) < 1e-6
+    assert abs(interval.last_byte_latency - (1.0 + 0.5 + 0.5 + 2.0) / 4) < 1e-6
+
+    # The end-of-data message is not counted.
+    benchmark.on_telemetry_response(telemetry_response([(0, 0, 0)]), received_at=106.0)
+    benchmark.on_telemetry_response(telemetry_response([(100, 105.0, 105.5)]), received_at=106.0)
+    assert benchmark.report(now=104.5).frames == 1
+    assert benchmark.idle_time(now=110.0) == 4.0
+
+    ended = benchmark.end_pass()
+    assert not benchmark.pass_started
+    assert benchmark.passes == [ended]
+    assert ended.total_bytes == 550
+    assert ended.frames == 5
+    assert ended.gaps == 1
+    assert ended.start == 101.5
+    assert ended.end == 106.0
+
+
+def test_benchmark_stream_against_fake_service() -> None:
+    servicer = FakeStellarStationService(message_count=50, payload_size=100, messages_per_second=200)
+    output = io.StringIO()
+
+    async def run():
+        server, port = await serve(servicer, '127.0.0.1:0')
+        try:
+            async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+                return await benchmark_stream(
+                    stellarstation_pb2_grpc.StellarStationServiceStub(channel), '5', ReportWriter(output),
+                    interval=0.1, end_after=0.2, exit_after_pass=True)
+        finally:
+            await server.stop(None)
+
+    benchmark = asyncio.run(run())
+
+    assert len(benchmark.passes) == 1
+    assert benchmark.passes[0].total_bytes == 5000
+    assert benchmark.passes[0].frames == 50
+    report = output.getvalue()
+    assert 'Pass 1:' in report
+    assert 'Pass Summary:' in report
+    assert 'Overall Summary:' in report
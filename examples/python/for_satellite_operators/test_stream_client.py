@@ -0,0 +1,107 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+
+from ack_policy import CountAckPolicy
+from fake_satellite_service import FakeStellarStationService, serve
+from stream_client import SatelliteStream, is_end_message
+
+
+async def run_stream(servicer, consume, **kwargs):
+    server, port = await serve(servicer, '127.0.0.1:0')
+    try:
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+            satellite_stream = SatelliteStream(client, '5', **kwargs)
+            await consume(satellite_stream)
+            return satellite_stream
+    finally:
+        await server.stop(None)
+
+
+async def read_until_end(satellite_stream):
+    await satellite_stream.open()
+    try:
+        async for response in satellite_stream.responses():
+            if response.HasField('receive_telemetry_response') and \
+                    is_end_message(response.receive_telemetry_response):
+                break
+    finally:
+        await satellite_stream.close()
+
+
+def test_stream_acks_every_message() -> None:
+    servicer = FakeStellarStationService(message_count=20, payload_size=100)
+    satellite_stream = asyncio.run(run_stream(servicer, read_until_end))
+
+    stats = satellite_stream.stats
+    assert stats.total_telemetry_messages == 21
+    assert stats.total_bytes_received == 2000
+    # The end message is not acked since the consumer stopped reading at it.
+    assert stats.total_acks_sent == 20
+    assert satellite_stream.last_ack_id == '19'
+    assert satellite_stream.stream_id == 'stream-1'
+
+    acks = [r.telemetry_received_ack.message_ack_id for r in servicer.requests
+            if r.HasField('telemetry_received_ack')]
+    assert acks == [str(i) for i in range(20)]
+
+
+def test_stream_coalesces_acks() -> None:
+    servicer = FakeStellarStationService(message_count=25, payload_size=10)
+    satellite_stream = asyncio.run(run_stream(servicer, read_until_end, ack_policy=CountAckPolicy(10)))
+
+    acks = [r.telemetry_received_ack.message_ack_id for r in servicer.requests
+            if r.HasField('telemetry_received_ack')]
+    assert acks == ['9', '19']
+    assert satellite_stream.stats.total_acks_sent == 2
+    # Messages 20..24 are processed but their ack is still pending.
+    assert satellite_stream.last_ack_id == '24'
+
+
+def test_stream_resumes_after_last_ack() -> None:
+    servicer = FakeStellarStationService(message_count=10, payload_size=10)
+
+    async def consume(satellite_stream):
+        await satellite_stream.open()
+        async for response in satellite_stream.responses():
+            if response.receive_telemetry_response.message_ack_id == '4':
+                break
+        await satellite_stream.close()
+        await read_until_end(satellite_stream)
+
+    satellite_stream = asyncio.run(run_stream(servicer, consume))
+
+    resume = [r for r in servicer.requests if r.stream_id]
+    assert len(resume) == 1
+    assert resume[0].stream_id == 'stream-1'
+    assert resume[0].resume_stream_message_ack_id == '3'
+    # Messages 4..9 are delivered again, plus the end message.
+    assert satellite_stream.stats.total_telemetry_messages == 5 + 7
+    assert satellite_stream.last_ack_id == '9'
+
+
+def test_stream_sends_commands() -> None:
+    servicer = FakeStellarStationService(message_count=5)
+
+    async def consume(satellite_stream):
+        await satellite_stream.open()
+        await satellite_stream.send_commands([b'\x01\x02'] * 3, channel_set_id='7', request_id='r1')
+        try:
+            async for response in satellite_stream.responses():
+                if response.HasField('stream_event'):
+                    assert response.stream_event.request_id == 'r1'
+                    break
+        finally:
+            await satellite_stream.close()
+
+    satellite_stream = asyncio.run(run_stream(servicer, consume))
+
+    commands = [r for r in servicer.requests if r.HasField('send_satellite_commands_request')]
+    assert len(commands) == 1
+    assert list(commands[0].send_satellite_commands_request.command) == [b'\x01\x02'] * 3
+    assert satellite_stream.stats.total_stream_events == 1
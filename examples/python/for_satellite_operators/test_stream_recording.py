@@ -0,0 +1,134 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import time
+
+import grpc
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+from stellarstation.api.v1 import transport_pb2
+
+from fake_satellite_service import FakeStellarStationService, serve
+from ack_policy import CountAckPolicy
+from stream_client import SatelliteStream, is_end_message
+from stream_recording import (ReplayStellarStationService, RecordingStellarStationServiceStub, StreamRecorder,
+                              read_recording, serve_replay)
+
+
+async def receive_all(client, resume_stream_message_ack_id=None, ack_policy=None):
+    satellite_stream = SatelliteStream(client, '5', resume_stream_message_ack_id=resume_stream_message_ack_id,
+                                       ack_policy=ack_policy)
+    await satellite_stream.open()
+    received = []
+    try:
+        async for response in satellite_stream.responses():
+            telemetry_response = response.receive_telemetry_response
+            if is_end_message(telemetry_response):
+                break
+            received.append(telemetry_response.message_ack_id)
+    finally:
+        await satellite_stream.close()
+    return received
+
+
+async def record(path, message_count):
+    server, port = await serve(FakeStellarStationService(message_count=message_count), '127.0.0.1:0')
+    try:
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            with StreamRecorder(path) as recorder:
+                return await receive_all(RecordingStellarStationServiceStub(channel, recorder))
+    finally:
+        await server.stop(None)
+
+
+async def replay(servicer, resume_stream_message_ack_id=None, ack_policy=None):
+    server, port = await serve_replay(servicer, '127.0.0.1:0')
+    try:
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+            received = await receive_all(client, resume_stream_message_ack_id, ack_policy)
+            # Let the last acks reach the server.
+            await asyncio.sleep(0.1)
+            return received
+    finally:
+        await server.stop(None)
+
+
+def test_recorded_stream_is_replayed(tmp_path) -> None:
+    path = str(tmp_path / 'pass.ssrec')
+    recorded = asyncio.run(record(path, 20))
+
+    records = read_recording(path)
+    assert recorded == [str(i) for i in range(20)]
+    # 20 messages and the end message.
+    assert len(records) == 21
+    arrival_times = [arrival_ns for arrival_ns, _ in records]
+    assert arrival_times == sorted(arrival_times)
+    response = stellarstation_pb2.SatelliteStreamResponse.FromString(records[3][1])
+    assert response.receive_telemetry_response.message_ack_id == '3'
+
+    servicer = ReplayStellarStationService(records, speed=None)
+    assert asyncio.run(replay(servicer)) == recorded
+    assert servicer.responses_sent == 21
+    assert servicer.acked == recorded
+
+    resumed = ReplayStellarStationService(records, speed=None)
+    assert asyncio.run(replay(resumed, resume_stream_message_ack_id='14')) == recorded[15:]
+
+
+def test_replay_waits_for_acks(tmp_path) -> None:
+    path = str(tmp_path / 'pass.ssrec')
+    asyncio.run(record(path, 30))
+    records = read_recording(path)
+
+    servicer = ReplayStellarStationService(records, speed=None, ack_window=5)
+    assert asyncio.run(replay(servicer)) == [str(i) for i in range(30)]
+    assert servicer.acked == [str(i) for i in range(30)]
+
+    # Acks for every 10 messages never come within a window of 5, so the replay stalls.
+    stalled = ReplayStellarStationService(records, speed=None, ack_window=5)
+
+    async def replay_briefly():
+        return await asyncio.wait_for(replay(stalled, ack_policy=CountAckPolicy(10)), 1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(replay_briefly())
+    assert stalled.responses_sent == 5
+    assert stalled.acked == []
+
+
+def test_replay_keeps_the_recorded_pace(tmp_path) -> None:
+    path = str(tmp_path / 'pass.ssrec')
+    with StreamRecorder(path) as recorder:
+        for i in range(5):
+            recorder.record(stellarstation_pb2.SatelliteStreamResponse(
+                receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+                    message_ack_id=str(i))).SerializeToString(), arrival_ns=i * 100000000)
+        recorder.record(stellarstation_pb2.SatelliteStreamResponse(
+            receive_telemetry_response=stellarstation_pb2.ReceiveTelemetryResponse(
+                telemetry=[transport_pb2.Telemetry()])).SerializeToString(),
+            arrival_ns=800000000)
+
+    # 0.8 seconds at twice the speed.
+    started = time.monotonic()
+    received = asyncio.run(replay(ReplayStellarStationService(read_recording(path), speed=2)))
+    elapsed = time.monotonic() - started
+
+    assert received == ['0', '1', '2', '3', '4']
+    assert 0.4 <= elapsed < 2
+
+
+def test_truncated_recording_is_read_up_to_the_last_whole_record(tmp_path) -> None:
+    path = str(tmp_path / 'pass.ssrec')
+    with StreamRecorder(path) as recorder:
+        recorder.record(b'first', 1)
+        recorder.record(b'second', 2)
+    with open(path, 'rb+') as f:
+        f.truncate(f.seek(0, 2) - 1)
+
+    assert read_recording(path) == [(1, b'first')]
+    with open(path, 'wb') as f:
+        f.write(b'other')
+    with pytest.raises(ValueError):
+        read_recording(path)
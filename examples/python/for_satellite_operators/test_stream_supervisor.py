@@ -0,0 +1,158 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+
+import grpc
+import pytest
+
+from stellarstation.api.v1 import stellarstation_pb2_grpc
+
+from ack_policy import CountAckPolicy
+from fake_satellite_service import FakeStellarStationService, serve
+from stream_client import SatelliteStream, is_end_message
+from stream_supervisor import Backoff, CheckpointStore, RecoveryMetrics, StreamSupervisor
+
+
+# Raised by the handler to stop the client as if its process had been killed.
+class Killed(Exception):
+    pass
+
+
+def no_wait_backoff():
+    return Backoff(initial=0.001, maximum=0.01)
+
+
+async def supervise(servicer, checkpoint_store=None, kill_at=None, max_attempts=None, ack_policy=None,
+                    before_checkpoint=None):
+    received = []
+
+    def handle_response(response):
+        if not response.HasField('receive_telemetry_response'):
+            return False
+        telemetry_response = response.receive_telemetry_response
+        if is_end_message(telemetry_response):
+            return True
+        if telemetry_response.message_ack_id == kill_at:
+            raise Killed()
+        received.append(telemetry_response.message_ack_id)
+        return False
+
+    server, port = await serve(servicer, '127.0.0.1:0')
+    try:
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+            supervisor = StreamSupervisor(
+                SatelliteStream(client, '5', ack_policy=ack_policy), handle_response, checkpoint_store=checkpoint_store,
+                backoff=no_wait_backoff(), max_attempts=max_attempts,
+                before_checkpoint=before_checkpoint)
+            completed = await supervisor.run()
+            return supervisor, received, completed
+    finally:
+        await server.stop(None)
+
+
+def test_backoff_grows_and_resets() -> None:
+    backoff = Backoff(initial=1, maximum=5, jitter=0)
+    assert [backoff.next_delay() for _ in range(5)] == [1, 2, 4, 5, 5]
+    backoff.reset()
+    assert backoff.next_delay() == 1
+
+    jittered = Backoff(initial=1, jitter=1, rng=lambda: 0.25)
+    assert jittered.next_delay() == 0.25
+
+
+def test_supervisor_resumes_after_failures() -> None:
+    servicer = FakeStellarStationService(message_count=30, fail_after=10, failures=2)
+    supervisor, received, completed = asyncio.run(supervise(servicer))
+
+    assert completed
+    assert servicer.streams_opened == 3
+    # Every message is received exactly once: each failure happens after the last ack.
+    assert received == [str(i) for i in range(30)]
+    assert len(supervisor.metrics.recoveries) == 2
+    # Depending on timing the failure is seen by a read (UNAVAILABLE) or by an ack write (INTERNAL).
+    assert all(r.reason in ('UNAVAILABLE', 'INTERNAL') for r in supervisor.metrics.recoveries)
+    assert all(r.recovery_time is not None for r in supervisor.metrics.recoveries)
+
+
+def test_supervisor_acks_the_end_message() -> None:
+    servicer = FakeStellarStationService(message_count=25)
+    supervisor, _, completed = asyncio.run(supervise(servicer, ack_policy=CountAckPolicy(10)))
+
+    assert completed
+    # The coalesced acks still pending at the end message are sent with its ack.
+    acks = [r.telemetry_received_ack.message_ack_id for r in servicer.requests
+            if r.HasField('telemetry_received_ack')]
+    assert acks == ['9', '19', '25']
+    assert supervisor.satellite_stream.last_ack_id == '25'
+
+
+def test_supervisor_gives_up_after_max_attempts() -> None:
+    servicer = FakeStellarStationService(message_count=30, fail_after=0, failures=10)
+    _, received, completed = asyncio.run(supervise(servicer, max_attempts=3))
+
+    assert not completed
+    assert servicer.streams_opened == 3
+
+
+def test_max_attempts_counts_failures_in_a_row() -> None:
+    # Every connection receives telemetry before it fails, so the stream never gives up.
+    servicer = FakeStellarStationService(message_count=30, fail_after=5, failures=5)
+    _, received, completed = asyncio.run(supervise(servicer, max_attempts=2))
+
+    assert completed
+    assert servicer.streams_opened == 6
+    assert received == [str(i) for i in range(30)]
+
+
+def test_supervisor_resumes_from_checkpoint_after_restart(tmp_path) -> None:
+    servicer = FakeStellarStationService(message_count=20)
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    flushed = []
+
+    async def before_checkpoint():
+        flushed.append(store.load('5'))
+
+    with pytest.raises(Killed):
+        asyncio.run(supervise(servicer, checkpoint_store=store, kill_at='7', before_checkpoint=before_checkpoint))
+    store.close()
+    # The outputs are flushed before the checkpoint is saved.
+    assert flushed[-1] == (None, None)
+
+    # A new process with a fresh store on the same database.
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    assert store.load('5') == ('stream-1', '6')
+    _, received, completed = asyncio.run(supervise(servicer, checkpoint_store=store))
+
+    assert completed
+    assert received[0] == '7'
+    resume = servicer.requests[-1] if servicer.requests[-1].stream_id else \
+        [r for r in servicer.requests if r.stream_id][-1]
+    assert resume.stream_id == 'stream-1'
+    assert resume.resume_stream_message_ack_id == '6'
+    # The stream is finished, so a later run doesn't resume it.
+    assert store.load('5', max_age=None) == (None, None)
+
+
+def test_recovery_metrics_waits_for_full_throughput() -> None:
+    now = [0.0]
+    metrics = RecoveryMetrics(window=1.0, clock=lambda: now[0])
+
+    def receive(seconds, bytes_per_second):
+        for _ in range(seconds * 10):
+            now[0] += 0.1
+            metrics.on_telemetry(bytes_per_second // 10)
+
+    receive(3, 1000)
+    assert round(metrics.bytes_per_second) == 1000
+
+    metrics.on_disconnect('UNAVAILABLE')
+    now[0] += 2.0
+    metrics.on_reconnect()
+    receive(2, 100)
+    recovery = metrics.recoveries[0]
+    assert round(recovery.first_telemetry_at - recovery.dropped_at, 3) == 2.1
+    assert recovery.full_throughput_at is None
+
+    receive(2, 1000)
+    assert 5.0 <= recovery.recovery_time <= 5.5
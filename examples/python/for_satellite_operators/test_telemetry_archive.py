@@ -0,0 +1,55 @@
+# Copyright 2026 Infostellar, Inc.
+
+import random
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from telemetry_archive import TelemetryArchive, TelemetryArchiveWriter
+
+
+def response(plan_id, ground_station_id, seconds, data):
+    return stellarstation_pb2.ReceiveTelemetryResponse(
+        plan_id=plan_id,
+        ground_station_id=ground_station_id,
+        telemetry=[transport_pb2.Telemetry(
+            framing=transport_pb2.AX25,
+            data=data,
+            frame_header=b'h',
+            downlink_frequency_hz=100,
+            time_first_byte_received=Timestamp(seconds=seconds),
+            time_last_byte_received=Timestamp(seconds=seconds, nanos=1))])
+
+
+def test_archive_round_trip_and_seek(tmp_path) -> None:
+    path = str(tmp_path / 'pass.tlma')
+    seconds = list(range(1000))
+    random.Random(1).shuffle(seconds)
+    with TelemetryArchiveWriter(path, buffer_size=1024) as writer:
+        for s in seconds:
+            writer.append_response(response('plan-a' if s % 2 else 'plan-b', 'gs-1', s, s.to_bytes(2, 'big')))
+        writer.append_response(response('plan-c', 'gs-2', 5, b'x'))
+
+    with TelemetryArchive(path) as archive:
+        assert len(archive) == 1001
+        assert archive.plan_ids() == ['plan-a', 'plan-b', 'plan-c']
+
+        frames = list(archive.frames('plan-a'))
+        assert [f.time_first_byte_received // 1000000000 for f in frames] == list(range(1, 1000, 2))
+        assert bytes(frames[0].data) == (1).to_bytes(2, 'big')
+        assert bytes(frames[0].frame_header) == b'h'
+        assert frames[0].framing == transport_pb2.AX25
+        assert frames[0].time_last_byte_received == 1000000001
+        assert isinstance(frames[0].data, memoryview)
+
+        frame = archive.seek('plan-b', 101 * 1000000000)
+        assert frame.time_first_byte_received == 102 * 1000000000
+        assert bytes(frame.data) == (102).to_bytes(2, 'big')
+        assert archive.seek('plan-b', 1000 * 1000000000) is None
+        assert archive.seek('plan-c', 0, ground_station_id='gs-1') is None
+        assert archive.seek('plan-c', 0, ground_station_id='gs-2').ground_station_id == 'gs-2'
+
+        window = list(archive.frames('plan-a', 'gs-1', 10 * 1000000000, 20 * 1000000000))
+        assert [f.time_first_byte_received // 1000000000 for f in window] == [11, 13, 15, 17, 19]
+        del frames, frame, window
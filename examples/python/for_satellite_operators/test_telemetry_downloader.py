@@ -0,0 +1,220 @@
+# Copyright 2026 Infostellar, Inc.
+
+import http.server
+import json
+import os
+import re
+import threading
+import time
+
+import pytest
+from stellarstation.api.v1 import stellarstation_pb2
+
+from stream_supervisor import Backoff
+from telemetry_downloader import TelemetryDownloader, telemetry_path
+
+
+class FileServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files, ranges=True, delay=0.0):
+        super().__init__(('127.0.0.1', 0), RangeRequestHandler)
+        self.files = files
+        self.ranges = ranges
+        self.delay = delay
+        # Statuses to fail the next requests with.
+        self.failures = []
+        self.requests = []
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def url(self, name):
+        return 'http://127.0.0.1:{}/{}?signature=x'.format(self.server_address[1], name)
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            server.requests.append((self.path, self.headers.get('Range')))
+            failure = server.failures.pop(0) if server.failures else None
+        try:
+            time.sleep(server.delay)
+            if failure:
+                self.send_error(failure)
+                return
+            data = server.files.get(self.path.split('?')[0].lstrip('/'))
+            if data is None:
+                self.send_error(404)
+                return
+            etag = '"{}"'.format(hash(data))
+            match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+            if not server.ranges or not match:
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */{}'.format(len(data)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, len(data)))
+            self.send_header('Content-Length', str(end + 1 - start))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(data[start:end + 1])
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(files, **options):
+        server = FileServer(files, **options)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def no_backoff():
+    return Backoff(initial=0, jitter=0)
+
+
+def plan_with_files(plan_id, server, names):
+    return stellarstation_pb2.Plan(id=plan_id, telemetry_metadata=[
+        stellarstation_pb2.TelemetryMetadata(url=server.url(name), data_type=data_type)
+        for name, data_type in names])
+
+
+def test_downloads_files_of_many_plans_in_parts(serve, tmp_path) -> None:
+    files = {'{}-{}.bin'.format(plan, kind): os.urandom(100000 + plan * 1000) for plan in range(5) for kind in range(2)}
+    server = serve(files, delay=0.01)
+    plans = [plan_with_files(str(plan), server, [('{}-0.bin'.format(plan), 0), ('{}-1.bin'.format(plan), 2)])
+             for plan in range(5)]
+
+    with TelemetryDownloader(str(tmp_path), max_connections=4, part_size=16384) as downloader:
+        results = list(downloader.download_plans(plans))
+
+    assert len(results) == 10
+    for plan, metadata, path, error in results:
+        assert error is None
+        assert path == telemetry_path(str(tmp_path), plan.id, metadata)
+        with open(path, 'rb') as f:
+            assert f.read() == files[os.path.basename(path).split('-', 1)[1]]
+    assert os.path.basename(results[0][2]).split('-')[0] in ('RAW', 'DECODED')
+    assert not [name for _, _, names in os.walk(str(tmp_path)) for name in names if '.part' in name]
+    assert server.max_active <= 4
+    # Connections are kept alive across parts and files.
+    assert server.connections <= 4 < len(server.requests)
+    assert downloader.stats.files_completed == 10
+
+    # Completed files are not downloaded again.
+    requests = len(server.requests)
+    with TelemetryDownloader(str(tmp_path), part_size=16384) as downloader:
+        assert all(error is None for _, _, _, error in downloader.download_plans(plans))
+    assert len(server.requests) == requests
+    assert downloader.stats.files_skipped == 10
+
+
+def test_resumes_partial_download(serve, tmp_path) -> None:
+    data = os.urandom(50000)
+    server = serve({'f.bin': data})
+    path = str(tmp_path / 'f.bin')
+    # An earlier run wrote the first 20000 bytes and the last part.
+    with open(path + '.part', 'wb') as f:
+        f.write(data[:20000] + bytes(20000) + data[40000:])
+    with open(path + '.part.json', 'w') as f:
+        json.dump({'size': len(data), 'etag': '"{}"'.format(hash(data)), 'done': [[0, 20000], [40000, 50000]]}, f)
+
+    with TelemetryDownloader(str(tmp_path), part_size=8000) as downloader:
+        results = list(downloader.download_all([('f', server.url('f.bin'), path)]))
+
+    assert results == [('f', path, None)]
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert sorted(r for _, r in server.requests) == ['bytes=20000-27999', 'bytes=28000-35999', 'bytes=36000-39999']
+    assert downloader.stats.bytes_resumed == 30000
+    assert not os.path.exists(path + '.part.json')
+
+
+def test_restarts_when_file_changed(serve, tmp_path) -> None:
+    data = os.urandom(30000)
+    server = serve({'f.bin': data})
+    path = str(tmp_path / 'f.bin')
+    with open(path + '.part', 'wb') as f:
+        f.write(os.urandom(10000))
+    with open(path + '.part.json', 'w') as f:
+        json.dump({'size': len(data), 'etag': '"old"', 'done': [[0, 10000]]}, f)
+
+    with TelemetryDownloader(str(tmp_path), part_size=8000) as downloader:
+        assert list(downloader.download_all([('f', server.url('f.bin'), path)]))[0][2] is None
+
+    with open(path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_server_without_ranges_and_empty_files(serve, tmp_path) -> None:
+    data = os.urandom(30000)
+    server = serve({'f.bin': data, 'empty.bin': b''}, ranges=False)
+
+    with TelemetryDownloader(str(tmp_path), part_size=8000) as downloader:
+        results = list(downloader.download_all([
+            ('f', server.url('f.bin'), str(tmp_path / 'f.bin')),
+            ('empty', server.url('empty.bin'), str(tmp_path / 'empty.bin')),
+        ]))
+
+    assert all(error is None for _, _, error in results)
+    with open(str(tmp_path / 'f.bin'), 'rb') as f:
+        assert f.read() == data
+    assert os.path.getsize(str(tmp_path / 'empty.bin')) == 0
+    assert len(server.requests) == 2
+
+
+def test_retries_server_errors_and_keeps_partial_download_on_failure(serve, tmp_path) -> None:
+    data = os.urandom(30000)
+    server = serve({'f.bin': data})
+    server.failures = [503, 500]
+    path = str(tmp_path / 'f.bin')
+
+    with TelemetryDownloader(str(tmp_path), part_size=8000, backoff_factory=no_backoff) as downloader:
+        assert list(downloader.download_all([('f', server.url('f.bin'), path)]))[0][2] is None
+    assert downloader.stats.retries == 2
+
+    # An expired URL fails without retries, and the part already downloaded is kept.
+    os.remove(path)
+    server.failures = [None, 403]
+    with TelemetryDownloader(str(tmp_path), max_connections=1, part_size=8000,
+                             backoff_factory=no_backoff) as downloader:
+        (_, _, error), = downloader.download_all([('f', server.url('f.bin'), path)])
+    assert error.status == 403
+    assert downloader.stats.retries == 0
+    with open(path + '.part.json') as f:
+        assert json.load(f)['done'] == [[0, 8000], [16000, 30000]]
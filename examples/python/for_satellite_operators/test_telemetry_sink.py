@@ -0,0 +1,57 @@
+# Copyright 2026 Infostellar, Inc.
+
+import os
+
+import pytest
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from stellarstation.api.v1 import stellarstation_pb2
+from stellarstation.api.v1 import transport_pb2
+
+from telemetry_sink import TelemetrySink, read_telemetry_file
+
+
+def telemetry(data, framing=transport_pb2.BITSTREAM, seconds=100, frame_header=b''):
+    return transport_pb2.Telemetry(
+        framing=framing,
+        data=data,
+        downlink_frequency_hz=437000000,
+        time_first_byte_received=Timestamp(seconds=seconds, nanos=5),
+        frame_header=frame_header)
+
+
+@pytest.mark.parametrize('background', [False, True])
+def test_sink_writes_one_file_per_plan_and_framing(tmp_path, background) -> None:
+    with TelemetrySink(str(tmp_path), buffer_size=64, background=background) as sink:
+        sink.write_response(stellarstation_pb2.ReceiveTelemetryResponse(
+            plan_id='p1',
+            telemetry=[telemetry(b'abc', frame_header=b'hdr'), telemetry(b'iq', framing=transport_pb2.IQ)]))
+        for i in range(100):
+            sink.write('p2', telemetry(bytes([i]) * 10, seconds=i))
+
+    plan_id, framing, records = read_telemetry_file(str(tmp_path / 'p1' / 'BITSTREAM-0000.tlm'))
+    assert (plan_id, framing) == ('p1', transport_pb2.BITSTREAM)
+    assert records[0].data == b'abc'
+    assert records[0].frame_header == b'hdr'
+    assert records[0].time_first_byte_received == 100 * 1000000000 + 5
+    assert records[0].downlink_frequency_hz == 437000000
+
+    _, framing, records = read_telemetry_file(str(tmp_path / 'p1' / 'IQ-0000.tlm'))
+    assert framing == transport_pb2.IQ
+    assert [r.data for r in records] == [b'iq']
+
+    _, _, records = read_telemetry_file(str(tmp_path / 'p2' / 'BITSTREAM-0000.tlm'))
+    assert [r.data for r in records] == [bytes([i]) * 10 for i in range(100)]
+    assert sink.records_written == 102
+
+
+def test_sink_rotates_without_overwriting(tmp_path) -> None:
+    for _ in range(2):
+        with TelemetrySink(str(tmp_path), max_file_size=100, background=False) as sink:
+            for i in range(10):
+                sink.write('p', telemetry(bytes(40)))
+
+    files = sorted(os.listdir(str(tmp_path / 'p')))
+    assert len(files) > 2
+    records = [r for name in files for r in read_telemetry_file(str(tmp_path / 'p' / name))[2]]
+    assert len(records) == 20
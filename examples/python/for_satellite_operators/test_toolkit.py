@@ -0,0 +1,90 @@
+# Copyright 2026 Infostellar, Inc.
+
+import asyncio
+import json
+import threading
+
+import pytest
+from google.auth import jwt as google_auth_jwt
+
+import toolkit
+
+
+@pytest.fixture(scope='module')
+def api_key_path(tmp_path_factory):
+    serialization = pytest.importorskip('cryptography.hazmat.primitives.serialization')
+    rsa = pytest.importorskip('cryptography.hazmat.primitives.asymmetric.rsa')
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()).decode('ascii')
+    path = tmp_path_factory.mktemp('keys') / 'api-key.json'
+    path.write_text(json.dumps({
+        'type': 'service_account',
+        'client_email': 'test@example.com',
+        'private_key_id': '1',
+        'private_key': pem,
+    }))
+    return str(path)
+
+
+def test_channels_are_shared(api_key_path) -> None:
+    channel = toolkit.get_channel(api_key_path, 'localhost:1')
+    assert toolkit.get_channel(api_key_path, 'localhost:1') is channel
+    assert toolkit.get_channel(api_key_path, 'localhost:2') is not channel
+    assert toolkit.get_channel(api_key_path, 'localhost:1', keepalive_time_ms=10000) is not channel
+
+    channels = []
+    threads = [threading.Thread(target=lambda: channels.append(toolkit.get_channel(api_key_path, 'localhost:3')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, channels))) == 1
+    toolkit.close_channels()
+
+
+def test_aio_channels_are_shared_per_event_loop(api_key_path) -> None:
+    async def get_channels():
+        return toolkit.get_aio_channel(api_key_path, 'localhost:1'), toolkit.get_aio_channel(api_key_path, 'localhost:1')
+
+    first, second = asyncio.run(get_channels())
+    assert first is second
+    other, _ = asyncio.run(get_channels())
+    assert other is not first
+
+
+SERVICE_URL = 'https://api.stellarstation.com/stellarstation.api.v1.StellarStationService'
+
+
+def test_tokens_are_cached_until_refresh_margin(api_key_path) -> None:
+    plugin = toolkit.CachedJwtAuthMetadataPlugin(api_key_path, 'api.stellarstation.com:443')
+    metadata = plugin.metadata(SERVICE_URL)
+    assert metadata[0][0] == 'authorization'
+    assert plugin.metadata(SERVICE_URL) is metadata
+    assert plugin.tokens_signed == 1
+
+    # A margin longer than the token lifetime forces a new token on every call.
+    plugin.refresh_margin = toolkit.TOKEN_LIFETIME_SECONDS + 1
+    plugin.metadata(SERVICE_URL)
+    plugin.metadata(SERVICE_URL)
+    assert plugin.tokens_signed == 3
+
+
+def test_token_audience_is_the_service_url(api_key_path) -> None:
+    class Context:
+        service_url = SERVICE_URL
+
+    plugin = toolkit.CachedJwtAuthMetadataPlugin(api_key_path, 'api.stellarstation.com:443')
+    results = []
+    plugin(Context(), lambda metadata, error: results.append((metadata, error)))
+    other = plugin.metadata('https://api.stellarstation.com/stellarstation.api.v1.groundstation.GroundStationService')
+
+    (metadata, error), = results
+    assert error is None
+    claims = google_auth_jwt.decode(metadata[0][1][len('Bearer '):], verify=False)
+    assert claims['aud'] == SERVICE_URL
+    assert other is not metadata
+    assert plugin.tokens_signed == 2
@@ -1,26 +1,199 @@
 # Copyright 2023 Infostellar, Inc.
 # Opens a stream to both receive telemetry and send commands.
 
+import asyncio
 import os
 from datetime import datetime
-from queue import Queue
-from time import sleep
-import grpc
-
-from stellarstation.api.v1 import stellarstation_pb2
-from google.protobuf.timestamp_pb2 import Timestamp
 
 import toolkit
+from ack_policy import parse_ack_policy
+from command_uplink import CommandUplink
+from dedup import DuplicateFilter
+from latency_histogram import LatencyRecorder, serve_latency_metrics
+from shm_ring import TelemetryRing
+from sink_pipeline import BLOCK, FileStage, SinkPipeline, parse_stages
+from stream_client import SatelliteStream, is_end_message
+from stream_recording import RecordingStellarStationServiceStub, StreamRecorder
+from stream_supervisor import CheckpointStore, StreamSupervisor
+
+
+async def stream(client, satellite_id, channel_id, ack_policy=None, latency=None, iq_sample_format=None,
+                 ring_name=None, gs_state_directory=None, sink_stages=None, backpressure=BLOCK):
+    # Set up for stream
+    #
+    # Latency histograms from the ground station to this client, and from receiving telemetry to
+    # acking it and to writing it to disk, per ground station and plan.
+    latency = latency or LatencyRecorder()
+
+    # Telemetry is handed to a pipeline of output stages. Each stage has a bounded queue and its
+    # own thread, so the stream loop is not slowed by the disk or any other output until that
+    # stage's queue fills up (see sink_pipeline.py).
+    pipeline = SinkPipeline()
+
+    # Telemetry is written to one file per plan and framing under this directory. When the disk
+    # can't keep up, reading the stream waits for it rather than losing data, while acks and
+    # commands carry on.
+    pipeline.add(FileStage("tlm_and_cmd_stream_example_tlm", on_written=latency.on_written), policy=BLOCK)
+
+    # Any other stages, e.g. UDP forwarding, with the chosen backpressure policy.
+    for stage in sink_stages or []:
+        pipeline.add(stage, policy=backpressure)
+
+    # With a sample format, IQ telemetry is also written to a memory-mapped .npy file per plan
+    # that can be sliced by time with iq_store.IqRecording.
+    iq_sink = None
+    if iq_sample_format:
+        # iq_store needs NumPy, so it is only imported when IQ telemetry is stored.
+        from iq_store import IqSink
+        iq_sink = IqSink("tlm_and_cmd_stream_example_iq", iq_sample_format)
+        pipeline.add(iq_sink.write_response, name='iq', policy=BLOCK)
+
+    # With a ring name, telemetry is also published to a shared-memory ring that consumer processes
+    # read with shm_ring.RingConsumer.
+    ring = TelemetryRing(ring_name) if ring_name else None
+
+    # With a directory, the antenna, receiver and transmitter state reported during the plan is
+    # stored there as columnar arrays per plan (see gs_state_store.py).
+    gs_state_store = None
+    if gs_state_directory:
+        # gs_state_store needs NumPy, so it is only imported when the state is stored.
+        from gs_state_store import GroundStationStateStore
+        gs_state_store = GroundStationStateStore(gs_state_directory)
+
+    # A resumed stream rewinds to the last acked message, so responses already written after it are
+    # received again. They are recognized by fingerprint and not written twice.
+    duplicates = DuplicateFilter()
+
+    # The stream_id and the last processed message_ack_id are checkpointed here, so if this
+    # process is restarted within 10 minutes it resumes the stream where it stopped. Once the stream
+    # has ended, the checkpoint is cleared so that a later run starts a new stream.
+    #
+    # A response is acked as soon as it is queued in the pipeline, so acks don't wait for the disk.
+    # The pipeline is flushed before every checkpoint, so a checkpoint only ever covers telemetry
+    # that has been written. If this process crashes, the responses queued or buffered since the
+    # last checkpoint are not written, but the resumed stream rewinds to the checkpoint and delivers
+    # them again. Any of them that were written before the crash are written twice.
+    checkpoint_store = CheckpointStore("tlm_and_cmd_stream_example_checkpoint.db")
+
+    # SatelliteStream keeps the counters, the stream_id and the last acked message_ack_id.
+    # Every read, ack and command goes through the same event loop.
+    #
+    # If you have the plan id, pass plan_id=plan_id to limit your stream to only data for that plan.
+    # If you have the groundstation id, pass ground_station_id=ground_station_id to limit your stream
+    # to only data from that groundstation.
+    satellite_stream = SatelliteStream(
+        client,
+        satellite_id,
+        # enable events allow stream events to be received
+        enable_events=True,
+        # This is required in order to do stream recovery
+        # It also helps us verify data is received by your client
+        enable_flow_control=True,
+        # Decides how often acks are sent. Each ack covers every message received before it,
+        # so at high downlink rates acks can be coalesced (see ack_policy.py).
+        ack_policy=ack_policy,
+        latency=latency)
+    stats = satellite_stream.stats
+
+    # Commands are batched into as few requests as possible, and each request is tracked until the
+    # ground station confirms it was sent.
+    uplink = CommandUplink(satellite_stream, channel_set_id=channel_id)
+    command_confirmations = []
 
-STREAM_DONE = object()
+    # Process responses
+    stop_streaming_critera = [toolkit.PlanLifecycleEventStatus.FAILED]
+    plan_status = toolkit.PlanLifecycleEventStatus.UNKNOWN
+    commands_sent = False
+
+    async def send_commands(satellite_stream):
+        nonlocal commands_sent
+        print("Stream opened for Satellite ID ({}), Channel ID ({}); {}".format(
+            satellite_id, channel_id, datetime.now()))
+        if commands_sent:
+            return
+        # Send a burst of dummy commands
+        # The uplink sends them in a single request, with a UUID request_id that the groundstation
+        # responds with to confirm the commands were sent.
+        # Each future resolves with the time it took until the confirmation arrived.
+        command_confirmations.extend(uplink.send_all([bytes.fromhex("AABBCCDDEEFF")] * 10))
+        commands_sent = True
+
+    # Returns True once we've received the end of the telemetry data or the plan fails.
+    async def handle_response(response):
+        nonlocal plan_status
+        end_message_received = False
+
+        # Match command confirmations
+        uplink.on_response(response)
+
+        # check if we received telemetry or a stream event
+        kind = response.WhichOneof("Response")
+        if kind == "receive_telemetry_response":
+            # Record the telemetry to file
+            if not duplicates.is_duplicate(response.receive_telemetry_response):
+                await pipeline.submit_async(response.receive_telemetry_response, token=latency.receive_token)
+                if ring is not None:
+                    ring.publish_response(response.receive_telemetry_response)
+
+            if is_end_message(response.receive_telemetry_response):
+                end_message_received = True
+
+        elif kind == "stream_event":
+            if gs_state_store is not None:
+                gs_state_store.append_event(response.stream_event)
+            try:
+                # There are various types of stream events
+                # There's monitoring events as well as life cycle events
+                # Here we're looking for plan status updates
+                if response.stream_event.HasField("plan_monitoring_event") and \
+                        response.stream_event.plan_monitoring_event.HasField("ground_station_event"):
+                    plan_status = toolkit.PlanLifecycleEventStatus(
+                        response.stream_event.plan_monitoring_event.ground_station_event.plan.status)
+            except:
+                pass
+
+        print("Plan Status = {}: {}".format(plan_status.name, stats), end="\r")
+
+        return plan_status in stop_streaming_critera or end_message_received
+
+    # The supervisor opens the stream, and if there's a problem with GRPC/Streamer
+    # reconnects with exponential backoff, resuming from the last processed message.
+    # Errors that can't be fixed by reconnecting, like an invalid API key, are raised.
+    supervisor = StreamSupervisor(
+        satellite_stream,
+        handle_response,
+        on_open=send_commands,
+        checkpoint_store=checkpoint_store,
+        before_checkpoint=pipeline.flush_async,
+        max_attempts=10)
+
+    try:
+        await supervisor.run()
+    finally:
+        await uplink.close()
+        await asyncio.gather(*command_confirmations, return_exceptions=True)
+        pipeline.close()
+        if iq_sink is not None:
+            iq_sink.close()
+        if ring is not None:
+            ring.close()
+        if gs_state_store is not None:
+            gs_state_store.close()
+        checkpoint_store.close()
+
+    print()
+    print(uplink.stats)
+    print("Duplicates: {}".format(duplicates.stats))
+    for stage_stats in pipeline.stats():
+        print(stage_stats)
+    for recovery in supervisor.metrics.recoveries:
+        print(recovery)
+    for histogram in latency.snapshot():
+        print("Latency {metric} (ground station {ground_station_id}, plan {plan_id}): count = {count}, "
+              "p50 = {p50_ms}ms, p99 = {p99_ms}ms, max = {max_ms}ms".format(**histogram))
+    print("Ending stream (id = {}): total bytes = {}, finished at = {}".format(
+        satellite_stream.stream_id, stats.total_bytes_received, datetime.now()))
 
-def generate_request(request_queue):
-    # iter(request_queue.get) will block until a message is sent into the queue
-    # we break from the loop by listening for STREAM_DONE to be sent into the queue
-    for request in iter(request_queue.get, None):
-        if request is STREAM_DONE:
-            break
-        yield request
 
 def run():
     STELLARSTATION_API_KEY_PATH = os.getenv('STELLARSTATION_API_KEY_PATH')
@@ -34,182 +207,54 @@ def run():
     STELLARSTATION_API_URL = os.getenv('STELLARSTATION_API_URL','stream.qa.stellarstation.com')
     assert STELLARSTATION_API_URL, "Did you properly define this environment variable on your system?"
 
-    # A client is necessary to receive services from StellarStation.
-    client = toolkit.get_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL)
-
-    # Set up for stream
-    tlm_file = open("tlm_and_cmd_stream_example_tlm.bin", "wb")
-    total_responses = 0
-    total_telemetry_messages = 0
-    total_stream_events = 0
-    total_acks_sent = 0
-    total_messages_sent = 0
-    total_bytes_received = 0
-    command_request_count = 0
-    stream_id = None
-    last_ack_id = None
-
-    # All messages to the streamer will go through this queue.
-    request_queue = Queue()
-    request_generator = generate_request(request_queue)
-
-    # Process responses
-    stop_streaming_critera = [toolkit.PlanLifecycleEventStatus.FAILED]
-    plan_status = toolkit.PlanLifecycleEventStatus.UNKNOWN
-    end_message_received = False
-    stream_attempts = 0
-
-    # Running in a loop to show how you can reconnect
-    # if there's a problem with GRPC/Streamer
-    #
-    # if we've received the end of the telemetry data, the plan fails,
-    # or we've tried 3 times we'll stop
-    while end_message_received is False and \
-            plan_status not in stop_streaming_critera and \
-            stream_attempts < 3:
-        stream_attempts += 1
-
-        # We'll prepare the initial setup request and add to queue
-        #
-        #
-        # enable_events, enable_flow_control do not need to be sent
-        # after the setup message.
-        stream_setup_request = stellarstation_pb2.SatelliteStreamRequest(
-            # satellite_id is required for every message sent
-            satellite_id=STELLARSTATION_API_SATELLITE_ID,
-            # enable events allow stream events to be received
-            enable_events=True,
-
-            # These are for stream recovery.
-            #
-            # stream_id and last_ack_id will be None in the first loop,
-            # but will let us attempt to recover the stream if an error occurs
-            stream_id=stream_id,
-            # On recovery, streamer will rewind the stream to the message after last_ack_id
-            resume_stream_message_ack_id=last_ack_id,
-            # This is required in order to do stream recovery
-            # It also helps us verify data is received by your client
-            enable_flow_control=True
-
-            # If you have the plan id, it'll limit your stream to only data for that plan
-            # plan_id=plan_id
-
-            # if you have the groundstation id, it'll limit your stream to only data from that groundstation
-            # groundstation_id=groundstation_id
-        )
-        request_queue.put(stream_setup_request)
-        total_messages_sent += 1
-
-        if command_request_count == 0:
-            # Queue a burst of dummy commands
-            # You can send many in a single request
-            # in this case we send 10 commands
-            command_request = stellarstation_pb2.SatelliteStreamRequest(
-                # The groundstation will try to respond with this request_id
-                # to confirm the command was sent.
-                # Using a UUID is recommended.
-                request_id="command_request_id_{}".format(
-                    command_request_count),
-                satellite_id=STELLARSTATION_API_SATELLITE_ID,
-                send_satellite_commands_request=stellarstation_pb2.SendSatelliteCommandsRequest(
-                    command=[bytes.fromhex("AABBCCDDEEFF")] * 10,
-                    channel_set_id=STELLARSTATION_API_SATELLITE_ID))
-
-            request_queue.put(command_request)
-            command_request_count += 1
-            total_messages_sent += 1
-
-        print("Starting stream for Satellite ID ({}), Channel ID ({}); {}".format(
-            STELLARSTATION_API_SATELLITE_ID, STELLARSTATION_API_CHANNEL_ID, datetime.now()))
-
+    # One of: every, count:<n>, interval:<ms>, adaptive[:<ms>]
+    ack_policy = parse_ack_policy(os.getenv('STELLARSTATION_API_ACK_POLICY', 'every'))
+
+    # If set, latency histograms are served as JSON at http://127.0.0.1:<port>/latency while streaming.
+    STELLARSTATION_API_LATENCY_PORT = os.getenv('STELLARSTATION_API_LATENCY_PORT')
+    latency = LatencyRecorder()
+    if STELLARSTATION_API_LATENCY_PORT:
+        serve_latency_metrics(latency, int(STELLARSTATION_API_LATENCY_PORT))
+
+    # If set, IQ telemetry is also stored as NumPy samples of this format: cf32, ci16 or ci8.
+    STELLARSTATION_API_IQ_FORMAT = os.getenv('STELLARSTATION_API_IQ_FORMAT')
+
+    # If set, telemetry is also published to a shared-memory ring of this name for local consumers,
+    # e.g. `python shm_ring.py <name> <slot>`.
+    STELLARSTATION_API_SHM_RING = os.getenv('STELLARSTATION_API_SHM_RING')
+
+    # If set, GroundStationState monitoring events are stored under this directory.
+    STELLARSTATION_API_GS_STATE_DIR = os.getenv('STELLARSTATION_API_GS_STATE_DIR')
+
+    # Extra output stages, e.g. stdout,udp:127.0.0.1:5000 (see sink_pipeline.parse_stages), and what
+    # they do when they fall behind: block, drop-oldest or spill.
+    STELLARSTATION_API_SINKS = os.getenv('STELLARSTATION_API_SINKS')
+    STELLARSTATION_API_BACKPRESSURE = os.getenv('STELLARSTATION_API_BACKPRESSURE', BLOCK)
+
+    # If set, every response is also recorded to this file as received, to be replayed offline with
+    # `python stream_recording.py <file>`.
+    STELLARSTATION_API_RECORD_PATH = os.getenv('STELLARSTATION_API_RECORD_PATH')
+
+    async def main():
+        # A client is necessary to receive services from StellarStation.
+        # The grpc.aio client must be created inside the event loop that uses it.
+        recorder = None
+        if STELLARSTATION_API_RECORD_PATH:
+            recorder = StreamRecorder(STELLARSTATION_API_RECORD_PATH)
+            client = RecordingStellarStationServiceStub(
+                toolkit.get_aio_channel(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL), recorder)
+        else:
+            client = toolkit.get_aio_grpc_client(STELLARSTATION_API_KEY_PATH, STELLARSTATION_API_URL)
+        sink_stages = parse_stages(STELLARSTATION_API_SINKS) if STELLARSTATION_API_SINKS else None
         try:
-            # OpenSatelliteStream will start the stream,
-            # all messages received will come as a response
-            # all messages we want to send go through request_queue and request_generator
-            for response in client.OpenSatelliteStream(request_generator):
-                total_responses += 1
-
-                # stream_id allows you to attempt a stream recovery, but
-                # also provides a useful identifier for the Stellarstation
-                # team to help debug any issues
-                if stream_id is None and len(response.stream_id) > 0:
-                    stream_id = response.stream_id
-
-                # check if we received telemetry or a stream event
-                if response.HasField("receive_telemetry_response"):
-                    total_telemetry_messages += 1
-
-                    # First we'll send an ack that we received the message
-                    # Acks are required to verify your client has received the data
-                    ack_request = stellarstation_pb2.SatelliteStreamRequest(
-                        satellite_id=STELLARSTATION_API_SATELLITE_ID,
-                        telemetry_received_ack=stellarstation_pb2.ReceiveTelemetryAck(
-                            message_ack_id=response.receive_telemetry_response.message_ack_id,
-                            # received_timestamp is not required,
-                            # but provides stellarstation with debugging information
-                            received_timestamp=Timestamp().GetCurrentTime()
-                        ))
-
-                    request_queue.put(ack_request)
-                    last_ack_id = response.receive_telemetry_response.message_ack_id
-                    total_messages_sent += 1
-                    total_acks_sent += 1
-
-                    # Record the telemetry to file
-                    for tlm in response.receive_telemetry_response.telemetry:
-                        total_bytes_received += len(tlm.data)
-                        tlm_file.write(tlm.data)
-
-                    # A message with 1 telemetry and 0 data is a way
-                    # we mark the End message. This may change in
-                    # the future for clearer detection for the end of a stream
-                    #
-                    # This message is sent when the groundstation is "cleaning up"
-                    # So it may arrive after the PlanLifecycleEventStatus
-                    # is marked as complete
-                    if len(response.receive_telemetry_response.telemetry) == 1 and len(response.receive_telemetry_response.telemetry[0].data) == 0:
-                        end_message_received = True
-
-                elif response.HasField("stream_event"):
-                    total_stream_events += 1
-
-                    try:
-                        # There are various types of stream events
-                        # There's monitoring events as well as life cycle events
-                        # Here we're looking for plan status updates
-                        if response.stream_event.HasField("plan_monitoring_event") and \
-                                response.stream_event.plan_monitoring_event.HasField("ground_station_event"):
-                            plan_status = toolkit.PlanLifecycleEventStatus(
-                                response.stream_event.plan_monitoring_event.ground_station_event.plan.status)
-                    except:
-                        pass
-
-                print("Plan Status = {}: Total Responses = {}, Telemetry Messages = {}, MessagesSent = {}, Acks Sent = {}, StreamEvents = {}, Total Bytes = {}".format(
-                    plan_status.name,
-                    total_responses,
-                    total_telemetry_messages,
-                    total_messages_sent,
-                    total_acks_sent,
-                    total_stream_events,
-                    total_bytes_received
-                ), end="\r")
-
-                if plan_status in stop_streaming_critera or end_message_received:
-                    break
-        except grpc.RpcError as e:
-            print("GRPC error while streaming: {}".format(e))
-            # Sleep before retrying
-            sleep(1)
-        except Exception as e:
-            print("Unhandled error while streaming: {}".format(e))
-            # unknown exceptions won't be retried
-            break
-
-    # Send STREAM_DONE so the request generator can shut down
-    request_queue.put(STREAM_DONE)
-    print()
-    print("Ending stream (id = {}): total bytes = {}, finished at = {}".format(
-        stream_id, total_bytes_received, datetime.now()))
+            await stream(client, STELLARSTATION_API_SATELLITE_ID, STELLARSTATION_API_CHANNEL_ID, ack_policy, latency,
+                         STELLARSTATION_API_IQ_FORMAT, STELLARSTATION_API_SHM_RING, STELLARSTATION_API_GS_STATE_DIR,
+                         sink_stages, STELLARSTATION_API_BACKPRESSURE)
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    asyncio.run(main())
 
 
 if __name__ == '__main__':
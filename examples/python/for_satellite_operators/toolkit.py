@@ -2,10 +2,15 @@
 
 # A nice set of tools used by the examples.
 
+import asyncio
+import datetime
+import threading
+import time
+import weakref
 from enum import Enum
 
+import grpc
 from google.auth import jwt as google_auth_jwt
-from google.auth.transport import grpc as google_auth_transport_grpc
 
 from stellarstation.api.v1 import stellarstation_pb2_grpc
 
@@ -26,26 +31,147 @@ class PlanLifecycleEventStatus(Enum):
     COMPLETED = 3
     FAILED = 4
 
-def get_grpc_client(api_key_path, api_url_path):
-    print('API Target: ', api_url_path)
-    jwt_credentials = google_auth_jwt.Credentials.from_service_account_file(
-        api_key_path,
-        audience=api_url_path,
-        token_lifetime=60)
+# By default, GRPC sets the max message size to 4MB, but StellarStation can support up to 10MB.
+# If GRPC message would be received which exceeds this GRPC limit, a RESOURCE_EXHAUSTED error will be returned.
+MAX_MESSAGE_LENGTH = 10 * 1024 * 1024
 
-    google_jwt_credentials = google_auth_jwt.OnDemandCredentials.from_signing_credentials(jwt_credentials)
+# How long signed API tokens are valid for, and how long before expiry they are re-signed.
+TOKEN_LIFETIME_SECONDS = 3600
+TOKEN_REFRESH_MARGIN_SECONDS = 300
 
-    # By default, GRPC sets the max message size to 4MB, but StellarStation can support up to 10MB.
-    # If GRPC message would be received which exceeds this GRPC limit, a RESOURCE_EXHAUSTED error will be returned.
-    options = [('grpc.max_send_message_length', 10 * 1024 * 1024),
-               ('grpc.max_receive_message_length', 10 * 1024 * 1024)]
+# Channels and credentials are shared by every client in the process, keyed by endpoint, key file
+# and channel options. Synchronous channels are thread-safe. grpc.aio channels are bound to the
+# event loop they were created in, so they are pooled per event loop.
+_pool_lock = threading.Lock()
+_credentials = {}
+_channels = {}
+_aio_channels = weakref.WeakKeyDictionary()
 
-    channel = google_auth_transport_grpc.secure_authorized_channel(
-            google_jwt_credentials,
-            None,
-            api_url_path,
-            options = options)
 
-    client = stellarstation_pb2_grpc.StellarStationServiceStub(channel)
+# Supplies an "authorization" header with a JWT signed with the API key.
+#
+# As with google.auth's OnDemandCredentials, the token's audience is the URL of the service being
+# called (e.g. https://api.stellarstation.com/stellarstation.api.v1.StellarStationService). A token is
+# signed once per audience and reused for every call on every channel using the same key and
+# endpoint, until it is within refresh_margin seconds of expiring.
+class CachedJwtAuthMetadataPlugin(grpc.AuthMetadataPlugin):
+    def __init__(self, api_key_path, api_url_path, token_lifetime=TOKEN_LIFETIME_SECONDS,
+                 refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS):
+        self._credentials = google_auth_jwt.Credentials.from_service_account_file(
+            api_key_path,
+            audience=api_url_path,
+            token_lifetime=token_lifetime)
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        # audience -> (metadata, expiry)
+        self._tokens = {}
+        self.tokens_signed = 0
 
-    return client
+    def metadata(self, audience):
+        with self._lock:
+            metadata, expiry = self._tokens.get(audience, (None, 0))
+            if metadata is None or time.time() >= expiry - self.refresh_margin:
+                credentials = self._credentials.with_claims(audience=audience)
+                credentials.refresh(None)
+                token = credentials.token
+                if isinstance(token, bytes):
+                    token = token.decode('utf-8')
+                metadata = (('authorization', 'Bearer ' + token),)
+                expiry = credentials.expiry.replace(tzinfo=datetime.timezone.utc).timestamp()
+                self._tokens[audience] = (metadata, expiry)
+                self.tokens_signed += 1
+            return metadata
+
+    def __call__(self, context, callback):
+        try:
+            metadata = self.metadata(context.service_url)
+        except Exception as e:
+            callback((), e)
+            return
+        callback(metadata, None)
+
+
+# Returns the gRPC channel options for a StellarStation channel.
+#
+# keepalive_time_ms enables HTTP/2 keepalive pings, which keep idle connections (e.g. between passes)
+# from being dropped by NATs and proxies. http2_lookahead_bytes sets the HTTP/2 stream window; larger
+# windows help high-rate downlinks over long round trips. BDP probing adjusts the window automatically
+# and is on by default.
+#
+# Channels with the same options share one connection. Channels with a different `connection` get
+# their own connection, which is how many streams are spread over several connections.
+def channel_options(keepalive_time_ms=None, keepalive_timeout_ms=20000, http2_lookahead_bytes=None,
+                    http2_bdp_probe=True, max_message_length=MAX_MESSAGE_LENGTH, connection=None):
+    options = [('grpc.max_send_message_length', max_message_length),
+               ('grpc.max_receive_message_length', max_message_length),
+               ('grpc.http2.bdp_probe', 1 if http2_bdp_probe else 0)]
+    if keepalive_time_ms is not None:
+        options += [('grpc.keepalive_time_ms', keepalive_time_ms),
+                    ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+                    ('grpc.keepalive_permit_without_calls', 1),
+                    ('grpc.http2.max_pings_without_data', 0)]
+    if http2_lookahead_bytes is not None:
+        options.append(('grpc.http2.lookahead_bytes', http2_lookahead_bytes))
+    if connection is not None:
+        options += [('grpc.use_local_subchannel_pool', 1),
+                    ('stellarstation.connection', connection)]
+    return tuple(options)
+
+
+def _channel_credentials(api_key_path, api_url_path):
+    # Must be called with _pool_lock held.
+    key = (api_key_path, api_url_path)
+    plugin = _credentials.get(key)
+    if plugin is None:
+        plugin = _credentials[key] = CachedJwtAuthMetadataPlugin(api_key_path, api_url_path)
+    return grpc.composite_channel_credentials(
+        grpc.ssl_channel_credentials(),
+        grpc.metadata_call_credentials(plugin))
+
+
+# Returns the shared channel for api_url_path authenticated with the key at api_key_path.
+# Keyword arguments are passed to channel_options.
+def get_channel(api_key_path, api_url_path, **options):
+    options = channel_options(**options)
+    key = (api_key_path, api_url_path, options)
+    with _pool_lock:
+        channel = _channels.get(key)
+        if channel is None:
+            print('API Target: ', api_url_path)
+            channel = _channels[key] = grpc.secure_channel(
+                api_url_path, _channel_credentials(api_key_path, api_url_path), options=options)
+        return channel
+
+
+# Same as get_channel, but returns a grpc.aio channel for the running event loop.
+def get_aio_channel(api_key_path, api_url_path, **options):
+    loop = asyncio.get_running_loop()
+    options = channel_options(**options)
+    key = (api_key_path, api_url_path, options)
+    with _pool_lock:
+        channels = _aio_channels.setdefault(loop, {})
+        channel = channels.get(key)
+        if channel is None:
+            print('API Target: ', api_url_path)
+            channel = channels[key] = grpc.aio.secure_channel(
+                api_url_path, _channel_credentials(api_key_path, api_url_path), options=options)
+        return channel
+
+
+# Closes the shared synchronous channels. grpc.aio channels are closed with their event loop.
+def close_channels():
+    with _pool_lock:
+        channels = list(_channels.values())
+        _channels.clear()
+    for channel in channels:
+        channel.close()
+
+
+def get_grpc_client(api_key_path, api_url_path, **options):
+    return stellarstation_pb2_grpc.StellarStationServiceStub(get_channel(api_key_path, api_url_path, **options))
+
+
+# Same as get_grpc_client, but the returned client runs on a grpc.aio channel.
+# It must be called, and the client used, from a running event loop.
+def get_aio_grpc_client(api_key_path, api_url_path, **options):
+    return stellarstation_pb2_grpc.StellarStationServiceStub(get_aio_channel(api_key_path, api_url_path, **options))